@@ -0,0 +1 @@
+"""Benchmark suite for the hypermvp pipelines (see run_benchmarks.py)."""
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files written by run_benchmarks.py.
+
+Prints the time of every benchmark and scale found in both files and the
+relative change. Exits with status 1 if anything got slower by more than
+--threshold, so the comparison can gate a CI job.
+
+Plain English:
+Run the suite before and after a change, then run this to see what got
+faster or slower.
+
+Usage:
+    python benchmarks/compare.py benchmarks/results/<before>.json benchmarks/results/<after>.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+def load_results(path: str) -> Tuple[Dict[str, Any], Dict[Tuple[str, int], Dict[str, Any]]]:
+    """Return (file header, {(benchmark, scale): result}) for a results file."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data, {(r["benchmark"], r["scale"]): r for r in data["results"]}
+
+def compare(before: Dict[Tuple[str, int], Dict[str, Any]], after: Dict[Tuple[str, int], Dict[str, Any]],
+            threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare the benchmarks present in both result sets.
+
+    Args:
+        before, after: {(benchmark, scale): result} as returned by load_results
+        threshold: Relative slowdown above which a benchmark counts as a regression
+
+    Returns:
+        list: One row per benchmark and scale with both times, the change and a regression flag
+    """
+    rows = []
+    for key in sorted(set(before) & set(after), key=lambda k: (k[1], k[0])):
+        old, new = before[key], after[key]
+        if "seconds" not in old or "seconds" not in new:
+            rows.append({"benchmark": key[0], "scale": key[1], "error": new.get("error") or old.get("error")})
+            continue
+        change = (new["seconds"] - old["seconds"]) / old["seconds"] if old["seconds"] else None
+        rows.append({
+            "benchmark": key[0],
+            "scale": key[1],
+            "before": old["seconds"],
+            "after": new["seconds"],
+            "change": change,
+            "regression": change is not None and change > threshold,
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("before", help="Results of the baseline commit")
+    parser.add_argument("after", help="Results of the commit to check")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default: 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    before_file, before = load_results(args.before)
+    after_file, after = load_results(args.after)
+    print(f"before: {before_file['git'].get('commit')}  after: {after_file['git'].get('commit')}")
+
+    rows = compare(before, after, args.threshold)
+    print(f"\n{'benchmark':<18} {'scale':>6} {'before s':>10} {'after s':>10} {'change':>8}")
+    for row in rows:
+        if "error" in row:
+            print(f"{row['benchmark']:<18} {row['scale']:>5}x  failed: {row['error']}")
+            continue
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "n/a"
+        flag = "  <-- slower" if row["regression"] else ""
+        print(f"{row['benchmark']:<18} {row['scale']:>5}x {row['before']:>10.3f} {row['after']:>10.3f} {change:>8}{flag}")
+
+    if any(row.get("regression") for row in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
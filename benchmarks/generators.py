@@ -0,0 +1,239 @@
+"""
+Synthetic input data for the benchmark suite.
+
+- `write_provider_workbook` writes a regelleistung.net style provider workbook
+  (one delivery month, bids split over one or more sheets).
+- `write_afrr_csv` writes one month of aFRR activations in the exact
+  netztransparenz.de CSV format: UTF-8 with BOM, `;` separated, CRLF line
+  ends, German dates, decimal commas with three decimals and local
+  CET/CEST quarter hours (92 or 100 of them on the days the clocks change).
+- `create_provider_data_table` fills the `provider_data` table the marginal
+  price engine reads, straight in DuckDB, so large scales don't need Excel.
+
+All generators are seeded, so the same arguments always give the same data.
+
+Plain English:
+Makes fake-but-realistic input files of any size, so the pipeline can be
+timed on far more data than the small test fixtures contain.
+"""
+
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Tuple
+from zoneinfo import ZoneInfo
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+PROVIDER_COLUMNS = [
+    "DELIVERY_DATE",
+    "PRODUCT",
+    "ENERGY_PRICE_[EUR/MWh]",
+    "ALLOCATED_CAPACITY_[MW]",
+    "ENERGY_PRICE_PAYMENT_DIRECTION",
+    "NOTE",
+]
+# One product per quarter hour and direction, NEG_001 = 00:00-00:15
+PRODUCTS = [f"{direction}_{n:03d}" for direction in ("NEG", "POS") for n in range(1, 97)]
+
+AFRR_TSOS = ["50Hertz", "Amprion", "TenneT TSO", "TransnetBW"]
+AFRR_HEADER = ["Datum", "Zeitzone", "von", "bis", "Einheit"] + [
+    f"{tso} ({direction})"
+    for direction in ("Positiv", "Negativ")
+    for tso in AFRR_TSOS + ["Deutschland"]
+]
+
+def month_days(year: int, month: int) -> List[date]:
+    """Return every day of a month."""
+    first = date(year, month, 1)
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return [first + timedelta(days=n) for n in range((next_month - first).days)]
+
+def add_months(year: int, month: int, count: int) -> Tuple[int, int]:
+    """Return (year, month) `count` months after the given month."""
+    index = year * 12 + (month - 1) + count
+    return index // 12, index % 12 + 1
+
+def provider_rows(year: int, month: int, bids_per_product: int = 10, seed: int = 0):
+    """
+    Yield the bid rows of one delivery month (same column order as PROVIDER_COLUMNS).
+
+    Prices are drawn from a wide, skewed distribution, as in the real merit
+    order lists; the payment direction follows the sign of the price.
+    """
+    rng = random.Random(f"provider-{year}-{month}-{seed}")
+    for day in month_days(year, month):
+        delivery_date = day.isoformat()
+        for product in PRODUCTS:
+            for _ in range(bids_per_product):
+                price = round(rng.lognormvariate(4.5, 0.8) - 40, 2)
+                capacity = float(rng.randint(1, 50))
+                direction = "GRID_TO_PROVIDER" if price >= 0 else "PROVIDER_TO_GRID"
+                yield [delivery_date, product, abs(price), capacity, direction, None]
+
+def write_provider_workbook(path: str, year: int, month: int, sheets: int = 1,
+                            bids_per_product: int = 10, seed: int = 0) -> int:
+    """
+    Write one month of provider bids to an .xlsx workbook.
+
+    The days of the month are split evenly over `sheets` sheets, like the
+    large monthly exports that are spread over several sheets.
+
+    Args:
+        path: Workbook path
+        year, month: Delivery month
+        sheets: Number of sheets to spread the month over
+        bids_per_product: Bids per product and day (192 products per day)
+        seed: Random seed
+
+    Returns:
+        int: Number of bid rows written
+    """
+    from openpyxl import Workbook
+
+    days = month_days(year, month)
+    per_sheet = -(-len(days) // max(sheets, 1))
+    workbook = Workbook(write_only=True)
+    rows = 0
+    all_rows = provider_rows(year, month, bids_per_product, seed)
+    for index in range(max(sheets, 1)):
+        sheet = workbook.create_sheet(f"Sheet{index + 1}")
+        sheet.append(PROVIDER_COLUMNS)
+        for _ in range(per_sheet * len(PRODUCTS) * bids_per_product):
+            row = next(all_rows, None)
+            if row is None:
+                break
+            sheet.append(row)
+            rows += 1
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    workbook.save(path)
+    return rows
+
+def quarter_hours(year: int, month: int):
+    """
+    Yield the local quarter hours of a month as (start, end) aware datetimes.
+
+    Walks in UTC, so the day the clocks go forward has 92 quarter hours and
+    the day they go back has 100, exactly like the netztransparenz exports.
+    """
+    start = datetime(year, month, 1, tzinfo=BERLIN).astimezone(timezone.utc)
+    next_year, next_month = add_months(year, month, 1)
+    end = datetime(next_year, next_month, 1, tzinfo=BERLIN).astimezone(timezone.utc)
+    step = timedelta(minutes=15)
+    while start < end:
+        yield start.astimezone(BERLIN), (start + step).astimezone(BERLIN)
+        start += step
+
+def _german_number(value: float) -> str:
+    return f"{value:.3f}".replace(".", ",")
+
+def afrr_lines(year: int, month: int, seed: int = 0):
+    """Yield the data lines (without line ends) of one month of aFRR activations."""
+    rng = random.Random(f"afrr-{year}-{month}-{seed}")
+    for local_start, local_end in quarter_hours(year, month):
+        values = []
+        for _ in ("Positiv", "Negativ"):
+            # Most quarter hours see no activation; values come in 4 kW steps
+            per_tso = [
+                rng.randint(1, 25_000) * 0.004 if rng.random() < 0.35 else 0.0
+                for _ in AFRR_TSOS
+            ]
+            values.extend(per_tso + [sum(per_tso)])
+        yield ";".join([
+            local_start.strftime("%d.%m.%Y"),
+            local_start.tzname(),
+            local_start.strftime("%H:%M"),
+            local_end.strftime("%H:%M"),
+            "MW",
+        ] + [_german_number(value) for value in values])
+
+def write_afrr_csv(path: str, year: int, month: int, seed: int = 0) -> int:
+    """
+    Write one month of aFRR activations as a netztransparenz CSV.
+
+    Args:
+        path: CSV path
+        year, month: Month to generate
+        seed: Random seed
+
+    Returns:
+        int: Number of data rows written
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    rows = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write(";".join(AFRR_HEADER) + "\r\n")
+        for line in afrr_lines(year, month, seed):
+            f.write(line + "\r\n")
+            rows += 1
+    return rows
+
+def create_provider_data_table(conn, start: date, end: date, bids_per_product: int = 10,
+                               seed: int = 0, table_name: str = "provider_data") -> int:
+    """
+    (Re)create the cleaned provider table the price engine reads.
+
+    Generated with SQL inside DuckDB, so even the 100x scale takes seconds.
+
+    Args:
+        conn: DuckDB connection
+        start, end: First and last delivery day (inclusive)
+        bids_per_product: Bids per product and day
+        seed: Random seed
+        table_name: Table to create
+
+    Returns:
+        int: Number of rows in the table
+    """
+    # Uniform numbers from row hashes instead of random(): deterministic for any thread count
+    uniform = "((hash(day, direction, n, bid, {seed}, {salt}) % 1000003) + 0.5) / 1000003.0"
+    u1, u2, u3 = (uniform.format(seed=int(seed), salt=salt) for salt in (1, 2, 3))
+    conn.execute(f"""
+        CREATE OR REPLACE TABLE {table_name} AS
+        SELECT
+            day::TIMESTAMP AS DELIVERY_DATE,
+            direction || '_' || LPAD(CAST(n AS VARCHAR), 3, '0') AS PRODUCT,
+            ROUND(EXP(4.5 + 0.8 * SQRT(-2 * LN({u1})) * COS(2 * PI() * {u2})) - 40, 2) AS ENERGY_PRICE__EUR_MWh_,
+            CAST(1 + FLOOR({u3} * 50) AS DOUBLE) AS OFFERED_CAPACITY__MW_
+        FROM range(DATE '{start.isoformat()}', DATE '{end.isoformat()}' + INTERVAL 1 DAY, INTERVAL 1 DAY) days(day),
+             (VALUES ('NEG'), ('POS')) directions(direction),
+             range(1, 97) products(n),
+             range({int(bids_per_product)}) bids(bid)
+    """)
+    return conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+def create_marginal_prices_table(conn, table_name: str = "marginal_prices") -> int:
+    """
+    (Re)create a marginal price table with one row per aFRR quarter hour.
+
+    Quarter hours without negative 50Hertz activation get a NULL price, as
+    the price engine writes them. Prices come from row hashes; only their
+    volume matters to the dashboard and viewer benchmarks.
+
+    Args:
+        conn: DuckDB connection with an `afrr_data` table
+        table_name: Table to create
+
+    Returns:
+        int: Number of rows in the table
+    """
+    conn.execute(f"""
+        CREATE OR REPLACE TABLE {table_name} AS
+        SELECT
+            STRPTIME("Datum", '%d.%m.%Y')::DATE AS date,
+            STRPTIME("Datum" || ' ' || "von", '%d.%m.%Y %H:%M') AS timestamp,
+            "von" AS quarter_hour_start,
+            "bis" AS quarter_hour_end,
+            volume AS activated_volume_mw,
+            CASE WHEN volume < 0.001 THEN 0 ELSE volume * 1.5 END AS available_capacity_mw,
+            CASE WHEN volume < 0.001 THEN NULL
+                 ELSE ROUND((hash("Datum", "von") % 40000) / 100.0, 2) END AS marginal_price,
+            'NEG_' || LPAD(CAST(
+                CAST(SPLIT_PART("von", ':', 1) AS INTEGER) * 4 + CAST(SPLIT_PART("von", ':', 2) AS INTEGER) // 15 + 1
+            AS VARCHAR), 3, '0') AS product_code
+        FROM (
+            SELECT *, CAST(REPLACE("50Hertz (Negativ)", ',', '.') AS DOUBLE) AS volume
+            FROM afrr_data
+        )
+    """)
+    return conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the hypermvp pipelines.
+
+Runs each benchmark on synthetic data at several scales and writes the
+results as JSON, so runs on different commits can be compared with
+benchmarks/compare.py. A scale of N means N delivery months of data:
+
+- provider_etl: `run_etl` on N monthly provider workbooks
+- afrr_load: read N netztransparenz CSVs and save them to DuckDB in one batch
+- price_engine: marginal prices for the latest month (or --engine-days) against
+  a database holding N months of provider and aFRR data
+- dashboard_queries: the dashboard overview summaries on that database
+- viewer_profile: DuckDB viewer table metadata, table/column profiles and
+  duplicate check on that database
+
+Generated inputs are cached in --data-dir and reused by later runs (and by
+smaller scales), so only the first run at a new scale pays for generating them.
+Each timed run gets a fresh copy of any database it writes to.
+
+Plain English:
+Shows how long the main steps take at today's size and at 10x and 100x the data,
+so a change that makes them slower shows up before it reaches production.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --scales 1 10 --only afrr_load price_engine --repeat 3
+    python benchmarks/compare.py benchmarks/results/<before>.json benchmarks/results/<after>.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(BASE_DIR, "src")
+for path in (SRC_DIR, BASE_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks import generators  # noqa: E402
+
+BENCHMARK_DIR = os.path.join(BASE_DIR, "benchmarks")
+DEFAULT_DATA_DIR = os.path.join(BENCHMARK_DIR, ".data")
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+DEFAULT_SCALES = [1, 10, 100]
+# The newest generated month; a scale of N covers the N months up to and including it
+LAST_MONTH = (2024, 12)
+
+
+@dataclass
+class ScaleData:
+    """Generated inputs for one scale."""
+    scale: int
+    months: List[Tuple[int, int]]
+    provider_files: List[str] = field(default_factory=list)
+    afrr_files: List[str] = field(default_factory=list)
+    db_path: str = ""
+    provider_rows: int = 0
+    afrr_rows: int = 0
+
+
+def scale_months(scale: int) -> List[Tuple[int, int]]:
+    """Return the (year, month) pairs covered by a scale, oldest first."""
+    year, month = LAST_MONTH
+    return [generators.add_months(year, month, offset) for offset in range(1 - scale, 1)]
+
+def prepare_scale(scale: int, data_dir: str, bids_per_product: int, sheets: int,
+                  seed: int, regenerate: bool = False) -> ScaleData:
+    """
+    Generate (or reuse) the workbooks, CSVs and database for one scale.
+
+    The database holds afrr_data (loaded with the production loader),
+    provider_data (the cleaned table the price engine reads) and a
+    marginal_prices table with one row per quarter hour.
+    """
+    from hypermvp.afrr.loader import read_afrr_csv, split_afrr_by_month
+    from hypermvp.afrr.save_to_duckdb import save_afrr_months_to_duckdb
+    import duckdb
+    import pandas as pd
+
+    data = ScaleData(scale=scale, months=scale_months(scale))
+    provider_dir = os.path.join(data_dir, "provider", f"bids{bids_per_product}_sheets{sheets}_seed{seed}")
+    afrr_dir = os.path.join(data_dir, "afrr", f"seed{seed}")
+
+    for year, month in data.months:
+        workbook = os.path.join(provider_dir, f"provider_{year}-{month:02d}.xlsx")
+        if regenerate or not os.path.exists(workbook):
+            print(f"  generating {os.path.relpath(workbook, data_dir)}", flush=True)
+            generators.write_provider_workbook(
+                workbook, year, month, sheets=sheets, bids_per_product=bids_per_product, seed=seed
+            )
+        data.provider_files.append(workbook)
+
+        csv_path = os.path.join(afrr_dir, f"afrr_{year}-{month:02d}.csv")
+        if regenerate or not os.path.exists(csv_path):
+            generators.write_afrr_csv(csv_path, year, month, seed=seed)
+        data.afrr_files.append(csv_path)
+
+    data.db_path = os.path.join(data_dir, "databases", f"scale{scale}_bids{bids_per_product}_seed{seed}.duckdb")
+    if regenerate and os.path.exists(data.db_path):
+        os.remove(data.db_path)
+    if not os.path.exists(data.db_path):
+        print(f"  building {os.path.relpath(data.db_path, data_dir)}", flush=True)
+        os.makedirs(os.path.dirname(data.db_path), exist_ok=True)
+        afrr = pd.concat([read_afrr_csv(path) for path in data.afrr_files], ignore_index=True)
+        save_afrr_months_to_duckdb(split_afrr_by_month(afrr), db_path=data.db_path, source_files=data.afrr_files)
+        conn = duckdb.connect(data.db_path)
+        try:
+            first_year, first_month = data.months[0]
+            last_day = generators.month_days(*data.months[-1])[-1]
+            generators.create_provider_data_table(
+                conn, date(first_year, first_month, 1), last_day, bids_per_product=bids_per_product, seed=seed
+            )
+            generators.create_marginal_prices_table(conn)
+        finally:
+            conn.close()
+
+    conn = duckdb.connect(data.db_path, read_only=True)
+    try:
+        data.provider_rows = conn.execute("SELECT COUNT(*) FROM provider_data").fetchone()[0]
+        data.afrr_rows = conn.execute("SELECT COUNT(*) FROM afrr_data").fetchone()[0]
+    finally:
+        conn.close()
+    return data
+
+# Each benchmark does its untimed setup in work_dir and returns the callable
+# that is timed. The callable returns a dict with at least "rows".
+
+def bench_provider_etl(data: ScaleData, work_dir: str, options: argparse.Namespace) -> Callable[[], Dict[str, Any]]:
+    from hypermvp.provider.etl import run_etl
+
+    db_path = os.path.join(work_dir, "provider.duckdb")
+
+    def run():
+        summary = run_etl(data.provider_files, db_path=db_path, table_name="provider_raw")
+        return {"rows": summary["rows_loaded"], "files": summary["files_processed"],
+                "sheets": summary["sheets_loaded"], "errors": len(summary["errors"])}
+    return run
+
+def bench_afrr_load(data: ScaleData, work_dir: str, options: argparse.Namespace) -> Callable[[], Dict[str, Any]]:
+    import pandas as pd
+
+    from hypermvp.afrr.loader import read_afrr_csv, split_afrr_by_month
+    from hypermvp.afrr.save_to_duckdb import save_afrr_months_to_duckdb
+
+    db_path = os.path.join(work_dir, "afrr.duckdb")
+
+    def run():
+        frames = [read_afrr_csv(path) for path in data.afrr_files]
+        monthly_data = split_afrr_by_month(pd.concat(frames, ignore_index=True))
+        rows = save_afrr_months_to_duckdb(monthly_data, db_path=db_path, source_files=data.afrr_files)
+        return {"rows": rows, "files": len(data.afrr_files), "months": len(monthly_data)}
+    return run
+
+def bench_price_engine(data: ScaleData, work_dir: str, options: argparse.Namespace) -> Callable[[], Dict[str, Any]]:
+    from hypermvp.analysis.marginal_price import calculate_marginal_prices, save_marginal_prices
+
+    db_path = os.path.join(work_dir, "engine.duckdb")
+    shutil.copyfile(data.db_path, db_path)
+    days = generators.month_days(*data.months[-1])
+    if options.engine_days:
+        days = days[:options.engine_days]
+    start, end = days[0].isoformat(), days[-1].isoformat()
+
+    def run():
+        results = calculate_marginal_prices(start, end, db_path=db_path)
+        saved = save_marginal_prices(results, db_path=db_path)
+        return {"rows": len(results), "saved": saved, "start_date": start, "end_date": end,
+                "provider_rows": data.provider_rows, "afrr_rows": data.afrr_rows}
+    return run
+
+def bench_dashboard_queries(data: ScaleData, work_dir: str, options: argparse.Namespace) -> Callable[[], Dict[str, Any]]:
+    from hypermvp.dashboard import summary
+    from hypermvp.utils import traced_duckdb
+
+    def run():
+        with traced_duckdb.connect(data.db_path, read_only=True) as con:
+            summaries = {
+                "provider_data": summary.get_provider_data_summary(con),
+                "afrr_data": summary.get_afrr_data_summary(con),
+                "marginal_prices": summary.get_marginal_price_summary(con),
+            }
+        return {
+            "rows": sum(int(s["date_range"]["total_records"][0]) for s in summaries.values() if s),
+            "days": {name: len(s["day_counts"]) if s else None for name, s in summaries.items()},
+        }
+    return run
+
+def bench_viewer_profile(data: ScaleData, work_dir: str, options: argparse.Namespace) -> Callable[[], Dict[str, Any]]:
+    from hypermvp.tools.duckdb_viewer.analysis import (
+        find_duplicates,
+        get_basic_table_profile,
+        get_table_metadata,
+        profile_column,
+    )
+    from hypermvp.utils import traced_duckdb
+
+    def run():
+        with traced_duckdb.connect(data.db_path, read_only=True) as conn:
+            tables = get_table_metadata(conn, exact=True)
+            profiles = [get_basic_table_profile(name, conn=conn)
+                        for name in ("afrr_data", "provider_data", "marginal_prices")]
+            profile_column("provider_data", "ENERGY_PRICE__EUR_MWh_", conn=conn)
+            duplicates = find_duplicates("provider_data", key_columns=["DELIVERY_DATE", "PRODUCT"], conn=conn)
+        return {
+            "rows": sum(p["row_count"] for p in profiles),
+            "tables": len(tables),
+            "duplicate_rows": duplicates["duplicate_rows"],
+        }
+    return run
+
+BENCHMARKS = {
+    "provider_etl": bench_provider_etl,
+    "afrr_load": bench_afrr_load,
+    "price_engine": bench_price_engine,
+    "dashboard_queries": bench_dashboard_queries,
+    "viewer_profile": bench_viewer_profile,
+}
+
+def time_benchmark(name: str, data: ScaleData, options: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run one benchmark `options.repeat` times and summarise the runs.
+
+    Wall/CPU time and peak RSS come from the run's instrumentation; the time
+    spent in instrumented stages (read_excel_file, afrr_save, ...) is kept too.
+
+    Returns:
+        dict: Median wall and CPU seconds, peak RSS, rows, rows/s and stage times
+    """
+    from hypermvp.utils.instrumentation import instrument, run_report
+
+    runs = []
+    for _ in range(options.repeat):
+        with tempfile.TemporaryDirectory(prefix=f"hypermvp_{name}_") as work_dir:
+            run = BENCHMARKS[name](data, work_dir, options)
+            with run_report(f"benchmark_{name}", output_dir=None) as report:
+                with instrument(name) as stage:
+                    details = run()
+            stages: Dict[str, float] = {}
+            for record in report.stages:
+                if record is not stage:
+                    stages[record.stage] = round(stages.get(record.stage, 0.0) + record.wall_seconds, 4)
+            runs.append({"stage": stage, "details": details, "stages": stages})
+
+    seconds = statistics.median(r["stage"].wall_seconds for r in runs)
+    rows = runs[-1]["details"]["rows"]
+    return {
+        "benchmark": name,
+        "scale": data.scale,
+        "months": len(data.months),
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        # The benchmark runs alone, so process CPU is its own, including DuckDB/Polars threads
+        "cpu_seconds": round(statistics.median(r["stage"].process_cpu_seconds for r in runs), 4),
+        "peak_rss_mb": max(r["stage"].peak_rss_mb for r in runs),
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None,
+        "runs_seconds": [r["stage"].wall_seconds for r in runs],
+        "stages": runs[-1]["stages"],
+        "details": {k: v for k, v in runs[-1]["details"].items() if k != "rows"},
+    }
+
+def git_info() -> Dict[str, Any]:
+    """Return the current commit and whether the working tree has changes."""
+    def git(*args):
+        result = subprocess.run(["git", *args], cwd=BASE_DIR, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+    }
+
+def environment_info() -> Dict[str, Any]:
+    """Return the interpreter, machine and library versions the results depend on."""
+    import duckdb
+    import pandas as pd
+    import polars as pl
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "duckdb": duckdb.__version__,
+        "polars": pl.__version__,
+        "pandas": pd.__version__,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hypermvp pipelines on synthetic data")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="Scales to run; N = N months of data (default: 1 10 100)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), metavar="BENCHMARK",
+                        help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per benchmark and scale (median is reported)")
+    parser.add_argument("--bids-per-product", type=int, default=10,
+                        help="Provider bids per product and day (192 products per day)")
+    parser.add_argument("--sheets", type=int, default=1, help="Sheets per provider workbook")
+    parser.add_argument("--engine-days", type=int,
+                        help="Limit the price engine to the first N days of the latest month")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the data generators")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Cache for generated inputs")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate cached inputs")
+    parser.add_argument("--output", metavar="PATH",
+                        help="JSON results file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipelines' log output")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    names = args.only or list(BENCHMARKS)
+    started_at = datetime.now()
+    git = git_info()
+
+    results = []
+    for scale in args.scales:
+        print(f"\nScale {scale}x ({scale} month{'s' if scale != 1 else ''})", flush=True)
+        data = prepare_scale(scale, args.data_dir, args.bids_per_product, args.sheets, args.seed, args.regenerate)
+        for name in names:
+            try:
+                result = time_benchmark(name, data, args)
+            except Exception as e:
+                logging.exception(f"Benchmark {name} failed at scale {scale}")
+                result = {"benchmark": name, "scale": scale, "error": f"{type(e).__name__}: {e}"}
+                print(f"  {name:<18} failed: {result['error']}")
+            else:
+                print(f"  {name:<18} {result['seconds']:>9.3f} s  {result['rows']:>12,} rows  "
+                      f"{result['peak_rss_mb']:>8,.0f} MB peak", flush=True)
+            results.append(result)
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{started_at:%Y%m%d_%H%M%S}_{(git['commit'] or 'nogit')[:10]}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round((datetime.now() - started_at) / timedelta(seconds=1), 1),
+            "git": git,
+            "environment": environment_info(),
+            "settings": {
+                "scales": args.scales,
+                "benchmarks": names,
+                "repeat": args.repeat,
+                "bids_per_product": args.bids_per_product,
+                "sheets": args.sheets,
+                "engine_days": args.engine_days,
+                "seed": args.seed,
+            },
+            "results": results,
+        }, f, indent=2, default=str)
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
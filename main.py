@@ -6,13 +6,10 @@ import os
 import time
 import subprocess
 from datetime import datetime
-import pandas as pd
 import re
 import glob
-import duckdb
 import threading
 import queue
-from tqdm import tqdm
 
 """
 Main processing workflow for energy data.
@@ -32,18 +29,12 @@ from hypermvp.global_config import (
     DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, 
     OUTPUT_DATA_DIR, AFRR_FILE_PATH, DUCKDB_DIR,
     AFRR_DUCKDB_PATH, PROVIDER_DUCKDB_PATH, ENERGY_DB_PATH,
-    PROVIDER_RAW_DIR
+    PROVIDER_RAW_DIR, AFRR_RAW_DIR, ensure_dirs
 )
 
-# Import AFRR modules
-from hypermvp.afrr.loader import load_afrr_data
-from hypermvp.afrr.cleaner import filter_negative_50hertz
-from hypermvp.afrr.save_to_duckdb import save_afrr_to_duckdb
-
-# Import provider loader
-from hypermvp.provider.etl import run_etl
-# Import provider cleaning logic
-from hypermvp.provider.provider_db_cleaner import clean_provider_table
+# The provider, aFRR and analysis stacks (pandas, polars, duckdb, ...) are
+# imported inside the workflow functions, so `--help` and argument errors
+# return without loading them.
 
 # Configure logging
 logging.basicConfig(
@@ -52,6 +43,9 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 
+# Name under which the provider ETL tracks processed downloads in the download cache
+PROVIDER_ETL_CONSUMER = "provider_etl"
+
 def read_stdout(pipe, q):
     # Read lines from the pipe and put them into a queue
     for line in iter(pipe.readline, ''):
@@ -62,26 +56,81 @@ def parse_number(num_str):
     """Parse a number that might have commas as thousand separators"""
     return int(num_str.replace(',', ''))
 
-def process_provider_workflow():
+def find_provider_files(changed_only=False, cache=None):
+    """
+    Return the provider workbooks (.xlsx and .xlsx.zip) to load from PROVIDER_RAW_DIR.
+
+    Args:
+        changed_only: Only return files the scraper download cache reports as
+            new or changed since the last provider ETL run.
+        cache: DownloadCache to ask (a new one by default)
+    """
+    from pathlib import Path
+    from hypermvp.provider.extractor import find_excel_files
+
+    if not os.path.isdir(PROVIDER_RAW_DIR):
+        return []
+    excel_files = [Path(f) for f in find_excel_files(PROVIDER_RAW_DIR)]
+    if changed_only:
+        from hypermvp.scrapers.download_cache import DownloadCache
+
+        cache = cache or DownloadCache()
+        changed = {path.resolve() for path in cache.pending_changes(PROVIDER_ETL_CONSUMER)}
+        excel_files = [f for f in excel_files if f.resolve() in changed]
+        logging.info(f"{len(excel_files):,} provider file(s) changed since the last ETL run")
+    return excel_files
+
+def finish_provider_load(db_path, cache, etl_start, months=None):
+    """
+    Rebuild provider_clean, refresh the loaded months of provider_data (the
+    table the analysis reads) and mark the loaded downloads as consumed.
+    """
+    from hypermvp.provider.provider_db_cleaner import clean_provider_table, refresh_provider_data
+    from hypermvp.utils.in_memory_db import is_in_memory
+
+    logging.info("Running provider table cleaning logic...")
+    clean_provider_table(db_path)
+    refresh_provider_data(db_path, months)
+    logging.info("Provider table cleaning complete.")
+
+    # Everything downloaded before this run started is now in the database
+    if not is_in_memory(db_path):
+        cache.mark_consumed(PROVIDER_ETL_CONSUMER, at=etl_start)
+
+def process_provider_workflow(db_path=PROVIDER_DUCKDB_PATH, changed_only=False, memory_budget=None, sheet_cache=None):
     """
     Loads all provider Excel files from PROVIDER_RAW_DIR into DuckDB using the atomic ETL workflow.
     No NOTE column filtering or logging; all NOTE values are imported as-is.
-    After loading, runs the provider table cleaning logic.
+    After loading, runs the provider table cleaning logic and refreshes the
+    loaded months of provider_data, so a following analysis prices with them.
+
+    Args:
+        db_path: DuckDB database path (file or ":memory:<name>"). Defaults to PROVIDER_DUCKDB_PATH.
+        changed_only: Only load files the scraper download cache reports as new or
+            changed since the last provider ETL run.
+        memory_budget: RAM budget (bytes, "auto" or e.g. "4GB"); the files are
+            then loaded in batches that fit into it.
+        sheet_cache: Optional SheetCache; workbooks decoded before are read from
+            their Parquet copy.
     """
-    from pathlib import Path
-    import polars as pl
+    from hypermvp.provider.etl import run_etl
+    from hypermvp.scrapers.download_cache import DownloadCache
 
-    excel_files = list(Path(PROVIDER_RAW_DIR).glob("*.xlsx"))
+    etl_start = time.time()
+    cache = DownloadCache()
+    excel_files = find_provider_files(changed_only, cache)
     if not excel_files:
-        logging.warning(f"No Excel files found in {PROVIDER_RAW_DIR}. Nothing to load.")
+        logging.warning(f"No Excel files to load from {PROVIDER_RAW_DIR}. Nothing to load.")
         return
 
     # No NOTE column cleaning or logging, just run the ETL
     logging.info(f"Found {len(excel_files):,} provider Excel files. Starting ETL...")
     summary = run_etl(
         [str(f) for f in excel_files],
-        db_path=PROVIDER_DUCKDB_PATH,
-        table_name="provider_raw"
+        db_path=db_path,
+        table_name="provider_raw",
+        memory_budget=memory_budget,
+        sheet_cache=sheet_cache
     )
     files_processed = f"{summary['files_processed']:,}"
     sheets_loaded = f"{summary['sheets_loaded']:,}"
@@ -91,12 +140,357 @@ def process_provider_workflow():
         f"sheets_loaded={sheets_loaded}, rows_loaded={rows_loaded}, "
         f"errors={summary['errors']}"
     )
-    # Run cleaning logic after ETL
-    logging.info("Running provider table cleaning logic...")
-    clean_provider_table(PROVIDER_DUCKDB_PATH)
-    logging.info("Provider table cleaning complete.")
+    if summary["rows_loaded"]:
+        finish_provider_load(db_path, cache, etl_start, summary["months"])
+
+def log_throughput(stage, rows, seconds, unit="rows"):
+    """Log a stage's volume and rate in one consistent line."""
+    rate = rows / seconds if seconds > 0 else float("inf")
+    logging.info(f"{stage}: {rows:,} {unit} in {seconds:.2f} seconds ({rate:,.0f} {unit}/s)")
+
+def find_afrr_files(file=None):
+    """Return the aFRR CSV to load: the given file, or every CSV in AFRR_RAW_DIR."""
+    from pathlib import Path
+
+    if file:
+        return [Path(file)]
+    return sorted(Path(AFRR_RAW_DIR).glob("*.csv"))
+
+def extract_afrr_months(month=None, year=None, file=None):
+    """
+    Read aFRR CSVs and group their rows by delivery month, without writing.
+
+    Args:
+        month: Only keep this month (1-12)
+        year: Only keep this year
+        file: Read this CSV instead of scanning AFRR_RAW_DIR
+
+    Returns:
+        tuple: (csv_files, [(month, year, DataFrame), ...] sorted by year and month)
+    """
+    from hypermvp.afrr.loader import read_afrr_csv, split_afrr_by_month
+    import pandas as pd
+
+    csv_files = find_afrr_files(file)
+    if not csv_files:
+        logging.warning(f"No aFRR CSV files found in {AFRR_RAW_DIR}. Nothing to load.")
+        return csv_files, []
+
+    # Extract: read every file and group its rows by delivery month
+    read_start = time.time()
+    frames_by_month = {}
+    rows_read = 0
+    for csv_file in csv_files:
+        try:
+            data = read_afrr_csv(csv_file)
+        except (OSError, KeyError, ValueError) as e:
+            logging.error(f"Skipping {csv_file.name}: {e}")
+            continue
+        rows_read += len(data)
+        for file_month, file_year, frame in split_afrr_by_month(data):
+            if (month is None or file_month == month) and (year is None or file_year == year):
+                frames_by_month.setdefault((file_month, file_year), []).append(frame)
+    log_throughput(f"aFRR read ({len(csv_files)} files)", rows_read, time.time() - read_start)
+
+    if not frames_by_month:
+        logging.warning(f"No aFRR rows for month={month}, year={year}. Nothing to load.")
+        return csv_files, []
+
+    # A month found in several files keeps the last (newest by name) value per quarter hour
+    monthly_data = [
+        (file_month, file_year, pd.concat(frames, ignore_index=True).drop_duplicates(
+            subset=["Datum", "von", "bis"], keep="last"
+        ))
+        for (file_month, file_year), frames in sorted(frames_by_month.items(), key=lambda item: item[0][::-1])
+    ]
+    return csv_files, monthly_data
+
+def write_afrr_months(csv_files, monthly_data, db_path=AFRR_DUCKDB_PATH):
+    """Replace the given months in afrr_data in one transaction and return the rows written."""
+    from hypermvp.afrr.save_to_duckdb import save_afrr_months_to_duckdb
+
+    write_start = time.time()
+    rows = save_afrr_months_to_duckdb(
+        monthly_data, db_path=db_path, source_files=[str(f) for f in csv_files]
+    )
+    log_throughput(f"aFRR write ({len(monthly_data)} months)", rows, time.time() - write_start)
+    return rows
+
+def process_afrr_workflow(month=None, year=None, file=None, db_path=AFRR_DUCKDB_PATH):
+    """
+    Load aFRR activation CSVs into DuckDB as one batch.
+
+    Every CSV in AFRR_RAW_DIR (or just `file`) is read and split by delivery
+    month. The months selected by `month`/`year` (all months if both are
+    None) then replace their rows in afrr_data in a single transaction.
+
+    Args:
+        month: Only load this month (1-12)
+        year: Only load this year
+        file: Load this CSV instead of scanning AFRR_RAW_DIR
+        db_path: DuckDB database path (file or ":memory:<name>")
+
+    Returns:
+        dict: files, months and rows loaded plus read/write seconds
+    """
+    read_start = time.time()
+    csv_files, monthly_data = extract_afrr_months(month, year, file)
+    read_seconds = time.time() - read_start
+    if not monthly_data:
+        return {"files": len(csv_files), "months": 0, "rows": 0}
+
+    # Load: one transaction for the whole batch
+    write_start = time.time()
+    rows = write_afrr_months(csv_files, monthly_data, db_path=db_path)
+    write_seconds = time.time() - write_start
+
+    return {
+        "files": len(csv_files),
+        "months": len(monthly_data),
+        "rows": rows,
+        "read_seconds": read_seconds,
+        "write_seconds": write_seconds,
+    }
+
+def calculate_analysis(start_date, end_date=None, db_path=ENERGY_DB_PATH):
+    """Calculate marginal prices for a date range (read-only) and log the throughput."""
+    from hypermvp.analysis.marginal_price import calculate_marginal_prices
+
+    calc_start = time.time()
+    results = calculate_marginal_prices(start_date, end_date, db_path=db_path)
+    log_throughput("Marginal price calculation", len(results), time.time() - calc_start, unit="intervals")
+    return results
+
+def save_analysis(results, db_path=ENERGY_DB_PATH):
+    """Save calculated marginal prices in one bulk write and log the throughput."""
+    from hypermvp.analysis.marginal_price import save_marginal_prices
+
+    save_start = time.time()
+    rows = save_marginal_prices(results, db_path=db_path)
+    log_throughput("Marginal price save", rows, time.time() - save_start)
+    return rows
+
+def process_analysis_workflow(start_date, end_date=None, db_path=ENERGY_DB_PATH):
+    """
+    Calculate marginal prices for a date range and save them in one bulk write.
+
+    Args:
+        start_date: First delivery date (YYYY-MM-DD)
+        end_date: Last delivery date, inclusive (defaults to today)
+        db_path: DuckDB database path (file or ":memory:<name>")
+
+    Returns:
+        dict: intervals calculated, rows saved and calculate/save seconds
+    """
+    calc_start = time.time()
+    results = calculate_analysis(start_date, end_date, db_path=db_path)
+    calc_seconds = time.time() - calc_start
+
+    save_start = time.time()
+    rows = save_analysis(results, db_path=db_path)
+    save_seconds = time.time() - save_start
+
+    return {
+        "intervals": len(results),
+        "rows": rows,
+        "calculate_seconds": calc_seconds,
+        "save_seconds": save_seconds,
+    }
+
+def month_range(month_key, start_date, end_date=None):
+    """
+    Clip a "YYYY-MM" month to [start_date, end_date].
+
+    Returns:
+        tuple: (first, last) ISO dates, or None if the month lies outside the range
+    """
+    from datetime import date, timedelta
+
+    year, month = (int(part) for part in month_key.split("-"))
+    first = date(year, month, 1)
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    lower = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else first
+    upper = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else datetime.now().date()
+    first, last = max(first, lower), min(last, upper)
+    if first > last:
+        return None
+    return first.isoformat(), last.isoformat()
+
+def provider_sheet_cache(args):
+    """Return the provider SheetCache unless the command line turned it off (--no-sheet-cache)."""
+    if not getattr(args, "sheet_cache", False):
+        return None
+    from hypermvp.provider.sheet_cache import SheetCache
+    return SheetCache()
+
+def run_all_workflow(args, db_path, max_workers=None):
+    """
+    Run provider, aFRR and analysis as a dependency graph.
+
+    Plain English: The provider workbooks and the aFRR CSVs are parsed at the
+    same time (provider parsing in worker processes). Their writes go through
+    one writer thread. Each month refreshed by this run is then analysed as
+    soon as the aFRR write and, for months with new provider data, the
+    provider write have been committed, so the run takes about as long as
+    the slowest stage rather than the sum of all of them.
+
+    Args:
+        args: Parsed command line arguments
+        db_path: DuckDB database path (file or ":memory:<name>")
+        max_workers: Worker threads for extraction/calculation (default: CPU based)
+
+    Returns:
+        DagRunner: The finished runner, with per-task results and timings
+    """
+    from hypermvp.provider.etl import extract_provider_data, load_extracted, run_etl
+    from hypermvp.provider.provider_etl_config import MAX_PARALLEL_SHEETS
+    from hypermvp.scrapers.download_cache import DownloadCache
+    from hypermvp.utils.dag import DagRunner
+
+    runner = DagRunner(max_workers=max_workers)
+    etl_start = time.time()
+    cache = DownloadCache()
+
+    memory_budget = getattr(args, "memory_budget", None)
+    sheet_cache = provider_sheet_cache(args)
+
+    def provider_extract():
+        excel_files = find_provider_files(args.changed_only, cache)
+        if not excel_files:
+            logging.warning(f"No Excel files to load from {PROVIDER_RAW_DIR}. Nothing to load.")
+            return None
+        files = [str(f) for f in excel_files]
+        if memory_budget is not None:
+            # Parsed batch by batch in provider_write, so the frames never all sit in memory
+            return {"files": files}
+        return extract_provider_data(files, max_workers=MAX_PARALLEL_SHEETS, sheet_cache=sheet_cache)
+
+    def provider_write():
+        extraction = runner.result("provider_extract")
+        if extraction is None:
+            return set()
+        if memory_budget is not None:
+            summary = run_etl(extraction["files"], db_path=db_path, table_name="provider_raw",
+                              memory_budget=memory_budget, sheet_cache=sheet_cache)
+            rows, months = summary["rows_loaded"], summary["months"]
+        else:
+            rows = load_extracted(extraction, db_path=db_path, table_name="provider_raw")
+            months = extraction["months"]
+            logging.info(
+                f"Provider ETL Summary: files_processed={len(extraction['files']):,}, "
+                f"sheets_loaded={len(extraction['frames']):,}, rows_loaded={rows:,}, "
+                f"errors={extraction['errors']}"
+            )
+        if not rows:
+            return set()
+        # Also refreshes provider_data, which the analysis of these months reads
+        finish_provider_load(db_path, cache, etl_start, months)
+        return months
+
+    def afrr_write():
+        csv_files, monthly_data = runner.result("afrr_extract")
+        if not monthly_data:
+            return set()
+        write_afrr_months(csv_files, monthly_data, db_path=db_path)
+        return {f"{year:04d}-{month:02d}" for month, year, _ in monthly_data}
+
+    def plan_analysis():
+        # Which writes each month waits for is known once both extracts are done
+        if memory_budget is not None:
+            provider_months = runner.result("provider_write")
+        else:
+            provider = runner.result("provider_extract")
+            provider_months = provider["months"] if provider is not None else set()
+        # Every month reads afrr_data, so every month waits for the aFRR write;
+        # that is one write, and on a fresh database it creates the table
+        sources = {}
+        for month, year, _ in runner.result("afrr_extract")[1]:
+            sources.setdefault(f"{year:04d}-{month:02d}", ["afrr_write"])
+        for key in provider_months:
+            sources.setdefault(key, ["afrr_write"]).append("provider_write")
+
+        planned = []
+        for key, deps in sorted(sources.items()):
+            dates = month_range(key, args.start_date, args.end_date)
+            if dates is None:
+                continue
+            runner.add(f"analysis_calc:{key}", lambda d=dates: calculate_analysis(*d, db_path=db_path), deps=deps)
+            runner.add(
+                f"analysis_save:{key}",
+                lambda k=key: save_analysis(runner.result(f"analysis_calc:{k}"), db_path=db_path),
+                deps=[f"analysis_calc:{key}"],
+                writer=True,
+            )
+            planned.append(key)
+        logging.info(f"Analysis planned for {len(planned)} month(s): {', '.join(planned) or 'none'}")
+        return planned
+
+    runner.add("provider_extract", provider_extract)
+    runner.add("afrr_extract", lambda: extract_afrr_months(args.month, args.year, args.file))
+    runner.add("provider_write", provider_write, deps=["provider_extract"], writer=True)
+    runner.add("afrr_write", afrr_write, deps=["afrr_extract"], writer=True)
+    # With a memory budget the provider months are only known once the batched load is done
+    provider_plan_dep = "provider_write" if memory_budget is not None else "provider_extract"
+    runner.add("plan_analysis", plan_analysis, deps=[provider_plan_dep, "afrr_extract"])
+    runner.run()
+
+    stage_seconds = sum(t["seconds"] for t in runner.timings.values())
+    wall_seconds = max((t["end"] for t in runner.timings.values()), default=0.0)
+    logging.info(
+        f"ALL workflow finished in {wall_seconds:.2f} seconds "
+        f"({stage_seconds:.2f} seconds of stage work across {len(runner.timings)} tasks)"
+    )
+    return runner
+
+def run_workflow(args, db_path):
+    """
+    Dispatch the selected workflow against the given database.
+
+    Plain English: Runs provider, aFRR and/or analysis processing and logs how
+    long each stage took, so in-memory and on-disk runs can be compared.
+    """
+    if args.workflow == "all":
+        run_all_workflow(args, db_path)
+        return
+
+    stages = {
+        "provider": lambda: process_provider_workflow(
+            db_path=db_path, changed_only=args.changed_only, memory_budget=args.memory_budget,
+            sheet_cache=provider_sheet_cache(args)
+        ),
+        "afrr": lambda: process_afrr_workflow(args.month, args.year, args.file, db_path=db_path),
+        "analysis": lambda: process_analysis_workflow(args.start_date, args.end_date, db_path=db_path),
+    }
+    stage_start = time.time()
+    stages[args.workflow]()
+    logging.info(f"{args.workflow.upper()} stage finished in {time.time() - stage_start:.2f} seconds")
+
+def dispatch(args):
+    """Run the parsed command line against the in-memory or on-disk database."""
+    run_start = time.time()
+
+    if args.in_memory:
+        from hypermvp.utils.in_memory_db import in_memory_database
+
+        logging.info("Running in in-memory DuckDB mode")
+        with in_memory_database(
+            seed_from=args.seed_from,
+            persist_to=args.persist_to,
+            overwrite=args.overwrite
+        ) as db_path:
+            run_workflow(args, db_path)
+        logging.info(f"In-memory run finished in {time.time() - run_start:.2f} seconds")
+    elif args.workflow == "visualize":
+        from hypermvp.analysis.plot_marginal_prices import plot_marginal_prices
+        plot_marginal_prices(args.start_date)
+        logging.info("Visualizations generated")
+    else:
+        run_workflow(args, ENERGY_DB_PATH)
 
 def main():
+    from hypermvp.utils.memory_budget import parse_memory_size
+    from hypermvp.utils.profiling import add_profile_arguments
+
     parser = argparse.ArgumentParser(
         description="Hypermvp Data Processing Workflows",
         epilog="Example: python main.py --workflow provider"
@@ -134,24 +528,66 @@ def main():
         help="Specific file to process (for AFRR workflow)",
         default=None
     )
-    
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Provider workflow: only load files the scraper reported as new or changed since the last run"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_memory_size,
+        metavar="SIZE",
+        default=None,
+        help="Provider and all workflows: RAM budget for the provider ETL, e.g. 4GB or 'auto' (half the available memory); "
+             "workbooks are loaded in batches that fit into it"
+    )
+    parser.add_argument(
+        "--no-sheet-cache",
+        dest="sheet_cache",
+        action="store_false",
+        help="Provider and all workflows: decode every workbook again instead of reusing the Parquet copies "
+             "in the sheet cache"
+    )
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Run against an in-memory DuckDB instead of the database file (nothing is written unless --persist-to is given)"
+    )
+    parser.add_argument(
+        "--seed-from",
+        metavar="DB_PATH",
+        default=None,
+        help="With --in-memory: copy this DuckDB file into memory before running (e.g. the production database)"
+    )
+    parser.add_argument(
+        "--persist-to",
+        metavar="DB_PATH",
+        default=None,
+        help="With --in-memory: export the in-memory database to this DuckDB file when the run succeeds"
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Allow --persist-to to replace an existing database file"
+    )
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
+    if (args.seed_from or args.persist_to) and not args.in_memory:
+        parser.error("--seed-from and --persist-to require --in-memory")
+    if args.in_memory and args.workflow == "visualize":
+        parser.error("--in-memory is not supported for the visualize workflow")
+
+    ensure_dirs()
     logging.info("Starting %s workflow", args.workflow.upper())
+    from hypermvp.utils.instrumentation import run_report
+    from hypermvp.utils.profiling import profile_session
+    from hypermvp.utils.traced_duckdb import query_trace
 
-    if args.workflow == "provider":
-        process_provider_workflow()
-    elif args.workflow == "afrr":
-        process_afrr_workflow(args.month, args.year, args.file)
-    elif args.workflow == "analysis":
-        process_analysis_workflow(args.start_date, args.end_date)
-    elif args.workflow == "all":
-        process_provider_workflow()
-        process_afrr_workflow(args.month, args.year, args.file)
-        process_analysis_workflow(args.start_date, args.end_date)
-    elif args.workflow == "visualize":
-        from hypermvp.analysis.plot_marginal_prices import plot_marginal_prices
-        plot_marginal_prices(args.start_date)
-        logging.info("Visualizations generated")
+    run_name = f"main_{args.workflow}"
+    with profile_session(run_name, args.profile, args.profile_stacks), \
+            run_report(run_name, metadata=vars(args)), query_trace(run_name):
+        dispatch(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the hypermvp entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for each
+entry point, several times, and reports the median cumulative import time plus
+the slowest individual imports.
+
+Plain English:
+Shows how long each command takes just to start up, and which libraries are
+responsible, so slow top-level imports are easy to spot.
+
+Usage:
+    python scripts/benchmark_import_time.py
+    python scripts/benchmark_import_time.py --repeat 5 --top 15 --json import_times.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(BASE_DIR, "src")
+
+# Modules whose import cost every CLI invocation pays
+ENTRY_POINTS = [
+    "hypermvp.global_config",
+    "main",
+    "hypermvp.provider.cli",
+    "hypermvp.tools.duckdb_viewer.cli",
+    "hypermvp.analysis.marginal_price_cli",
+    "hypermvp.scrapers.cli",
+]
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output into a list of (module, self_us, cumulative_us).
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len("import time:"):].split("|")
+            rows.append((module.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+def measure(module):
+    """
+    Import a module in a fresh interpreter and return its parsed import timings.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, BASE_DIR, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(result.stderr)
+
+def benchmark(module, repeat=3, top=10):
+    """
+    Benchmark one entry point.
+
+    Returns:
+        Dictionary with the median total import time (ms) and the slowest imports
+    """
+    totals = []
+    self_times = {}
+    for _ in range(repeat):
+        rows = measure(module)
+        total = next((cum for name, _, cum in reversed(rows) if name == module), 0)
+        totals.append(total)
+        for name, self_us, _ in rows:
+            self_times.setdefault(name, []).append(self_us)
+
+    slowest = sorted(
+        ((name, statistics.median(times)) for name, times in self_times.items()),
+        key=lambda item: item[1],
+        reverse=True
+    )[:top]
+    return {
+        "module": module,
+        "total_ms": statistics.median(totals) / 1000,
+        "runs": repeat,
+        "slowest_imports_ms": [{"module": name, "self_ms": us / 1000} for name, us in slowest],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of hypermvp entry points")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS, help="Modules to import (default: all entry points)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreter runs per module (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list per module")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        try:
+            result = benchmark(module, repeat=args.repeat, top=args.top)
+        except RuntimeError as e:
+            print(f"{module}: {e}")
+            continue
+        results.append(result)
+
+        print(f"\n{module}: {result['total_ms']:,.1f} ms (median of {args.repeat})")
+        for item in result["slowest_imports_ms"]:
+            print(f"  {item['self_ms']:>9,.1f} ms  {item['module']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
+import io
 import pandas as pd
+import logging
 import os
 
+from hypermvp.utils.instrumentation import instrumented
+
 def load_afrr_data(file_path):
     """
     Loads CSV data into a Pandas DataFrame and retrieves month and year from the data inside the first column ("Datum").
@@ -17,4 +21,58 @@ def load_afrr_data(file_path):
         return df  # Make sure this returns a DataFrame, not a tuple
     except Exception as e:
         print(f"Error loading AFRR data: {e}")
-        return None
\ No newline at end of file
+        return None
+
+AFRR_COLUMNS = ["Datum", "von", "bis", "50Hertz (Negativ)"]
+
+@instrumented("afrr_load", rows_out=len)
+def read_afrr_csv(source):
+    """
+    Parse a netztransparenz aFRR CSV into the layout stored in afrr_data.
+
+    Values are kept as the strings from the file (German dates and decimal
+    commas), which is what the marginal price engine queries.
+
+    Plain English: Works on a file path or on the raw bytes of a download, so
+    the scraper can load a month without writing the CSV to disk first.
+
+    Args:
+        source (str | Path | bytes): CSV file path or CSV content.
+
+    Returns:
+        pd.DataFrame: The Datum, von, bis and 50Hertz (Negativ) columns.
+
+    Raises:
+        KeyError: If a required column is missing.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    df = pd.read_csv(source, sep=';', dtype=str, encoding='utf-8-sig')
+    df.columns = df.columns.astype(str).str.strip()
+    missing = [col for col in AFRR_COLUMNS if col not in df.columns]
+    if missing:
+        raise KeyError(f"Required columns missing in aFRR data: {missing}")
+    return df[AFRR_COLUMNS].dropna(subset=["Datum"]).reset_index(drop=True)
+
+def split_afrr_by_month(df):
+    """
+    Split aFRR rows into one frame per delivery month.
+
+    Args:
+        df (pd.DataFrame): Output of read_afrr_csv.
+
+    Returns:
+        list: (month, year, pd.DataFrame) tuples in date order; rows whose
+        Datum cannot be parsed are dropped.
+    """
+    from hypermvp.global_config import AFRR_DATE_FORMAT
+
+    dates = pd.to_datetime(df["Datum"], format=AFRR_DATE_FORMAT, errors="coerce")
+    valid = dates.notna()
+    if not valid.all():
+        logging.warning(f"Dropping {(~valid).sum()} aFRR rows with an unreadable Datum")
+    df, dates = df[valid], dates[valid]
+    return [
+        (int(month), int(year), frame.reset_index(drop=True))
+        for (year, month), frame in df.groupby([dates.dt.year, dates.dt.month], sort=True)
+    ]
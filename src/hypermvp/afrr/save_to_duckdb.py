@@ -3,8 +3,10 @@ import time
 import logging
 import pandas as pd
 import duckdb
-from hypermvp.global_config import PROCESSED_DATA_DIR, DUCKDB_PATH, AFRR_FILE_PATH
-from hypermvp.utils.db_versioning import create_duckdb_snapshot, add_version_metadata
+from hypermvp.global_config import PROCESSED_DATA_DIR, DUCKDB_PATH, AFRR_FILE_PATH, AFRR_DATE_FORMAT, ensure_dirs
+from hypermvp.utils.db_versioning import SNAPSHOT_ENGINE, create_duckdb_snapshot, add_version_metadata
+from hypermvp.utils.in_memory_db import is_in_memory
+from hypermvp.utils.instrumentation import instrumented
 
 def save_afrr_to_duckdb(cleaned_afrr_data, month, year, table_name="afrr_data", db_path=None):
     """
@@ -17,68 +19,130 @@ def save_afrr_to_duckdb(cleaned_afrr_data, month, year, table_name="afrr_data",
         table_name (str): Name of the table in the DuckDB database.
         db_path (str, optional): Path to DuckDB database file. Defaults to DUCKDB_PATH from config.
     
+    Returns:
+        int: Number of rows inserted into the database.
+    """
+    return save_afrr_months_to_duckdb(
+        [(month, year, cleaned_afrr_data)], table_name=table_name, db_path=db_path
+    )
+
+@instrumented(
+    "afrr_save",
+    rows_in=lambda monthly_data, *args, **kwargs: sum(len(df) for _, _, df in monthly_data),
+    rows_out=lambda rows: rows,
+)
+def save_afrr_months_to_duckdb(monthly_data, table_name="afrr_data", db_path=None, source_files=None):
+    """
+    Save several months of aFRR data to DuckDB in one batched write.
+
+    All months are replaced inside a single transaction: existing rows for every
+    month/year in the batch are deleted, then the new rows are inserted with one
+    INSERT. Either the whole batch lands or nothing changes.
+
+    Plain English:
+    Refreshing a year of data costs one snapshot, one connection and one commit
+    instead of twelve.
+
+    Args:
+        monthly_data (list): (month, year, pd.DataFrame) tuples, one per month.
+        table_name (str): Name of the table in the DuckDB database.
+        db_path (str, optional): Path to DuckDB database file. Defaults to DUCKDB_PATH from config.
+        source_files (list, optional): Source names recorded in the version metadata.
+
     Returns:
         int: Number of rows inserted into the database.
     """
     if db_path is None:
         db_path = DUCKDB_PATH
+    if not monthly_data:
+        logging.info("No aFRR data to save")
+        return 0
     
     start_time = time.time()
     
     try:
         # Create snapshot before making changes
-        create_duckdb_snapshot(db_path)
+        create_duckdb_snapshot(db_path, engine=SNAPSHOT_ENGINE)
         
         # Create database and connect
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        if not is_in_memory(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
         conn = duckdb.connect(db_path)
         
-        # Add version metadata
-        source_file = 'afrr_data_source'  # Default value for tests
-        if 'AFRR_FILE_PATH' in globals():
-            source_file = AFRR_FILE_PATH
-        add_version_metadata(conn, [source_file], f"afrr_update_{month}_{year}")
+        # Version metadata is recorded with the data, inside the transaction
+        if source_files is None:
+            source_files = ['afrr_data_source']  # Default value for tests
+            if 'AFRR_FILE_PATH' in globals():
+                source_files = [AFRR_FILE_PATH]
+        if len(monthly_data) == 1:
+            month, year, _ = monthly_data[0]
+            operation = f"afrr_update_{month}_{year}"
+        else:
+            operation = f"afrr_update_{len(monthly_data)}_months"
+
+        # Add month and year columns to the data and combine the batch
+        frames = []
+        for month, year, frame in monthly_data:
+            data = frame.copy()
+            data["month"] = month
+            data["year"] = year
+            frames.append(data)
+        data = pd.concat(frames, ignore_index=True)
+        months = pd.DataFrame(
+            sorted({(month, year) for month, year, _ in monthly_data}),
+            columns=["month", "year"]
+        )
 
-        # Add month and year columns to the data
-        data = cleaned_afrr_data.copy()
-        data["month"] = month
-        data["year"] = year
+        conn.execute("BEGIN TRANSACTION")
 
         # Check if the table exists
         table_exists = conn.execute(
             f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'"
         ).fetchone() is not None
 
+        conn.register("temp_df", data)
+        conn.register("temp_months", months)
         if not table_exists:
             # Create the table if it doesn't exist
             logging.info(f"Creating new table '{table_name}' in DuckDB")
-            conn.register("temp_df", data)
             conn.execute(
                 f"CREATE TABLE {table_name} AS SELECT * FROM temp_df WHERE 1=0"
             )
-            conn.unregister("temp_df")
         
-        # Delete any existing data for this month and year
+        # Delete any existing data for the months in this batch
         delete_start = time.time()
-        deleted_rows = conn.execute(
-            f"DELETE FROM {table_name} WHERE month = {month} AND year = {year}"
-        ).fetchone()[0]
+        deleted_rows = conn.execute(f"""
+            DELETE FROM {table_name}
+            WHERE (month, year) IN (SELECT (month, year) FROM temp_months)
+        """).fetchone()[0]
         
         if deleted_rows > 0:
-            logging.info(f"Removed {deleted_rows} existing rows for {month}/{year} from '{table_name}' in {time.time() - delete_start:.2f} seconds")
+            logging.info(f"Removed {deleted_rows} existing rows for {len(months)} month(s) from '{table_name}' in {time.time() - delete_start:.2f} seconds")
         
         # Insert new data
         insert_start = time.time()
-        conn.register("temp_df", data)
         conn.execute(f"INSERT INTO {table_name} SELECT * FROM temp_df")
         row_count = len(data)
         conn.unregister("temp_df")
+        conn.unregister("temp_months")
+        
+        delivery_dates = pd.to_datetime(data["Datum"], format=AFRR_DATE_FORMAT, errors="coerce").dropna()
+        add_version_metadata(
+            conn,
+            source_files,
+            operation,
+            tables=[table_name],
+            date_range=(delivery_dates.min().date(), delivery_dates.max().date()) if len(delivery_dates) else None,
+            rows_inserted=row_count,
+            rows_deleted=deleted_rows,
+            duration_seconds=time.time() - start_time,
+        )
         
         # Commit changes and close
-        conn.commit()
+        conn.execute("COMMIT")
         
         logging.info(
-            f"Inserted {row_count} rows of aFRR data for {month}/{year} into '{table_name}' in {time.time() - insert_start:.2f} seconds"
+            f"Inserted {row_count} rows of aFRR data for {len(months)} month(s) into '{table_name}' in {time.time() - insert_start:.2f} seconds"
         )
         logging.info(f"Total save operation took {time.time() - start_time:.2f} seconds")
         
@@ -86,6 +150,11 @@ def save_afrr_to_duckdb(cleaned_afrr_data, month, year, table_name="afrr_data",
         
     except Exception as e:
         logging.error(f"Error saving aFRR data to DuckDB: {e}")
+        if 'conn' in locals():
+            try:
+                conn.execute("ROLLBACK")
+            except duckdb.Error:
+                pass  # No transaction was open
         return 0
     finally:
         # Close the DuckDB connection
@@ -100,5 +169,6 @@ if __name__ == "__main__":
         'bis': ['00:15', '00:30'],
         '50Hertz (Negativ)': [4.364, 10.052]
     })
+    ensure_dirs()
     example_db_path = os.path.join(PROCESSED_DATA_DIR, "example_afrr.duckdb")
     save_afrr_to_duckdb(test_data, 9, 2024, "afrr_example", example_db_path)
\ No newline at end of file
@@ -1,12 +1,78 @@
+import os
 import duckdb
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Use a non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime, timedelta
+from datetime import datetime
 import numpy as np
-from hypermvp.global_config import ENERGY_DB_PATH
+from hypermvp.global_config import ENERGY_DB_PATH, OUTPUT_DATA_DIR, ISO_DATE_FORMAT, ensure_dirs
+
+# One query for the whole date range: bid counts per NEG product and day, plus
+# 4-hour block statistics computed with window functions (16 products per block).
+BID_DISTRIBUTION_SQL = """
+WITH product_counts AS (
+    SELECT 
+        DELIVERY_DATE::DATE as date,
+        PRODUCT,
+        CAST(SUBSTRING(PRODUCT, 5, 3) AS INTEGER) as interval_number,
+        COUNT(*) as bid_count
+    FROM provider_data
+    WHERE DELIVERY_DATE::DATE BETWEEN ? AND ?
+      AND PRODUCT LIKE 'NEG_%'
+    GROUP BY ALL
+),
+with_blocks AS (
+    SELECT 
+        *,
+        (interval_number - 1) // 16 as block_index
+    FROM product_counts
+)
+SELECT 
+    date,
+    PRODUCT,
+    interval_number,
+    bid_count,
+    printf('%02d:%02d', (interval_number - 1) // 4, ((interval_number - 1) % 4) * 15) as time,
+    block_index,
+    printf('%02d:00-%02d:00', block_index * 4, (block_index + 1) * 4) as block,
+    MIN(bid_count) OVER block_window as block_min,
+    MAX(bid_count) OVER block_window as block_max,
+    AVG(bid_count) OVER block_window as block_mean,
+    STDDEV_SAMP(bid_count) OVER block_window as block_std,
+    COUNT(*) OVER block_window as block_products
+FROM with_blocks
+WINDOW block_window AS (PARTITION BY date, block_index)
+ORDER BY date, interval_number
+"""
+
+def plot_bid_distribution(product_counts, date, output_dir=OUTPUT_DATA_DIR):
+    """
+    Render the bid distribution of one day as a bar chart PNG.
+    
+    Args:
+        product_counts: DataFrame with interval_number, bid_count, block and time columns for one day
+        date: Date the data belongs to (used in title and file name)
+        output_dir: Directory to save the PNG in
+        
+    Returns:
+        Path to the saved plot
+    """
+    # Plotting libraries are only imported when a plot is actually requested
+    import matplotlib
+    matplotlib.use('Agg')  # Use a non-interactive backend
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    plt.figure(figsize=(15, 8))
+    sns.barplot(x='interval_number', y='bid_count', hue='block', data=product_counts)
+    plt.title(f"Bid Distribution Across 15-minute Intervals ({date})")
+    plt.xlabel("15-minute Interval")
+    plt.ylabel("Number of Bids")
+    plt.xticks(np.arange(0, 96, 4), [product_counts['time'].iloc[i] if i < len(product_counts) else "" for i in np.arange(0, 96, 4)])
+    plt.tight_layout()
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"bid_distribution_{date}.png")
+    plt.savefig(output_path)
+    plt.close()
+    return output_path
 
 def analyze_bid_distribution(date, db_path=ENERGY_DB_PATH):
     """
@@ -89,17 +155,8 @@ def analyze_bid_distribution(date, db_path=ENERGY_DB_PATH):
                     print(f"      {row['PRODUCT']} ({row['time']}): {row['bid_count']} bids")
         
         # Plot the distribution
-        plt.figure(figsize=(15, 8))
-        sns.barplot(x='interval_number', y='bid_count', hue='block', data=product_counts)
-        plt.title(f"Bid Distribution Across 15-minute Intervals ({date})")
-        plt.xlabel("15-minute Interval")
-        plt.ylabel("Number of Bids")
-        plt.xticks(np.arange(0, 96, 4), [product_counts['time'].iloc[i] if i < len(product_counts) else "" for i in np.arange(0, 96, 4)])
-        plt.tight_layout()
-        plt.savefig(f"/home/philly/hypermvp/data/03_output/bid_distribution_{date}.png")
-        plt.close()
-        
-        print(f"\nPlot saved to /home/philly/hypermvp/data/03_output/bid_distribution_{date}.png")
+        output_path = plot_bid_distribution(product_counts, date)
+        print(f"\nPlot saved to {output_path}")
         
         # Return the dataframe for further analysis
         return product_counts
@@ -107,38 +164,104 @@ def analyze_bid_distribution(date, db_path=ENERGY_DB_PATH):
     finally:
         conn.close()
 
-def analyze_date_range(start_date, end_date=None):
-    """Analyze bid distribution over a range of dates"""
+def analyze_bid_distribution_batch(start_date, end_date=None, db_path=ENERGY_DB_PATH,
+                                   plot=False, output_dir=OUTPUT_DATA_DIR):
+    """
+    Analyze the bid distribution for a whole date range with a single DuckDB query.
+    
+    Plain English: Instead of opening the database and drawing a chart for every
+    single day, this counts bids per 15-minute product for all days at once and
+    works out the 4-hour block statistics (min/max/mean/std) in the same query.
+    Charts are only drawn at the end, and only if you ask for them.
+    
+    Args:
+        start_date: First date (YYYY-MM-DD string or date)
+        end_date: Last date, inclusive (defaults to start_date)
+        db_path: Path to DuckDB database
+        plot: If True, save one bar chart per day after the analysis
+        output_dir: Directory for the charts
+        
+    Returns:
+        Dictionary with three DataFrames:
+        - product_counts: one row per day and NEG product, with its block statistics
+        - block_stats: one row per day and 4-hour block
+        - inconsistencies: products whose bid count differs from the block minimum
+    """
     if end_date is None:
         end_date = start_date
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, ISO_DATE_FORMAT).date()
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date, ISO_DATE_FORMAT).date()
+    
+    conn = duckdb.connect(db_path, read_only=True)
+    try:
+        product_counts = conn.execute(BID_DISTRIBUTION_SQL, [start_date, end_date]).fetchdf()
+    finally:
+        conn.close()
+    # fetchdf returns DATE columns as timestamps; keep plain dates for labels and file names
+    product_counts['date'] = pd.to_datetime(product_counts['date']).dt.date
     
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
+    block_columns = ['date', 'block_index', 'block', 'block_min', 'block_max',
+                     'block_mean', 'block_std', 'block_products']
+    block_stats = (
+        product_counts[block_columns]
+        .drop_duplicates(subset=['date', 'block_index'])
+        .rename(columns={
+            'block_min': 'min', 'block_max': 'max', 'block_mean': 'mean',
+            'block_std': 'std', 'block_products': 'count'
+        })
+        .reset_index(drop=True)
+    )
+    inconsistencies = product_counts[
+        (product_counts['block_min'] != product_counts['block_max'])
+        & (product_counts['bid_count'] != product_counts['block_min'])
+    ].reset_index(drop=True)
+    
+    if plot:
+        for date, day_counts in product_counts.groupby('date'):
+            plot_bid_distribution(day_counts.reset_index(drop=True), date, output_dir)
     
-    all_results = []
-    current = start
+    return {
+        "product_counts": product_counts,
+        "block_stats": block_stats,
+        "inconsistencies": inconsistencies
+    }
+
+def analyze_date_range(start_date, end_date=None, db_path=ENERGY_DB_PATH, plot=False):
+    """Analyze bid distribution over a range of dates"""
+    results = analyze_bid_distribution_batch(start_date, end_date, db_path=db_path, plot=plot)
+    product_counts = results["product_counts"]
     
-    while current <= end:
-        date_str = current.strftime("%Y-%m-%d")
-        print(f"\n{'='*50}\nAnalyzing {date_str}\n{'='*50}")
-        result = analyze_bid_distribution(date_str)
-        if result is not None:
-            result['date'] = date_str
-            all_results.append(result)
-        current += timedelta(days=1)
+    if product_counts.empty:
+        print(f"No NEG products found between {start_date} and {end_date or start_date}")
+        return None
     
-    if all_results:
-        return pd.concat(all_results)
-    return None
+    print(f"Analysis for {start_date} to {end_date or start_date}:")
+    print(f"Days with NEG products: {product_counts['date'].nunique()}")
+    print(f"Total NEG bids: {product_counts['bid_count'].sum()}")
+    
+    inconsistencies = results["inconsistencies"]
+    if inconsistencies.empty:
+        print("\nNo inconsistencies within 4-hour blocks")
+    else:
+        print(f"\nInconsistencies within 4-hour blocks ({len(inconsistencies)} products):")
+        for (date, block), block_data in inconsistencies.groupby(['date', 'block']):
+            first = block_data.iloc[0]
+            print(f"  {date} block {block}: varies from {first['block_min']} to {first['block_max']} bids")
+            for _, row in block_data.iterrows():
+                print(f"      {row['PRODUCT']} ({row['time']}): {row['bid_count']} bids")
+    
+    return product_counts
 
 if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python -m src.hypermvp.analysis.analyze_bid_distribution YYYY-MM-DD [END_DATE]")
-        sys.exit(1)
+    import argparse
     
-    start_date = sys.argv[1]
-    end_date = sys.argv[2] if len(sys.argv) > 2 else None
+    parser = argparse.ArgumentParser(description="Analyze bid distribution across 15-minute intervals")
+    parser.add_argument("start_date", help="Start date (YYYY-MM-DD)")
+    parser.add_argument("end_date", nargs="?", default=None, help="End date (YYYY-MM-DD), defaults to start date")
+    parser.add_argument("--plot", action="store_true", help="Save one bid distribution chart per day")
+    args = parser.parse_args()
+    ensure_dirs()
     
-    analyze_date_range(start_date, end_date)
\ No newline at end of file
+    analyze_date_range(args.start_date, args.end_date, plot=args.plot)
@@ -1,17 +1,22 @@
 import pandas as pd
 import duckdb
 import logging
+import time
 from datetime import datetime, timedelta, date
 # Add standardized date format imports
-from hypermvp.global_config import ENERGY_DB_PATH, ISO_DATETIME_FORMAT, ISO_DATE_FORMAT, TIME_FORMAT, AFRR_DATE_FORMAT
+from hypermvp.global_config import ENERGY_DB_PATH, ISO_DATETIME_FORMAT, ISO_DATE_FORMAT, TIME_FORMAT, AFRR_DATE_FORMAT, ensure_dirs
+from hypermvp.utils import traced_duckdb
+from hypermvp.utils.instrumentation import instrumented
 
-def calculate_marginal_prices(start_date=None, end_date=None):
+@instrumented(rows_out=len)
+def calculate_marginal_prices(start_date=None, end_date=None, db_path=None):
     """
     Calculate marginal prices for the given date range.
     
     Args:
         start_date (str or datetime): Start date in YYYY-MM-DD format. If None, use the earliest date in the DB.
         end_date (str or datetime): End date in YYYY-MM-DD format. If None, use today's date.
+        db_path (str, optional): DuckDB database path (file or ":memory:<name>"). Defaults to ENERGY_DB_PATH.
     
     Returns:
         pd.DataFrame: DataFrame with marginal prices for each 15-minute interval.
@@ -22,8 +27,10 @@ def calculate_marginal_prices(start_date=None, end_date=None):
     import logging
     
     # Connect to DB
-    from hypermvp.global_config import ENERGY_DB_PATH
-    con = duckdb.connect(ENERGY_DB_PATH)
+    if db_path is None:
+        from hypermvp.global_config import ENERGY_DB_PATH
+        db_path = ENERGY_DB_PATH
+    con = traced_duckdb.connect(db_path)
     
     # Convert string dates to datetime objects if needed
     if isinstance(start_date, str):
@@ -36,6 +43,14 @@ def calculate_marginal_prices(start_date=None, end_date=None):
     # Make end_date inclusive of the entire day
     end_date = end_date + timedelta(days=1) - timedelta(microseconds=1)
     
+    # On a fresh database a run may have loaded only one of the two inputs
+    existing = {name for (name,) in con.execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+    missing = [name for name in ("afrr_data", "provider_data") if name not in existing]
+    if missing:
+        logging.warning(f"No marginal prices for {start_date} to {end_date}: table(s) {', '.join(missing)} not found")
+        con.close()
+        return pd.DataFrame()
+
     # Check if AFRR data exists for the date range
     afrr_data_exists = con.execute("""
         SELECT COUNT(*) 
@@ -276,17 +291,30 @@ def calculate_marginal_prices(start_date=None, end_date=None):
     
     return results_df
 
-def save_marginal_prices(results_df):
-    """Save marginal prices to the database."""
+@instrumented(rows_in=lambda results_df, *args, **kwargs: len(results_df), rows_out=lambda rows: rows)
+def save_marginal_prices(results_df, db_path=None):
+    """
+    Save marginal prices to the database.
+
+    Args:
+        results_df (pd.DataFrame): Output of calculate_marginal_prices.
+        db_path (str, optional): DuckDB database path (file or ":memory:<name>"). Defaults to ENERGY_DB_PATH.
+
+    Returns:
+        int: Number of rows saved.
+    """
     if results_df.empty:
         logging.warning("No results to save")
-        return
+        return 0
     
     import duckdb
-    from hypermvp.global_config import ENERGY_DB_PATH
     from hypermvp.utils.db_versioning import add_version_metadata
-    
-    con = duckdb.connect(ENERGY_DB_PATH)
+
+    if db_path is None:
+        from hypermvp.global_config import ENERGY_DB_PATH
+        db_path = ENERGY_DB_PATH
+    con = traced_duckdb.connect(db_path)
+    start_time = time.time()
     
     try:
         # Create table if it doesn't exist
@@ -303,37 +331,60 @@ def save_marginal_prices(results_df):
             )
         """)
         
+        # Replace the date range in one transaction
+        con.execute("BEGIN TRANSACTION")
+        
         # Delete existing rows for these dates to avoid duplicates
         min_date = results_df['date'].min()
         max_date = results_df['date'].max()
         
-        con.execute("""
+        deleted_rows = con.execute("""
             DELETE FROM marginal_prices
             WHERE date BETWEEN ? AND ?
-        """, [min_date, max_date])
+        """, [min_date, max_date]).fetchone()[0]
         
-        # Insert the new results
-        for _, row in results_df.iterrows():
-            con.execute("""
-                INSERT INTO marginal_prices VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, [
-                row['date'],
-                row['timestamp'],
-                row['quarter_hour_start'],
-                row['quarter_hour_end'],
-                row['activated_volume_mw'],
-                row['available_capacity_mw'],
-                row['marginal_price'],
-                row['product_code']
-            ])
+        # Insert the new results in one bulk statement
+        con.register("results_df", results_df)
+        con.execute("""
+            INSERT INTO marginal_prices (
+                date, timestamp, quarter_hour_start, quarter_hour_end,
+                activated_volume_mw, available_capacity_mw, marginal_price, product_code
+            )
+            SELECT
+                CAST(date AS DATE),
+                CAST(timestamp AS TIMESTAMP),
+                CAST(quarter_hour_start AS VARCHAR),
+                CAST(quarter_hour_end AS VARCHAR),
+                CAST(activated_volume_mw AS DOUBLE),
+                CAST(available_capacity_mw AS DOUBLE),
+                CAST(marginal_price AS DOUBLE),
+                CAST(product_code AS VARCHAR)
+            FROM results_df
+        """)
+        con.unregister("results_df")
         
         # Add version metadata
-        add_version_metadata(con, f"Calculated {len(results_df)} marginal prices for {min_date} to {max_date}", "ANALYSIS")
+        add_version_metadata(
+            con,
+            f"Calculated {len(results_df)} marginal prices for {min_date} to {max_date}",
+            "ANALYSIS",
+            tables=["marginal_prices"],
+            date_range=(min_date, max_date),
+            rows_inserted=len(results_df),
+            rows_deleted=deleted_rows,
+            duration_seconds=time.time() - start_time,
+        )
+        con.execute("COMMIT")
         
         logging.info(f"Saved {len(results_df)} marginal prices to database")
+        return len(results_df)
         
     except Exception as e:
         logging.error(f"Error saving marginal prices: {e}")
+        try:
+            con.execute("ROLLBACK")
+        except duckdb.Error:
+            pass  # No transaction was open
         raise
     finally:
         con.close()
@@ -527,6 +578,7 @@ if __name__ == "__main__":
     import logging
     
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    ensure_dirs()
     
     if len(sys.argv) > 1 and sys.argv[1] == 'diagnose':
         diagnose_provider_data()
@@ -1,17 +1,26 @@
 import argparse
 import logging
 from datetime import datetime, timedelta
-import pandas as pd
-from hypermvp.global_config import ENERGY_DB_PATH
-from hypermvp.analysis.marginal_price import calculate_and_save_for_date_range
+from hypermvp.global_config import ENERGY_DB_PATH, ensure_dirs
+from hypermvp.utils.profiling import add_profile_arguments, profile_session
 
 def main():
     parser = argparse.ArgumentParser(description="Calculate marginal prices for energy markets")
     parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD)")
     parser.add_argument("--end", type=str, help="End date (YYYY-MM-DD), defaults to start date")
     parser.add_argument("--db-path", type=str, default=ENERGY_DB_PATH, help="DuckDB database path")
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    ensure_dirs()
+    with profile_session("marginal_price_cli", args.profile, args.profile_stacks):
+        run(args)
+
+def run(args):
+    """Calculate, save and summarise marginal prices for the parsed arguments."""
+    # Heavy imports only once the arguments are known to be valid
+    import pandas as pd
+    from hypermvp.analysis.marginal_price import calculate_and_save_for_date_range
     
     start_date = args.start
     end_date = args.end if args.end else start_date
@@ -2,7 +2,7 @@ import duckdb
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from hypermvp.global_config import ENERGY_DB_PATH, OUTPUT_DATA_DIR
+from hypermvp.global_config import ENERGY_DB_PATH, OUTPUT_DATA_DIR, ensure_dirs
 import os
 
 def plot_marginal_prices(date="2024-09-01"):
@@ -91,4 +91,5 @@ if __name__ == "__main__":
     import sys
     
     date = sys.argv[1] if len(sys.argv) > 1 else "2024-09-01"
+    ensure_dirs()
     plot_marginal_prices(date)
\ No newline at end of file
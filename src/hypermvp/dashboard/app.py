@@ -1,8 +1,5 @@
 import streamlit as st
 import pandas as pd
-import duckdb
-import matplotlib.pyplot as plt
-import seaborn as sns
 import plotly.express as px
 from datetime import datetime, timedelta
 import os
@@ -11,7 +8,9 @@ import json
 
 # Add the project root to the path so we can import the config
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
-from hypermvp.global_config import ENERGY_DB_PATH, ISO_DATETIME_FORMAT, ISO_DATE_FORMAT, TIME_FORMAT
+from hypermvp.global_config import ENERGY_DB_PATH, ISO_DATETIME_FORMAT, ISO_DATE_FORMAT, TIME_FORMAT, ensure_dirs
+from hypermvp.utils import traced_duckdb
+from hypermvp.dashboard import summary
 
 def connect_to_db():
     """Connect to DuckDB database."""
@@ -22,7 +21,7 @@ def connect_to_db():
             return None
             
         # Connect to the database
-        con = duckdb.connect(ENERGY_DB_PATH)
+        con = traced_duckdb.connect(ENERGY_DB_PATH)
         
         # Test the connection with a simple query
         test = con.execute("SELECT 1").fetchone()
@@ -38,152 +37,20 @@ def connect_to_db():
 
 def get_provider_data_summary(con):
     """Get a summary of provider data in the database."""
-    # Check if table exists
-    table_exists = con.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='provider_data'
-    """).fetchone()
-    
-    if not table_exists:
-        return None
-    
-    # Get date range
-    date_range = con.execute("""
-        SELECT 
-            MIN(DELIVERY_DATE) as min_date,
-            MAX(DELIVERY_DATE) as max_date,
-            COUNT(DISTINCT DELIVERY_DATE) as num_days,
-            COUNT(*) as total_records
-        FROM provider_data
-    """).fetchdf()
-    
-    # Get counts by product
-    product_counts = con.execute("""
-        SELECT 
-            PRODUCT,
-            COUNT(*) as count
-        FROM provider_data
-        GROUP BY PRODUCT
-        ORDER BY count DESC
-    """).fetchdf()
-    
-    # Get counts by day
-    day_counts = con.execute("""
-        SELECT 
-            DELIVERY_DATE::DATE as date,
-            COUNT(*) as count
-        FROM provider_data
-        GROUP BY date
-        ORDER BY date
-    """).fetchdf()
-    
-    return {
-        "date_range": date_range,
-        "product_counts": product_counts,
-        "day_counts": day_counts
-    }
+    return summary.get_provider_data_summary(con)
 
 def get_afrr_data_summary(con):
     """Get summary of AFRR data."""
     try:
-        # Check if table exists
-        table_exists = con.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='afrr_data'
-        """).fetchone()
-        
-        if not table_exists:
-            return None
-            
-        # Get date summary
-        date_range = con.execute(f"""
-            SELECT 
-                MIN(STRPTIME("Datum", ?)) as min_date,
-                MAX(STRPTIME("Datum", ?)) as max_date,
-                COUNT(DISTINCT STRPTIME("Datum", ?)) as num_days,
-                COUNT(*) as total_records
-            FROM afrr_data
-        """, [AFRR_DATE_FORMAT, AFRR_DATE_FORMAT, AFRR_DATE_FORMAT]).fetchdf()
-        
-        # Get counts by day
-        day_counts = con.execute(f"""
-            SELECT 
-                STRPTIME("Datum", ?)::DATE as date,
-                COUNT(*) as count
-            FROM afrr_data
-            GROUP BY date
-            ORDER BY date
-        """, [AFRR_DATE_FORMAT]).fetchdf()
-        
-        return {
-            "date_range": date_range,
-            "day_counts": day_counts
-        }
+        return summary.get_afrr_data_summary(con)
     except Exception as e:
         st.error(f"Error getting AFRR data summary: {e}")
         return None  # Return None instead of empty DataFrame
 
 def get_marginal_price_summary(con):
     """Get a summary of marginal price data in the database."""
-    # Check if table exists
-    table_exists = con.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='marginal_prices'
-    """).fetchone()
-    
-    if not table_exists:
-        return None
-    
-    # First, check the actual column names
-    columns = con.execute("PRAGMA table_info(marginal_prices)").fetchdf()
-    
-    # Try different possible column names for timestamp and price
-    possible_timestamp_cols = ["timestamp", "delivery_date", "date", "time"]
-    possible_price_cols = ["price", "marginal_price", "value"]
-    
-    timestamp_col = None
-    price_col = None
-    
-    for col in columns["name"]:
-        if col.lower() in possible_timestamp_cols:
-            timestamp_col = col
-        elif col.lower() in possible_price_cols:
-            price_col = col
-    
-    if not timestamp_col or not price_col:
-        return None
-    
-    # Now use the identified columns with proper GROUP BY
     try:
-        date_range = con.execute(f"""
-            SELECT 
-                MIN("{timestamp_col}") as min_date,
-                MAX("{timestamp_col}") as max_date,
-                COUNT(DISTINCT "{timestamp_col}"::DATE) as num_days,
-                COUNT(*) as total_records,
-                COUNT(*) filter (where "{price_col}" IS NOT NULL) as non_null_prices,
-                COUNT(*) filter (where "{price_col}" IS NULL) as null_prices
-            FROM marginal_prices
-        """).fetchdf()
-        
-        # Get counts by day with proper GROUP BY
-        day_counts = con.execute(f"""
-            SELECT 
-                "{timestamp_col}"::DATE as date,
-                COUNT(*) as total_intervals,
-                COUNT(*) filter (where "{price_col}" IS NOT NULL) as intervals_with_prices,
-                COUNT(*) filter (where "{price_col}" IS NULL) as intervals_without_prices
-            FROM marginal_prices
-            GROUP BY date
-            ORDER BY date
-        """).fetchdf()
-        
-        return {
-            "date_range": date_range,
-            "day_counts": day_counts,
-            "timestamp_col": timestamp_col,
-            "price_col": price_col
-        }
+        return summary.get_marginal_price_summary(con)
     except Exception as e:
         st.error(f"Error querying marginal prices: {e}")
         return None
@@ -389,6 +256,7 @@ def generate_text_summary(con):
     return summary_path
 
 def app():
+    ensure_dirs()
     st.set_page_config(page_title="HyperMVP Data Dashboard", layout="wide")
     
     st.title("HyperMVP Database Dashboard")
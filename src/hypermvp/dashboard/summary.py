@@ -0,0 +1,144 @@
+"""
+Summary queries behind the dashboard overview.
+
+Kept free of Streamlit and Plotly so they can be run (and benchmarked)
+without the dashboard; `app.py` adds the error messages shown in the UI.
+
+Plain English:
+Each function takes an open DuckDB connection and returns the date range and
+per-day counts for one table, or None if the table does not exist yet.
+"""
+
+from hypermvp.global_config import AFRR_DATE_FORMAT
+
+def table_exists(con, table_name):
+    """Return True if the table exists in the database."""
+    return con.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name=?
+    """, [table_name]).fetchone() is not None
+
+def get_provider_data_summary(con):
+    """Get a summary of provider data in the database."""
+    if not table_exists(con, "provider_data"):
+        return None
+
+    # Get date range
+    date_range = con.execute("""
+        SELECT
+            MIN(DELIVERY_DATE) as min_date,
+            MAX(DELIVERY_DATE) as max_date,
+            COUNT(DISTINCT DELIVERY_DATE) as num_days,
+            COUNT(*) as total_records
+        FROM provider_data
+    """).fetchdf()
+
+    # Get counts by product
+    product_counts = con.execute("""
+        SELECT
+            PRODUCT,
+            COUNT(*) as count
+        FROM provider_data
+        GROUP BY PRODUCT
+        ORDER BY count DESC
+    """).fetchdf()
+
+    # Get counts by day
+    day_counts = con.execute("""
+        SELECT
+            DELIVERY_DATE::DATE as date,
+            COUNT(*) as count
+        FROM provider_data
+        GROUP BY date
+        ORDER BY date
+    """).fetchdf()
+
+    return {
+        "date_range": date_range,
+        "product_counts": product_counts,
+        "day_counts": day_counts
+    }
+
+def get_afrr_data_summary(con):
+    """Get summary of AFRR data."""
+    if not table_exists(con, "afrr_data"):
+        return None
+
+    # Get date summary
+    date_range = con.execute("""
+        SELECT
+            MIN(STRPTIME("Datum", ?)) as min_date,
+            MAX(STRPTIME("Datum", ?)) as max_date,
+            COUNT(DISTINCT STRPTIME("Datum", ?)) as num_days,
+            COUNT(*) as total_records
+        FROM afrr_data
+    """, [AFRR_DATE_FORMAT, AFRR_DATE_FORMAT, AFRR_DATE_FORMAT]).fetchdf()
+
+    # Get counts by day
+    day_counts = con.execute("""
+        SELECT
+            STRPTIME("Datum", ?)::DATE as date,
+            COUNT(*) as count
+        FROM afrr_data
+        GROUP BY date
+        ORDER BY date
+    """, [AFRR_DATE_FORMAT]).fetchdf()
+
+    return {
+        "date_range": date_range,
+        "day_counts": day_counts
+    }
+
+def get_marginal_price_summary(con):
+    """Get a summary of marginal price data in the database."""
+    if not table_exists(con, "marginal_prices"):
+        return None
+
+    # First, check the actual column names
+    columns = con.execute("PRAGMA table_info(marginal_prices)").fetchdf()
+
+    # Try different possible column names for timestamp and price
+    possible_timestamp_cols = ["timestamp", "delivery_date", "date", "time"]
+    possible_price_cols = ["price", "marginal_price", "value"]
+
+    timestamp_col = None
+    price_col = None
+
+    for col in columns["name"]:
+        if col.lower() in possible_timestamp_cols:
+            timestamp_col = col
+        elif col.lower() in possible_price_cols:
+            price_col = col
+
+    if not timestamp_col or not price_col:
+        return None
+
+    date_range = con.execute(f"""
+        SELECT
+            MIN("{timestamp_col}") as min_date,
+            MAX("{timestamp_col}") as max_date,
+            COUNT(DISTINCT "{timestamp_col}"::DATE) as num_days,
+            COUNT(*) as total_records,
+            COUNT(*) filter (where "{price_col}" IS NOT NULL) as non_null_prices,
+            COUNT(*) filter (where "{price_col}" IS NULL) as null_prices
+        FROM marginal_prices
+    """).fetchdf()
+
+    # Get counts by day; group by position, since "date" is also a column of marginal_prices
+    day_counts = con.execute(f"""
+        SELECT
+            "{timestamp_col}"::DATE as date,
+            COUNT(*) as total_intervals,
+            COUNT(*) filter (where "{price_col}" IS NOT NULL) as intervals_with_prices,
+            COUNT(*) filter (where "{price_col}" IS NULL) as intervals_without_prices
+        FROM marginal_prices
+        GROUP BY 1
+        ORDER BY 1
+    """).fetchdf()
+
+    return {
+        "date_range": date_range,
+        "day_counts": day_counts,
+        "timestamp_col": timestamp_col,
+        "price_col": price_col
+    }
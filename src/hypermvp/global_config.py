@@ -1,7 +1,4 @@
 import os
-from pathlib import Path
-from datetime import datetime
-import logging
 
 # Define base directory (project root)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,6 +13,9 @@ OUTPUT_DATA_DIR = os.path.join(DATA_DIR, "03_output")
 PROVIDER_RAW_DIR = os.path.join(RAW_DATA_DIR, "provider") 
 AFRR_RAW_DIR = os.path.join(RAW_DATA_DIR, "afrr")
 
+# Scraper download cache (HTTP validators + content hashes, see hypermvp.scrapers.download_cache)
+DOWNLOAD_CACHE_DIR = os.path.join(RAW_DATA_DIR, ".download_cache")
+
 # Processed data directories
 PROCESSED_PROVIDER_DIR = os.path.join(PROCESSED_DATA_DIR, "provider")
 PROCESSED_AFRR_DIR = os.path.join(PROCESSED_DATA_DIR, "afrr")
@@ -24,6 +24,13 @@ PROCESSED_AFRR_DIR = os.path.join(PROCESSED_DATA_DIR, "afrr")
 DUCKDB_DIR = os.path.join(OUTPUT_DATA_DIR, "duckdb")
 ENERGY_DB_PATH = os.path.join(DUCKDB_DIR, "energy_data.duckdb")
 
+# JSON run reports written by hypermvp.utils.instrumentation
+RUN_REPORTS_DIR = os.path.join(OUTPUT_DATA_DIR, "run_reports")
+# Slow-query reports written by hypermvp.utils.traced_duckdb
+QUERY_REPORTS_DIR = os.path.join(OUTPUT_DATA_DIR, "query_reports")
+# cProfile stats and collapsed stacks written by --profile (hypermvp.utils.profiling)
+PROFILES_DIR = os.path.join(OUTPUT_DATA_DIR, "profiles")
+
 # For backward compatibility 
 DUCKDB_PATH = ENERGY_DB_PATH
 PROVIDER_DUCKDB_PATH = ENERGY_DB_PATH
@@ -69,17 +76,7 @@ def standardize_date_column(df, column, input_format=None):
         
     return df
 
-# Discover provider files from the provider directory
-os.makedirs(PROVIDER_RAW_DIR, exist_ok=True)  
-PROVIDER_FILE_PATHS = [
-    os.path.join(PROVIDER_RAW_DIR, file)
-    for file in os.listdir(PROVIDER_RAW_DIR) 
-    if os.path.isfile(os.path.join(PROVIDER_RAW_DIR, file))
-    and (file.endswith(".xlsx") or file.endswith(".csv"))
-]
-
 # AFRR file paths
-os.makedirs(AFRR_RAW_DIR, exist_ok=True)
 AFRR_FILE_PATH = os.path.join(AFRR_RAW_DIR, "afrr_data.csv")
 
 # Test Data directories (for unit testing)
@@ -92,16 +89,76 @@ TEST_ENERGY_DB_PATH = os.path.join(TEST_DUCKDB_DIR, "energy_data.duckdb")
 TEST_PROVIDER_DUCKDB_PATH = TEST_ENERGY_DB_PATH
 TEST_AFRR_DUCKDB_PATH = TEST_ENERGY_DB_PATH
 
-# Ensure all directories exist
-os.makedirs(RAW_DATA_DIR, exist_ok=True)
-os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
-os.makedirs(OUTPUT_DATA_DIR, exist_ok=True)
-os.makedirs(DUCKDB_DIR, exist_ok=True)  # Create the duckdb subfolder
-os.makedirs(RAW_TEST_DIR, exist_ok=True)
-os.makedirs(PROCESSED_TEST_DIR, exist_ok=True)
-os.makedirs(OUTPUT_TEST_DIR, exist_ok=True)
-os.makedirs(TEST_DUCKDB_DIR, exist_ok=True)  # Create the test duckdb subfolder
-
-# Ensure these directories exist
-os.makedirs(PROCESSED_PROVIDER_DIR, exist_ok=True)
-os.makedirs(PROCESSED_AFRR_DIR, exist_ok=True)
\ No newline at end of file
+# Directory setup
+# =========================================
+# Importing this module only builds path strings; nothing touches the disk.
+# Entry points that write data call ensure_dirs() once before they start.
+
+DATA_DIRS = [
+    RAW_DATA_DIR,
+    PROVIDER_RAW_DIR,
+    AFRR_RAW_DIR,
+    PROCESSED_DATA_DIR,
+    PROCESSED_PROVIDER_DIR,
+    PROCESSED_AFRR_DIR,
+    OUTPUT_DATA_DIR,
+    DUCKDB_DIR,
+]
+
+TEST_DIRS = [
+    RAW_TEST_DIR,
+    PROCESSED_TEST_DIR,
+    OUTPUT_TEST_DIR,
+    TEST_DUCKDB_DIR,
+]
+
+def ensure_dirs(include_test_dirs=False):
+    """
+    Create the project data directories if they do not exist yet.
+
+    Plain English: Call this once at the start of a command that writes data,
+    so raw, processed, output and DuckDB folders are in place.
+
+    Args:
+        include_test_dirs: Also create the tests/tests_data directories
+
+    Returns:
+        List of directories that were checked/created
+    """
+    dirs = DATA_DIRS + (TEST_DIRS if include_test_dirs else [])
+    for directory in dirs:
+        os.makedirs(directory, exist_ok=True)
+    return dirs
+
+def discover_provider_files(provider_dir=None):
+    """
+    List provider .xlsx/.xlsx.zip/.csv files in the provider raw directory.
+
+    Plain English: Looks into the provider download folder and returns the full
+    paths of all spreadsheets found there (an empty list if the folder is missing).
+
+    Args:
+        provider_dir: Directory to scan, defaults to PROVIDER_RAW_DIR
+
+    Returns:
+        List of file paths
+    """
+    provider_dir = provider_dir or PROVIDER_RAW_DIR
+    if not os.path.isdir(provider_dir):
+        return []
+    return [
+        os.path.join(provider_dir, file)
+        for file in os.listdir(provider_dir)
+        if os.path.isfile(os.path.join(provider_dir, file))
+        and file.endswith((".xlsx", ".xlsx.zip", ".csv"))
+    ]
+
+def __getattr__(name):
+    """
+    Resolve PROVIDER_FILE_PATHS on first access instead of at import time.
+    """
+    if name == "PROVIDER_FILE_PATHS":
+        value = discover_provider_files()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
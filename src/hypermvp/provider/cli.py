@@ -7,17 +7,15 @@ Provides tools to view, filter, and analyze data in your DuckDB database.
 import argparse
 import sys
 import logging
+from importlib.util import find_spec
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import json
 
+# DuckDB, Polars and rich are imported inside the commands that use them,
+# so --help and argument errors come back immediately.
 from hypermvp.global_config import ENERGY_DB_PATH
-from hypermvp.tools.duckdb_viewer.connection import (
-    get_connection, 
-    query_to_polars,
-    get_table_schema,
-    get_sample_data
-)
+from hypermvp.utils.profiling import add_profile_arguments, profile_session
 from hypermvp.tools.duckdb_viewer.query_templates import (
     list_tables_query,
     table_preview_query,
@@ -25,20 +23,8 @@ from hypermvp.tools.duckdb_viewer.query_templates import (
     filter_non_empty_column_query,
     get_table_columns_query
 )
-from hypermvp.tools.duckdb_viewer.analysis import (
-    get_basic_table_profile,
-    profile_column,
-    find_data_quality_issues,
-    analyze_note_column
-)
 
-try:
-    from rich.console import Console
-    from rich.table import Table
-    from rich import print as rich_print
-    RICH_AVAILABLE = True
-except ImportError:
-    RICH_AVAILABLE = False
+RICH_AVAILABLE = find_spec("rich") is not None
 
 # Set up logging
 logging.basicConfig(
@@ -47,8 +33,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize rich console if available
-console = Console() if RICH_AVAILABLE else None
+# Rich console, created on first use
+console = None
+
+def get_console():
+    """Return the shared rich console, creating it on first use."""
+    global console
+    if console is None:
+        from rich.console import Console
+        console = Console()
+    return console
 
 def format_output(data, format_type: str = 'table'):
     """
@@ -60,7 +54,9 @@ def format_output(data, format_type: str = 'table'):
             return json.dumps(data, indent=2, default=str)
         # If the data is a string, return as-is (so \n creates line breaks)
         return str(data)
-    
+
+    from rich.table import Table
+
     if isinstance(data, dict):
         # Display dictionary as key-value pairs
         table = Table(show_header=True)
@@ -100,6 +96,8 @@ def command_list_tables(args):
     List all tables in the database, showing table names and meta information (row/column counts).
     Output is formatted as a clean, aligned table for human readability.
     """
+    from hypermvp.tools.duckdb_viewer.connection import get_connection, query_to_polars, get_table_schema
+
     try:
         conn = get_connection(args.db_path)
         tables_df = query_to_polars(list_tables_query(), conn=conn)
@@ -153,6 +151,8 @@ def command_list_tables(args):
 
 def command_preview(args):
     """Preview data from a table."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection, get_sample_data
+
     try:
         if not args.table:
             return "Error: Table name is required."
@@ -166,6 +166,8 @@ def command_preview(args):
 
 def command_search(args):
     """Search for data in a table."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection, query_to_polars
+
     try:
         if not all([args.table, args.column, args.term]):
             return "Error: Table name, column name, and search term are all required."
@@ -187,6 +189,9 @@ def command_search(args):
 
 def command_profile(args):
     """Profile a table or column."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection
+    from hypermvp.tools.duckdb_viewer.analysis import get_basic_table_profile, profile_column
+
     try:
         if not args.table:
             return "Error: Table name is required."
@@ -203,6 +208,9 @@ def command_profile(args):
 
 def command_analyze_notes(args):
     """Analyze the NOTE column in a table."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection
+    from hypermvp.tools.duckdb_viewer.analysis import analyze_note_column
+
     try:
         if not args.table:
             return "Error: Table name is required."
@@ -217,6 +225,9 @@ def command_analyze_notes(args):
 
 def command_quality(args):
     """Find data quality issues in a table."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection
+    from hypermvp.tools.duckdb_viewer.analysis import find_data_quality_issues
+
     try:
         if not args.table:
             return "Error: Table name is required."
@@ -248,6 +259,7 @@ def main():
         default="table",
         help="Output format (table or JSON)"
     )
+    add_profile_arguments(global_parser)
 
     # Parse known args to separate global options from subcommand
     args, remaining_argv = global_parser.parse_known_args()
@@ -319,6 +331,11 @@ def main():
         parser.print_help()
         return 1
 
+    with profile_session(f"provider_cli_{parsed_args.command}", parsed_args.profile, parsed_args.profile_stacks):
+        return run_command(parsed_args)
+
+def run_command(parsed_args):
+    """Run the parsed subcommand and print its result."""
     # Execute the command
     result = None
     if parsed_args.command == "tables":
@@ -336,7 +353,7 @@ def main():
 
     # Display the result
     if RICH_AVAILABLE and parsed_args.format == 'table':
-        console.print(format_output(result, parsed_args.format))
+        get_console().print(format_output(result, parsed_args.format))
     else:
         print(format_output(result, parsed_args.format))
 
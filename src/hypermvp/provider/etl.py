@@ -11,19 +11,307 @@ Call `run_etl` with a list of Excel file paths and a DuckDB path to process all
 """
 
 import logging
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple, Union
 
 import polars as pl
 
-from .extractor import read_excel_file
+from .extractor import read_excel_file, read_excel_chunks
+from .sheet_cache import SheetCache
+from .xlsx_stream import sheet_sizes
 from .validators import validate_sheets
-from .loader import load_provider_data, create_table_if_not_exists
-from .provider_etl_config import REQUIRED_COLUMNS
+from .loader import load_provider_data, create_table_if_not_exists, get_duckdb_connection, insert_dataframes
+from .provider_etl_config import REQUIRED_COLUMNS, RAW_TABLE_SCHEMA, BATCH_SIZE
+from hypermvp.utils.instrumentation import instrumented
+from hypermvp.utils.memory_budget import MemoryBudget
 
+def _extract_file(file: str, sheet_cache: Optional[SheetCache] = None) -> Dict[str, Any]:
+    """Read and validate every sheet of one workbook (runs in a worker process)."""
+    frames, errors = [], []
+    sheets = read_excel_file(file, cache=sheet_cache)
+    for sheet_name, df in sheets.items():
+        valid, msg = validate_sheets(df, REQUIRED_COLUMNS)
+        if not valid:
+            errors.append({"file": file, "sheet": sheet_name, "error": msg})
+            logging.warning(f"Validation failed: {file} [{sheet_name}] - {msg}")
+            continue
+        # Add source file info for traceability
+        frames.append(df.with_columns(pl.lit(file).alias("source_file")))
+    return {"frames": frames, "errors": errors}
+
+def _stream_file(file: str, chunk_rows: int, errors: List[Dict[str, Any]]) -> Iterator[Tuple[str, pl.DataFrame]]:
+    """Read and validate one workbook chunk by chunk, yielding (sheet name, frame) pairs."""
+    invalid = set()
+    for sheet_name, df in read_excel_chunks(file, chunk_rows):
+        if sheet_name in invalid:
+            continue
+        valid, msg = validate_sheets(df, REQUIRED_COLUMNS)
+        if not valid:
+            invalid.add(sheet_name)
+            errors.append({"file": file, "sheet": sheet_name, "error": msg})
+            logging.warning(f"Validation failed: {file} [{sheet_name}] - {msg}")
+            continue
+        yield sheet_name, df.with_columns(pl.lit(file).alias("source_file"))
+
+def _file_frames(
+    file: str, budget: MemoryBudget, chunk_rows: int, errors: List[Dict[str, Any]],
+    sheet_cache: Optional[SheetCache] = None
+) -> Iterator[Tuple[Any, pl.DataFrame]]:
+    """
+    Yield (sheet, frame) pairs of one workbook for load_in_batches.
+
+    Workbooks that would not fit into the budget are streamed chunk by chunk,
+    the others are read whole (through the sheet cache, if given). Read
+    errors are recorded in errors, not raised.
+    """
+    try:
+        try:
+            xml_bytes = sum(sheet_sizes(file).values())
+        except Exception:
+            # Not a workbook the streaming reader understands: leave it to calamine
+            xml_bytes = 0
+        if budget.should_stream(xml_bytes):
+            logging.info(f"Streaming {file} in chunks of {chunk_rows:,} rows")
+            yield from _stream_file(file, chunk_rows, errors)
+        else:
+            outcome = _extract_file(file, sheet_cache)
+            errors.extend(outcome["errors"])
+            yield from enumerate(outcome.pop("frames"))
+    except Exception as e:
+        errors.append({"file": file, "error": str(e)})
+        logging.error(f"Failed to process {file}: {e}")
+
+def _date_range(frames: List[pl.DataFrame]) -> Tuple[Optional[str], Optional[str], Set[str]]:
+    """Return the min and max DELIVERY_DATE and the delivery months ("YYYY-MM") of some frames."""
+    min_date = None
+    max_date = None
+    months = set()
+    for df in frames:
+        # Track min/max DELIVERY_DATE
+        if "DELIVERY_DATE" in df.columns and df.height > 0:
+            col = df["DELIVERY_DATE"].to_list()
+            try:
+                dates = [str(d) for d in col if d]
+                if dates:
+                    sheet_min = min(dates)
+                    sheet_max = max(dates)
+                    if min_date is None or sheet_min < min_date:
+                        min_date = sheet_min
+                    if max_date is None or sheet_max > max_date:
+                        max_date = sheet_max
+                    months.update(d[:7] for d in dates)
+            except Exception as e:
+                logging.warning(f"Could not determine date range: {e}")
+    return min_date, max_date, months
+
+def extract_provider_data(
+    excel_files: List[str], max_workers: int = 1, sheet_cache: Optional[SheetCache] = None
+) -> Dict[str, Any]:
+    """
+    Extract and validate Excel files without touching the database.
+
+    Plain English:
+    This is the CPU-heavy half of the ETL. With max_workers > 1 the workbooks
+    are parsed in separate processes; the result is handed to `load_extracted`,
+    which does the (serial) database write.
+
+    Args:
+        excel_files: List of Excel file paths to process.
+        max_workers: Number of worker processes for parsing (1 = in this process).
+        sheet_cache: Optional SheetCache; cached workbooks are not decoded again.
+
+    Returns:
+        Dictionary with the valid frames, errors, row count, min/max
+        DELIVERY_DATE and the set of delivery months ("YYYY-MM").
+    """
+    logging.info(f"Starting ETL for {len(excel_files)} files.")
+    extracted = []
+    errors = []
+    total_rows = 0
+
+    if max_workers > 1 and len(excel_files) > 1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Spawn rather than fork: this runs on a DAG worker thread next to DuckDB,
+        # polars' thread pool and the run-report sampler, and a forked child can
+        # inherit a lock one of those threads held and hang on it forever
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(excel_files)), mp_context=context) as pool:
+            futures = [(file, pool.submit(_extract_file, file, sheet_cache)) for file in excel_files]
+            outcomes = []
+            for file, future in futures:
+                try:
+                    outcomes.append((file, future.result()))
+                except Exception as e:
+                    outcomes.append((file, e))
+    else:
+        outcomes = []
+        for file in excel_files:
+            logging.info(f"Extracting: {file}")
+            try:
+                outcomes.append((file, _extract_file(file, sheet_cache)))
+            except Exception as e:
+                outcomes.append((file, e))
+
+    for file, outcome in outcomes:
+        if isinstance(outcome, Exception):
+            errors.append({"file": file, "error": str(outcome)})
+            logging.error(f"Failed to process {file}: {outcome}")
+            continue
+        errors.extend(outcome["errors"])
+        extracted.extend(outcome["frames"])
+        total_rows += sum(df.height for df in outcome["frames"])
+
+    min_date, max_date, months = _date_range(extracted)
+    return {
+        "files": list(excel_files),
+        "frames": extracted,
+        "errors": errors,
+        "rows": total_rows,
+        "min_date": min_date,
+        "max_date": max_date,
+        "months": months,
+    }
+
+def load_extracted(
+    extraction: Dict[str, Any],
+    db_path: str = "provider_data.duckdb",
+    table_name: str = "provider_raw"
+) -> int:
+    """
+    Load the output of `extract_provider_data` into DuckDB.
+    Deletes all rows in the date range of the new data before inserting.
+
+    Args:
+        extraction: Result of extract_provider_data.
+        db_path: Path to DuckDB database file.
+        table_name: Name of the DuckDB table to load data into.
+
+    Returns:
+        Number of rows loaded.
+    """
+    if not extraction["frames"]:
+        return 0
+    # Atomic import: delete all rows in date range before insert
+    conn = get_duckdb_connection(db_path)
+    create_table_if_not_exists(conn, table_name, RAW_TABLE_SCHEMA)
+    min_date, max_date = extraction["min_date"], extraction["max_date"]
+    if min_date and max_date:
+        logging.info(f"Deleting existing rows in '{table_name}' for DELIVERY_DATE between {min_date} and {max_date}...")
+        conn.execute(f"DELETE FROM {table_name} WHERE DELIVERY_DATE BETWEEN ? AND ?", [min_date, max_date])
+    else:
+        logging.warning("Could not determine date range for deletion; skipping delete step.")
+    conn.close()
+    # Now insert new data
+    load_provider_data(extraction["frames"], db_path=db_path, table_name=table_name)
+    return extraction["rows"]
+
+def load_in_batches(
+    excel_files: List[str],
+    budget: MemoryBudget,
+    db_path: str = "provider_data.duckdb",
+    table_name: str = "provider_raw",
+    sheet_cache: Optional[SheetCache] = None
+) -> Dict[str, Any]:
+    """
+    Extract and load workbooks one at a time, flushing whenever the pending
+    frames reach the memory budget.
+
+    Plain English:
+    Instead of reading every workbook and then writing, the frames are written
+    (and freed) as soon as they fill their share of the budget, so peak memory
+    is about one batch rather than the whole directory. Workbooks too large to
+    parse within the budget are streamed in chunks of rows (see xlsx_stream),
+    so even a single huge sheet is written a chunk at a time.
+
+    Every batch replaces the existing rows in its own DELIVERY_DATE range, in
+    one transaction per batch. Rows inserted earlier in the same run are kept
+    (they share one load_timestamp). Committing per batch keeps DuckDB from
+    holding the whole load as uncommitted data; if a run fails part-way, the
+    batches already written stay, and running the load again replaces them.
+    The same goes for a streamed workbook that turns out to be broken half-way:
+    its chunks read so far are loaded and the error is reported.
+
+    Args:
+        excel_files: List of Excel file paths to process.
+        budget: Memory budget that decides when to flush.
+        db_path: Path to DuckDB database file.
+        table_name: Name of the DuckDB table to load data into.
+        sheet_cache: Optional SheetCache for the workbooks that are read whole.
+
+    Returns:
+        Dictionary with the files, sheet and row counts, errors, min/max
+        DELIVERY_DATE, delivery months and number of batches written.
+    """
+    load_timestamp = datetime.now()
+    summary = {
+        "files": list(excel_files), "sheets": 0, "rows": 0, "errors": [],
+        "min_date": None, "max_date": None, "months": set(), "batches": 0,
+    }
+    pending: List[pl.DataFrame] = []
+    pending_bytes = 0
+
+    def flush():
+        nonlocal pending_bytes
+        if not pending:
+            return
+        min_date, max_date, months = _date_range(pending)
+        # A connection per batch: closing it lets DuckDB release the batch's buffers
+        conn = get_duckdb_connection(db_path)
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            create_table_if_not_exists(conn, table_name, RAW_TABLE_SCHEMA)
+            if min_date and max_date:
+                conn.execute(
+                    f'DELETE FROM "{table_name}" WHERE DELIVERY_DATE BETWEEN ? AND ? '
+                    f'AND load_timestamp IS DISTINCT FROM ?',
+                    [min_date, max_date, load_timestamp]
+                )
+            else:
+                logging.warning("Could not determine date range for deletion; skipping delete step.")
+            insert_dataframes(conn, table_name, pending, load_timestamp=load_timestamp)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        if min_date and max_date:
+            summary["min_date"] = min(filter(None, [summary["min_date"], min_date]))
+            summary["max_date"] = max(filter(None, [summary["max_date"], max_date]))
+            summary["months"].update(months)
+        summary["batches"] += 1
+        logging.info(
+            f"Flushed batch {summary['batches']}: {sum(df.height for df in pending):,} rows, "
+            f"~{pending_bytes / 1024 ** 2:,.0f} MB"
+        )
+        pending.clear()
+        pending_bytes = 0
+
+    logging.info(f"Starting ETL for {len(excel_files)} files with a memory budget of {budget}.")
+    chunk_rows = budget.chunk_rows(BATCH_SIZE)
+    for file in excel_files:
+        logging.info(f"Extracting: {file}")
+        sheets = set()
+        for sheet, df in _file_frames(file, budget, chunk_rows, summary["errors"], sheet_cache):
+            pending.append(df)
+            pending_bytes += df.estimated_size()
+            sheets.add(sheet)
+            summary["rows"] += df.height
+            del df
+            if budget.should_flush(pending_bytes):
+                flush()
+        summary["sheets"] += len(sheets)
+    flush()
+    return summary
+
+@instrumented(rows_out=lambda summary: summary["rows_loaded"])
 def run_etl(
     excel_files: List[str],
     db_path: str = "provider_data.duckdb",
-    table_name: str = "provider_raw"
+    table_name: str = "provider_raw",
+    memory_budget: Union[None, int, str, MemoryBudget] = None,
+    sheet_cache: Optional[SheetCache] = None
 ) -> Dict[str, Any]:
     """
     Runs the ETL pipeline: extract, validate, and load Excel files.
@@ -33,73 +321,34 @@ def run_etl(
         excel_files: List of Excel file paths to process.
         db_path: Path to DuckDB database file.
         table_name: Name of the DuckDB table to load data into.
+        memory_budget: RAM budget in bytes, "auto" or a size like "4GB". With a
+            budget the files are loaded in batches (see load_in_batches); without
+            one, everything is extracted first and then loaded.
+        sheet_cache: Optional SheetCache; workbooks decoded by an earlier run
+            (or validation) are read from their Parquet copy.
 
     Returns:
         Dictionary with ETL summary stats.
     """
-    logging.info(f"Starting ETL for {len(excel_files)} files.")
-    extracted = []
-    errors = []
-    total_rows = 0
-    min_date = None
-    max_date = None
-
-    for file in excel_files:
-        try:
-            logging.info(f"Extracting: {file}")
-            sheets = read_excel_file(file)
-            # Validate each sheet
-            for sheet_name, df in sheets.items():
-                valid, msg = validate_sheets(df, REQUIRED_COLUMNS)
-                if not valid:
-                    errors.append({"file": file, "sheet": sheet_name, "error": msg})
-                    logging.warning(f"Validation failed: {file} [{sheet_name}] - {msg}")
-                    continue
-                # Add source file info for traceability
-                df = df.with_columns(pl.lit(file).alias("source_file"))
-                extracted.append(df)
-                total_rows += df.height
-                # Track min/max DELIVERY_DATE
-                if "DELIVERY_DATE" in df.columns and df.height > 0:
-                    col = df["DELIVERY_DATE"].to_list()
-                    try:
-                        dates = [str(d) for d in col if d]
-                        if dates:
-                            sheet_min = min(dates)
-                            sheet_max = max(dates)
-                            if min_date is None or sheet_min < min_date:
-                                min_date = sheet_min
-                            if max_date is None or sheet_max > max_date:
-                                max_date = sheet_max
-                    except Exception as e:
-                        logging.warning(f"Could not determine date range in {file} [{sheet_name}]: {e}")
-        except Exception as e:
-            errors.append({"file": file, "error": str(e)})
-            logging.error(f"Failed to process {file}: {e}")
-
-    if extracted:
-        # Atomic import: delete all rows in date range before insert
-        import duckdb
-        conn = duckdb.connect(db_path)
-        from .provider_etl_config import RAW_TABLE_SCHEMA
-        create_table_if_not_exists(conn, table_name, RAW_TABLE_SCHEMA)
-        if min_date and max_date:
-            logging.info(f"Deleting existing rows in '{table_name}' for DELIVERY_DATE between {min_date} and {max_date}...")
-            conn.execute(f"DELETE FROM {table_name} WHERE DELIVERY_DATE BETWEEN ? AND ?", [min_date, max_date])
-        else:
-            logging.warning("Could not determine date range for deletion; skipping delete step.")
-        conn.close()
-        # Now insert new data
-        load_provider_data(extracted, db_path=db_path, table_name=table_name)
-        loaded = total_rows
+    budget = MemoryBudget.resolve(memory_budget)
+    if budget is not None:
+        batched = load_in_batches(excel_files, budget, db_path=db_path, table_name=table_name,
+                                  sheet_cache=sheet_cache)
+        sheets, loaded, errors = batched["sheets"], batched["rows"], batched["errors"]
+        months, batches = batched["months"], batched["batches"]
     else:
-        loaded = 0
+        extraction = extract_provider_data(excel_files, sheet_cache=sheet_cache)
+        sheets, errors, months = len(extraction["frames"]), extraction["errors"], extraction["months"]
+        loaded = load_extracted(extraction, db_path=db_path, table_name=table_name)
+        batches = 1 if loaded else 0
 
     summary = {
         "files_processed": len(excel_files),
-        "sheets_loaded": len(extracted),
+        "sheets_loaded": sheets,
         "rows_loaded": loaded,
         "errors": errors,
+        "months": months,
+        "batches": batches,
     }
     # Format numbers with European decimal separators for output
     def euro_fmt(val):
@@ -111,7 +360,7 @@ def run_etl(
     logging.info(
         "Provider ETL Summary: files_processed=%s, sheets_loaded=%s, rows_loaded=%s, errors=%s",
         euro_fmt(len(excel_files)),
-        euro_fmt(len(extracted)),
+        euro_fmt(sheets),
         euro_fmt(loaded),
         errors
     )
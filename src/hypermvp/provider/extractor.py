@@ -7,35 +7,62 @@ Excel extraction utilities for the provider ETL pipeline.
 """
 
 import polars as pl
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import os
 import fastexcel
 import logging
 
-from .provider_etl_config import POLARS_READ_OPTS, REQUIRED_COLUMNS, MAX_PARALLEL_SHEETS
+from .provider_etl_config import POLARS_READ_OPTS, REQUIRED_COLUMNS, MAX_PARALLEL_SHEETS, BATCH_SIZE
 from .progress import progress_bar, format_size
+from .xlsx_stream import sheet_sizes, iter_sheet_chunks
+from .sheet_cache import SheetCache
+from .workbook_archive import is_excel_file, is_zipped_workbook, workbook_source
+from hypermvp.utils.instrumentation import instrumented
 
-def read_excel_file(filepath: str) -> Dict[str, pl.DataFrame]:
+@instrumented(rows_out=lambda sheets: sum(df.height for df in sheets.values()))
+def read_excel_file(filepath: str, cache: Optional[SheetCache] = None) -> Dict[str, pl.DataFrame]:
     """
     Reads all sheets from an Excel file into a dictionary of Polars DataFrames.
     Always returns a dict, even for single-sheet files.
+    An .xlsx.zip archive is read directly, without extracting it to disk.
     If the last column (e.g., 'NOTE') is entirely empty, it is dropped.
     If not, the last column is always cast to string to avoid dtype warnings.
 
     Args:
         filepath: Path to the Excel file.
+        cache: Optional SheetCache; a workbook decoded before is read from its
+            Parquet copy, and a newly decoded one is added to the cache.
 
     Returns:
         A dictionary mapping sheet names to Polars DataFrames.
     """
+    if cache is None:
+        return _decode_excel_file(filepath)
+    key = cache.key(filepath)
+    sheets = cache.get(key)
+    if sheets is not None:
+        logging.info(f"Read {os.path.basename(filepath)} from the sheet cache")
+        return sheets
+    sheets = _decode_excel_file(filepath)
+    try:
+        cache.put(key, sheets, source=filepath)
+    except Exception as e:
+        # A full disk or read-only cache directory must not fail the read
+        logging.warning(f"Could not cache {filepath}: {e}")
+    return sheets
+
+def _decode_excel_file(filepath: str) -> Dict[str, pl.DataFrame]:
+    """Decode every sheet of an Excel file with calamine (see read_excel_file)."""
+    # The path of an .xlsx, or the bytes of the workbook inside an .xlsx.zip
+    source = workbook_source(filepath)
     try:
         # First get sheet names using fastexcel
-        reader = fastexcel.read_excel(filepath)
+        reader = fastexcel.read_excel(source)
         sheet_names = reader.sheet_names
 
         result = {}
         for sheet_name in sheet_names:
-            df = pl.read_excel(filepath, sheet_name=sheet_name, engine="calamine")
+            df = pl.read_excel(source, sheet_name=sheet_name, engine="calamine")
             last_col = df.columns[-1]
             non_empty = df.filter(pl.col(last_col).is_not_null() & (pl.col(last_col) != "")).height
             if non_empty == 0:
@@ -50,7 +77,7 @@ def read_excel_file(filepath: str) -> Dict[str, pl.DataFrame]:
         return result
     except Exception as e:
         # Fallback to Polars' multi-sheet reading if fastexcel fails
-        sheets = pl.read_excel(filepath, sheet_id=None, engine="calamine")
+        sheets = pl.read_excel(source, sheet_id=None, engine="calamine")
         # Apply the same logic for the fallback
         if isinstance(sheets, dict):
             for sheet_name, df in sheets.items():
@@ -78,12 +105,33 @@ def read_excel_file(filepath: str) -> Dict[str, pl.DataFrame]:
             return {"Sheet1": sheets}
         return sheets
 
-def extract_excels(filepaths: List[str]) -> List[Dict[str, pl.DataFrame]]:
+def read_excel_chunks(filepath: str, chunk_rows: int = BATCH_SIZE) -> Iterator[Tuple[str, pl.DataFrame]]:
+    """
+    Streams all sheets of an Excel file as Polars DataFrames of up to chunk_rows rows.
+
+    Use this instead of read_excel_file for workbooks too large to hold in
+    memory. Whether the last column is empty is only known at the end of a
+    sheet, so it is never dropped here; it is always cast to string, which
+    also keeps its dtype the same in every chunk.
+
+    Args:
+        filepath: Path to the Excel file.
+        chunk_rows: Maximum number of rows per DataFrame.
+
+    Returns:
+        An iterator of (sheet name, DataFrame) pairs, sheet by sheet.
+    """
+    for sheet_name in sheet_sizes(filepath):
+        for df in iter_sheet_chunks(filepath, sheet_name, chunk_rows):
+            yield sheet_name, df.with_columns(pl.col(df.columns[-1]).cast(pl.Utf8))
+
+def extract_excels(filepaths: List[str], cache: Optional[SheetCache] = None) -> List[Dict[str, pl.DataFrame]]:
     """
     Reads multiple Excel files in parallel, showing progress.
 
     Args:
         filepaths: List of Excel file paths.
+        cache: Optional SheetCache passed on to read_excel_file.
 
     Returns:
         List of dictionaries (one per file) mapping sheet names to DataFrames.
@@ -94,13 +142,16 @@ def extract_excels(filepaths: List[str]) -> List[Dict[str, pl.DataFrame]]:
             print(f"File not found: {filepath}")
             continue
         print(f"Reading {os.path.basename(filepath)} ({format_size(os.path.getsize(filepath))})")
-        sheets = read_excel_file(filepath)
+        sheets = read_excel_file(filepath, cache=cache)
         results.append(sheets)
     return results
 
 def find_excel_files(directory: str) -> List[str]:
     """
-    Find all Excel files in a directory.
+    Find all Excel files (.xlsx and .xlsx.zip) in a directory.
+
+    If a workbook and its .xlsx.zip sit next to each other, only the newer
+    of the two is returned, so the same month is not loaded twice.
     
     Args:
         directory: Directory to search
@@ -111,8 +162,16 @@ def find_excel_files(directory: str) -> List[str]:
     if not os.path.exists(directory):
         raise FileNotFoundError(f"Directory not found: {directory}")
         
-    excel_files = [os.path.join(directory, f) for f in os.listdir(directory) 
-                  if f.lower().endswith('.xlsx')]
+    by_workbook = {}
+    for name in os.listdir(directory):
+        if not is_excel_file(name):
+            continue
+        path = os.path.join(directory, name)
+        workbook = name[:-len(".zip")] if is_zipped_workbook(name) else name
+        other = by_workbook.get(workbook)
+        if other is None or os.path.getmtime(path) > os.path.getmtime(other):
+            by_workbook[workbook] = path
+    excel_files = list(by_workbook.values())
     
     if not excel_files:
         logging.warning(f"No Excel files found in {directory}")
@@ -122,6 +181,8 @@ def find_excel_files(directory: str) -> List[str]:
     return sorted(excel_files)  # Sort for consistent processing order
 
 # Plain English summary:
-# - `read_excel_file` loads all sheets from a single Excel file into Polars DataFrames.
+# - `read_excel_file` loads all sheets from a single Excel file (.xlsx or .xlsx.zip) into
+#   Polars DataFrames, optionally through the Parquet sheet cache.
+# - `read_excel_chunks` streams very large files chunk by chunk instead.
 # - `extract_excels` processes a list of files, showing progress and skipping missing files.
 # - Both functions are optimized for large files and can be extended for parallelism if needed.
\ No newline at end of file
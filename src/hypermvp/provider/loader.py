@@ -6,15 +6,17 @@ import logging
 import os
 import duckdb
 import polars as pl
-from typing import List, Tuple
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 from .provider_etl_config import RAW_TABLE_SCHEMA
+from hypermvp.utils import traced_duckdb
 
-def get_duckdb_connection(db_path: str = "provider_data.duckdb") -> duckdb.DuckDBPyConnection:
+def get_duckdb_connection(db_path: str = "provider_data.duckdb") -> traced_duckdb.TracedConnection:
     """
-    Returns a DuckDB connection to the specified database file.
+    Returns a (traced) DuckDB connection to the specified database file.
     """
-    return duckdb.connect(db_path)
+    return traced_duckdb.connect(db_path)
 
 def create_table_if_not_exists(conn: duckdb.DuckDBPyConnection, table_name: str, schema: dict):
     """
@@ -29,16 +31,21 @@ def create_table_if_not_exists(conn: duckdb.DuckDBPyConnection, table_name: str,
 def insert_dataframes(
     conn: duckdb.DuckDBPyConnection,
     table_name: str,
-    dfs: List[pl.DataFrame]
+    dfs: List[pl.DataFrame],
+    load_timestamp: Optional[datetime] = None
 ):
     """
     Efficiently inserts Polars DataFrames into DuckDB.
     Uses DuckDB's in-memory registration for fast, zero-copy bulk insert.
+    If load_timestamp is given, it is stored in the load_timestamp column of every row.
     """
     for i, df in enumerate(dfs):
+        if load_timestamp is not None:
+            df = df.with_columns(pl.lit(load_timestamp).alias("load_timestamp"))
         df = ensure_all_columns(df, RAW_TABLE_SCHEMA)
         temp_view = f"_temp_df_{i}"
-        conn.register(temp_view, df.to_pandas())
+        # Arrow shares the frame's buffers, where a pandas copy would double the batch in memory
+        conn.register(temp_view, df.to_arrow())
         logging.info(f"Loading {len(df):,} rows into DuckDB table '{table_name}'...")  # <-- thousands separator
         conn.execute(f'INSERT INTO "{table_name}" SELECT * FROM "{temp_view}"')
         conn.unregister(temp_view)
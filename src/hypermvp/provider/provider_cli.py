@@ -5,12 +5,18 @@ Usage examples:
     python -m src.hypermvp.provider.provider_cli --load --input-dir /path/to/xlsx --db-path /path/to/your.duckdb
     python -m src.hypermvp.provider.provider_cli --clean --db-path /path/to/your.duckdb
     python -m src.hypermvp.provider.provider_cli --all --input-dir /path/to/xlsx --db-path /path/to/your.duckdb
+    python -m src.hypermvp.provider.provider_cli --load --input-dir /path/to/xlsx --db-path /path/to/your.duckdb --memory-budget 4GB
 """
 import argparse
 import sys
 from pathlib import Path
 from .provider_db_cleaner import clean_provider_table
 from .etl import run_etl
+from .extractor import find_excel_files
+from .sheet_cache import SheetCache
+from hypermvp.global_config import ensure_dirs
+from hypermvp.utils.memory_budget import parse_memory_size
+from hypermvp.utils.profiling import add_profile_arguments, profile_session
 
 def main():
     parser = argparse.ArgumentParser(description="Provider Data Workflow CLI")
@@ -20,7 +26,22 @@ def main():
     parser.add_argument("--input-dir", type=str, help="Directory containing provider Excel files")
     parser.add_argument("--db-path", type=str, required=True, help="Path to DuckDB database")
     parser.add_argument("--log-level", type=str, default="INFO", help="Logging level")
+    parser.add_argument(
+        "--memory-budget", type=parse_memory_size, default=None, metavar="SIZE",
+        help="RAM budget for --load, e.g. 4GB or 'auto' (half the available memory); files are loaded in batches that fit"
+    )
+    parser.add_argument(
+        "--no-sheet-cache", dest="sheet_cache", action="store_false",
+        help="Decode every workbook again instead of reusing the Parquet copies in the sheet cache"
+    )
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    ensure_dirs()
+    with profile_session("provider_etl_cli", args.profile, args.profile_stacks):
+        run(args)
+
+def run(args):
+    """Run the load and/or clean steps selected by the parsed arguments."""
 
     import logging
     logging.basicConfig(level=getattr(logging, args.log_level.upper(), "INFO"))
@@ -41,13 +62,17 @@ def main():
         # Always create/connect to the DuckDB file for robustness, even if no Excel files are found
         import duckdb
         duckdb.connect(args.db_path).close()
-        excel_files = list(input_dir.glob("*.xlsx"))
+        excel_files = find_excel_files(str(input_dir))
         if not excel_files:
             print(f"No Excel files found in {input_dir}")
             # Do not exit(1); the DB file is now created for downstream steps and test compatibility
             return
         print(f"Starting ETL process for {len(excel_files)} files...")
-        summary = run_etl([str(f) for f in excel_files], db_path=args.db_path, table_name="provider_raw")
+        sheet_cache = SheetCache() if getattr(args, "sheet_cache", False) else None
+        summary = run_etl(
+            excel_files, db_path=args.db_path, table_name="provider_raw",
+            memory_budget=args.memory_budget, sheet_cache=sheet_cache
+        )
         print(f"ETL Summary: {summary}")
 
     if args.clean or args.all:
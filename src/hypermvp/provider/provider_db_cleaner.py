@@ -1,13 +1,22 @@
 """
 Provider table cleaning logic for DuckDB.
 Implements US001-provider_table_cleaner.md requirements.
+
+provider_raw (as loaded by the ETL) -> provider_clean (signed prices, no POS
+products) -> provider_data, the table the marginal price analysis, the bid
+distribution analysis and the dashboard read.
 """
 import duckdb
 import logging
 from pathlib import Path
+from typing import Iterable, Optional
+
+from hypermvp.utils.in_memory_db import is_in_memory
+from hypermvp.utils.instrumentation import instrument
 
 PROVIDER_RAW_TABLE = "provider_raw"
 PROVIDER_CLEAN_TABLE = "provider_clean"
+PROVIDER_DATA_TABLE = "provider_data"
 
 CLEAN_SQL = f'''
 CREATE OR REPLACE TABLE {PROVIDER_CLEAN_TABLE} AS
@@ -15,12 +24,12 @@ SELECT
     DELIVERY_DATE,
     PRODUCT,
     CASE
-        WHEN PAYMENT_DIRECTION = 'PROVIDER_TO_GRID'
-        THEN -1 * ENERGY_PRICE_EUR_MWh
-        ELSE ENERGY_PRICE_EUR_MWh
+        WHEN "ENERGY_PRICE_PAYMENT_DIRECTION" = 'PROVIDER_TO_GRID'
+        THEN -1 * "ENERGY_PRICE_[EUR/MWh]"
+        ELSE "ENERGY_PRICE_[EUR/MWh]"
     END AS ENERGY_PRICE_EUR_MWh,
-    PAYMENT_DIRECTION,
-    ALLOCATED_CAPACITY_MW,
+    "ENERGY_PRICE_PAYMENT_DIRECTION" AS PAYMENT_DIRECTION,
+    "ALLOCATED_CAPACITY_[MW]" AS ALLOCATED_CAPACITY_MW,
     NOTE,
     source_file,
     load_timestamp
@@ -29,6 +38,17 @@ WHERE NOT PRODUCT LIKE 'POS_%'
 ORDER BY DELIVERY_DATE ASC, ENERGY_PRICE_EUR_MWh ASC;
 '''
 
+# Columns the analysis reads; a bid's allocated capacity is the capacity it offers
+PROVIDER_DATA_SCHEMA_SQL = f'''
+CREATE TABLE IF NOT EXISTS {PROVIDER_DATA_TABLE} (
+    DELIVERY_DATE TIMESTAMP,
+    PRODUCT VARCHAR,
+    ENERGY_PRICE__EUR_MWh_ DOUBLE,
+    OFFERED_CAPACITY__MW_ DOUBLE
+);
+'''
+CLEAN_MONTH = "strftime(TRY_CAST(DELIVERY_DATE AS TIMESTAMP), '%Y-%m')"
+
 def clean_provider_table(db_path: str):
     """
     Cleans the provider_raw table in DuckDB and writes the result to provider_clean.
@@ -36,10 +56,67 @@ def clean_provider_table(db_path: str):
     - Multiplies ENERGY_PRICE_EUR_MWh by -1 where PAYMENT_DIRECTION is 'PROVIDER_TO_GRID'.
     - Sorts by DELIVERY_DATE (chronological), then ENERGY_PRICE_EUR_MWh (ascending).
     """
-    if not Path(db_path).exists():
+    if not is_in_memory(db_path) and not Path(db_path).exists():
         raise FileNotFoundError(f"DuckDB database not found: {db_path}")
     logging.info(f"Cleaning provider table in {db_path} ...")
-    con = duckdb.connect(db_path)
-    con.execute(CLEAN_SQL)
-    con.close()
+    with instrument("clean_provider_table") as stage:
+        con = duckdb.connect(db_path)
+        stage.rows_in = con.execute(f"SELECT COUNT(*) FROM {PROVIDER_RAW_TABLE}").fetchone()[0]
+        con.execute(CLEAN_SQL)
+        stage.rows_out = con.execute(f"SELECT COUNT(*) FROM {PROVIDER_CLEAN_TABLE}").fetchone()[0]
+        con.close()
     logging.info("Provider table cleaned and saved as 'provider_clean'.")
+
+def refresh_provider_data(db_path: str, months: Optional[Iterable[str]] = None) -> int:
+    """
+    Replace the given delivery months of provider_data with the rows of provider_clean.
+
+    Plain English:
+    After a provider load, copies the freshly cleaned bids of the loaded
+    months into the table the analysis reads. Months that were not loaded
+    keep their rows, so older data in provider_data is not lost.
+
+    Args:
+        db_path: DuckDB database path (file or ":memory:<name>")
+        months: "YYYY-MM" delivery months to replace (default: every month in provider_clean)
+
+    Returns:
+        int: Number of rows written to provider_data
+    """
+    with instrument("refresh_provider_data") as stage:
+        con = duckdb.connect(db_path)
+        try:
+            if months is None:
+                months = [m for (m,) in con.execute(
+                    f"SELECT DISTINCT {CLEAN_MONTH} FROM {PROVIDER_CLEAN_TABLE}"
+                ).fetchall() if m is not None]
+            months = sorted(months)
+            con.execute(PROVIDER_DATA_SCHEMA_SQL)
+            con.execute("BEGIN TRANSACTION")
+            con.execute(
+                f"DELETE FROM {PROVIDER_DATA_TABLE} WHERE list_contains(?, strftime(DELIVERY_DATE, '%Y-%m'))",
+                [months],
+            )
+            con.execute(f"""
+                INSERT INTO {PROVIDER_DATA_TABLE}
+                    (DELIVERY_DATE, PRODUCT, ENERGY_PRICE__EUR_MWh_, OFFERED_CAPACITY__MW_)
+                SELECT TRY_CAST(DELIVERY_DATE AS TIMESTAMP), PRODUCT, ENERGY_PRICE_EUR_MWh, ALLOCATED_CAPACITY_MW
+                FROM {PROVIDER_CLEAN_TABLE}
+                WHERE list_contains(?, {CLEAN_MONTH})
+            """, [months])
+            rows = con.execute(
+                f"SELECT COUNT(*) FROM {PROVIDER_DATA_TABLE} WHERE list_contains(?, strftime(DELIVERY_DATE, '%Y-%m'))",
+                [months],
+            ).fetchone()[0]
+            con.execute("COMMIT")
+        except Exception:
+            try:
+                con.execute("ROLLBACK")
+            except duckdb.Error:
+                pass  # No transaction was open
+            raise
+        finally:
+            con.close()
+        stage.rows_out = rows
+    logging.info(f"Refreshed {rows:,} rows of '{PROVIDER_DATA_TABLE}' for {len(months)} month(s).")
+    return rows
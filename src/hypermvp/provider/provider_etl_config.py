@@ -12,7 +12,7 @@ Plain English summary:
 """
 
 import os
-from hypermvp.global_config import ISO_DATETIME_FORMAT, ISO_DATE_FORMAT, standardize_date_column
+from hypermvp.global_config import ISO_DATETIME_FORMAT, ISO_DATE_FORMAT, PROCESSED_PROVIDER_DIR, standardize_date_column
 
 # Table schema for raw provider data (matches Excel input)
 RAW_TABLE_SCHEMA = {
@@ -57,6 +57,10 @@ POLARS_READ_OPTS = {
 MAX_PARALLEL_SHEETS = min(4, os.cpu_count() or 4)  # Parallel Excel reading
 BATCH_SIZE = 100_000  # Rows per batch insert into DuckDB
 
+# Parsed-sheet cache: decoded workbooks as Parquet, least recently used evicted above the limit
+SHEET_CACHE_DIR = os.path.join(PROCESSED_PROVIDER_DIR, "sheet_cache")
+SHEET_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
 # DuckDB settings
 DUCKDB_THREADS = min(6, os.cpu_count() or 4)  # Default thread count for DuckDB
 
@@ -0,0 +1,155 @@
+"""
+Parquet cache of decoded provider workbooks.
+
+Decoding a large workbook takes far longer than reading the same data back
+from Parquet. `SheetCache` stores every sheet `read_excel_file` returns as a
+zstd-compressed Parquet file, keyed by the SHA-256 of the workbook and the
+sheet name, under SHEET_CACHE_DIR (in PROCESSED_PROVIDER_DIR):
+
+    sheet_cache/<sha256>/manifest.json   sheet names -> Parquet files
+    sheet_cache/<sha256>/0.parquet, 1.parquet, ...
+
+Keying by content rather than path or mtime means a renamed or re-downloaded
+but unchanged file is still a hit, and an edited file never is. Every hit
+touches the manifest; once the cache grows past its size limit the least
+recently used workbooks are deleted.
+
+Plain English:
+Pass `cache=SheetCache()` to read_excel_file (or `sheet_cache=` to run_etl)
+and a workbook is only decoded the first time; validating or reloading it
+later reads the Parquet copy instead.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import polars as pl
+
+from hypermvp.scrapers.download_cache import file_sha256
+from . import provider_etl_config
+
+MANIFEST = "manifest.json"
+# Bump when read_excel_file changes what it returns, so older entries are ignored
+CACHE_FORMAT = 1
+PARQUET_COMPRESSION = "zstd"
+
+class SheetCache:
+    """
+    Size-limited, least-recently-used cache of decoded workbooks.
+
+    Safe to share between processes: entries are written to a temporary
+    directory and renamed into place, so readers never see half an entry.
+
+    Args:
+        cache_dir: Cache directory (default: SHEET_CACHE_DIR)
+        max_bytes: Size above which the least recently used workbooks are evicted
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or provider_etl_config.SHEET_CACHE_DIR)
+        self.max_bytes = provider_etl_config.SHEET_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def key(self, filepath: str) -> str:
+        """Return the cache key of a workbook (the SHA-256 of its content)."""
+        return file_sha256(filepath)
+
+    def get(self, key: str) -> Optional[Dict[str, pl.DataFrame]]:
+        """
+        Return the cached sheets of a workbook, or None if it is not cached.
+
+        Unreadable entries (e.g. left by a crash or an older format) are deleted.
+        """
+        entry = self.cache_dir / key
+        manifest_path = entry / MANIFEST
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") != CACHE_FORMAT:
+                raise ValueError(f"cache format {manifest.get('format')}, expected {CACHE_FORMAT}")
+            sheets = {name: pl.read_parquet(entry / filename) for name, filename in manifest["sheets"]}
+        except Exception as e:
+            logging.warning(f"Dropping unreadable sheet cache entry {entry}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        # The manifest's mtime is the entry's last use
+        os.utime(manifest_path)
+        return sheets
+
+    def put(self, key: str, sheets: Dict[str, pl.DataFrame], source: Optional[str] = None):
+        """
+        Store the sheets of a workbook, then evict old entries if the cache is too large.
+
+        Args:
+            key: Cache key from key()
+            sheets: Sheet name -> DataFrame, as returned by read_excel_file
+            source: Path of the workbook, kept in the manifest for reference
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_dir = Path(tempfile.mkdtemp(prefix=f".{key[:16]}-", dir=self.cache_dir))
+        try:
+            manifest = {"format": CACHE_FORMAT, "source": source, "sheets": []}
+            for i, (name, df) in enumerate(sheets.items()):
+                filename = f"{i}.parquet"
+                df.write_parquet(temp_dir / filename, compression=PARQUET_COMPRESSION)
+                manifest["sheets"].append([name, filename])
+            with open(temp_dir / MANIFEST, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            try:
+                os.rename(temp_dir, self.cache_dir / key)
+            except OSError:
+                # Another process cached the same workbook first
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def entries(self) -> List[Dict]:
+        """Return key, size in bytes and last use of every entry, least recently used first."""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for entry in self.cache_dir.iterdir():
+            manifest_path = entry / MANIFEST
+            if entry.name.startswith(".") or not manifest_path.exists():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append({"key": entry.name, "bytes": size, "last_used": manifest_path.stat().st_mtime})
+            except OSError:
+                # Evicted by another process while we looked at it
+                continue
+        return sorted(entries, key=lambda e: e["last_used"])
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently used entries until the cache fits into max_bytes.
+
+        Args:
+            keep: Key to evict last (the entry just written), unless it alone exceeds the limit
+
+        Returns:
+            int: Number of bytes freed
+        """
+        entries = self.entries()
+        total = sum(e["bytes"] for e in entries)
+        entries.sort(key=lambda e: e["key"] == keep)
+        freed = 0
+        for entry in entries:
+            if total - freed <= self.max_bytes:
+                break
+            shutil.rmtree(self.cache_dir / entry["key"], ignore_errors=True)
+            freed += entry["bytes"]
+            logging.info(f"Evicted {entry['key'][:12]} ({entry['bytes'] / 1024 ** 2:,.1f} MB) from the sheet cache")
+        return freed
+
+    def clear(self):
+        """Delete every cached workbook."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -10,6 +10,7 @@ from datetime import datetime
 
 from .provider_etl_config import REQUIRED_COLUMNS, standardize_polars_date_column
 from .extractor import read_excel_file, find_excel_files
+from .sheet_cache import SheetCache
 from .progress import progress_bar
 from hypermvp.global_config import ISO_DATE_FORMAT
 
@@ -99,7 +100,8 @@ def extract_date_range(
 
 def validate_all_excels_in_directory(
     directory: str,
-    required_columns: List[str] = REQUIRED_COLUMNS
+    required_columns: List[str] = REQUIRED_COLUMNS,
+    cache: Optional[SheetCache] = None
 ) -> Tuple[bool, Any]:
     """
     Validates all Excel files in the specified directory with progress bars.
@@ -107,6 +109,7 @@ def validate_all_excels_in_directory(
     Args:
         directory: Path to directory containing Excel files
         required_columns: List of column names that must be present
+        cache: Optional SheetCache, so a later load reuses the decoded sheets
         
     Returns:
         Tuple of (success, result) where result is either an error message
@@ -129,7 +132,7 @@ def validate_all_excels_in_directory(
         ):
             try:
                 file_name = os.path.basename(excel_file)
-                dfs_by_sheet = read_excel_file(excel_file)
+                dfs_by_sheet = read_excel_file(excel_file, cache=cache)
                 
                 # Process sheets with progress bar
                 for sheet_name, df in progress_bar(
@@ -0,0 +1,68 @@
+"""
+Zipped provider workbooks (.xlsx.zip) read without extracting them to disk.
+
+The provider platform publishes every month as an .xlsx inside a .zip. The
+readers accept such archives directly: `workbook_source` returns the inner
+workbook's bytes, which calamine reads like a file, and `open_workbook_zip`
+opens them for the streaming reader. The buffer holds the workbook's own
+(already compressed) bytes, so it is much smaller than the decoded sheets.
+
+Plain English:
+The raw provider directory may hold the downloaded .xlsx.zip archives as they
+are; nothing needs to be unpacked before the ETL runs.
+"""
+
+import io
+import os
+import zipfile
+from typing import Union
+
+ZIPPED_WORKBOOK_SUFFIX = ".xlsx.zip"
+EXCEL_SUFFIXES = (".xlsx", ZIPPED_WORKBOOK_SUFFIX)
+
+def is_zipped_workbook(filepath: str) -> bool:
+    """Return True for an .xlsx packed in a .zip archive."""
+    return str(filepath).lower().endswith(ZIPPED_WORKBOOK_SUFFIX)
+
+def is_excel_file(filepath: str) -> bool:
+    """Return True for the workbook files the provider ETL reads (.xlsx and .xlsx.zip)."""
+    return str(filepath).lower().endswith(EXCEL_SUFFIXES)
+
+def inner_workbook_name(archive: zipfile.ZipFile) -> str:
+    """
+    Return the name of the workbook inside an archive.
+
+    Raises:
+        ValueError: If the archive contains no .xlsx, or more than one
+    """
+    names = [
+        info.filename for info in archive.infolist()
+        if not info.is_dir() and info.filename.lower().endswith(".xlsx")
+        and not os.path.basename(info.filename).startswith(("~$", "."))
+    ]
+    if len(names) != 1:
+        found = ", ".join(names) or "none"
+        raise ValueError(f"Expected one .xlsx in {archive.filename}, found {found}")
+    return names[0]
+
+def read_workbook_bytes(filepath: str) -> bytes:
+    """Return the bytes of the workbook inside an .xlsx.zip archive."""
+    with zipfile.ZipFile(filepath) as archive:
+        return archive.read(inner_workbook_name(archive))
+
+def workbook_source(filepath: str) -> Union[str, bytes]:
+    """
+    Return something calamine and Polars can open for a workbook file.
+
+    Plain English:
+    An .xlsx is passed on as its path; for an .xlsx.zip the inner workbook is
+    read into memory (not written to disk) and returned as bytes.
+    """
+    if is_zipped_workbook(filepath):
+        return read_workbook_bytes(filepath)
+    return filepath
+
+def open_workbook_zip(filepath: str) -> zipfile.ZipFile:
+    """Open the zip container of a workbook (an .xlsx is itself a zip), unpacking .xlsx.zip in memory."""
+    source = workbook_source(filepath)
+    return zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source)
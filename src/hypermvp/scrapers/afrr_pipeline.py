@@ -0,0 +1,73 @@
+"""Scrape aFRR activation data straight into DuckDB.
+
+The regular scraper saves one CSV per month, which is then loaded in a
+separate step. The pipeline keeps the CSVs in memory instead:
+
+1. fetch all requested months (in parallel when the scraper has a downloader)
+2. parse each CSV from memory
+3. replace the months in `afrr_data` with one batched, transactional write
+
+Plain English:
+The monthly refresh becomes one command. Nothing is written to the raw data
+folder, and a month that fails to download or parse is skipped without
+touching the data already in the database.
+"""
+
+import logging
+import time
+
+from hypermvp.afrr.loader import read_afrr_csv
+from hypermvp.afrr.save_to_duckdb import save_afrr_months_to_duckdb
+from hypermvp.global_config import AFRR_DUCKDB_PATH
+
+logger = logging.getLogger(__name__)
+
+def scrape_afrr_to_duckdb(scraper, dates, db_path=AFRR_DUCKDB_PATH, table_name="afrr_data"):
+    """
+    Download the months covering `dates` and upsert them into DuckDB.
+
+    Args:
+        scraper: An AFRRScraper (with a downloader for parallel fetching)
+        dates: Dates whose months should be refreshed
+        db_path: DuckDB database to write to
+        table_name: Target table
+
+    Returns:
+        dict: months_fetched, months_loaded, rows, fetch_seconds, write_seconds
+    """
+    fetch_start = time.perf_counter()
+    fetched = scraper.fetch_months(dates)
+    fetch_seconds = time.perf_counter() - fetch_start
+
+    monthly_data = []
+    source_files = []
+    for month_start, content in fetched:
+        label = month_start.strftime('%Y-%m')
+        try:
+            frame = read_afrr_csv(content)
+        except (KeyError, ValueError) as e:
+            logger.error(f"Could not parse aFRR data for {label}: {e}")
+            continue
+        if frame.empty:
+            logger.warning(f"No aFRR rows for {label}, skipping")
+            continue
+        monthly_data.append((month_start.month, month_start.year, frame))
+        source_files.append(f"{scraper.BASE_URL}#{label}")
+
+    write_start = time.perf_counter()
+    rows = save_afrr_months_to_duckdb(
+        monthly_data, table_name=table_name, db_path=db_path, source_files=source_files
+    )
+    write_seconds = time.perf_counter() - write_start
+
+    logger.info(
+        f"Fetched {len(fetched)} month(s) in {fetch_seconds:.2f}s, "
+        f"wrote {rows:,} rows for {len(monthly_data)} month(s) in {write_seconds:.2f}s"
+    )
+    return {
+        "months_fetched": len(fetched),
+        "months_loaded": len(monthly_data),
+        "rows": rows,
+        "fetch_seconds": fetch_seconds,
+        "write_seconds": write_seconds,
+    }
@@ -4,6 +4,7 @@ from hypermvp.scrapers.base_scraper import BaseScraper
 import logging
 from pathlib import Path
 import re
+import threading
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import json
@@ -13,19 +14,19 @@ class AFRRScraper(BaseScraper):
     
     BASE_URL = "https://www.netztransparenz.de/de-de/Regelenergie/Daten-Regelreserve/Aktivierte-Regelleistung"
     
-    def __init__(self, output_dir=None, delay=None):
-        super().__init__(output_dir=output_dir, delay=delay)
+    def __init__(self, output_dir=None, delay=None, downloader=None, cache=None):
+        super().__init__(output_dir=output_dir, delay=delay, downloader=downloader)
+        # Optional DownloadCache: the form POST has no HTTP validators, so the
+        # cache is used for the TTL and for content hashes only
+        self.cache = cache
         self.logger = logging.getLogger("AFRRScraper")
+        # ASP.NET hidden fields (__VIEWSTATE etc.), reused for every month's POST
+        self._form_state = None
+        self._form_lock = threading.Lock()
+        self.form_page_loads = 0
     
-    def download_date(self, target_date):
-        """Download aFRR data for a specific month.
-        
-        Args:
-            target_date: The date to download data for.
-            
-        Returns:
-            List of paths to downloaded files.
-        """
+    def _month_bounds(self, target_date):
+        """Return the first and last day of the month containing target_date."""
         # Convert to date object if string
         if isinstance(target_date, str):
             target_date = datetime.strptime(target_date, "%Y-%m-%d").date()
@@ -36,11 +37,96 @@ class AFRRScraper(BaseScraper):
             end_date = start_date.replace(year=start_date.year + 1, month=1, day=1) - timedelta(days=1)
         else:
             end_date = start_date.replace(month=start_date.month + 1, day=1) - timedelta(days=1)
+        return start_date, end_date
+    
+    def download_date(self, target_date):
+        """Download aFRR data for a specific month.
+        
+        Args:
+            target_date: The date to download data for.
             
+        Returns:
+            List of paths to downloaded files.
+        """
+        start_date, end_date = self._month_bounds(target_date)
+            
+        cache_key = f"afrr:{start_date.strftime('%Y-%m')}"
+        if self.cache is not None and self.cache.is_fresh(cache_key):
+            cached_path = Path(self.cache.get(cache_key)["path"])
+            self.logger.info(f"Using cached {cached_path.name} (checked within TTL)")
+            return [cached_path]
+        
         self.logger.info(f"Downloading aFRR data for {start_date.strftime('%Y-%m')} (from {start_date} to {end_date})")
+        download_response = self._request_csv(start_date, end_date)
+        
+        # Extract filename from headers if available
+        filename = None
+        if "Content-Disposition" in download_response.headers:
+            match = re.search(r'filename="(.+)"', download_response.headers["Content-Disposition"])
+            if match:
+                filename = match.group(1)
+                
+        if not filename:
+            # Generate a default filename
+            filename = f"afrr_{start_date.strftime('%Y-%m')}.csv"
+            
+        # Save the file
+        file_path = self.save_response_to_file(download_response, filename)
+        self.logger.info(f"Downloaded aFRR data to {file_path}")
+        if self.cache is not None:
+            changed = self.cache.record(cache_key, file_path)
+            self.logger.info(f"{Path(file_path).name} {'changed' if changed else 'unchanged'} since last download")
+        
+        return [file_path]
+    
+    def fetch_month(self, target_date):
+        """Download one month of aFRR data into memory, without writing a file.
+        
+        Args:
+            target_date: Any date in the month to download.
+            
+        Returns:
+            tuple: (first day of the month, raw CSV bytes)
+        """
+        start_date, end_date = self._month_bounds(target_date)
+        self.logger.info(f"Fetching aFRR data for {start_date.strftime('%Y-%m')} into memory")
+        response = self._request_csv(start_date, end_date)
+        return start_date, response.content
+    
+    def fetch_months(self, dates):
+        """Fetch every month touched by `dates` into memory.
+        
+        Months are fetched concurrently when the scraper has a downloader.
+        
+        Returns:
+            List of (first day of the month, raw CSV bytes) for the months that succeeded
+        """
+        months = sorted({self._month_bounds(d)[0] for d in dates})
+        return self._run_for_dates(self.fetch_month, months)
+    
+    def _get_form_state(self, stale=None):
+        """Return the page's hidden form fields, loading the page only when needed.
+        
+        The hidden fields (__VIEWSTATE, __EVENTVALIDATION, ...) do not depend on
+        the month, so one page load serves every download in the session.
         
-        # Step 1: Get the main page to extract form tokens
+        Args:
+            stale: A state the server rejected. It is replaced by a fresh page
+                load, unless another thread already did that.
+        
+        Returns:
+            dict: Hidden input names and values (shared, do not modify).
+        """
+        with self._form_lock:
+            if self._form_state is None or self._form_state is stale:
+                self._form_state = self._load_form_state()
+            return self._form_state
+    
+    def _load_form_state(self):
+        """GET the download page and extract its hidden form fields."""
+        # Get the main page to extract form tokens
         response = self.get_with_retry(self.BASE_URL)
+        self.form_page_loads += 1
         soup = BeautifulSoup(response.content, "html.parser")
         
         # Find the form
@@ -50,12 +136,60 @@ class AFRRScraper(BaseScraper):
             raise ValueError("Could not find form on page")
             
         # Extract hidden fields
-        form_data = {}
+        form_state = {}
         # Add all hidden inputs
         for hidden_input in form.find_all("input", {"type": "hidden"}):
             if hidden_input.has_attr("name") and hidden_input.has_attr("value"):
-                form_data[hidden_input["name"]] = hidden_input["value"]
-                
+                form_state[hidden_input["name"]] = hidden_input["value"]
+        self.logger.debug(f"Loaded {len(form_state)} hidden form fields")
+        return form_state
+    
+    def _request_csv(self, start_date, end_date):
+        """Submit the download form for a date range and return the CSV response.
+        
+        Uses the cached form state. If the server rejects it (error status or
+        no CSV, e.g. an expired viewstate), the page is reloaded once and the
+        request repeated.
+        
+        Raises:
+            ValueError: If the form cannot be found or the server does not return a CSV.
+        """
+        form_state = self._get_form_state()
+        download_response = self._submit_form(form_state, start_date, end_date)
+        if not self._is_csv(download_response):
+            self.logger.info("Form submission rejected, reloading form state and retrying")
+            form_state = self._get_form_state(stale=form_state)
+            download_response = self._submit_form(form_state, start_date, end_date)
+        
+        if download_response.status_code != 200:
+            self.logger.error(f"Form submission failed with status {download_response.status_code}")
+            raise ValueError(f"Form submission failed with status {download_response.status_code}")
+            
+        # Check content type to ensure we got a file
+        content_type = download_response.headers.get("Content-Type", "")
+        if self._is_csv(download_response):
+            return download_response
+        
+        # If we didn't get a CSV, something went wrong
+        self.logger.error(f"Expected CSV but got {content_type}")
+        debug_file = f"afrr_debug_{start_date.strftime('%Y-%m')}.html"
+        debug_path = self.save_response_to_file(download_response, debug_file)
+        self.logger.info(f"Saved debug HTML to {debug_path}")
+        
+        raise ValueError(f"Expected CSV but got {content_type}")
+    
+    @staticmethod
+    def _is_csv(response):
+        """True if the form submission returned the CSV file."""
+        content_type = response.headers.get("Content-Type", "")
+        return response.status_code == 200 and (
+            "text/csv" in content_type or "application/octet-stream" in content_type
+        )
+    
+    def _submit_form(self, form_state, start_date, end_date):
+        """POST the download form for a date range using the given hidden fields."""
+        form_data = dict(form_state)
+        
         # Set the event target to the CSV download button
         form_data["__EVENTTARGET"] = "dnn$ctr2413$View$btnDownloadGridCsv"
         form_data["__EVENTARGUMENT"] = ""
@@ -92,36 +226,5 @@ class AFRRScraper(BaseScraper):
         
         # Submit the form
         self.logger.info("Submitting form to download CSV")
-        download_response = self.session.post(self.BASE_URL, data=form_data)
-        
-        if download_response.status_code != 200:
-            self.logger.error(f"Form submission failed with status {download_response.status_code}")
-            raise ValueError(f"Form submission failed with status {download_response.status_code}")
-            
-        # Check content type to ensure we got a file
-        content_type = download_response.headers.get("Content-Type", "")
-        if "text/csv" in content_type or "application/octet-stream" in content_type:
-            # Extract filename from headers if available
-            filename = None
-            if "Content-Disposition" in download_response.headers:
-                match = re.search(r'filename="(.+)"', download_response.headers["Content-Disposition"])
-                if match:
-                    filename = match.group(1)
-                    
-            if not filename:
-                # Generate a default filename
-                filename = f"afrr_{start_date.strftime('%Y-%m')}.csv"
-                
-            # Save the file
-            file_path = self.save_response_to_file(download_response, filename)
-            self.logger.info(f"Downloaded aFRR data to {file_path}")
-            
-            return [file_path]
-        else:
-            # If we didn't get a CSV, something went wrong
-            self.logger.error(f"Expected CSV but got {content_type}")
-            debug_file = f"afrr_debug_{start_date.strftime('%Y-%m')}.html"
-            debug_path = self.save_response_to_file(download_response, debug_file)
-            self.logger.info(f"Saved debug HTML to {debug_path}")
-            
-            raise ValueError(f"Expected CSV but got {content_type}")
\ No newline at end of file
+        self._throttle(self.BASE_URL)
+        return self.session.post(self.BASE_URL, data=form_data)
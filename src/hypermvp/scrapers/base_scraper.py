@@ -8,16 +8,31 @@ import time
 import random
 from datetime import datetime, timedelta
 from hypermvp.global_config import RAW_DATA_DIR
-from hypermvp.scrapers.scraper_config import USER_AGENTS, MAX_RETRIES, REQUEST_DELAY
+from hypermvp.scrapers.scraper_config import USER_AGENTS, MAX_RETRIES, REQUEST_DELAY, STREAM_CHUNK_SIZE
+
+def _validator(response):
+    """Return the strong ETag, or else the Last-Modified date, that identifies the file version."""
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
 
 class BaseScraper(ABC):
     """Base class for web scrapers with common functionality."""
     
-    def __init__(self, output_dir=None, delay=None):
-        """Initialize with configurable output directory and request delay."""
+    def __init__(self, output_dir=None, delay=None, downloader=None):
+        """Initialize with configurable output directory and request delay.
+
+        Args:
+            output_dir: Directory where downloaded files are saved
+            delay: Seconds between sequential requests
+            downloader: Optional AsyncDownloader. When given, its pooled session
+                and rate limits are used and date ranges are downloaded concurrently.
+        """
         self.output_dir = output_dir or RAW_DATA_DIR
         self.delay = delay or REQUEST_DELAY
-        self.session = requests.Session()
+        self.downloader = downloader
+        self.session = downloader.session if downloader is not None else requests.Session()
         self.logger = logging.getLogger(self.__class__.__name__)
         
         # Setup default headers
@@ -31,16 +46,25 @@ class BaseScraper(ABC):
             'Cache-Control': 'max-age=0'
         })
     
+    def _throttle(self, url):
+        """Wait for the downloader's rate limit for this host (no-op without a downloader)."""
+        if self.downloader is not None:
+            self.downloader.throttle(url)
+
     def get_with_retry(self, url, max_retries=None, **kwargs):
         """Make GET request with retry logic."""
         max_retries = max_retries or MAX_RETRIES
         
+        headers = kwargs.pop('headers', None) or {}
+        
         for attempt in range(max_retries):
             try:
-                # Rotate user agent
-                self.session.headers.update({'User-Agent': random.choice(USER_AGENTS)})
+                # Rotate user agent per request: the session may be shared by
+                # a downloader's worker threads, so its headers are left alone
+                request_headers = {'User-Agent': random.choice(USER_AGENTS), **headers}
+                self._throttle(url)
                 
-                response = self.session.get(url, **kwargs)
+                response = self.session.get(url, headers=request_headers, **kwargs)
                 response.raise_for_status()
                 return response
             except requests.exceptions.RequestException as e:
@@ -54,15 +78,122 @@ class BaseScraper(ABC):
                     raise
     
     def save_response_to_file(self, response, filename):
-        """Save response content to a file."""
+        """Save response content to a file.
+
+        Written in chunks, so a response requested with stream=True is never
+        held in memory as a whole.
+        """
         output_path = Path(self.output_dir) / filename
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         with open(output_path, 'wb') as f:
-            f.write(response.content)
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                f.write(chunk)
         self.logger.info(f"Saved file: {output_path}")
         return output_path
     
+    def stream_download(self, url, target_path, headers=None, on_chunk=None, max_retries=None):
+        """Download a URL to a file in chunks, resuming interrupted downloads.
+
+        Data goes to `<target_path>.part` and is renamed when complete. If a
+        .part file is left over from an earlier (crashed) run, or the
+        connection drops mid-download, the download continues from where it
+        stopped with an HTTP Range request.
+
+        The file's ETag (or Last-Modified date) is kept next to the .part file
+        and sent as If-Range, so the server only sends the rest of the file if
+        it has not changed; otherwise it sends the whole new file. A .part
+        file without a saved validator is downloaded again from the start.
+
+        Args:
+            url: URL to download
+            target_path: Final path of the downloaded file
+            headers: Extra request headers (e.g. conditional cache headers)
+            on_chunk: Optional callback(chunk, offset) for every chunk written,
+                where offset is the chunk's position in the file
+            max_retries: Attempts to complete the download (default MAX_RETRIES)
+
+        Returns:
+            The last response. Responses other than 200/206 (e.g. 304) are
+            returned without writing anything.
+        """
+        target_path = Path(target_path)
+        part_path = target_path.with_name(target_path.name + ".part")
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        validator_path = part_path.with_name(part_path.name + ".validator")
+        max_retries = max_retries or MAX_RETRIES
+        
+        for attempt in range(max_retries):
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            validator = validator_path.read_text(encoding="utf-8") if validator_path.exists() else None
+            if offset and not validator:
+                # Nothing to tell whether the file changed since the .part was written
+                self.logger.info(f"Restarting {target_path.name}: no ETag or Last-Modified for the partial file")
+                self.discard_partial(target_path)
+                offset = 0
+            request_headers = dict(headers or {})
+            if offset:
+                request_headers['Range'] = f"bytes={offset}-"
+                request_headers['If-Range'] = validator
+                self.logger.info(f"Resuming {target_path.name} from byte {offset:,}")
+            
+            try:
+                response = self.get_with_retry(url, headers=request_headers, stream=True)
+            except requests.exceptions.HTTPError as e:
+                if offset and e.response is not None and e.response.status_code == 416:
+                    # Stale partial file (e.g. the archive was replaced): start over
+                    self.discard_partial(target_path)
+                    continue
+                raise
+            
+            if response.status_code not in (200, 206):
+                return response
+            if response.status_code == 200:
+                # The file changed (If-Range) or the server ignored the Range header: whole file
+                offset = 0
+            elif offset and _validator(response) not in (None, validator):
+                # A range of a different version of the file (If-Range ignored): start over
+                response.close()
+                self.logger.info(f"{target_path.name} changed since the partial download: starting over")
+                self.discard_partial(target_path)
+                continue
+            if offset == 0:
+                current = _validator(response)
+                if current:
+                    validator_path.write_text(current, encoding="utf-8")
+                else:
+                    validator_path.unlink(missing_ok=True)
+            
+            try:
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        f.write(chunk)
+                        if on_chunk is not None:
+                            on_chunk(chunk, offset)
+                        offset += len(chunk)
+            except requests.exceptions.RequestException as e:
+                self.logger.warning(
+                    f"Download of {target_path.name} interrupted at byte {offset:,} "
+                    f"(attempt {attempt+1}/{max_retries}): {e}"
+                )
+                continue
+            finally:
+                response.close()
+            
+            part_path.replace(target_path)
+            validator_path.unlink(missing_ok=True)
+            return response
+        
+        raise IOError(f"Download of {url} did not complete after {max_retries} attempts")
+    
+    def discard_partial(self, target_path):
+        """Delete the .part file of an unfinished download and the validator saved with it."""
+        part_path = Path(target_path).with_name(Path(target_path).name + ".part")
+        part_path.unlink(missing_ok=True)
+        part_path.with_name(part_path.name + ".validator").unlink(missing_ok=True)
+    
     @abstractmethod
     def download_date(self, target_date):
         """Download data for a specific date."""
@@ -78,23 +209,68 @@ class BaseScraper(ABC):
         elif isinstance(end_date, str):
             end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
         
+        dates = []
         current_date = start_date
-        results = []
-        
         while current_date <= end_date:
+            dates.append(current_date)
+            current_date += timedelta(days=1)
+        
+        return self.download_dates(dates)
+    
+    def download_dates(self, dates):
+        """Download data for a list of dates.
+
+        Sequential with a fixed delay by default; concurrent and rate limited
+        when the scraper was created with a downloader.
+
+        Returns:
+            Results of download_date for the dates that succeeded, in order
+        """
+        return self._run_for_dates(self.download_date, dates)
+    
+    def _run_for_dates(self, func, dates):
+        """Call func(date) for every date, concurrently if a downloader is set.
+
+        Failures are logged and dropped, so one bad date does not stop the rest.
+        """
+        if self.downloader is not None:
+            return self._run_concurrently(
+                [(func, (date,)) for date in dates],
+                [str(date) for date in dates]
+            )
+        
+        results = []
+        for current_date in dates:
             self.logger.info(f"Processing date: {current_date}")
             try:
-                result = self.download_date(current_date)
+                result = func(current_date)
                 results.append(result)
             except Exception as e:
                 self.logger.error(f"Failed to download data for {current_date}: {e}")
             
             # Wait before next request
             time.sleep(self.delay)
-            current_date += timedelta(days=1)
         
         return results
     
+    def _run_concurrently(self, jobs, labels):
+        """Run (callable, args) jobs through the downloader, logging and dropping failures."""
+        host_url = getattr(self, "BASE_URL", "")
+        self.logger.info(
+            f"Downloading {len(jobs)} items concurrently "
+            f"(max {self.downloader.max_per_host} per host, {self.downloader.rate:.2f} requests/s)"
+        )
+        outcomes = self.downloader.run_jobs(
+            (host_url, func, args) for func, args in jobs
+        )
+        results = []
+        for label, outcome in zip(labels, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Failed to download data for {label}: {outcome}")
+            elif outcome is not None:
+                results.append(outcome)
+        return results
+    
     def validate_downloaded_data(self, file_path, required_columns=None):
         """Validate that downloaded data meets requirements."""
         import pandas as pd
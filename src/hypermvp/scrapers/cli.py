@@ -12,12 +12,22 @@ import time
 from hypermvp.scrapers.afrr_scraper import AFRRScraper
 from hypermvp.global_config import (
     RAW_DATA_DIR,
+    AFRR_DUCKDB_PATH,
     ISO_DATETIME_FORMAT,
     ISO_DATE_FORMAT,
     TIME_FORMAT,
-    AFRR_DATE_FORMAT
+    AFRR_DATE_FORMAT,
+    ensure_dirs
 )
 from hypermvp.scrapers.provider_scraper import ProviderScraper
+from hypermvp.scrapers.download_engine import AsyncDownloader
+from hypermvp.scrapers.download_cache import DownloadCache
+from hypermvp.scrapers.scraper_config import (
+    MAX_REQUESTS_PER_HOST,
+    RATE_LIMIT_PER_SECOND,
+    DOWNLOAD_CACHE_TTL
+)
+from hypermvp.utils.profiling import add_profile_arguments, profile_session
 
 def generate_date_points(start_date, end_date, increment='day'):
     """Generate dates based on the specified increment.
@@ -87,9 +97,33 @@ def main():
                       help="Product type for provider data (default: aFRR)")
     parser.add_argument("--market", choices=['ENERGY', 'CAPACITY'], default='ENERGY',
                       help="Market type for provider data (default: ENERGY)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                      help="Download this many items in parallel (default: 1, sequential)")
+    parser.add_argument("--per-host", type=int, default=MAX_REQUESTS_PER_HOST,
+                      help=f"Maximum parallel requests per server (default: {MAX_REQUESTS_PER_HOST})")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT_PER_SECOND,
+                      help=f"Maximum requests per second per server (default: {RATE_LIMIT_PER_SECOND:g})")
+    parser.add_argument("--no-cache", action="store_true",
+                      help="Always download, ignoring the local download cache")
+    parser.add_argument("--keep-zip", action="store_true",
+                      help="Provider only: keep the downloaded .xlsx.zip archives instead of extracting them "
+                           "(the provider ETL reads them directly)")
+    parser.add_argument("--to-db", action="store_true",
+                      help="aFRR only: load the downloaded months straight into DuckDB instead of saving CSV files")
+    parser.add_argument("--db-path", default=AFRR_DUCKDB_PATH,
+                      help=f"Database used with --to-db (default: {AFRR_DUCKDB_PATH})")
+    parser.add_argument("--cache-ttl", type=float, default=DOWNLOAD_CACHE_TTL,
+                      help=f"Seconds a cached file is reused without asking the server (default: {DOWNLOAD_CACHE_TTL})")
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
-    
+    ensure_dirs()
+    with profile_session("scrapers_cli", args.profile, args.profile_stacks):
+        run(args)
+
+def run(args):
+    """Download (and optionally load) the data selected by the parsed arguments."""
+
     # Configure logging
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(
@@ -117,58 +151,67 @@ def main():
     afrr_output_dir = base_output_dir / "afrr"
     os.makedirs(afrr_output_dir, exist_ok=True)
     
+    # Download cache: skip or revalidate files we already have
+    run_start = time.time()
+    cache = None if args.no_cache else DownloadCache(ttl=args.cache_ttl)
+    
+    # Concurrent mode: one shared engine (connection pool + per-host limits) for all scrapers
+    downloader = None
+    if args.concurrency > 1:
+        downloader = AsyncDownloader(
+            max_concurrency=args.concurrency,
+            max_per_host=args.per_host,
+            rate=args.rate
+        )
+    
     # Run the AFRR scraper
     if args.scraper in ['afrr', 'both']:
-        scraper = AFRRScraper(output_dir=afrr_output_dir)
-        logging.info(f"Running AFRR scraper for {len(process_dates)} dates")
-        
-        results = []
-        for date in process_dates:
-            # MODIFIED: Use standardized date formatting in logs
-            logging.info(f"Processing date: {date.strftime(ISO_DATE_FORMAT)}")
-            try:
-                result = scraper.download_date(date)
-                results.append(result)
-                # Add delay between requests
-                time.sleep(scraper.delay)
-            except Exception as e:
-                # MODIFIED: Use standardized date formatting in logs
-                logging.error(f"Failed to download data for {date.strftime(ISO_DATE_FORMAT)}: {e}")
+        scraper = AFRRScraper(output_dir=afrr_output_dir, downloader=downloader, cache=cache)
+        if args.to_db:
+            # Pipeline mode: fetch months into memory, then one batched write
+            from hypermvp.scrapers.afrr_pipeline import scrape_afrr_to_duckdb
+            logging.info(f"Running AFRR pipeline for {len(process_dates)} dates into {args.db_path}")
+            summary = scrape_afrr_to_duckdb(scraper, process_dates, db_path=args.db_path)
+            logging.info(f"Loaded {summary['rows']:,} rows for {summary['months_loaded']} month(s)")
+        else:
+            logging.info(f"Running AFRR scraper for {len(process_dates)} dates")
+            results = scraper.download_dates(process_dates)
     
     # Run the Provider scraper
     if args.scraper in ['provider', 'both']:
         provider_output_dir = base_output_dir / "provider"
         os.makedirs(provider_output_dir, exist_ok=True)
         
-        provider_scraper = ProviderScraper(output_dir=provider_output_dir)
+        provider_scraper = ProviderScraper(
+            output_dir=provider_output_dir, downloader=downloader, cache=cache, keep_archives=args.keep_zip
+        )
         logging.info(f"Running Provider scraper for {len(process_dates)} dates")
         
         # Provider scraper works on monthly data
         if args.increment != 'month':
             logging.warning("Provider scraper works best with --increment=month, filtering dates...")
             # Extract unique year/month combinations
-            year_months = set((d.year, d.month) for d in process_dates)
+            year_months = sorted(set((d.year, d.month) for d in process_dates))
             logging.info(f"Will download {len(year_months)} unique months")
         else:
             year_months = [(d.year, d.month) for d in process_dates]
         
-        for year, month in year_months:
-            # MODIFIED: Use standardized date formatting
-            month_date = datetime(year, month, 1)
-            logging.info(f"Downloading provider data for {month_date.strftime('%Y-%m')}")
-            try:
-                file_path = provider_scraper.download_monthly_data(
-                    year, month, 
-                    product=args.product, 
-                    market=args.market
-                )
-                if file_path:
-                    logging.info(f"Successfully downloaded {file_path}")
-                # Add delay between requests
-                time.sleep(provider_scraper.delay)
-            except Exception as e:
-                # MODIFIED: Use standardized date formatting
-                logging.error(f"Failed to download provider data for {month_date.strftime('%Y-%m')}: {e}")
+        downloaded = provider_scraper.download_months(
+            year_months,
+            product=args.product,
+            market=args.market
+        )
+        logging.info(f"Downloaded {len(downloaded)} of {len(year_months)} provider files")
+    
+    if downloader is not None:
+        downloader.close()
+    
+    # Tell downstream ETL what actually changed in this run
+    if cache is not None:
+        changed_files = cache.changed_since(run_start)
+        logging.info(f"{len(changed_files)} file(s) new or changed in this run")
+        for path in changed_files:
+            logging.info(f"  changed: {path}")
     
     # MODIFIED: Add ISO timestamp to completion message
     logging.info(f"Scraping completed at {datetime.now().strftime(ISO_DATETIME_FORMAT)}")
@@ -0,0 +1,184 @@
+"""Local download cache with HTTP revalidation and content hashes.
+
+Every downloaded file gets an entry in a small JSON index under RAW_DATA_DIR:
+its HTTP validators (ETag, Last-Modified), a SHA-256 of the saved file, and
+when it was last checked and last changed.
+
+- Within the TTL a cached file is used without any request.
+- After the TTL the scraper sends If-None-Match / If-Modified-Since, and a
+  304 Not Modified costs one round trip instead of a full download.
+- The content hash tells whether a re-downloaded file actually changed, so
+  downstream ETL can ask for changed files only (see pending_changes()).
+
+Plain English:
+Past months never change, so we should not download and re-import them every
+time. The cache remembers what we already have and asks the server only
+"has this changed?".
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from hypermvp.global_config import DOWNLOAD_CACHE_DIR
+from hypermvp.scrapers.scraper_config import DOWNLOAD_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.json"
+
+def file_sha256(path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DownloadCache:
+    """
+    JSON-backed index of downloaded files, keyed by URL (or any stable key).
+
+    Thread-safe, so it can be shared by concurrent downloads.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: float = DOWNLOAD_CACHE_TTL):
+        self.cache_dir = Path(cache_dir or DOWNLOAD_CACHE_DIR)
+        self.index_path = self.cache_dir / INDEX_FILENAME
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index = self._load()
+
+    def _load(self) -> Dict:
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                index.setdefault("entries", {})
+                index.setdefault("consumers", {})
+                return index
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable download cache index {self.index_path}: {e}")
+        return {"entries": {}, "consumers": {}}
+
+    def _save(self):
+        """Write the index atomically (temp file + rename). Caller holds the lock."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.index_path)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cache entry for a key, or None if missing or its file is gone."""
+        with self._lock:
+            entry = self._index["entries"].get(key)
+        if entry and Path(entry["path"]).exists():
+            return dict(entry)
+        return None
+
+    def is_fresh(self, key: str) -> bool:
+        """True if the entry was checked within the TTL and its file still exists."""
+        entry = self.get(key)
+        return bool(entry) and (time.time() - entry["checked_at"]) < self.ttl
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """
+        Return If-None-Match / If-Modified-Since headers for revalidating a key.
+
+        Empty if nothing usable is cached, which results in a normal download.
+        """
+        entry = self.get(key)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def touch(self, key: str) -> Optional[Path]:
+        """
+        Mark a key as revalidated (e.g. after a 304) and return its cached path.
+        """
+        with self._lock:
+            entry = self._index["entries"].get(key)
+            if not entry:
+                return None
+            entry["checked_at"] = time.time()
+            self._save()
+            return Path(entry["path"])
+
+    def record(self, key: str, path, etag: Optional[str] = None,
+               last_modified: Optional[str] = None, sha256: Optional[str] = None) -> bool:
+        """
+        Store or update the entry for a freshly downloaded file.
+
+        Args:
+            key: Cache key (usually the download URL)
+            path: Where the downloaded (or extracted) file was saved
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+            sha256: Content hash; computed from the file if omitted
+
+        Returns:
+            True if the content is new or differs from the previous download
+        """
+        path = Path(path)
+        sha256 = sha256 or file_sha256(path)
+        now = time.time()
+        with self._lock:
+            previous = self._index["entries"].get(key)
+            changed = previous is None or previous.get("sha256") != sha256
+            self._index["entries"][key] = {
+                "path": str(path),
+                "etag": etag,
+                "last_modified": last_modified,
+                "sha256": sha256,
+                "size": path.stat().st_size,
+                "fetched_at": now,
+                "checked_at": now,
+                "changed_at": now if changed else previous.get("changed_at", now),
+            }
+            self._save()
+        return changed
+
+    def record_response(self, key: str, response, path, sha256: Optional[str] = None) -> bool:
+        """Record a download using the validators from a requests.Response."""
+        return self.record(
+            key,
+            path,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            sha256=sha256,
+        )
+
+    def changed_since(self, since: float) -> List[Path]:
+        """Return the files whose content changed at or after a Unix timestamp."""
+        with self._lock:
+            entries = list(self._index["entries"].values())
+        return sorted(
+            Path(entry["path"]) for entry in entries
+            if entry.get("changed_at", 0) >= since and Path(entry["path"]).exists()
+        )
+
+    def pending_changes(self, consumer: str) -> List[Path]:
+        """
+        Return files that changed since a consumer last called mark_consumed().
+
+        Plain English: Lets an ETL step ask "which downloads are new to me?"
+        """
+        with self._lock:
+            since = self._index["consumers"].get(consumer, 0)
+        return self.changed_since(since)
+
+    def mark_consumed(self, consumer: str, at: Optional[float] = None):
+        """Remember that a consumer has processed every change up to now (or `at`)."""
+        with self._lock:
+            self._index["consumers"][consumer] = at if at is not None else time.time()
+            self._save()
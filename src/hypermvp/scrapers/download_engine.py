@@ -0,0 +1,245 @@
+"""Asyncio download engine with per-host limits and token-bucket rate limiting.
+
+The scrapers are built on `requests`, so the engine keeps that stack: each
+blocking request runs in a worker thread via `asyncio.to_thread`, while the
+event loop enforces the limits. All requests share one pooled
+`requests.Session`, so connections to a host are reused instead of being
+re-opened for every month.
+
+Plain English:
+Instead of downloading month after month with a fixed pause in between, the
+engine downloads several months at once, but never more than `max_per_host`
+at a time from one server and never faster than `rate` requests per second.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from hypermvp.scrapers.scraper_config import (
+    MAX_CONCURRENT_DOWNLOADS,
+    MAX_REQUESTS_PER_HOST,
+    MAX_RETRIES,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_SECOND,
+    USER_AGENTS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying (rate limited or temporarily unavailable)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def host_of(url: str) -> str:
+    """Return the host (netloc) part of a URL, used as the key for per-host limits."""
+    return urlsplit(url).netloc.lower()
+
+def create_pooled_session(pool_size: int = MAX_CONCURRENT_DOWNLOADS) -> requests.Session:
+    """
+    Create a requests session whose connection pool fits the engine's concurrency.
+
+    Plain English: One session, many reusable connections. Without a big enough
+    pool, parallel downloads would keep opening and closing TCP/TLS connections.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": random.choice(USER_AGENTS)})
+    return session
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Each request
+    takes one token; `reserve()` returns how long the caller has to wait for
+    its token, so the same bucket works for threads (time.sleep) and
+    coroutines (asyncio.sleep).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return the number of seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            # Negative balance: the token is handed out once the debt has refilled
+            return -self._tokens / self.rate
+
+    def wait(self):
+        """Block the calling thread until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+class AsyncDownloader:
+    """
+    Concurrent downloader with bounded parallelism.
+
+    Limits:
+      - max_concurrency: requests in flight across all hosts
+      - max_per_host: requests in flight per host
+      - rate/burst: token bucket per host (requests per second)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_DOWNLOADS,
+        max_per_host: int = MAX_REQUESTS_PER_HOST,
+        rate: float = RATE_LIMIT_PER_SECOND,
+        burst: int = RATE_LIMIT_BURST,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = 1.0,
+        session: Optional[requests.Session] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_host = max(1, min(max_per_host, self.max_concurrency))
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max(1, max_retries)
+        self.backoff = backoff
+        self.session = session or create_pooled_session(self.max_concurrency)
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        # Semaphores belong to an event loop, so they are created per run()
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """Return the token bucket for the URL's host."""
+        host = host_of(url)
+        with self._buckets_lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def throttle(self, url: str):
+        """
+        Block until the URL's host may receive another request.
+
+        Plain English: Used by the (synchronous) scrapers before each request,
+        so requests made inside a job are rate limited too.
+        """
+        self.bucket_for(url).wait()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = host_of(url)
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_limits[host]
+
+    async def _limited(self, url: str, func: Callable, *args, **kwargs):
+        """Run a blocking callable in a worker thread under the global and per-host limits."""
+        async with self._global_limit, self._host_limit(url):
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def fetch(self, url: str, method: str = "GET", **kwargs) -> requests.Response:
+        """
+        Fetch a URL with rate limiting, concurrency limits and retries.
+
+        Retries network errors and 429/5xx responses with exponential backoff.
+        Other HTTP errors are raised immediately.
+        """
+        kwargs.setdefault("timeout", 60)
+        for attempt in range(self.max_retries):
+            delay = self.bucket_for(url).reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                response = await self._limited(url, self.session.request, method, url, **kwargs)
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries - 1:
+                    raise requests.exceptions.HTTPError(
+                        f"{response.status_code} for {url}", response=response
+                    )
+                response.raise_for_status()
+                return response
+            except requests.exceptions.RequestException as e:
+                retryable = e.response is None or e.response.status_code in RETRY_STATUS_CODES
+                if not retryable or attempt == self.max_retries - 1:
+                    raise
+                sleep_time = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                logger.warning(
+                    f"Request failed (attempt {attempt+1}/{self.max_retries}): {e}. "
+                    f"Retrying in {sleep_time:.2f} seconds..."
+                )
+                await asyncio.sleep(sleep_time)
+
+    async def run_job(self, url: str, func: Callable, *args, **kwargs):
+        """
+        Run a blocking download job (e.g. a scraper's download_date) under the host's limits.
+
+        The job's own requests are rate limited through throttle(); this only
+        bounds how many jobs run against the host at the same time.
+        """
+        return await self._limited(url, func, *args, **kwargs)
+
+    async def _gather(self, coroutine_factories: List[Callable]) -> List[Any]:
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits = {}
+        return await asyncio.gather(
+            *(factory() for factory in coroutine_factories), return_exceptions=True
+        )
+
+    def run(self, coroutine_factories: List[Callable]) -> List[Any]:
+        """
+        Run coroutines concurrently and return their results in order.
+
+        Failed items are returned as exception objects instead of aborting the batch.
+        """
+        if not coroutine_factories:
+            return []
+        return asyncio.run(self._gather(coroutine_factories))
+
+    def fetch_all(self, urls: Iterable[str], method: str = "GET", **kwargs) -> List[Any]:
+        """
+        Download many URLs concurrently.
+
+        Returns:
+            One requests.Response (or exception) per URL, in input order
+        """
+        return self.run([
+            (lambda url=url: self.fetch(url, method=method, **kwargs)) for url in urls
+        ])
+
+    def run_jobs(self, jobs: Iterable[Tuple[str, Callable, tuple]]) -> List[Any]:
+        """
+        Run blocking jobs concurrently, each given as (url, callable, args).
+
+        Returns:
+            One result (or exception) per job, in input order
+        """
+        return self.run([
+            (lambda url=url, func=func, args=args: self.run_job(url, func, *args))
+            for url, func, args in jobs
+        ])
+
+    def close(self):
+        """Close the pooled session."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
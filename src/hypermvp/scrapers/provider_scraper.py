@@ -8,20 +8,31 @@ from datetime import datetime
 import calendar
 from typing import Optional, List, Dict, Any
 import random
+import shutil
+import time
 
 from hypermvp.scrapers.base_scraper import BaseScraper
-from hypermvp.scrapers.scraper_config import PROVIDER_CONFIG, USER_AGENTS
+from hypermvp.scrapers.scraper_config import PROVIDER_CONFIG, USER_AGENTS, STREAM_CHUNK_SIZE
+from hypermvp.scrapers.zip_stream import StreamingZipExtractor
 
 class ProviderScraper(BaseScraper):
     """Scraper for downloading market results data from regelleistung.net."""
 
-    def __init__(self, output_dir: str = "data/01_raw/provider"):
+    def __init__(self, output_dir: str = "data/01_raw/provider", downloader=None, cache=None,
+                 keep_archives: bool = False):
         """Initialize the provider scraper.
         
         Args:
             output_dir: Directory where downloaded files will be saved
+            downloader: Optional AsyncDownloader for concurrent, rate-limited downloads
+            cache: Optional DownloadCache; unchanged months are then revalidated
+                (HTTP 304) or skipped within the cache TTL instead of re-downloaded
+            keep_archives: Keep the downloaded .xlsx.zip as it is instead of
+                extracting the workbook (the provider ETL reads archives directly)
         """
-        super().__init__(output_dir=output_dir)
+        super().__init__(output_dir=output_dir, downloader=downloader)
+        self.cache = cache
+        self.keep_archives = keep_archives
         self.BASE_URL = PROVIDER_CONFIG['base_url']
         self.API_URL = PROVIDER_CONFIG['api_url']
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -82,23 +93,75 @@ class ProviderScraper(BaseScraper):
             'User-Agent': self.get_random_user_agent()
         }
         
+        # Reuse the cached file if it was checked recently, otherwise revalidate it
+        if self.cache is not None:
+            if self.cache.is_fresh(api_url):
+                cached_path = Path(self.cache.get(api_url)["path"])
+                self.logger.info(f"Using cached {cached_path.name} (checked within TTL)")
+                return cached_path
+            headers.update(self.cache.conditional_headers(api_url))
+        
         self.logger.info(f"Downloading {product} {market} market data for {year}-{month:02d}")
         
-        # Download the ZIP file
-        response = self.get_with_retry(api_url, headers=headers)
+        # Stream the ZIP to disk (resumable) and extract the workbook from the same stream
+        zip_path = Path(self.output_dir) / file_name
+        extractor = None if self.keep_archives else StreamingZipExtractor(self.output_dir)
         
-        if response.status_code == 200:
-            # Save the ZIP file
-            zip_path = Path(self.output_dir) / file_name
-            self.save_response_to_file(response, zip_path)
-            
-            # Extract the ZIP file
-            extracted_file = self._extract_zip(zip_path)
+        def extract_chunk(chunk, offset):
+            nonlocal extractor
+            if extractor is None:
+                return
+            if offset != extractor.bytes_fed:
+                # Resumed download: the stream no longer starts at the archive header
+                extractor.abort()
+                extractor = None
+                return
+            try:
+                extractor.feed(chunk)
+            except ValueError as e:
+                self.logger.info(f"Falling back to extracting after download: {e}")
+                extractor.abort()
+                extractor = None
+        
+        response = self.stream_download(api_url, zip_path, headers=headers, on_chunk=extract_chunk)
+        
+        if response.status_code == 304 and self.cache is not None:
+            if extractor is not None:
+                extractor.abort()
+            self.discard_partial(zip_path)
+            cached_path = self.cache.touch(api_url)
+            self.logger.info(f"Not modified since last download: {cached_path.name}")
+            return cached_path
+        
+        if response.status_code in (200, 206) and self.keep_archives:
+            self.logger.info(f"Saved {zip_path.name}")
+            if self.cache is not None:
+                changed = self.cache.record_response(api_url, response, zip_path)
+                self.logger.info(f"{zip_path.name} {'changed' if changed else 'unchanged'} since last download")
+            return zip_path
+        
+        if response.status_code in (200, 206):
+            extracted_file, sha256 = None, None
+            if extractor is not None and extractor.done:
+                try:
+                    extracted_file = extractor.close()
+                    sha256 = extractor.sha256
+                except ValueError as e:
+                    self.logger.warning(f"Streaming extraction failed, extracting from file: {e}")
+            elif extractor is not None:
+                extractor.abort()
+            if extracted_file is None:
+                extracted_file = self._extract_zip(zip_path)
             
             # Optionally remove the ZIP file after extraction
             if extracted_file:
                 zip_path.unlink(missing_ok=True)
                 self.logger.info(f"Successfully extracted {extracted_file.name}")
+                if self.cache is not None:
+                    changed = self.cache.record_response(api_url, response, extracted_file, sha256=sha256)
+                    self.logger.info(
+                        f"{extracted_file.name} {'changed' if changed else 'unchanged'} since last download"
+                    )
                 return extracted_file
             
             return zip_path
@@ -118,19 +181,24 @@ class ProviderScraper(BaseScraper):
         Returns:
             Path to the extracted file, or None if extraction failed
         """
+        target_path = None
         try:
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # Extract to the same directory
-                zip_ref.extractall(Path(self.output_dir))
-                
                 # Get the name of the extracted file (should be only one)
                 if len(zip_ref.namelist()) > 0:
                     excel_filename = zip_ref.namelist()[0]
-                    return Path(self.output_dir) / excel_filename
+                    target_path = Path(self.output_dir) / Path(excel_filename).name
+                    # Copy in chunks instead of extractall, so memory use stays flat
+                    with zip_ref.open(excel_filename) as source, open(target_path, 'wb') as target:
+                        shutil.copyfileobj(source, target, STREAM_CHUNK_SIZE)
+                    return target_path
                 
             return None
         except Exception as e:
             self.logger.error(f"Error extracting ZIP file: {e}")
+            # Don't leave a half-written workbook behind for the ETL to pick up
+            if target_path is not None:
+                target_path.unlink(missing_ok=True)
             return None
             
     def download_date_range(self, start_year: int, start_month: int, 
@@ -149,15 +217,11 @@ class ProviderScraper(BaseScraper):
         Returns:
             List of paths to downloaded files
         """
-        downloaded_files = []
-        
+        months = []
         current_year, current_month = start_year, start_month
         
         while (current_year < end_year) or (current_year == end_year and current_month <= end_month):
-            file_path = self.download_monthly_data(current_year, current_month, product, market)
-            
-            if file_path:
-                downloaded_files.append(file_path)
+            months.append((current_year, current_month))
             
             # Move to next month
             if current_month == 12:
@@ -165,8 +229,40 @@ class ProviderScraper(BaseScraper):
                 current_year += 1
             else:
                 current_month += 1
-                
+            
+        return self.download_months(months, product, market)
+
+    def download_months(self, months: List[tuple], product: str = "aFRR",
+                        market: str = "ENERGY") -> List[Path]:
+        """Download data for a list of (year, month) pairs.
+        
+        Months are fetched concurrently when the scraper has a downloader,
+        otherwise one after another with a fixed delay.
+        
+        Args:
+            months: List of (year, month) tuples
+            product: Product type (aFRR, mFRR, PRL)
+            market: Market type (ENERGY, CAPACITY)
+            
+        Returns:
+            List of paths to downloaded files
+        """
+        if self.downloader is not None:
+            return self._run_concurrently(
+                [(self.download_monthly_data, (year, month, product, market)) for year, month in months],
+                [f"{year}-{month:02d}" for year, month in months]
+            )
+        
+        downloaded_files = []
+        for year, month in months:
+            try:
+                file_path = self.download_monthly_data(year, month, product, market)
+                if file_path:
+                    downloaded_files.append(file_path)
+            except Exception as e:
+                self.logger.error(f"Failed to download provider data for {year}-{month:02d}: {e}")
+            
             # Add a delay to be nice to the server
-            self.delay_request()
+            time.sleep(self.delay)
             
-        return downloaded_files
\ No newline at end of file
+        return downloaded_files
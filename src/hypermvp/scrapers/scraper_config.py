@@ -21,4 +21,16 @@ USER_AGENTS = [
 
 # Request limits to be polite
 REQUEST_DELAY = 2.0  # seconds between requests
-MAX_RETRIES = 5
\ No newline at end of file
+MAX_RETRIES = 5
+
+# Concurrent downloads (see hypermvp.scrapers.download_engine)
+MAX_CONCURRENT_DOWNLOADS = 4    # requests in flight across all hosts
+MAX_REQUESTS_PER_HOST = 2       # requests in flight per host
+RATE_LIMIT_PER_SECOND = 1.0 / REQUEST_DELAY  # sustained requests per second per host
+RATE_LIMIT_BURST = 2            # requests allowed back-to-back before the rate applies
+
+# Download cache: files checked within this many seconds are reused without a request
+DOWNLOAD_CACHE_TTL = 24 * 3600
+
+# Streaming downloads: bytes read and written per chunk
+STREAM_CHUNK_SIZE = 1024 * 1024
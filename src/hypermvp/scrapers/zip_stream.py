@@ -0,0 +1,179 @@
+"""Incremental ZIP extraction for downloads that are still arriving.
+
+`zipfile` needs the central directory at the end of an archive, so it can only
+extract once the whole file is on disk. The provider result lists are single
+workbook archives, and every ZIP member is preceded by a local file header.
+That is enough to inflate the workbook chunk by chunk while it downloads.
+
+Plain English:
+The .xlsx is written out while the .zip is still downloading, so nothing is
+held in memory and the archive does not have to be read a second time.
+"""
+
+import hashlib
+import logging
+import struct
+import zlib
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+DATA_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+LOCAL_HEADER_SIZE = 30
+
+# Compression methods we can inflate incrementally
+STORED = 0
+DEFLATED = 8
+
+class StreamingZipExtractor:
+    """
+    Extract the first member of a ZIP archive from a stream of chunks.
+
+    Feed the archive bytes in order with feed(), then call close() to verify
+    the CRC and move the extracted file into place. Raises ValueError for
+    archives it cannot stream (e.g. unsupported compression), in which case
+    the caller should fall back to extracting the finished file with zipfile.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.bytes_fed = 0
+        self.target_path: Optional[Path] = None
+        self.sha256 = None
+
+        self._buffer = b""
+        self._header = None
+        self._out = None
+        self._part_path = None
+        self._decompressor = None
+        self._remaining = None  # bytes left for STORED members
+        self._crc = 0
+        self._digest = hashlib.sha256()
+        self._trailer = b""
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """True once the member's data has been fully extracted."""
+        return self._done
+
+    def _parse_header(self) -> bool:
+        """Parse the local file header once enough bytes are buffered."""
+        if len(self._buffer) < LOCAL_HEADER_SIZE:
+            return False
+        if self._buffer[:4] != LOCAL_HEADER_SIGNATURE:
+            raise ValueError("Stream does not start with a ZIP local file header")
+        (_, _, flags, method, _, _, crc, compressed_size, _, name_len, extra_len) = struct.unpack(
+            "<4sHHHHHIIIHH", self._buffer[:LOCAL_HEADER_SIZE]
+        )
+        header_len = LOCAL_HEADER_SIZE + name_len + extra_len
+        if len(self._buffer) < header_len:
+            return False
+
+        if flags & 0x1:
+            raise ValueError("Encrypted ZIP members cannot be streamed")
+        if method not in (STORED, DEFLATED):
+            raise ValueError(f"Unsupported ZIP compression method {method}")
+        has_descriptor = bool(flags & 0x8)
+        if method == STORED and (has_descriptor or compressed_size == 0xFFFFFFFF):
+            raise ValueError("Stored ZIP member without a known size cannot be streamed")
+
+        name = self._buffer[LOCAL_HEADER_SIZE:LOCAL_HEADER_SIZE + name_len].decode(
+            "utf-8" if flags & 0x800 else "cp437"
+        )
+        # Never trust directory components from the archive
+        self.target_path = self.output_dir / Path(name).name
+        self._part_path = self.target_path.with_name(self.target_path.name + ".part")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._out = open(self._part_path, "wb")
+
+        self._header = {"crc": crc, "has_descriptor": has_descriptor, "method": method}
+        if method == DEFLATED:
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        else:
+            self._remaining = compressed_size
+
+        data = self._buffer[header_len:]
+        self._buffer = b""
+        if data:
+            self._consume(data)
+        return True
+
+    def _write(self, data: bytes):
+        if data:
+            self._out.write(data)
+            self._crc = zlib.crc32(data, self._crc)
+            self._digest.update(data)
+
+    def _consume(self, data: bytes):
+        """Inflate/copy member data; keep whatever follows it as the trailer."""
+        if self._done:
+            self._trailer = (self._trailer + data)[:16]
+            return
+        if self._decompressor is not None:
+            try:
+                inflated = self._decompressor.decompress(data)
+            except zlib.error as e:
+                raise ValueError(f"Corrupt deflate data: {e}") from e
+            self._write(inflated)
+            if self._decompressor.eof:
+                self._done = True
+                self._trailer = self._decompressor.unused_data[:16]
+        else:
+            chunk = data[:self._remaining]
+            self._write(chunk)
+            self._remaining -= len(chunk)
+            if self._remaining == 0:
+                self._done = True
+                self._trailer = data[len(chunk):][:16]
+
+    def feed(self, chunk: bytes):
+        """Feed the next chunk of the archive."""
+        self.bytes_fed += len(chunk)
+        if self._header is None:
+            self._buffer += chunk
+            self._parse_header()
+        else:
+            self._consume(chunk)
+
+    def _expected_crc(self) -> Optional[int]:
+        if not self._header["has_descriptor"]:
+            return self._header["crc"]
+        trailer = self._trailer
+        if trailer.startswith(DATA_DESCRIPTOR_SIGNATURE):
+            trailer = trailer[4:]
+        if len(trailer) < 4:
+            return None
+        return struct.unpack("<I", trailer[:4])[0]
+
+    def close(self) -> Path:
+        """
+        Finish extraction, verify the CRC and move the file into place.
+
+        Returns:
+            Path to the extracted file
+        """
+        if not self._done:
+            self.abort()
+            raise ValueError("ZIP stream ended before the member was complete")
+        self._out.close()
+
+        expected = self._expected_crc()
+        if expected is not None and expected != self._crc:
+            self._part_path.unlink(missing_ok=True)
+            raise ValueError(f"CRC mismatch for {self.target_path.name}")
+        if expected is None:
+            logger.warning(f"No CRC available to verify {self.target_path.name}")
+
+        self._part_path.replace(self.target_path)
+        self.sha256 = self._digest.hexdigest()
+        return self.target_path
+
+    def abort(self):
+        """Stop extracting and remove the partial output."""
+        if self._out is not None and not self._out.closed:
+            self._out.close()
+        if self._part_path is not None:
+            self._part_path.unlink(missing_ok=True)
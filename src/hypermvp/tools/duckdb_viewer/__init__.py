@@ -5,19 +5,33 @@ This module provides tools for exploring, analyzing and validating data
 stored in DuckDB databases, with a focus on energy market data.
 """
 
-from hypermvp.tools.duckdb_viewer.connection import (
-    get_connection,
-    query_to_polars,
-    get_table_schema,
-    get_sample_data
-)
+from importlib import import_module
 
-from hypermvp.tools.duckdb_viewer.analysis import (
-    get_basic_table_profile,
-    profile_column,
-    find_data_quality_issues,
-    analyze_note_column
-)
+# Public names and the submodule that defines them. They are imported on first
+# access, so `python -m hypermvp.tools.duckdb_viewer.cli --help` does not pay for
+# DuckDB and Polars before it has even parsed its arguments.
+_LAZY_EXPORTS = {
+    "get_connection": "connection",
+    "query_to_polars": "connection",
+    "get_table_schema": "connection",
+    "get_sample_data": "connection",
+    "stream_query": "connection",
+    "export_query": "export",
+    "get_basic_table_profile": "analysis",
+    "profile_column": "analysis",
+    "find_data_quality_issues": "analysis",
+    "analyze_note_column": "analysis",
+    "find_duplicates": "analysis",
+    "get_table_metadata": "analysis",
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = import_module(f"{__name__}.{_LAZY_EXPORTS[name]}")
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Version information
 __version__ = "0.1.0"
@@ -28,8 +42,12 @@ __all__ = [
     "query_to_polars",
     "get_table_schema",
     "get_sample_data",
+    "stream_query",
+    "export_query",
     "get_basic_table_profile",
     "profile_column",
     "find_data_quality_issues",
     "analyze_note_column",
+    "find_duplicates",
+    "get_table_metadata",
 ]
\ No newline at end of file
@@ -4,9 +4,9 @@ Data analysis utilities for the DuckDB viewer.
 This module provides tools to analyze and profile data stored in DuckDB tables.
 """
 
-import polars as pl
 from typing import Dict, List, Tuple, Optional, Union
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from hypermvp.tools.duckdb_viewer.connection import (
     query_to_polars,
@@ -15,10 +15,72 @@ from hypermvp.tools.duckdb_viewer.connection import (
 )
 from hypermvp.tools.duckdb_viewer.query_templates import (
     column_stats_query,
-    table_summary_query
+    table_summary_query,
+    table_metadata_query,
+    duplicate_groups_query,
+    duplicate_group_count_query
 )
 
-def get_basic_table_profile(table_name: str, conn=None) -> Dict:
+def get_table_metadata(conn=None, exact: bool = False, max_workers: int = 4) -> List[Dict]:
+    """
+    List all tables with their row and column counts.
+    
+    Plain English: Gives you an overview of every table in the database. By default
+    the row counts are DuckDB's own estimates, which are available instantly. Ask for
+    exact counts if you need them; the tables are then counted in parallel.
+    
+    Args:
+        conn: Optional existing connection
+        exact: Count rows with SELECT COUNT(*) instead of using catalog estimates
+        max_workers: Number of parallel cursors used for exact counts
+        
+    Returns:
+        List of dictionaries with name, rows, columns and whether rows are exact
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    
+    try:
+        # Plain tuples are enough here and keep `tables` from loading Polars
+        tables = [
+            {
+                "name": table_name,
+                "rows": estimated_rows,
+                "columns": column_count,
+                "exact": False
+            }
+            for table_name, estimated_rows, column_count
+            in conn.execute(table_metadata_query()).fetchall()
+        ]
+        
+        if exact and tables:
+            def count_rows(table_name):
+                # Each thread gets its own cursor; a single connection is not thread-safe
+                cursor = conn.cursor()
+                try:
+                    return cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+                except Exception as e:
+                    logging.warning(f"Could not count rows in '{table_name}': {e}")
+                    return None
+                finally:
+                    cursor.close()
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                counts = list(executor.map(count_rows, [t["name"] for t in tables]))
+            
+            for table, count in zip(tables, counts):
+                if count is not None:
+                    table["rows"] = count
+                    table["exact"] = True
+        
+        return tables
+    finally:
+        if close_conn:
+            conn.close()
+
+def get_basic_table_profile(table_name: str, conn=None, approximate: bool = False) -> Dict:
     """
     Get a basic profile of a table including row count and other high-level statistics.
     
@@ -27,12 +89,16 @@ def get_basic_table_profile(table_name: str, conn=None) -> Dict:
     
     Args:
         table_name: Name of the table to profile
+        approximate: Estimate distinct rows with HyperLogLog instead of an exact count
         
     Returns:
         Dictionary with table statistics
     """
-    # Get basic table statistics
-    summary_df = query_to_polars(table_summary_query(table_name), conn=conn)
+    # Get basic table statistics (distinct rows are counted on row hashes)
+    summary_df = query_to_polars(
+        table_summary_query(table_name, approximate=approximate),
+        conn=conn
+    )
     
     if len(summary_df) == 0:
         raise ValueError(f"No data found for table '{table_name}'")
@@ -49,11 +115,80 @@ def get_basic_table_profile(table_name: str, conn=None) -> Dict:
         "table_name": table_name,
         "row_count": row_count,
         "distinct_rows": distinct_rows,
-        "duplicate_rows": row_count - distinct_rows,
+        # HyperLogLog estimates can overshoot slightly, so never report negatives
+        "duplicate_rows": max(row_count - distinct_rows, 0),
+        "approximate": approximate,
         "column_count": len(columns),
         "columns": [col["name"] for col in columns]
     }
 
+def find_duplicates(
+    table_name: str,
+    key_columns: Optional[List[str]] = None,
+    limit: int = 10,
+    approximate: bool = False,
+    conn=None
+) -> Dict:
+    """
+    Find duplicate rows or duplicate key combinations in a table.
+    
+    Plain English: Tells you how many rows are repeated in your table and shows
+    the most frequently repeated ones. If you give key columns (for example
+    DELIVERY_DATE and PRODUCT), it checks whether those values repeat instead
+    of the whole row.
+    
+    Rows are compared by their 64-bit hash, so memory use depends on the number
+    of distinct rows rather than their width. With approximate=True the distinct
+    count is a HyperLogLog estimate and the exact duplicate group count is skipped.
+    
+    Args:
+        table_name: Name of the table to analyze
+        key_columns: Columns that should uniquely identify a row (defaults to all columns)
+        limit: Maximum number of duplicate groups to list (0 skips the listing)
+        approximate: Estimate counts with HyperLogLog for very large tables
+        conn: Optional existing connection
+        
+    Returns:
+        Dictionary with duplicate statistics and the largest duplicate groups
+    """
+    if key_columns:
+        # Fail early with a clear message if a key column does not exist
+        column_names = [col["name"] for col in get_table_schema(table_name, conn=conn)]
+        missing = [col for col in key_columns if col not in column_names]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in table '{table_name}'")
+    
+    summary_df = query_to_polars(
+        table_summary_query(table_name, approximate=approximate, key_columns=key_columns),
+        conn=conn
+    )
+    row_count, distinct_keys = summary_df.row(0)
+    
+    result = {
+        "table_name": table_name,
+        "key_columns": key_columns or "all columns",
+        "approximate": approximate,
+        "row_count": row_count,
+        "distinct_keys": distinct_keys,
+        "duplicate_rows": max(row_count - distinct_keys, 0),
+    }
+    
+    if not approximate:
+        counts_df = query_to_polars(
+            duplicate_group_count_query(table_name, key_columns=key_columns),
+            conn=conn
+        )
+        result["duplicate_groups"] = counts_df["duplicate_groups"][0]
+    
+    if limit > 0:
+        groups_df = query_to_polars(
+            duplicate_groups_query(table_name, key_columns=key_columns, limit=limit),
+            conn=conn
+        )
+        result["top_groups"] = groups_df.to_dicts()
+    
+    return result
+
 def profile_column(table_name: str, column_name: str, conn=None) -> Dict:
     """
     Get detailed profile of a specific column in a table.
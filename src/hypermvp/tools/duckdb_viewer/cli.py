@@ -7,38 +7,28 @@ Provides tools to view, filter, and analyze data in your DuckDB database.
 import argparse
 import sys
 import logging
+from importlib.util import find_spec
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import json
 
+# Only lightweight modules are imported here. DuckDB, Polars, PyArrow and rich
+# are imported inside the commands that use them, so --help and argument errors
+# come back immediately.
 from hypermvp.global_config import ENERGY_DB_PATH
-from hypermvp.tools.duckdb_viewer.connection import (
-    get_connection, 
-    query_to_polars,
-    get_table_schema,
-    get_sample_data
+from hypermvp.utils.profiling import add_profile_arguments, profile_session
+from hypermvp.tools.duckdb_viewer.export import (
+    EXPORT_FORMATS,
+    DEFAULT_EXPORT_BATCH_SIZE
 )
 from hypermvp.tools.duckdb_viewer.query_templates import (
-    list_tables_query,
     table_preview_query,
     search_table_query,
     filter_non_empty_column_query,
     get_table_columns_query
 )
-from hypermvp.tools.duckdb_viewer.analysis import (
-    get_basic_table_profile,
-    profile_column,
-    find_data_quality_issues,
-    analyze_note_column
-)
 
-try:
-    from rich.console import Console
-    from rich.table import Table
-    from rich import print as rich_print
-    RICH_AVAILABLE = True
-except ImportError:
-    RICH_AVAILABLE = False
+RICH_AVAILABLE = find_spec("rich") is not None
 
 # Set up logging
 logging.basicConfig(
@@ -47,10 +37,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize rich console if available
-console = Console() if RICH_AVAILABLE else None
+# Rich console, created on first use
+console = None
+
+def get_console():
+    """Return the shared rich console, creating it on first use."""
+    global console
+    if console is None:
+        from rich.console import Console
+        console = Console()
+    return console
 
-def format_output(data, format_type: str = 'table'):
+def format_output(data, format_type: str = 'table', max_rows: int = 20):
     """
     Format data for display in the terminal.
     """
@@ -60,7 +58,9 @@ def format_output(data, format_type: str = 'table'):
             return json.dumps(data, indent=2, default=str)
         # If the data is a string, return as-is (so \n creates line breaks)
         return str(data)
-    
+
+    from rich.table import Table
+
     if isinstance(data, dict):
         # Display dictionary as key-value pairs
         table = Table(show_header=True)
@@ -77,17 +77,15 @@ def format_output(data, format_type: str = 'table'):
     
     elif hasattr(data, 'to_dict'):
         # Handle Polars DataFrame
-        df_dict = data.to_dict(as_series=False)
         table = Table(show_header=True)
         
         # Add columns
         for col_name in data.columns:
             table.add_column(col_name)
         
-        # Add rows
-        for i in range(min(len(data), 20)):  # Limit to 20 rows for display
-            row = [str(df_dict[col][i]) for col in data.columns]
-            table.add_row(*row)
+        # Add rows; only convert the rows we actually show
+        for row in data.head(max_rows).iter_rows():  # Limit rows for display
+            table.add_row(*[str(value) for value in row])
             
         return table
     
@@ -98,38 +96,33 @@ def format_output(data, format_type: str = 'table'):
 def command_list_tables(args):
     """
     List all tables in the database, showing table names and meta information (row/column counts).
+    Row counts come from DuckDB's catalog in a single query; pass --exact to count rows
+    (tables are counted in parallel).
     Output is formatted as a clean, aligned table for human readability.
     """
+    from hypermvp.tools.duckdb_viewer.connection import get_connection
+    from hypermvp.tools.duckdb_viewer.analysis import get_table_metadata
+
     try:
         conn = get_connection(args.db_path)
-        tables_df = query_to_polars(list_tables_query(), conn=conn)
-        table_names = tables_df["table_name"].to_list() if "table_name" in tables_df.columns else []
-        meta_info = []
-
-        for table in table_names:
-            try:
-                count_df = query_to_polars(f"SELECT COUNT(*) as row_count FROM {table}", conn=conn)
-                row_count = int(count_df["row_count"][0]) if "row_count" in count_df.columns else "?"
-                schema = get_table_schema(table, conn=conn)
-                col_count = len(schema)
-            except Exception:
-                row_count = "?"
-                col_count = "?"
-            meta_info.append({"name": table, "rows": row_count, "columns": col_count})
-
+        meta_info = get_table_metadata(conn=conn, exact=args.exact)
         conn.close()
+        table_names = [info["name"] for info in meta_info]
 
         if not table_names:
             return "No tables found in the database."
 
+        # Estimated counts are marked as such so nobody mistakes them for exact numbers
+        rows_title = "Rows" if args.exact else "Rows (est.)"
+
         # Calculate column widths for alignment
         name_len = max(len("Table Name"), *(len(str(info["name"])) for info in meta_info))
-        rows_len = max(len("Rows"), *(len(str(info["rows"])) for info in meta_info))
+        rows_len = max(len(rows_title), *(len(str(info["rows"])) for info in meta_info))
         cols_len = max(len("Columns"), *(len(str(info["columns"])) for info in meta_info))
 
         # Header
         output_lines = [f"Tables in your DuckDB database ({len(table_names)} total):"]
-        header = f"{'Table Name'.ljust(name_len)}   {'Rows'.rjust(rows_len)}   {'Columns'.rjust(cols_len)}"
+        header = f"{'Table Name'.ljust(name_len)}   {rows_title.rjust(rows_len)}   {'Columns'.rjust(cols_len)}"
         output_lines.append(header)
         output_lines.append(f"{'-'*name_len}   {'-'*rows_len}   {'-'*cols_len}")
 
@@ -151,15 +144,75 @@ def command_list_tables(args):
         logger.error(f"Error listing tables: {e}")
         return f"Error: {str(e)}"
 
+def print_output(data, format_type: str = 'table', max_rows: int = 20):
+    """
+    Print data to the terminal, using rich formatting when available.
+    """
+    if RICH_AVAILABLE and format_type == 'table':
+        get_console().print(format_output(data, format_type, max_rows))
+    else:
+        print(format_output(data, format_type, max_rows))
+
+def stream_results(args, query: str, empty_message: str):
+    """
+    Run a query and either export it or page through it in the terminal.
+
+    Plain English: Rows are read from the database in chunks. With --output they
+    are written straight to a file; otherwise each page is printed as soon as it
+    arrives, so you see the first rows immediately even for huge results.
+
+    Returns:
+        A message to display (export summary or empty_message), or None if
+        the rows have already been printed.
+    """
+    from hypermvp.tools.duckdb_viewer.connection import get_connection, stream_query
+    from hypermvp.tools.duckdb_viewer.export import export_query, iter_pages
+
+    conn = get_connection(args.db_path)
+    try:
+        if args.output:
+            rows = export_query(
+                query,
+                conn,
+                args.output,
+                output_path=args.output_path,
+                batch_size=args.batch_size
+            )
+            # Keep stdout clean when the export itself goes to stdout
+            if args.output_path is None:
+                logger.info(f"Exported {rows:,} rows as {args.output}")
+                return None
+            return f"Exported {rows:,} rows as {args.output} to {args.output_path}"
+
+        import polars as pl
+
+        interactive = sys.stdin.isatty() and sys.stdout.isatty()
+        reader = stream_query(query, conn, batch_size=args.page_size)
+        shown = 0
+        for page_number, batch, has_more in iter_pages(reader, args.page_size):
+            page = pl.from_arrow(batch)
+            if args.format == 'json':
+                print_output(page.to_dicts(), args.format)
+            else:
+                print_output(page, args.format, max_rows=args.page_size)
+            shown += page.height
+            if has_more:
+                if not interactive:
+                    continue
+                answer = input(f"-- page {page_number}, {shown:,} rows shown -- Enter for more, q to quit: ")
+                if answer.strip().lower().startswith("q"):
+                    break
+        return None if shown else empty_message
+    finally:
+        conn.close()
+
 def command_preview(args):
     """Preview data from a table."""
     try:
         if not args.table:
             return "Error: Table name is required."
-        conn = get_connection(args.db_path)
-        data = get_sample_data(args.table, limit=args.limit, conn=conn)
-        conn.close()
-        return data
+        query = table_preview_query(args.table, limit=args.limit)
+        return stream_results(args, query, f"Table {args.table} is empty.")
     except Exception as e:
         logger.error(f"Error previewing table: {e}")
         return f"Error: {str(e)}"
@@ -175,18 +228,20 @@ def command_search(args):
             args.term, 
             limit=args.limit
         )
-        conn = get_connection(args.db_path)
-        results = query_to_polars(query, conn=conn)
-        conn.close()
-        if len(results) == 0:
-            return f"No results found for '{args.term}' in {args.table}.{args.column}."
-        return results
+        return stream_results(
+            args,
+            query,
+            f"No results found for '{args.term}' in {args.table}.{args.column}."
+        )
     except Exception as e:
         logger.error(f"Error searching: {e}")
         return f"Error: {str(e)}"
 
 def command_profile(args):
     """Profile a table or column."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection
+    from hypermvp.tools.duckdb_viewer.analysis import get_basic_table_profile, profile_column
+
     try:
         if not args.table:
             return "Error: Table name is required."
@@ -194,7 +249,9 @@ def command_profile(args):
         if args.column:
             profile = profile_column(args.table, args.column, conn=conn)
         else:
-            profile = get_basic_table_profile(args.table, conn=conn)
+            profile = get_basic_table_profile(
+                args.table, conn=conn, approximate=args.approx
+            )
         conn.close()
         return profile
     except Exception as e:
@@ -203,6 +260,9 @@ def command_profile(args):
 
 def command_analyze_notes(args):
     """Analyze the NOTE column in a table."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection
+    from hypermvp.tools.duckdb_viewer.analysis import analyze_note_column
+
     try:
         if not args.table:
             return "Error: Table name is required."
@@ -217,6 +277,9 @@ def command_analyze_notes(args):
 
 def command_quality(args):
     """Find data quality issues in a table."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection
+    from hypermvp.tools.duckdb_viewer.analysis import find_data_quality_issues
+
     try:
         if not args.table:
             return "Error: Table name is required."
@@ -228,6 +291,42 @@ def command_quality(args):
         logger.error(f"Error finding data quality issues: {e}")
         return f"Error: {str(e)}"
 
+def command_duplicates(args):
+    """Find duplicate rows or duplicate key combinations in a table."""
+    from hypermvp.tools.duckdb_viewer.connection import get_connection
+    from hypermvp.tools.duckdb_viewer.analysis import find_duplicates
+
+    try:
+        if not args.table:
+            return "Error: Table name is required."
+        key_columns = (
+            [col.strip() for col in args.keys.split(",") if col.strip()]
+            if args.keys else None
+        )
+        conn = get_connection(args.db_path)
+        duplicates = find_duplicates(
+            args.table,
+            key_columns=key_columns,
+            limit=args.limit,
+            approximate=args.approx,
+            conn=conn
+        )
+        conn.close()
+        return duplicates
+    except Exception as e:
+        logger.error(f"Error finding duplicates: {e}")
+        return f"Error: {str(e)}"
+
+def positive_int(text: str) -> int:
+    """argparse type for row counts such as --page-size: an integer of at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer '{text}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
 def main():
     """
     Command-line entry point for DuckDB viewer.
@@ -248,6 +347,31 @@ def main():
         default="table",
         help="Output format (table or JSON)"
     )
+    add_profile_arguments(global_parser)
+
+    # Options shared by commands that return rows (preview, search)
+    rows_parser = argparse.ArgumentParser(add_help=False)
+    rows_parser.add_argument(
+        "--page-size",
+        type=positive_int,
+        default=20,
+        help="Rows per page when printing results (default: 20)"
+    )
+    rows_parser.add_argument(
+        "--output",
+        choices=EXPORT_FORMATS,
+        help="Stream results to a file instead of printing them"
+    )
+    rows_parser.add_argument(
+        "--output-path",
+        help="Target file for --output (csv and jsonl default to stdout)"
+    )
+    rows_parser.add_argument(
+        "--batch-size",
+        type=positive_int,
+        default=DEFAULT_EXPORT_BATCH_SIZE,
+        help=f"Rows fetched per batch when exporting (default: {DEFAULT_EXPORT_BATCH_SIZE:,})"
+    )
 
     # Parse known args to separate global options from subcommand
     args, remaining_argv = global_parser.parse_known_args()
@@ -259,20 +383,29 @@ def main():
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
     # List tables command
-    subparsers.add_parser("tables", help="List all tables in the database")
+    tables_parser = subparsers.add_parser("tables", help="List all tables in the database")
+    tables_parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Count rows exactly (slower) instead of using catalog estimates"
+    )
 
     # Preview command
-    preview_parser = subparsers.add_parser("preview", help="Preview data from a table")
+    preview_parser = subparsers.add_parser(
+        "preview", help="Preview data from a table", parents=[rows_parser]
+    )
     preview_parser.add_argument("table", help="Table name to preview")
     preview_parser.add_argument(
         "--limit",
         type=int,
         default=10,
-        help="Maximum number of rows to show"
+        help="Maximum number of rows to show (0 for all rows)"
     )
 
     # Search command
-    search_parser = subparsers.add_parser("search", help="Search for data in a table")
+    search_parser = subparsers.add_parser(
+        "search", help="Search for data in a table", parents=[rows_parser]
+    )
     search_parser.add_argument("table", help="Table name to search in")
     search_parser.add_argument("column", help="Column name to search in")
     search_parser.add_argument("term", help="Search term (can include % wildcards)")
@@ -280,7 +413,7 @@ def main():
         "--limit",
         type=int,
         default=100,
-        help="Maximum number of rows to show"
+        help="Maximum number of rows to show (0 for all rows)"
     )
 
     # Profile command
@@ -293,6 +426,11 @@ def main():
         "--column",
         help="Column name to profile (if omitted, profiles the entire table)"
     )
+    profile_parser.add_argument(
+        "--approx",
+        action="store_true",
+        help="Estimate distinct rows with HyperLogLog (faster on very large tables)"
+    )
 
     # Analyze notes command
     notes_parser = subparsers.add_parser(
@@ -312,6 +450,28 @@ def main():
     )
     quality_parser.add_argument("table", help="Table name to analyze")
 
+    # Duplicates command
+    duplicates_parser = subparsers.add_parser(
+        "duplicates",
+        help="Find duplicate rows or duplicate key combinations in a table"
+    )
+    duplicates_parser.add_argument("table", help="Table name to analyze")
+    duplicates_parser.add_argument(
+        "--keys",
+        help="Comma-separated key columns (if omitted, compares full rows)"
+    )
+    duplicates_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Maximum number of duplicate groups to show (0 to skip)"
+    )
+    duplicates_parser.add_argument(
+        "--approx",
+        action="store_true",
+        help="Estimate counts with HyperLogLog (faster on very large tables)"
+    )
+
     # Now parse the rest of the arguments (subcommand and its options)
     parsed_args = parser.parse_args(remaining_argv, namespace=args)
 
@@ -319,6 +479,11 @@ def main():
         parser.print_help()
         return 1
 
+    with profile_session(f"duckdb_viewer_{parsed_args.command}", parsed_args.profile, parsed_args.profile_stacks):
+        return run_command(parsed_args)
+
+def run_command(parsed_args):
+    """Run the parsed subcommand and print its result."""
     # Execute the command
     result = None
     if parsed_args.command == "tables":
@@ -333,12 +498,12 @@ def main():
         result = command_analyze_notes(parsed_args)
     elif parsed_args.command == "quality":
         result = command_quality(parsed_args)
+    elif parsed_args.command == "duplicates":
+        result = command_duplicates(parsed_args)
 
-    # Display the result
-    if RICH_AVAILABLE and parsed_args.format == 'table':
-        console.print(format_output(result, parsed_args.format))
-    else:
-        print(format_output(result, parsed_args.format))
+    # Display the result (streamed commands have already printed their rows)
+    if result is not None:
+        print_output(result, parsed_args.format)
 
     return 0
 
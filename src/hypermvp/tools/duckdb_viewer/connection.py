@@ -5,14 +5,17 @@ Provides standardized connection handling and query execution,
 leveraging existing configuration from global_config.py.
 """
 
-import duckdb
-import polars as pl
-from typing import Union, Dict, Optional, List
+from typing import TYPE_CHECKING, Union, Dict, Optional, List
 from pathlib import Path
 
+if TYPE_CHECKING:
+    # Polars is only needed once a result is materialised (DuckDB's .pl() imports it)
+    import polars as pl
+
 from hypermvp.global_config import ENERGY_DB_PATH, TEST_ENERGY_DB_PATH
+from hypermvp.utils import traced_duckdb
 
-def get_connection(db_path: str = ENERGY_DB_PATH) -> duckdb.DuckDBPyConnection:
+def get_connection(db_path: str = ENERGY_DB_PATH) -> traced_duckdb.TracedConnection:
     """
     Create and return a connection to the DuckDB database.
     
@@ -22,14 +25,14 @@ def get_connection(db_path: str = ENERGY_DB_PATH) -> duckdb.DuckDBPyConnection:
         db_path: Path to the DuckDB database file, defaults to project's main database
         
     Returns:
-        A DuckDB connection object
+        A DuckDB connection object (traced, see hypermvp.utils.traced_duckdb)
     """
     if not Path(db_path).exists():
         raise FileNotFoundError(f"DuckDB database not found at {db_path}")
     
-    return duckdb.connect(db_path)
+    return traced_duckdb.connect(db_path)
 
-def query_to_polars(query: str, conn = None, close_conn: bool = True) -> pl.DataFrame:
+def query_to_polars(query: str, conn = None, close_conn: bool = True) -> "pl.DataFrame":
     """
     Execute a SQL query and return results as a Polars DataFrame.
     
@@ -58,6 +61,28 @@ def query_to_polars(query: str, conn = None, close_conn: bool = True) -> pl.Data
         if should_close:
             conn.close()
 
+def stream_query(query: str, conn, batch_size: int = 100_000):
+    """
+    Execute a SQL query and return a reader that yields Arrow record batches.
+    
+    Plain English: Instead of loading the whole result into memory at once, this
+    hands you the rows in chunks of `batch_size`, so the first rows are available
+    right away and huge results never have to fit in memory.
+    
+    Args:
+        query: SQL query to execute
+        conn: Existing connection (must stay open while the reader is consumed)
+        batch_size: Number of rows per record batch
+        
+    Returns:
+        A pyarrow RecordBatchReader (iterate over it to get each batch)
+    """
+    result = conn.execute(query)
+    # Newer DuckDB versions renamed fetch_record_batch to to_arrow_reader
+    if hasattr(result, "to_arrow_reader"):
+        return result.to_arrow_reader(batch_size)
+    return result.fetch_record_batch(batch_size)
+
 def get_table_schema(table_name: str, conn = None) -> List[Dict[str, str]]:
     """
     Get schema information for a specific table.
@@ -103,7 +128,7 @@ def get_table_schema(table_name: str, conn = None) -> List[Dict[str, str]]:
         if close_conn:
             conn.close()
 
-def get_sample_data(table_name: str, limit: int = 10, conn = None) -> pl.DataFrame:
+def get_sample_data(table_name: str, limit: int = 10, conn = None) -> "pl.DataFrame":
     """
     Get a sample of data from the specified table.
     
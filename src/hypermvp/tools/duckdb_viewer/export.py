@@ -0,0 +1,167 @@
+"""
+Streaming export utilities for the DuckDB viewer.
+
+Query results are pulled from DuckDB as Arrow record batches and written
+batch by batch, so exporting a multi-million-row table never needs more
+memory than a single batch.
+"""
+
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+# Formats supported by export_query
+EXPORT_FORMATS = ["parquet", "csv", "jsonl"]
+
+# Rows per Arrow record batch when exporting
+DEFAULT_EXPORT_BATCH_SIZE = 100_000
+
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def _open_sink(output_path: Optional[str], binary: bool):
+    """
+    Open the export target, falling back to stdout when no path is given.
+    """
+    if output_path is None:
+        yield sys.stdout.buffer if binary else sys.stdout
+        return
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb" if binary else "w", encoding=None if binary else "utf-8") as f:
+        yield f
+
+def _write_parquet(reader, output_path: str) -> int:
+    """Write record batches to a zstd-compressed Parquet file."""
+    import pyarrow.parquet as pq
+
+    rows = 0
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(output_path, reader.schema, compression="zstd") as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+def _write_csv(reader, output_path: Optional[str]) -> int:
+    """Write record batches as CSV (header once, then one chunk per batch)."""
+    import pyarrow.csv as pacsv
+
+    rows = 0
+    with _open_sink(output_path, binary=True) as sink:
+        writer = pacsv.CSVWriter(sink, reader.schema)
+        try:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            writer.close()
+    return rows
+
+def _write_jsonl(reader, output_path: Optional[str]) -> int:
+    """Write record batches as JSON Lines (one JSON object per row)."""
+    rows = 0
+    with _open_sink(output_path, binary=False) as sink:
+        for batch in reader:
+            for row in batch.to_pylist():
+                sink.write(json.dumps(row, default=str) + "\n")
+            rows += batch.num_rows
+    return rows
+
+def export_query(
+    query: str,
+    conn,
+    output_format: str,
+    output_path: Optional[str] = None,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE
+) -> int:
+    """
+    Stream the result of a query to a Parquet, CSV or JSON Lines file.
+
+    Plain English: Saves the rows returned by a query to a file, a chunk at a
+    time, so even very large tables can be exported without running out of memory.
+
+    Args:
+        query: SQL query to execute
+        conn: Open DuckDB connection
+        output_format: One of "parquet", "csv" or "jsonl"
+        output_path: Target file (csv and jsonl write to stdout if omitted)
+        batch_size: Number of rows fetched from DuckDB per batch
+
+    Returns:
+        Number of rows written
+    """
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unsupported export format '{output_format}'. Choose one of {EXPORT_FORMATS}"
+        )
+    if output_format == "parquet" and output_path is None:
+        raise ValueError("An output path is required for Parquet export")
+
+    from hypermvp.tools.duckdb_viewer.connection import stream_query
+
+    reader = stream_query(query, conn, batch_size=batch_size)
+
+    if output_format == "parquet":
+        rows = _write_parquet(reader, output_path)
+    elif output_format == "csv":
+        rows = _write_csv(reader, output_path)
+    else:
+        rows = _write_jsonl(reader, output_path)
+
+    logger.info(f"Exported {rows:,} rows as {output_format} to {output_path or 'stdout'}")
+    return rows
+
+def iter_pages(reader, page_size: int) -> Iterator[tuple]:
+    """
+    Re-chunk a record batch reader into pages of exactly `page_size` rows.
+
+    Plain English: Hands out the query result one screen-sized page at a time,
+    and tells you whether more pages follow, without reading ahead more than one batch.
+
+    Args:
+        reader: Arrow RecordBatchReader (e.g. from stream_query)
+        page_size: Number of rows per page
+
+    Yields:
+        Tuples of (page_number, record_batch, has_more)
+
+    Raises:
+        ValueError: If page_size is less than 1
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+    import pyarrow as pa
+
+    pending = []
+    pending_rows = 0
+    page_number = 0
+    batches = iter(reader)
+    exhausted = False
+
+    while not exhausted or pending_rows > 0:
+        # Fill up until we have more than one page, so we know whether another follows
+        while not exhausted and pending_rows <= page_size:
+            try:
+                batch = next(batches)
+            except StopIteration:
+                exhausted = True
+                break
+            if batch.num_rows:
+                pending.append(batch)
+                pending_rows += batch.num_rows
+
+        if pending_rows == 0:
+            break
+
+        combined = pa.Table.from_batches(pending).combine_chunks()
+        page = combined.slice(0, page_size)
+        rest = combined.slice(page_size)
+        pending = rest.to_batches()
+        pending_rows = rest.num_rows
+
+        page_number += 1
+        page_batch = page.to_batches()[0] if page.num_rows else None
+        yield page_number, page_batch, pending_rows > 0
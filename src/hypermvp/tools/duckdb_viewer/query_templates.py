@@ -5,6 +5,8 @@ This module provides standardized SQL queries that can be used
 for common database operations.
 """
 
+from typing import List, Optional
+
 def list_tables_query() -> str:
     """
     Generate a query to list all tables in the database.
@@ -21,7 +23,35 @@ def list_tables_query() -> str:
     ORDER BY table_name
     """
 
-def table_preview_query(table_name: str, limit: int = 10) -> str:
+def table_metadata_query() -> str:
+    """
+    Generate a query that lists all tables with their size from the catalog.
+    
+    Plain English: Returns a SQL query that shows every table with its
+    approximate row count and number of columns, without reading the tables.
+    
+    Row counts come from DuckDB's catalog (duckdb_tables().estimated_size),
+    which is instant but may lag slightly behind recent deletes.
+    
+    Returns:
+        SQL query string
+    """
+    return """
+    SELECT 
+        table_name,
+        estimated_size as estimated_rows,
+        column_count
+    FROM duckdb_tables()
+    WHERE database_name = current_database()
+      AND schema_name = 'main'
+    ORDER BY table_name
+    """
+
+def _limit_clause(limit: Optional[int]) -> str:
+    """Return a LIMIT clause, or nothing if limit is None or 0 (all rows)."""
+    return f"LIMIT {limit}" if limit else ""
+
+def table_preview_query(table_name: str, limit: Optional[int] = 10) -> str:
     """
     Generate a query to preview data from a table.
     
@@ -29,7 +59,7 @@ def table_preview_query(table_name: str, limit: int = 10) -> str:
     
     Args:
         table_name: Name of the table to preview
-        limit: Maximum number of rows to return
+        limit: Maximum number of rows to return (None or 0 returns all rows)
         
     Returns:
         SQL query string
@@ -37,27 +67,134 @@ def table_preview_query(table_name: str, limit: int = 10) -> str:
     return f"""
     SELECT * 
     FROM {table_name} 
-    LIMIT {limit}
+    {_limit_clause(limit)}
     """
 
-def table_summary_query(table_name: str) -> str:
+def _row_hash_expression(key_columns: Optional[List[str]] = None) -> str:
+    """
+    Build a SQL expression that hashes a full row or a set of key columns.
+    
+    Plain English: Instead of comparing whole rows, we compare a 64-bit
+    fingerprint of each row. That keeps duplicate checks fast and light on memory.
+    
+    Args:
+        key_columns: Columns to hash (defaults to all columns of the table)
+        
+    Returns:
+        SQL expression string
+    """
+    if not key_columns:
+        return "hash(*COLUMNS(*))"
+    quoted = ", ".join(f'"{col}"' for col in key_columns)
+    return f"hash({quoted})"
+
+def table_summary_query(
+    table_name: str,
+    approximate: bool = False,
+    key_columns: Optional[List[str]] = None
+) -> str:
     """
     Generate a query to get summary statistics for a table.
     
     Plain English: Returns a SQL query that counts rows and gives you a quick
-    overview of what's in a table.
+    overview of what's in a table, including how many rows are distinct.
+    
+    Distinct rows are counted on row hashes rather than with SELECT DISTINCT *,
+    so memory stays bounded even for very large tables. With approximate=True
+    the count uses HyperLogLog (approx_count_distinct), which needs only a few
+    kilobytes regardless of table size.
     
     Args:
         table_name: Name of the table to summarize
+        approximate: Estimate the distinct count with HyperLogLog
+        key_columns: Count distinct key combinations instead of full rows
         
     Returns:
         SQL query string
     """
+    distinct_expr = (
+        "approx_count_distinct(row_hash)" if approximate
+        else "COUNT(DISTINCT row_hash)"
+    )
     return f"""
     SELECT 
         COUNT(*) as row_count,
-        (SELECT COUNT(*) FROM (SELECT DISTINCT * FROM {table_name})) as distinct_rows
-    FROM {table_name}
+        {distinct_expr} as distinct_rows
+    FROM (
+        SELECT {_row_hash_expression(key_columns)} as row_hash
+        FROM {table_name}
+    )
+    """
+
+def duplicate_groups_query(
+    table_name: str,
+    key_columns: Optional[List[str]] = None,
+    limit: int = 10
+) -> str:
+    """
+    Generate a query to list the largest groups of duplicate rows.
+    
+    Plain English: Returns a SQL query that shows which key values (or which
+    row fingerprints, if no keys are given) appear more than once, and how often.
+    
+    Args:
+        table_name: Name of the table to check
+        key_columns: Columns that should uniquely identify a row
+            (defaults to the full row, reported as a row hash)
+        limit: Maximum number of groups to return
+        
+    Returns:
+        SQL query string
+    """
+    if key_columns:
+        select_expr = ", ".join(f'"{col}"' for col in key_columns)
+    else:
+        select_expr = f"{_row_hash_expression()} as row_hash"
+    return f"""
+    SELECT 
+        *,
+        COUNT(*) as occurrences
+    FROM (
+        SELECT {select_expr}
+        FROM {table_name}
+    )
+    GROUP BY ALL
+    HAVING COUNT(*) > 1
+    ORDER BY occurrences DESC
+    LIMIT {limit}
+    """
+
+def duplicate_group_count_query(
+    table_name: str,
+    key_columns: Optional[List[str]] = None
+) -> str:
+    """
+    Generate a query to count duplicate groups and surplus duplicate rows.
+    
+    Plain English: Returns a SQL query that tells you how many key values are
+    duplicated and how many extra rows those duplicates add up to.
+    
+    Args:
+        table_name: Name of the table to check
+        key_columns: Columns that should uniquely identify a row
+            (defaults to the full row)
+        
+    Returns:
+        SQL query string
+    """
+    return f"""
+    SELECT 
+        COUNT(*) as duplicate_groups,
+        COALESCE(SUM(occurrences - 1), 0) as duplicate_rows
+    FROM (
+        SELECT COUNT(*) as occurrences
+        FROM (
+            SELECT {_row_hash_expression(key_columns)} as row_hash
+            FROM {table_name}
+        )
+        GROUP BY row_hash
+        HAVING COUNT(*) > 1
+    )
     """
 
 def column_stats_query(table_name: str, column_name: str) -> str:
@@ -84,7 +221,7 @@ def column_stats_query(table_name: str, column_name: str) -> str:
     FROM {table_name}
     """
 
-def search_table_query(table_name: str, column_name: str, search_term: str, limit: int = 100) -> str:
+def search_table_query(table_name: str, column_name: str, search_term: str, limit: Optional[int] = 100) -> str:
     """
     Generate a query to search for a term in a specific column.
     
@@ -94,7 +231,7 @@ def search_table_query(table_name: str, column_name: str, search_term: str, limi
         table_name: Name of the table to search
         column_name: Name of the column to search in
         search_term: Term to search for (can use % wildcards)
-        limit: Maximum number of rows to return
+        limit: Maximum number of rows to return (None or 0 returns all rows)
         
     Returns:
         SQL query string
@@ -103,7 +240,7 @@ def search_table_query(table_name: str, column_name: str, search_term: str, limi
     SELECT *
     FROM {table_name}
     WHERE {column_name} LIKE '{search_term}'
-    LIMIT {limit}
+    {_limit_clause(limit)}
     """
 
 def filter_non_empty_column_query(table_name: str, column_name: str, limit: int = 100) -> str:
@@ -0,0 +1,134 @@
+"""
+Small dependency-aware task runner.
+
+Tasks are plain callables with a name and a list of tasks they depend on.
+A task starts as soon as all of its dependencies have finished, so
+independent work runs concurrently:
+
+- worker tasks (parsing files, calculating) run in a thread pool;
+- writer tasks (anything that writes to DuckDB) run one at a time on a
+  single writer thread, so database writes never compete with each other.
+
+Tasks may add further tasks while the DAG is running, e.g. one task per
+month once the months to process are known.
+
+Plain English:
+Register the stages with `add`, call `run`, and the whole job takes about as
+long as its slowest chain of dependent stages instead of the sum of all of them.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from hypermvp.utils.instrumentation import instrument
+
+
+@dataclass
+class Task:
+    """One node of the DAG."""
+    name: str
+    func: Callable[[], Any]
+    deps: List[str] = field(default_factory=list)
+    writer: bool = False
+
+
+class DagRunner:
+    """
+    Run tasks in dependency order, in parallel where the dependencies allow.
+
+    Args:
+        max_workers: Size of the worker thread pool (writer tasks always run
+            on their own single thread).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self.tasks: Dict[str, Task] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._start = None
+
+    def add(self, name: str, func: Callable[[], Any], deps: Sequence[str] = (), writer: bool = False) -> Task:
+        """
+        Register a task. Safe to call from inside a running task.
+
+        Args:
+            name: Unique task name
+            func: Callable without arguments; its return value is stored in `results`
+            deps: Names of tasks that must finish first
+            writer: Run on the single writer thread
+
+        Returns:
+            Task: The registered task
+        """
+        with self._lock:
+            if name in self.tasks:
+                raise ValueError(f"Task '{name}' is already registered")
+            task = Task(name, func, list(deps), writer)
+            self.tasks[name] = task
+            return task
+
+    def result(self, name: str) -> Any:
+        """Return the result of a finished task."""
+        return self.results[name]
+
+    def _timed(self, task: Task) -> Any:
+        started = time.time()
+        try:
+            with instrument(task.name):
+                return task.func()
+        finally:
+            finished = time.time()
+            self.timings[task.name] = {
+                "start": started - self._start,
+                "end": finished - self._start,
+                "seconds": finished - started,
+            }
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every registered task (including tasks added while running).
+
+        If a task fails, no new tasks are started; running tasks are allowed to
+        finish and the first error is re-raised.
+
+        Returns:
+            dict: Task name -> return value
+        """
+        self._start = time.time()
+        done, running, error = set(), {}, None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dag-worker") as workers, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="dag-writer") as writer:
+            while True:
+                if error is None:
+                    with self._lock:
+                        pending = [t for t in self.tasks.values() if t.name not in done and t.name not in running.values()]
+                    for task in pending:
+                        if all(dep in done for dep in task.deps):
+                            pool = writer if task.writer else workers
+                            running[pool.submit(self._timed, task)] = task.name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                        done.add(name)
+                    except Exception as e:
+                        logging.error(f"Task {name} failed: {e}")
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        blocked = sorted(set(self.tasks) - done)
+        if blocked:
+            raise ValueError(f"Tasks never became ready (missing or cyclic dependencies): {blocked}")
+        return self.results
@@ -2,16 +2,21 @@ import os
 import logging
 import shutil
 import gzip
+import time
 from datetime import datetime
-from hypermvp.global_config import OUTPUT_DATA_DIR, PROVIDER_DUCKDB_PATH  # Import both needed config variables
+from hypermvp.global_config import OUTPUT_DATA_DIR, PROVIDER_DUCKDB_PATH, DUCKDB_PATH, ensure_dirs  # Import needed config variables
 
 # Add this flag at the top of the file
 ENABLE_SNAPSHOTS = False  # Set to True when ready for production
 
+# Engine used by the data loaders: "parquet" (deduplicated, see snapshot_store)
+# or "gzip" (full compressed copy of the database file)
+SNAPSHOT_ENGINE = "parquet"
+
 # Define snapshot directory using direct path from config
 SNAPSHOT_DIR = os.path.join(OUTPUT_DATA_DIR, "snapshots")
 
-def create_duckdb_snapshot(db_path, keep=3, force_enable=False):
+def create_duckdb_snapshot(db_path, keep=3, force_enable=False, engine="gzip"):
     """
     Create a compressed snapshot of the DuckDB file before making changes.
     
@@ -19,6 +24,11 @@ def create_duckdb_snapshot(db_path, keep=3, force_enable=False):
         db_path: Path to the database file to snapshot
         keep: Number of snapshots to keep
         force_enable: If True, create snapshot even if ENABLE_SNAPSHOTS is False (for testing)
+        engine: "gzip" for a compressed copy of the file, "parquet" for a
+            deduplicated Parquet snapshot (only changed months are written)
+    
+    Returns:
+        Path of the .duckdb.gz file ("gzip") or the snapshot name ("parquet")
     """
     if not (ENABLE_SNAPSHOTS or force_enable):
         logging.info("Snapshots disabled for pilot phase")
@@ -28,6 +38,15 @@ def create_duckdb_snapshot(db_path, keep=3, force_enable=False):
         logging.info(f"No database at {db_path} to snapshot")
         return None
 
+    if engine == "parquet":
+        from hypermvp.utils.snapshot_store import SnapshotStore
+        store = SnapshotStore(db_path)
+        manifest = store.create()
+        store.prune(keep)
+        return manifest["name"]
+    if engine != "gzip":
+        raise ValueError(f"Unknown snapshot engine: {engine}")
+
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     # For tests, use directory where the db is located
     snapshot_dir = os.path.join(os.path.dirname(db_path), "snapshots")
@@ -62,33 +81,126 @@ def cleanup_old_snapshots(snapshot_dir, base_name, keep=3):
         os.remove(os.path.join(snapshot_dir, old_snapshot))
         logging.info(f"Removed old snapshot: {old_snapshot}")
 
-def add_version_metadata(conn, source_files, operation_type):
-    """Add version metadata to track the lineage of data operations."""
-    # Create version table if it doesn't exist 
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS version_history (
-            version_id INTEGER PRIMARY KEY,
-            timestamp TIMESTAMP,
-            operation_type VARCHAR,
-            source_files VARCHAR,
-            username VARCHAR
+VERSION_SEQUENCE = "version_history_seq"
+
+# Structured columns added to version_history after the original five
+VERSION_DETAIL_COLUMNS = {
+    "tables_touched": "VARCHAR[]",
+    "date_from": "DATE",
+    "date_to": "DATE",
+    "rows_inserted": "BIGINT",
+    "rows_deleted": "BIGINT",
+    "duration_seconds": "DOUBLE",
+}
+
+def ensure_version_table(conn):
+    """
+    Create (or upgrade) the version_history table and its ID sequence.
+
+    Databases created before the sequence existed get one that starts after
+    their highest version_id, plus the structured columns.
+    """
+    sequence_exists = conn.execute(
+        "SELECT COUNT(*) FROM duckdb_sequences() "
+        "WHERE database_name = current_database() AND sequence_name = ?",
+        [VERSION_SEQUENCE],
+    ).fetchone()[0] > 0
+    existing_columns = {row[0] for row in conn.execute(
+        "SELECT column_name FROM duckdb_columns() "
+        "WHERE database_name = current_database() AND table_name = 'version_history'"
+    ).fetchall()}
+
+    if not sequence_exists:
+        start = 1
+        if existing_columns:
+            start = conn.execute("SELECT COALESCE(MAX(version_id), 0) + 1 FROM version_history").fetchone()[0]
+        conn.execute(f"CREATE SEQUENCE IF NOT EXISTS {VERSION_SEQUENCE} START {int(start)}")
+
+    if not existing_columns:
+        details = ",\n            ".join(f"{name} {sql_type}" for name, sql_type in VERSION_DETAIL_COLUMNS.items())
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS version_history (
+                version_id INTEGER PRIMARY KEY DEFAULT nextval('{VERSION_SEQUENCE}'),
+                timestamp TIMESTAMP,
+                operation_type VARCHAR,
+                source_files VARCHAR,
+                username VARCHAR,
+                {details}
+            )
+        """)
+        return
+    for name, sql_type in VERSION_DETAIL_COLUMNS.items():
+        if name not in existing_columns:
+            conn.execute(f"ALTER TABLE version_history ADD COLUMN IF NOT EXISTS {name} {sql_type}")
+
+def add_version_metadata(conn, source_files, operation_type, tables=None, date_range=None,
+                         rows_inserted=None, rows_deleted=None, duration_seconds=None):
+    """
+    Add version metadata to track the lineage of data operations.
+
+    IDs come from a DuckDB sequence, so concurrent writers never get the same
+    version_id and no scan of version_history is needed.
+
+    Args:
+        conn: Open DuckDB connection (call inside the write's transaction to
+            record the version atomically with the data)
+        source_files: Files or sources the data came from
+        operation_type: Short name of the operation, e.g. "afrr_update_9_2024"
+        tables: Names of the tables written
+        date_range: (first, last) delivery date covered by the write
+        rows_inserted: Number of rows inserted
+        rows_deleted: Number of rows deleted or replaced
+        duration_seconds: How long the write took
+
+    Returns:
+        int: The new version_id
+    """
+    ensure_version_table(conn)
+    date_from, date_to = date_range if date_range else (None, None)
+    return conn.execute(f"""
+        INSERT INTO version_history (
+            version_id, timestamp, operation_type, source_files, username,
+            tables_touched, date_from, date_to, rows_inserted, rows_deleted, duration_seconds
         )
-    """)
-    
-    # Get the next version_id 
-    max_id = conn.execute("SELECT COALESCE(MAX(version_id), 0) + 1 FROM version_history").fetchone()[0]
-    
-    # Insert with explicit version_id
-    conn.execute("""
-        INSERT INTO version_history (version_id, timestamp, operation_type, source_files, username)
-        VALUES (?, ?, ?, ?, ?)
+        VALUES (nextval('{VERSION_SEQUENCE}'), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        RETURNING version_id
     """, (
-        max_id,
         datetime.now(),
         operation_type,
         str(source_files),
-        os.environ.get('USER', 'unknown')
-    ))
+        os.environ.get('USER', 'unknown'),
+        list(tables) if tables else None,
+        date_from,
+        date_to,
+        rows_inserted,
+        rows_deleted,
+        duration_seconds,
+    )).fetchone()[0]
+
+def versions_since(conn, version_id, table=None):
+    """
+    Return the versions recorded after `version_id`, oldest first.
+
+    Plain English: Lets an incremental job ask "what changed since I last
+    ran?" and which delivery dates it has to recompute.
+
+    Args:
+        conn: Open DuckDB connection
+        version_id: Last version the caller has processed (0 for everything)
+        table: Only versions that touched this table
+
+    Returns:
+        list of dicts, one per version
+    """
+    ensure_version_table(conn)
+    query = "SELECT * FROM version_history WHERE version_id > ?"
+    params = [version_id]
+    if table is not None:
+        query += " AND list_contains(tables_touched, ?)"
+        params.append(table)
+    cursor = conn.execute(query + " ORDER BY version_id", params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 def vacuum_database(conn):
     """Reclaim space in the database after operations."""
@@ -96,4 +208,139 @@ def vacuum_database(conn):
         conn.execute("VACUUM")
         logging.info("Database vacuumed to reclaim space")
     except Exception as e:
-        logging.warning(f"Failed to vacuum database: {e}")
\ No newline at end of file
+        logging.warning(f"Failed to vacuum database: {e}")
+
+def list_snapshots(db_path=DUCKDB_PATH):
+    """
+    List the snapshots of a database, oldest first.
+
+    Returns:
+        Names usable with restore_snapshot(): Parquet snapshot names and
+        .duckdb.gz file names
+    """
+    from hypermvp.utils.snapshot_store import SnapshotStore
+
+    snapshot_dir = os.path.join(os.path.dirname(db_path), "snapshots")
+    name_without_ext = os.path.splitext(os.path.basename(db_path))[0]
+    gzip_snapshots = []
+    if os.path.isdir(snapshot_dir):
+        gzip_snapshots = sorted(
+            f for f in os.listdir(snapshot_dir)
+            if f.startswith(name_without_ext) and f.endswith('.duckdb.gz')
+        )
+    return SnapshotStore(db_path).list_snapshots() + gzip_snapshots
+
+def _validate_database(path):
+    """Open a database and read every table once; raises if the file is unusable."""
+    import duckdb
+
+    conn = duckdb.connect(path, read_only=True)
+    try:
+        tables = conn.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE database_name = current_database()"
+        ).fetchall()
+        for (table_name,) in tables:
+            conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()
+    finally:
+        conn.close()
+
+def restore_snapshot(name, db_path=DUCKDB_PATH):
+    """
+    Replace a database with one of its snapshots.
+
+    Parquet snapshots are streamed back into a fresh database and every
+    partition is re-fingerprinted against the snapshot manifest. Gzip
+    snapshots are decompressed in chunks and opened once to check them. In
+    both cases the database is only replaced once the restored copy is valid.
+
+    Plain English: Undo a bad import by going back to the state before it.
+
+    Args:
+        name: Snapshot name from list_snapshots()
+        db_path: Database to restore
+
+    Returns:
+        Path of the restored database
+
+    Raises:
+        FileNotFoundError: If there is no snapshot with that name
+        ValueError: If the restored data fails validation
+    """
+    from hypermvp.utils.snapshot_store import SnapshotStore
+
+    start_time = time.time()
+    if name.endswith('.duckdb.gz'):
+        snapshot_path = os.path.join(os.path.dirname(db_path), "snapshots", name)
+        if not os.path.exists(snapshot_path):
+            raise FileNotFoundError(f"No snapshot named {name}")
+        import duckdb
+
+        temp_path = f"{db_path}.restore"
+        try:
+            with gzip.open(snapshot_path, 'rb') as f_in, open(temp_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+            _validate_database(temp_path)
+        except (OSError, EOFError, duckdb.Error) as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise ValueError(f"Snapshot {name} is not a valid database: {e}") from e
+        # A write-ahead log left by the old database would be replayed onto the restored one
+        if os.path.exists(f"{db_path}.wal"):
+            os.remove(f"{db_path}.wal")
+        os.replace(temp_path, db_path)
+    else:
+        SnapshotStore(db_path).restore(name, db_path)
+
+    logging.info(f"Restored {db_path} from snapshot {name} in {time.time() - start_time:.2f} seconds")
+    return db_path
+
+def diff_snapshots(a, b, db_path=DUCKDB_PATH):
+    """
+    Report which delivery dates changed between two Parquet snapshots.
+
+    Args:
+        a: Older snapshot name
+        b: Newer snapshot name
+        db_path: Database the snapshots belong to
+
+    Returns:
+        list of dicts with table, delivery_date, rows_a, rows_b, row_delta and
+        content_changed, one per changed (table, delivery date)
+    """
+    from hypermvp.utils.snapshot_store import SnapshotStore
+
+    changes = SnapshotStore(db_path).diff(a, b)
+    tables = sorted({change["table"] for change in changes})
+    logging.info(f"{len(changes)} delivery date(s) changed in {len(tables)} table(s) between {a} and {b}")
+    return changes
+
+def main():
+    """List, compare and restore snapshots from the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage DuckDB snapshots")
+    parser.add_argument("--db-path", default=DUCKDB_PATH, help=f"Database (default: {DUCKDB_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List snapshots, oldest first")
+    diff_parser = subparsers.add_parser("diff", help="Show delivery dates that changed between two snapshots")
+    diff_parser.add_argument("a")
+    diff_parser.add_argument("b")
+    restore_parser = subparsers.add_parser("restore", help="Replace the database with a snapshot")
+    restore_parser.add_argument("name")
+    args = parser.parse_args()
+    ensure_dirs()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.command == "list":
+        for name in list_snapshots(args.db_path):
+            print(name)
+    elif args.command == "diff":
+        for change in diff_snapshots(args.a, args.b, args.db_path):
+            kind = "changed" if change["content_changed"] else f"{change['row_delta']:+d} rows"
+            print(f"{change['table']:<30} {str(change['delivery_date']):<12} "
+                  f"{change['rows_a']:>8} -> {change['rows_b']:<8} {kind}")
+    else:
+        restore_snapshot(args.name, args.db_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+In-memory DuckDB sessions for whole-pipeline runs.
+
+Every module in hypermvp opens its own connection with `duckdb.connect(db_path)`.
+DuckDB shares a *named* in-memory database (":memory:<name>") between all
+connections in the same process for as long as at least one of them stays
+open. This module keeps such an "anchor" connection open for the duration of
+a run, so the provider, aFRR and analysis stages can all work against RAM
+instead of the database file, without changing how they connect.
+
+Plain English:
+Wrap a pipeline run in `in_memory_database()` and pass the path it yields as
+`db_path` everywhere. Nothing touches the disk until the end, and only if you
+ask for the result to be persisted.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import duckdb
+
+# Default name of the shared in-memory database used by main.py --in-memory
+IN_MEMORY_DB_PATH = ":memory:hypermvp"
+
+def is_in_memory(db_path) -> bool:
+    """
+    Check whether a DuckDB path refers to an in-memory database.
+
+    Plain English: True for ":memory:" and named variants like ":memory:hypermvp",
+    which have no file on disk to create, check or snapshot.
+    """
+    return str(db_path).startswith(":memory:")
+
+def _copy_database(conn: duckdb.DuckDBPyConnection, source: str, target: str):
+    """Copy every table, view and sequence from one attached catalog to another."""
+    conn.execute(f'COPY FROM DATABASE "{source}" TO "{target}"')
+
+def seed_from_file(conn: duckdb.DuckDBPyConnection, source_path: str):
+    """
+    Copy an on-disk DuckDB database into the connection's in-memory database.
+
+    Plain English: Starts the in-memory run from a copy of an existing database,
+    so what-if experiments never modify the real file.
+
+    Args:
+        conn: Connection to the in-memory database
+        source_path: Path to the DuckDB file to copy from (opened read-only)
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"DuckDB database not found: {source_path}")
+    memory_catalog = conn.execute("SELECT current_database()").fetchone()[0]
+    conn.execute(f"ATTACH '{source_path}' AS seed_source (READ_ONLY)")
+    try:
+        _copy_database(conn, "seed_source", memory_catalog)
+    finally:
+        conn.execute("DETACH seed_source")
+    logging.info(f"Seeded in-memory database from {source_path}")
+
+def persist_to_file(conn: duckdb.DuckDBPyConnection, target_path: str, overwrite: bool = False) -> str:
+    """
+    Export the connection's in-memory database to a DuckDB file.
+
+    Plain English: Writes everything built in memory to disk in one go. The copy
+    goes to a temporary file first and is moved into place at the end, so an
+    existing database is never left half-written.
+
+    Args:
+        conn: Connection to the in-memory database
+        target_path: DuckDB file to create
+        overwrite: Replace target_path if it already exists
+
+    Returns:
+        The path written to
+    """
+    if os.path.exists(target_path) and not overwrite:
+        raise FileExistsError(f"Refusing to overwrite existing database: {target_path}")
+
+    target_dir = os.path.dirname(os.path.abspath(target_path))
+    os.makedirs(target_dir, exist_ok=True)
+    temp_path = f"{target_path}.tmp"
+    for leftover in (temp_path, f"{temp_path}.wal"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+    start_time = time.time()
+    memory_catalog = conn.execute("SELECT current_database()").fetchone()[0]
+    conn.execute(f"ATTACH '{temp_path}' AS persist_target")
+    try:
+        _copy_database(conn, memory_catalog, "persist_target")
+    finally:
+        conn.execute("DETACH persist_target")
+    os.replace(temp_path, target_path)
+
+    logging.info(f"Persisted in-memory database to {target_path} in {time.time() - start_time:.2f} seconds")
+    return target_path
+
+@contextmanager
+def in_memory_database(
+    db_path: str = IN_MEMORY_DB_PATH,
+    seed_from: Optional[str] = None,
+    persist_to: Optional[str] = None,
+    overwrite: bool = False
+) -> Iterator[str]:
+    """
+    Keep a named in-memory DuckDB database alive for the duration of a block.
+
+    Plain English: Everything inside the `with` block that connects to the
+    yielded path sees the same in-memory database. When the block finishes
+    without errors, the result is optionally written to disk.
+
+    Args:
+        db_path: Named in-memory path (must start with ":memory:")
+        seed_from: Optional DuckDB file to copy into memory first
+        persist_to: Optional DuckDB file to export the result to on success
+        overwrite: Allow persist_to to replace an existing file
+
+    Yields:
+        The db_path to pass to the pipeline functions
+    """
+    if not is_in_memory(db_path) or db_path == ":memory:":
+        # A bare ":memory:" gives every connection its own private database
+        raise ValueError(f"Expected a named in-memory path like ':memory:name', got '{db_path}'")
+
+    anchor = duckdb.connect(db_path)
+    try:
+        if seed_from:
+            seed_from_file(anchor, seed_from)
+        yield db_path
+        if persist_to:
+            persist_to_file(anchor, persist_to, overwrite=overwrite)
+    finally:
+        anchor.close()
@@ -0,0 +1,264 @@
+"""
+Lightweight per-stage instrumentation and JSON run reports.
+
+`instrument` measures one stage of a workflow: wall time, CPU time, rows
+in/out and resident memory (start, end and peak, via psutil). It works as a
+context manager or as a decorator:
+
+    with instrument("clean_provider_table") as stage:
+        ...
+        stage.rows_out = 1234
+
+    @instrumented("read_excel_file", rows_out=lambda sheets: sum(df.height for df in sheets.values()))
+    def read_excel_file(filepath): ...
+
+Every stage logs one summary line. While a `run_report` is open, stages from
+all threads are also collected and written to one JSON file when the run
+ends, so runs can be compared over time. Stages that run in worker processes
+only log; they are not part of the parent's report.
+
+A stage's `cpu_seconds` is the CPU time of the thread it ran on, so stages
+that overlap (e.g. under --workflow all) do not count each other's work.
+Work a stage hands to other threads (DuckDB's or Polars' thread pools) is
+only in `process_cpu_seconds`, which is process-wide and therefore also
+includes every stage that ran at the same time.
+
+Plain English:
+Wrap a run in `run_report("main_all")` and every instrumented function called
+during it shows up in data/03_output/run_reports/ with its time, CPU, rows and memory.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import psutil
+
+from hypermvp.global_config import RUN_REPORTS_DIR
+
+# How often the active run samples RSS to catch peaks between stage start and end
+RSS_SAMPLE_INTERVAL = 0.05
+
+_PROCESS = psutil.Process()
+_MB = 1024 * 1024
+
+def _rss() -> int:
+    return _PROCESS.memory_info().rss
+
+
+@dataclass
+class StageRecord:
+    """Measurements for one instrumented stage."""
+    stage: str
+    started_at: str
+    thread: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    process_cpu_seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    rss_start_mb: float = 0.0
+    rss_end_mb: float = 0.0
+    peak_rss_mb: float = 0.0
+    error: Optional[str] = None
+
+
+class RunReport:
+    """
+    Collects the stages of one run and samples RSS in the background.
+
+    Args:
+        name: Run name, used in the report file name
+        metadata: Extra JSON-serialisable details stored with the report
+    """
+
+    def __init__(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.metadata = metadata or {}
+        self.stages: List[StageRecord] = []
+        self.started_at = datetime.now()
+        self.peak_rss = _rss()
+        self._active: List[StageRecord] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    def _sample(self):
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL):
+            self._observe(_rss())
+
+    def _observe(self, rss: int):
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+            for record in self._active:
+                record.peak_rss_mb = max(record.peak_rss_mb, rss / _MB)
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self._observe(_rss())
+
+    def begin(self, record: StageRecord):
+        with self._lock:
+            self._active.append(record)
+
+    def end(self, record: StageRecord):
+        with self._lock:
+            self._active.remove(record)
+            self.stages.append(record)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self._wall_start, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu_start, 4),
+            "peak_rss_mb": round(self.peak_rss / _MB, 1),
+            "metadata": self.metadata,
+            "stages": [asdict(record) for record in self.stages],
+        }
+
+    def write(self, output_dir: str = RUN_REPORTS_DIR) -> str:
+        """Write the report as JSON and return the file path."""
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{self.name}_{self.started_at:%Y%m%d_%H%M%S_%f}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+
+_current_report: Optional[RunReport] = None
+# Thread id -> names of the stages currently open on that thread (outermost first)
+_thread_stages: Dict[int, List[str]] = {}
+
+def active_stages() -> Dict[int, str]:
+    """
+    Return the stage each thread is currently in, e.g. {thread_id: "run_etl;read_excel_file"}.
+
+    Plain English: Lets a sampling profiler label stack samples with the stage they belong to.
+    """
+    return {ident: ";".join(names) for ident, names in list(_thread_stages.items()) if names}
+
+def current_report() -> Optional[RunReport]:
+    """Return the run report that is currently collecting stages, if any."""
+    return _current_report
+
+@contextmanager
+def run_report(name: str, output_dir: Optional[str] = RUN_REPORTS_DIR,
+               metadata: Optional[Dict[str, Any]] = None) -> Iterator[RunReport]:
+    """
+    Collect every instrumented stage of a run and write one JSON report.
+
+    The report is written even if the run fails, so failed runs can be
+    compared too.
+
+    Args:
+        name: Run name, e.g. "main_all"
+        output_dir: Directory for the JSON file (None = collect only, don't write)
+        metadata: Extra details to store, e.g. the command line arguments
+
+    Yields:
+        RunReport: The report being collected
+    """
+    global _current_report
+    report = RunReport(name, metadata)
+    previous, _current_report = _current_report, report
+    report.start()
+    try:
+        yield report
+    finally:
+        report.stop()
+        _current_report = previous
+        if output_dir:
+            path = report.write(output_dir)
+            logging.info(f"Run report written to {path}")
+
+class instrument:
+    """
+    Measure one stage. Use `with instrument("name") as stage:` and set
+    `stage.rows_in` / `stage.rows_out` inside the block when they are known.
+    """
+
+    def __init__(self, stage: str, rows_in: Optional[int] = None):
+        self.record = StageRecord(
+            stage=stage,
+            started_at=datetime.now().isoformat(timespec="milliseconds"),
+            thread=threading.current_thread().name,
+            rows_in=rows_in,
+        )
+
+    def __enter__(self) -> StageRecord:
+        rss = _rss()
+        self.record.rss_start_mb = self.record.peak_rss_mb = rss / _MB
+        self._report = current_report()
+        if self._report is not None:
+            self._report.begin(self.record)
+        _thread_stages.setdefault(threading.get_ident(), []).append(self.record.stage)
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        self._process_cpu = time.process_time()
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        stages = _thread_stages.get(threading.get_ident())
+        if stages:
+            stages.pop()
+        record = self.record
+        record.wall_seconds = round(time.perf_counter() - self._wall, 4)
+        record.cpu_seconds = round(time.thread_time() - self._cpu, 4)
+        record.process_cpu_seconds = round(time.process_time() - self._process_cpu, 4)
+        rss = _rss()
+        record.rss_end_mb = round(rss / _MB, 1)
+        record.peak_rss_mb = round(max(record.peak_rss_mb, rss / _MB), 1)
+        record.rss_start_mb = round(record.rss_start_mb, 1)
+        if exc is not None:
+            record.error = f"{exc_type.__name__}: {exc}"
+        if self._report is not None:
+            self._report.end(record)
+
+        rows = ""
+        if record.rows_in is not None:
+            rows += f", rows_in={record.rows_in:,}"
+        if record.rows_out is not None:
+            rows += f", rows_out={record.rows_out:,}"
+        logging.info(
+            f"[stage] {record.stage}: wall={record.wall_seconds:.2f}s cpu={record.cpu_seconds:.2f}s"
+            f"{rows}, peak_rss={record.peak_rss_mb:,.0f} MB" + (" (failed)" if record.error else "")
+        )
+        return False
+
+def instrumented(stage: Optional[str] = None,
+                 rows_in: Optional[Callable[..., Optional[int]]] = None,
+                 rows_out: Optional[Callable[[Any], Optional[int]]] = None):
+    """
+    Decorator form of `instrument`.
+
+    Args:
+        stage: Stage name (defaults to the function name)
+        rows_in: Called with the function's arguments, returns the input row count
+        rows_out: Called with the function's result, returns the output row count
+    """
+    def decorator(func):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with instrument(name, rows_in=rows_in(*args, **kwargs) if rows_in else None) as record:
+                result = func(*args, **kwargs)
+                if rows_out is not None:
+                    record.rows_out = rows_out(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,110 @@
+"""
+RAM budgets for loaders that would otherwise hold all of their input at once.
+
+`parse_memory_size` is an argparse type for `--memory-budget` ("4GB", "512MB",
+"auto", ...). `MemoryBudget.resolve` turns that value into a budget that never
+exceeds the memory psutil reports as available, and `should_flush` tells a
+loader when its pending frames have grown large enough to write them out.
+`should_stream` and `chunk_rows` decide when a workbook is too large to parse
+in one go and how many rows to read at a time instead.
+
+Plain English:
+Run `--memory-budget 4GB` and the provider ETL loads the workbooks in batches
+that fit into 4 GB instead of reading every workbook before writing anything.
+"""
+
+import argparse
+import logging
+import re
+from typing import Optional, Union
+
+import psutil
+
+# Share of the currently available memory used by `--memory-budget auto`
+AUTO_BUDGET_SHARE = 0.5
+# Share of the budget pending frames may use; the rest covers the copy made
+# while inserting (the load_timestamp and column alignment) and DuckDB's own buffers
+BATCH_SHARE = 0.35
+# Calamine holds about 1.7x a sheet's XML while parsing it; workbooks whose
+# sheets would not fit into the batch share are streamed instead
+EXCEL_PARSE_FACTOR = 2
+# Memory per row while a sheet is streamed (row lists plus the chunk's frame)
+STREAM_ROW_BYTES = 1024
+MIN_CHUNK_ROWS = 1_000
+# Flush early whenever the machine's available memory drops below this
+MIN_AVAILABLE_BYTES = 256 * 1024 * 1024
+
+_MB = 1024 * 1024
+_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+
+def parse_memory_size(text: str) -> Union[int, str]:
+    """
+    Parse a memory size such as "8GB", "512MB", "1.5G" or "1073741824".
+
+    Units are binary (1 GB = 1024 MB). "auto" is passed through for
+    MemoryBudget.resolve.
+
+    Returns:
+        int | str: Size in bytes, or "auto"
+    """
+    if text.strip().lower() == "auto":
+        return "auto"
+    match = _SIZE.match(text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid memory size '{text}' (use e.g. 4GB, 512MB or auto)")
+    size = int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"memory size must be positive, got '{text}'")
+    return size
+
+
+class MemoryBudget:
+    """
+    A RAM limit for one load.
+
+    Args:
+        limit_bytes: Total memory the load may use
+    """
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = int(limit_bytes)
+        self.batch_bytes = int(self.limit_bytes * BATCH_SHARE)
+
+    @classmethod
+    def resolve(cls, value: Union[None, int, str, "MemoryBudget"]) -> Optional["MemoryBudget"]:
+        """
+        Build a budget from a --memory-budget value (None = no budget).
+
+        Requests above the memory that is currently available are capped to it,
+        since going over would only push the load into swap.
+        """
+        if value is None or isinstance(value, MemoryBudget):
+            return value
+        if isinstance(value, str):
+            value = parse_memory_size(value)
+        available = psutil.virtual_memory().available
+        if value == "auto":
+            return cls(available * AUTO_BUDGET_SHARE)
+        if value > available:
+            logging.warning(
+                f"Memory budget of {value / _MB:,.0f} MB exceeds the {available / _MB:,.0f} MB available; "
+                f"using {available / _MB:,.0f} MB"
+            )
+            return cls(available)
+        return cls(value)
+
+    def should_flush(self, pending_bytes: int) -> bool:
+        """Return True once pending data fills its share of the budget or the machine runs low."""
+        return pending_bytes >= self.batch_bytes or psutil.virtual_memory().available < MIN_AVAILABLE_BYTES
+
+    def should_stream(self, sheet_xml_bytes: int) -> bool:
+        """Return True if parsing sheets of this (uncompressed XML) size at once would overrun the batch share."""
+        return sheet_xml_bytes * EXCEL_PARSE_FACTOR > self.batch_bytes
+
+    def chunk_rows(self, max_rows: int) -> int:
+        """Rows per chunk when streaming a sheet: as many as fit into the batch share, up to max_rows."""
+        return max(MIN_CHUNK_ROWS, min(max_rows, self.batch_bytes // STREAM_ROW_BYTES))
+
+    def __str__(self) -> str:
+        return f"{self.limit_bytes / _MB:,.0f} MB (batches up to {self.batch_bytes / _MB:,.0f} MB)"
@@ -0,0 +1,173 @@
+"""
+`--profile` support shared by the command line tools.
+
+`add_profile_arguments` adds the options to a parser and `profile_session`
+wraps the command:
+
+- `--profile` runs the command under cProfile and writes `<run>.prof` into
+  data/03_output/profiles/<run>_<timestamp>/ (open it with snakeviz or
+  `python -m pstats`). A short table of the top cumulative functions is
+  printed to stderr on exit.
+- `--profile-stacks` additionally samples the stacks of all threads and writes
+  flamegraph-compatible collapsed stacks (`<run>.collapsed` with one root
+  frame per stage, plus one `<stage>.collapsed` per stage), for
+  flamegraph.pl, speedscope or inferno.
+
+Python only allows one cProfile profiler per process at a time (on 3.12+ it
+sees every thread), so the cProfile stats cover the whole invocation; the
+per-stage split comes from the sampled stacks, which are labelled with the
+instrumented stage (see hypermvp.utils.instrumentation) each thread is in.
+
+Plain English:
+Add `--profile` to any hypermvp command to find out where a slow run spends its time.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from hypermvp.global_config import PROFILES_DIR
+from hypermvp.utils.instrumentation import active_stages
+
+# Seconds between stack samples for --profile-stacks
+STACK_SAMPLE_INTERVAL = 0.005
+# Functions listed in the summary printed on exit
+SUMMARY_TOP = 15
+# Blocking waits of idle threads (samplers, thread pools); left out of the summary only
+IDLE_FUNCTIONS = {("threading.py", "wait"), ("~", "<method 'acquire' of '_thread.lock' objects>")}
+
+def add_profile_arguments(parser):
+    """Add --profile and --profile-stacks to an argparse parser."""
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Profile the run with cProfile and print the top functions (output in {PROFILES_DIR})"
+    )
+    parser.add_argument(
+        "--profile-stacks",
+        action="store_true",
+        help="With --profile: also write flamegraph-compatible collapsed stacks per stage"
+    )
+    return parser
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """
+    Samples the stacks of all threads in the background.
+
+    Each sample is stored as a collapsed stack (`root;caller;...;leaf`),
+    rooted at the stage the thread was in (or its thread name).
+    """
+
+    def __init__(self, interval: float = STACK_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Dict[str, Counter] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stages = active_stages()
+            for ident, frame in sys._current_frames().items():
+                if ident == own or names.get(ident) in ("rss-sampler", "stack-sampler"):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stage = stages.get(ident, names.get(ident, "thread"))
+                self.samples.setdefault(stage, Counter())[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, output_dir: str, run_name: str):
+        """Write one collapsed file for the whole run and one per stage."""
+        combined = os.path.join(output_dir, f"{run_name}.collapsed")
+        with open(combined, "w", encoding="utf-8") as all_stacks:
+            for stage, counts in sorted(self.samples.items()):
+                safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", stage)
+                with open(os.path.join(output_dir, f"{safe_name}.collapsed"), "w", encoding="utf-8") as f:
+                    for stack, count in counts.most_common():
+                        f.write(f"{stack} {count}\n")
+                        all_stacks.write(f"{stage.replace(' ', '_')};{stack} {count}\n")
+        return combined
+
+def format_summary(stats: pstats.Stats, top: int = SUMMARY_TOP) -> str:
+    """Return a small table of the functions with the highest cumulative time (idle waits left out)."""
+    stats.sort_stats("cumulative")
+    lines = [f"{'cumtime':>9} {'tottime':>9} {'calls':>9}  function"]
+    busy = [f for f in stats.fcn_list if (os.path.basename(f[0]), f[2]) not in IDLE_FUNCTIONS]
+    for func in busy[:top]:
+        _, calls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        where = f"{os.path.basename(filename)}:{line}({name})" if line else name
+        lines.append(f"{cumtime:9.3f} {tottime:9.3f} {calls:9,}  {where}")
+    return "\n".join(lines)
+
+@contextmanager
+def profile_session(run_name: str, enabled: bool = True, stacks: bool = False,
+                    output_dir: str = PROFILES_DIR, top: int = SUMMARY_TOP) -> Iterator[Optional[str]]:
+    """
+    Profile the enclosed block (a no-op unless enabled).
+
+    Args:
+        run_name: Name of the command, used for the output folder and files
+        enabled: Whether to profile at all (pass args.profile)
+        stacks: Also sample collapsed stacks per stage
+        output_dir: Parent directory for the profile folders
+        top: Number of functions in the summary printed on exit
+
+    Yields:
+        str | None: The folder the profile is written to, or None when disabled
+    """
+    if not enabled:
+        yield None
+        return
+
+    run_dir = os.path.join(output_dir, f"{run_name}_{datetime.now():%Y%m%d_%H%M%S}")
+    os.makedirs(run_dir, exist_ok=True)
+    sampler = StackSampler() if stacks else None
+    profiler = cProfile.Profile()
+    if sampler:
+        sampler.start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield run_dir
+    finally:
+        profiler.disable()
+        seconds = time.perf_counter() - started
+        if sampler:
+            sampler.stop()
+        prof_path = os.path.join(run_dir, f"{run_name}.prof")
+        profiler.dump_stats(prof_path)
+        written = [prof_path]
+        if sampler:
+            written.append(sampler.write(run_dir, run_name))
+
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        print(
+            f"\n=== Profile: {run_name} ({seconds:.2f} s) ===\n{format_summary(stats, top)}\n"
+            f"Profile written to {', '.join(written)}",
+            file=sys.stderr,
+        )
@@ -0,0 +1,432 @@
+"""Deduplicated Parquet snapshots of a DuckDB database.
+
+The original snapshots (see db_versioning.create_duckdb_snapshot) gzip a full
+copy of the database file on every save. This store keeps each table as
+zstd-compressed Parquet, split by delivery month, and addresses every piece
+by a fingerprint of its contents:
+
+    snapshots/<db name>/
+        manifests/<snapshot name>.json   tables, schemas, sequences, pieces
+        objects/ab/<fingerprint>_0.parquet
+
+A piece whose fingerprint already exists is not written again, so a snapshot
+after a one-month aFRR update only exports that month. Fingerprints come from
+a hash aggregate that DuckDB computes in one scan, and the Parquet export runs
+on all DuckDB threads, which compress row groups in parallel.
+
+Plain English:
+A snapshot only stores what changed since the last one, and restoring is
+just reading Parquet files back into a fresh database.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from hypermvp.global_config import AFRR_DATE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+UNPARTITIONED = "all"
+# Column used for the delivery date of each row, in order of preference
+DELIVERY_DATE_COLUMNS = {
+    "DELIVERY_DATE": 'TRY_CAST("DELIVERY_DATE" AS DATE)',
+    "Datum": (
+        f"COALESCE(TRY_STRPTIME(CAST(\"Datum\" AS VARCHAR), '{AFRR_DATE_FORMAT}')::DATE, "
+        'TRY_CAST("Datum" AS DATE))'
+    ),
+    "date": 'TRY_CAST("date" AS DATE)',
+}
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for use in SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+def delivery_date_expression(columns) -> Optional[str]:
+    """
+    Return a SQL expression for a row's delivery date, or None if the table has none.
+
+    Covers the provider tables (DELIVERY_DATE), afrr_data (German "Datum"
+    strings) and marginal_prices (date).
+    """
+    for column, expression in DELIVERY_DATE_COLUMNS.items():
+        if column in columns:
+            return expression
+    return None
+
+def list_tables(conn) -> List[Dict]:
+    """Return name, CREATE statement and columns for every base table in the current database."""
+    rows = conn.execute("""
+        SELECT table_name, sql
+        FROM duckdb_tables()
+        WHERE database_name = current_database() AND schema_name = 'main' AND NOT temporary
+        ORDER BY table_name
+    """).fetchall()
+    tables = []
+    for name, sql in rows:
+        columns = [row[0] for row in conn.execute(
+            "SELECT column_name FROM duckdb_columns() "
+            "WHERE database_name = current_database() AND schema_name = 'main' AND table_name = ? "
+            "ORDER BY column_index",
+            [name],
+        ).fetchall()]
+        tables.append({"name": name, "sql": sql, "columns": columns})
+    return tables
+
+def partition_fingerprints(conn, table: Dict) -> List[Dict]:
+    """
+    Fingerprint a table's delivery-month partitions with one hash-aggregate scan.
+
+    Returns:
+        One {"key", "rows", "fingerprint"} dict per partition, sorted by key
+    """
+    date_expr = delivery_date_expression(table["columns"])
+    key_expr = (
+        f"COALESCE(strftime({date_expr}, '%Y-%m'), 'undated')"
+        if date_expr else f"'{UNPARTITIONED}'"
+    )
+    rows = conn.execute(f"""
+        SELECT {key_expr} AS partition_key,
+               COUNT(*) AS row_count,
+               CAST(SUM(CAST(hash(__row) AS HUGEINT)) AS VARCHAR) AS row_hash_sum
+        FROM {quote_identifier(table['name'])} AS __row
+        GROUP BY partition_key
+        ORDER BY partition_key
+    """).fetchall()
+    partitions = []
+    for key, row_count, hash_sum in rows:
+        digest = hashlib.sha256(
+            f"{table['sql']}|{key}|{row_count}|{hash_sum}".encode("utf-8")
+        ).hexdigest()
+        partitions.append({"key": key, "rows": row_count, "fingerprint": digest})
+    return partitions
+
+class SnapshotStore:
+    """
+    Content-addressed snapshot store for one DuckDB database file.
+
+    Args:
+        db_path: Database the snapshots belong to
+        root: Snapshot directory (default: "snapshots" next to the database)
+        threads: DuckDB threads used for hashing and Parquet compression
+    """
+
+    def __init__(self, db_path, root=None, threads: Optional[int] = None):
+        self.db_path = Path(db_path)
+        self.db_name = self.db_path.stem
+        base = Path(root) if root else self.db_path.parent / "snapshots"
+        self.root = base / self.db_name
+        self.objects_dir = self.root / "objects"
+        self.manifests_dir = self.root / "manifests"
+        self.threads = threads or os.cpu_count() or 1
+
+    def _object_files(self, fingerprint: str) -> List[Path]:
+        return sorted((self.objects_dir / fingerprint[:2]).glob(f"{fingerprint}_*.parquet"))
+
+    def manifest_path(self, name: str) -> Path:
+        return self.manifests_dir / f"{name}.json"
+
+    def list_snapshots(self) -> List[str]:
+        """Snapshot names, oldest first."""
+        if not self.manifests_dir.exists():
+            return []
+        return sorted(p.stem for p in self.manifests_dir.glob("*.json"))
+
+    def load_manifest(self, name: str) -> Dict:
+        """Read a snapshot manifest. Raises FileNotFoundError for unknown names."""
+        path = self.manifest_path(name)
+        if not path.exists():
+            raise FileNotFoundError(f"No snapshot named {name} in {self.root}")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _export_partitions(self, conn, table: Dict, partitions: List[Dict]):
+        """Write the given partitions of a table to Parquet objects in one COPY."""
+        staging = self.root / f".staging_{os.getpid()}_{time.time_ns()}"
+        name = quote_identifier(table["name"])
+        staging.mkdir(parents=True)
+        try:
+            if partitions[0]["key"] == UNPARTITIONED:
+                conn.execute(
+                    f"COPY {name} TO '{staging / 'data_0.parquet'}' "
+                    f"(FORMAT parquet, COMPRESSION zstd)"
+                )
+                written = {UNPARTITIONED: [staging / "data_0.parquet"]}
+            else:
+                date_expr = delivery_date_expression(table["columns"])
+                key_expr = f"COALESCE(strftime({date_expr}, '%Y-%m'), 'undated')"
+                keys = ", ".join(f"'{p['key']}'" for p in partitions)
+                conn.execute(f"""
+                    COPY (SELECT *, {key_expr} AS __snapshot_partition
+                          FROM {name} WHERE {key_expr} IN ({keys}))
+                    TO '{staging}' (FORMAT parquet, COMPRESSION zstd, PARTITION_BY (__snapshot_partition), OVERWRITE_OR_IGNORE)
+                """)
+                written = {
+                    p["key"]: sorted((staging / f"__snapshot_partition={p['key']}").glob("*.parquet"))
+                    for p in partitions
+                }
+
+            for partition in partitions:
+                target_dir = self.objects_dir / partition["fingerprint"][:2]
+                target_dir.mkdir(parents=True, exist_ok=True)
+                for index, source in enumerate(written[partition["key"]]):
+                    os.replace(source, target_dir / f"{partition['fingerprint']}_{index}.parquet")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def create(self, name: Optional[str] = None, conn=None) -> Dict:
+        """
+        Snapshot the database, exporting only partitions not already stored.
+
+        Args:
+            name: Snapshot name (default: <db name>_<timestamp>)
+            conn: Open connection to the database (default: connect to db_path)
+
+        Returns:
+            dict: The manifest, plus "exported"/"reused" partition counts
+        """
+        import duckdb
+
+        start = time.perf_counter()
+        name = name or f"{self.db_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        own_conn = conn is None
+        if own_conn:
+            conn = duckdb.connect(str(self.db_path))
+        exported = reused = 0
+        try:
+            conn.execute(f"SET threads = {int(self.threads)}")
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "name": name,
+                "created_at": datetime.now().isoformat(),
+                "database": str(self.db_path),
+                "tables": [],
+                "sequences": [
+                    {"name": seq_name, "sql": sql}
+                    for seq_name, sql in conn.execute(
+                        "SELECT sequence_name, sql FROM duckdb_sequences() "
+                        "WHERE database_name = current_database() AND schema_name = 'main'"
+                    ).fetchall()
+                ],
+                "views": [
+                    sql for (sql,) in conn.execute(
+                        "SELECT sql FROM duckdb_views() "
+                        "WHERE database_name = current_database() AND NOT internal"
+                    ).fetchall()
+                ],
+            }
+            for table in list_tables(conn):
+                partitions = partition_fingerprints(conn, table)
+                missing = [p for p in partitions if not self._object_files(p["fingerprint"])]
+                if missing:
+                    self._export_partitions(conn, table, missing)
+                exported += len(missing)
+                reused += len(partitions) - len(missing)
+                for partition in partitions:
+                    partition["files"] = [
+                        str(path.relative_to(self.root)) for path in self._object_files(partition["fingerprint"])
+                    ]
+                manifest["tables"].append({
+                    "name": table["name"],
+                    "sql": table["sql"],
+                    "rows": sum(p["rows"] for p in partitions),
+                    "partitions": partitions,
+                })
+        finally:
+            if own_conn:
+                conn.close()
+
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.manifest_path(name).with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, self.manifest_path(name))
+
+        logger.info(
+            f"Created snapshot {name}: {exported} partition(s) exported, {reused} reused "
+            f"in {time.perf_counter() - start:.2f} seconds"
+        )
+        return {**manifest, "exported": exported, "reused": reused}
+
+    def restore(self, name: str, target_path, validate: bool = True) -> Path:
+        """
+        Rebuild a database file from a snapshot.
+
+        The Parquet objects are streamed into a temporary database, checked
+        against the manifest and only then moved into place, so a failed
+        restore never leaves a half-written database behind.
+
+        Args:
+            name: Snapshot to restore
+            target_path: Database file to create or replace
+            validate: Re-fingerprint every restored partition and compare
+                it with the manifest
+
+        Returns:
+            Path of the restored database
+
+        Raises:
+            ValueError: If the restored data does not match the manifest
+        """
+        import duckdb
+
+        manifest = self.load_manifest(name)
+        target_path = Path(target_path)
+        temp_path = target_path.with_name(target_path.name + ".restore")
+        temp_path.unlink(missing_ok=True)
+        conn = duckdb.connect(str(temp_path))
+        try:
+            conn.execute(f"SET threads = {int(self.threads)}")
+            for sequence in manifest["sequences"]:
+                conn.execute(sequence["sql"])
+            for table in manifest["tables"]:
+                conn.execute(table["sql"])
+                files = self.table_files(manifest, table["name"])
+                if files:
+                    conn.execute(
+                        f"INSERT INTO {quote_identifier(table['name'])} "
+                        f"SELECT * FROM read_parquet(?, hive_partitioning = false)",
+                        [files],
+                    )
+            for view_sql in manifest["views"]:
+                conn.execute(view_sql)
+            if validate:
+                self._validate(conn, manifest)
+            conn.execute("CHECKPOINT")
+        except Exception:
+            conn.close()
+            temp_path.unlink(missing_ok=True)
+            raise
+        conn.close()
+        # A write-ahead log left by the old database would be replayed onto the restored one
+        target_path.with_name(target_path.name + ".wal").unlink(missing_ok=True)
+        os.replace(temp_path, target_path)
+        return target_path
+
+    def _validate(self, conn, manifest: Dict):
+        """Compare restored tables with the manifest's partition fingerprints."""
+        restored = {table["name"]: table for table in list_tables(conn)}
+        for table in manifest["tables"]:
+            expected = [(p["key"], p["rows"], p["fingerprint"]) for p in table["partitions"]]
+            actual = [
+                (p["key"], p["rows"], p["fingerprint"])
+                for p in partition_fingerprints(conn, restored[table["name"]])
+            ]
+            if actual != expected:
+                raise ValueError(
+                    f"Restored table {table['name']} does not match snapshot {manifest['name']}"
+                )
+
+    def table_files(self, manifest: Dict, table_name: str) -> List[str]:
+        """Absolute paths of the Parquet objects holding a table in a snapshot."""
+        for table in manifest["tables"]:
+            if table["name"] == table_name:
+                return [str(self.root / f) for p in table["partitions"] for f in p["files"]]
+        return []
+
+    def _date_aggregates(self, conn, table: Dict, keys) -> Dict:
+        """Row count and hash sum per delivery date, for the given partitions of a table."""
+        files = [
+            str(self.root / f)
+            for p in table["partitions"] if p["key"] in keys
+            for f in p["files"]
+        ]
+        if not files:
+            return {}
+        columns = [row[0] for row in conn.execute(
+            "DESCRIBE SELECT * FROM read_parquet(?, hive_partitioning = false)", [files]
+        ).fetchall()]
+        date_expr = delivery_date_expression(columns) or "NULL"
+        rows = conn.execute(f"""
+            SELECT {date_expr} AS delivery_date,
+                   COUNT(*),
+                   CAST(SUM(CAST(hash(__row) AS HUGEINT)) AS VARCHAR)
+            FROM read_parquet(?, hive_partitioning = false) AS __row
+            GROUP BY delivery_date
+        """, [files]).fetchall()
+        return {delivery_date: (count, hash_sum) for delivery_date, count, hash_sum in rows}
+
+    def diff(self, a: str, b: str) -> List[Dict]:
+        """
+        Compare two snapshots table by table and delivery date by delivery date.
+
+        Partitions with the same fingerprint in both snapshots are skipped
+        without reading any data. Changed partitions are summarised with a
+        hash aggregate per delivery date, streamed straight from the Parquet
+        files, so neither snapshot is loaded into memory.
+
+        Returns:
+            One dict per changed (table, delivery date): table, delivery_date,
+            rows_a, rows_b, row_delta and content_changed (same row count but
+            different values)
+        """
+        import duckdb
+
+        manifest_a, manifest_b = self.load_manifest(a), self.load_manifest(b)
+        tables_a = {t["name"]: t for t in manifest_a["tables"]}
+        tables_b = {t["name"]: t for t in manifest_b["tables"]}
+        empty = {"partitions": []}
+        changes = []
+        conn = duckdb.connect()
+        try:
+            conn.execute(f"SET threads = {int(self.threads)}")
+            for table_name in sorted(set(tables_a) | set(tables_b)):
+                table_a = tables_a.get(table_name, empty)
+                table_b = tables_b.get(table_name, empty)
+                parts_a = {p["key"]: p["fingerprint"] for p in table_a["partitions"]}
+                parts_b = {p["key"]: p["fingerprint"] for p in table_b["partitions"]}
+                changed_keys = {
+                    key for key in set(parts_a) | set(parts_b)
+                    if parts_a.get(key) != parts_b.get(key)
+                }
+                if not changed_keys:
+                    continue
+                dates_a = self._date_aggregates(conn, table_a, changed_keys)
+                dates_b = self._date_aggregates(conn, table_b, changed_keys)
+                for delivery_date in sorted(set(dates_a) | set(dates_b), key=lambda d: (d is None, d)):
+                    rows_a, hash_a = dates_a.get(delivery_date, (0, None))
+                    rows_b, hash_b = dates_b.get(delivery_date, (0, None))
+                    if rows_a == rows_b and hash_a == hash_b:
+                        continue
+                    changes.append({
+                        "table": table_name,
+                        "delivery_date": delivery_date,
+                        "rows_a": rows_a,
+                        "rows_b": rows_b,
+                        "row_delta": rows_b - rows_a,
+                        "content_changed": rows_a == rows_b,
+                    })
+        finally:
+            conn.close()
+        return changes
+
+    def prune(self, keep: int = 3) -> int:
+        """
+        Keep the newest `keep` snapshots and delete objects no manifest uses.
+
+        Returns:
+            Number of snapshots removed
+        """
+        snapshots = self.list_snapshots()
+        removed = snapshots[:-keep] if keep > 0 else snapshots
+        for name in removed:
+            self.manifest_path(name).unlink(missing_ok=True)
+            logger.info(f"Removed old snapshot: {name}")
+
+        referenced = set()
+        for name in self.list_snapshots():
+            for table in self.load_manifest(name)["tables"]:
+                for partition in table["partitions"]:
+                    referenced.update(partition["files"])
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob("*/*.parquet"):
+                if str(path.relative_to(self.root)) not in referenced:
+                    path.unlink()
+        return len(removed)
@@ -0,0 +1,308 @@
+"""
+Traced DuckDB connections and per-run slow-query reports.
+
+`connect()` returns a drop-in wrapper around `duckdb.connect()`. Every
+statement run through it is logged on the "hypermvp.sql" logger (DEBUG) with
+its parameters, duration and the number of rows fetched. Statements slower
+than SLOW_QUERY_SECONDS are logged as warnings and, for read-only queries,
+profiled once with `EXPLAIN (ANALYZE, FORMAT JSON)`.
+
+While a `query_trace()` is open, all statements from all threads are
+aggregated and a JSON report is written at the end: the statements that
+took the most total time plus every slow query with its captured plan.
+
+Plain English:
+Use `traced_duckdb.connect(db_path)` instead of `duckdb.connect(db_path)` and
+wrap a run in `query_trace("main_all")` to see which queries dominate it.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import duckdb
+
+from hypermvp.global_config import QUERY_REPORTS_DIR
+
+logger = logging.getLogger("hypermvp.sql")
+
+# Statements slower than this (execute + fetch) count as slow queries
+SLOW_QUERY_SECONDS = 1.0
+# Most EXPLAIN ANALYZE profiles captured per run (one per distinct statement)
+MAX_PROFILES_PER_RUN = 20
+# Longest SQL / parameter text kept in logs and reports
+MAX_TEXT_LENGTH = 500
+
+
+def _is_read_only(sql: str) -> bool:
+    """Return True for a single SELECT statement (a WITH ... INSERT is a write), judged by DuckDB's parser."""
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error:
+        return False
+    return len(statements) == 1 and statements[0].type == duckdb.StatementType.SELECT
+
+def _shorten(value: Any) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    text = " ".join(text.split())
+    return text if len(text) <= MAX_TEXT_LENGTH else text[:MAX_TEXT_LENGTH] + "..."
+
+def _count_rows(value: Any) -> Optional[int]:
+    if value is None:
+        return 0
+    if isinstance(value, tuple):
+        return 1
+    if isinstance(value, dict):  # fetchnumpy: column name -> array
+        return len(next(iter(value.values()), []))
+    if hasattr(value, "num_rows"):  # pyarrow.Table
+        return value.num_rows
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+class QueryTrace:
+    """Aggregates the statements of one run (from any thread)."""
+
+    def __init__(self, name: str, slow_seconds: float = SLOW_QUERY_SECONDS,
+                 max_profiles: int = MAX_PROFILES_PER_RUN):
+        self.name = name
+        self.slow_seconds = slow_seconds
+        self.max_profiles = max_profiles
+        self.started_at = datetime.now()
+        self.statements: Dict[str, Dict[str, Any]] = {}
+        self.slow_queries: List[Dict[str, Any]] = []
+        self._profiled = set()
+        self._lock = threading.Lock()
+
+    def add(self, record: "QueryRecord"):
+        with self._lock:
+            stats = self.statements.setdefault(record.sql, {
+                "sql": _shorten(record.sql), "calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "rows": 0,
+            })
+            stats["calls"] += 1
+            stats["total_seconds"] += record.seconds
+            stats["max_seconds"] = max(stats["max_seconds"], record.seconds)
+            stats["rows"] += record.rows or 0
+
+    def should_profile(self, record: "QueryRecord") -> bool:
+        with self._lock:
+            if record.sql in self._profiled or len(self._profiled) >= self.max_profiles:
+                return False
+            self._profiled.add(record.sql)
+            return True
+
+    def add_slow(self, entry: Dict[str, Any]):
+        with self._lock:
+            self.slow_queries.append(entry)
+
+    def to_dict(self, top: int = 25) -> Dict[str, Any]:
+        statements = sorted(self.statements.values(), key=lambda s: s["total_seconds"], reverse=True)
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "slow_query_seconds": self.slow_seconds,
+            "statements": sum(s["calls"] for s in statements),
+            "distinct_statements": len(statements),
+            "total_seconds": round(sum(s["total_seconds"] for s in statements), 4),
+            "top_statements": [
+                {**s, "total_seconds": round(s["total_seconds"], 4), "max_seconds": round(s["max_seconds"], 4)}
+                for s in statements[:top]
+            ],
+            "slow_queries": self.slow_queries,
+        }
+
+    def write(self, output_dir: str = QUERY_REPORTS_DIR) -> str:
+        """Write the slow-query report as JSON and return the file path."""
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{self.name}_{self.started_at:%Y%m%d_%H%M%S_%f}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+
+_current_trace: Optional[QueryTrace] = None
+
+def current_trace() -> Optional[QueryTrace]:
+    """Return the query trace that is currently collecting statements, if any."""
+    return _current_trace
+
+@contextmanager
+def query_trace(name: str, output_dir: Optional[str] = QUERY_REPORTS_DIR,
+                slow_seconds: float = SLOW_QUERY_SECONDS) -> Iterator[QueryTrace]:
+    """
+    Collect every traced statement of a run and write a slow-query report.
+
+    Args:
+        name: Run name, e.g. "main_all"
+        output_dir: Directory for the JSON report (None = collect only, don't write)
+        slow_seconds: Threshold above which a statement is reported and profiled
+
+    Yields:
+        QueryTrace: The trace being collected
+    """
+    global _current_trace
+    trace = QueryTrace(name, slow_seconds=slow_seconds)
+    previous, _current_trace = _current_trace, trace
+    try:
+        yield trace
+    finally:
+        _current_trace = previous
+        if output_dir:
+            path = trace.write(output_dir)
+            logging.info(
+                f"Query report written to {path} ({len(trace.slow_queries)} slow of "
+                f"{sum(s['calls'] for s in trace.statements.values()):,} statements)"
+            )
+
+
+class QueryRecord:
+    """One executed statement; finished once its rows are fetched or the next statement starts."""
+
+    def __init__(self, sql: str, params: Any, seconds: float):
+        self.sql = sql
+        self.params = params
+        self.seconds = seconds
+        self.rows: Optional[int] = None
+        self.done = False
+        # The trace that was open when the statement ran gets it, even if it is finished later
+        self.trace = current_trace()
+
+
+class TracedResult:
+    """
+    Result of `TracedConnection.execute`. Fetch methods count the rows and add
+    the fetch time to the statement; everything else goes to the connection.
+    """
+
+    _FETCHES = ("fetchone", "fetchall", "fetchmany", "fetchdf", "df", "fetch_df", "pl",
+                "arrow", "fetch_arrow_table", "to_arrow_table", "fetchnumpy")
+
+    def __init__(self, connection: "TracedConnection", result, record: QueryRecord):
+        self._connection = connection
+        self._result = result
+        self._record = record
+
+    def __getattr__(self, name):
+        attr = getattr(self._result, name)
+        if name not in self._FETCHES or not callable(attr):
+            return attr
+
+        def fetch(*args, **kwargs):
+            started = time.perf_counter()
+            value = attr(*args, **kwargs)
+            record = self._record
+            record.seconds += time.perf_counter() - started
+            rows = _count_rows(value)
+            if name in ("fetchone", "fetchmany"):
+                # Row-by-row fetching: keep counting, finish with the next statement
+                record.rows = (record.rows or 0) + (rows or 0)
+            else:
+                record.rows = rows
+                self._connection._finish(record)
+            return value
+        return fetch
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+
+class TracedConnection:
+    """
+    Wrapper around a DuckDB connection that traces `execute`.
+
+    Anything else (register, close, cursor, ...) is passed straight through, so
+    existing code works unchanged.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, label: str = ""):
+        self._conn = conn
+        self._label = label
+        self._pending: Optional[QueryRecord] = None
+
+    @property
+    def raw(self) -> duckdb.DuckDBPyConnection:
+        """The wrapped DuckDB connection."""
+        return self._conn
+
+    def execute(self, query: str, parameters: Any = None) -> TracedResult:
+        self._finish(self._pending)
+        started = time.perf_counter()
+        if parameters is None:
+            result = self._conn.execute(query)
+        else:
+            result = self._conn.execute(query, parameters)
+        record = QueryRecord(query, parameters, time.perf_counter() - started)
+        self._pending = record
+        return TracedResult(self, result, record)
+
+    def _finish(self, record: Optional[QueryRecord]):
+        if record is None or record.done:
+            return
+        record.done = True
+        if record is self._pending:
+            self._pending = None
+        params = f" params={_shorten(record.params)}" if record.params is not None else ""
+        rows = f" rows={record.rows:,}" if record.rows is not None else ""
+        logger.debug(f"{record.seconds * 1000:.1f} ms{rows}{params} | {_shorten(record.sql)}")
+
+        trace = record.trace
+        threshold = trace.slow_seconds if trace else SLOW_QUERY_SECONDS
+        if trace:
+            trace.add(record)
+        if record.seconds < threshold:
+            return
+        logger.warning(f"Slow query ({record.seconds:.2f}s{rows}){self._label}: {_shorten(record.sql)}")
+        if trace:
+            entry = {
+                "sql": _shorten(record.sql),
+                "params": _shorten(record.params) if record.params is not None else None,
+                "seconds": round(record.seconds, 4),
+                "rows": record.rows,
+                "at": datetime.now().isoformat(timespec="milliseconds"),
+            }
+            if _is_read_only(record.sql) and trace.should_profile(record):
+                entry["profile"] = self._profile(record)
+            trace.add_slow(entry)
+
+    def _profile(self, record: QueryRecord) -> Any:
+        """Re-run a read-only statement under EXPLAIN ANALYZE and return the profile."""
+        try:
+            if record.params is None:
+                rows = self._conn.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {record.sql}").fetchall()
+            else:
+                rows = self._conn.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {record.sql}", record.params).fetchall()
+            return json.loads(rows[0][-1])
+        except (duckdb.Error, ValueError) as e:
+            logger.debug(f"Could not profile slow query: {e}")
+            return None
+
+    def close(self):
+        self._finish(self._pending)
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+def connect(database: str = ":memory:", read_only: bool = False, **kwargs) -> TracedConnection:
+    """
+    Open a traced DuckDB connection (same arguments as duckdb.connect).
+
+    Returns:
+        TracedConnection: Wrapper that logs and times every statement
+    """
+    conn = duckdb.connect(database, read_only=read_only, **kwargs)
+    return TracedConnection(conn, label=f" [{os.path.basename(str(database))}]")
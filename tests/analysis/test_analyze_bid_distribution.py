@@ -0,0 +1,46 @@
+"""
+Tests for the batch bid distribution analysis.
+
+Uses a temporary DuckDB database with a small provider_data table covering two days.
+"""
+import duckdb
+import pytest
+
+from hypermvp.analysis.analyze_bid_distribution import analyze_bid_distribution_batch
+
+@pytest.fixture
+def provider_db(tmp_path):
+    """Two days of NEG bids: day one is consistent, day two has an extra bid on NEG_002."""
+    db_path = tmp_path / "bids.duckdb"
+    con = duckdb.connect(str(db_path))
+    con.execute("CREATE TABLE provider_data (DELIVERY_DATE VARCHAR, PRODUCT VARCHAR)")
+    rows = []
+    for day in ["2024-09-01", "2024-09-02"]:
+        for interval in range(1, 33):  # first two 4-hour blocks
+            bids = 3 if (day == "2024-09-02" and interval == 2) else 2
+            rows += [(day, f"NEG_{interval:03d}")] * bids
+    rows.append(("2024-09-01", "POS_001"))
+    con.executemany("INSERT INTO provider_data VALUES (?, ?)", rows)
+    con.close()
+    return str(db_path)
+
+def test_batch_counts_products_per_day(provider_db):
+    result = analyze_bid_distribution_batch("2024-09-01", "2024-09-02", db_path=provider_db)
+    product_counts = result["product_counts"]
+    assert len(product_counts) == 64  # 32 NEG products on each of 2 days
+    assert set(product_counts["block"]) == {"00:00-04:00", "04:00-08:00"}
+    assert product_counts.loc[0, "time"] == "00:00"
+
+def test_batch_block_stats_and_inconsistencies(provider_db):
+    result = analyze_bid_distribution_batch("2024-09-01", "2024-09-02", db_path=provider_db)
+    block_stats = result["block_stats"]
+    assert len(block_stats) == 4  # 2 blocks x 2 days
+    assert block_stats["count"].tolist() == [16, 16, 16, 16]
+    inconsistencies = result["inconsistencies"]
+    assert inconsistencies["PRODUCT"].tolist() == ["NEG_002"]
+    assert inconsistencies.loc[0, "block_max"] == 3
+
+def test_batch_respects_date_range(provider_db):
+    result = analyze_bid_distribution_batch("2024-09-01", db_path=provider_db)
+    assert result["product_counts"]["date"].nunique() == 1
+    assert result["inconsistencies"].empty
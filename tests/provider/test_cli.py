@@ -30,7 +30,8 @@ def test_cli_runs_and_loads(monkeypatch):
             "python", "-m", "src.hypermvp.provider.provider_cli",
             "--input-dir", tmpdir,
             "--db-path", str(db_path),
-            "--log-level", "INFO"
+            "--log-level", "INFO",
+            "--no-sheet-cache"
         ]
 
         # Run the CLI as a subprocess
@@ -37,4 +37,166 @@ def test_run_etl(sample_excel_files, tmp_path):
     conn = duckdb.connect(str(db_path))
     result = conn.execute("SELECT * FROM provider_raw").fetchall()
     assert len(result) == 1
-    conn.close()
\ No newline at end of file
+    conn.close()
+def write_provider_file(path, dates, price):
+    import pandas as pd
+    pd.DataFrame({
+        "DELIVERY_DATE": dates,
+        "PRODUCT": ["NEG_001"] * len(dates),
+        "ENERGY_PRICE_[EUR/MWh]": [price] * len(dates),
+        "ENERGY_PRICE_PAYMENT_DIRECTION": ["GRID_TO_PROVIDER"] * len(dates),
+        "ALLOCATED_CAPACITY_[MW]": [5.0] * len(dates),
+        "NOTE": [""] * len(dates),
+    }).to_excel(path, index=False)
+    return str(path)
+
+def test_run_etl_with_memory_budget_flushes_per_file(tmp_path):
+    from hypermvp.utils.memory_budget import MemoryBudget
+
+    files = [
+        write_provider_file(tmp_path / "jan.xlsx", ["2024-01-01", "2024-01-02"], 10.0),
+        write_provider_file(tmp_path / "feb.xlsx", ["2024-02-01"], 20.0),
+        # Same day as jan.xlsx, loaded in a later batch of the same run: both are kept
+        write_provider_file(tmp_path / "jan_extra.xlsx", ["2024-01-02"], 30.0),
+    ]
+    db_path = str(tmp_path / "test.duckdb")
+    conn = duckdb.connect(db_path)
+    etl.create_table_if_not_exists(conn, "provider_raw", etl.RAW_TABLE_SCHEMA)
+    conn.execute("""
+        INSERT INTO provider_raw (DELIVERY_DATE, PRODUCT, "ENERGY_PRICE_[EUR/MWh]")
+        VALUES ('2024-01-01', 'OLD', 1.0), ('2024-03-01', 'KEEP', 1.0)
+    """)
+    conn.close()
+
+    # A budget this small flushes after every file
+    summary = etl.run_etl(files, db_path=db_path, memory_budget=MemoryBudget(1))
+
+    assert summary["batches"] == 3
+    assert summary["rows_loaded"] == 4
+    assert summary["months"] == {"2024-01", "2024-02"}
+    conn = duckdb.connect(db_path)
+    rows = conn.execute("""
+        SELECT DELIVERY_DATE, PRODUCT, "ENERGY_PRICE_[EUR/MWh]", load_timestamp IS NOT NULL
+        FROM provider_raw ORDER BY ALL
+    """).fetchall()
+    conn.close()
+    assert rows == [
+        ("2024-01-01", "NEG_001", 10.0, True),
+        ("2024-01-02", "NEG_001", 10.0, True),
+        ("2024-01-02", "NEG_001", 30.0, True),
+        ("2024-02-01", "NEG_001", 20.0, True),
+        ("2024-03-01", "KEEP", 1.0, False),
+    ]
+
+def test_run_etl_with_memory_budget_rolls_back_failed_batch(tmp_path, monkeypatch):
+    from hypermvp.utils.memory_budget import MemoryBudget
+
+    files = [
+        write_provider_file(tmp_path / "jan.xlsx", ["2024-01-01"], 10.0),
+        write_provider_file(tmp_path / "feb.xlsx", ["2024-02-01"], 20.0),
+    ]
+    db_path = str(tmp_path / "test.duckdb")
+    etl.run_etl(files, db_path=db_path)
+
+    calls = []
+    original = etl.insert_dataframes
+
+    def failing_insert(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(etl, "insert_dataframes", failing_insert)
+    with pytest.raises(RuntimeError):
+        etl.run_etl(files, db_path=db_path, memory_budget=MemoryBudget(1))
+
+    # January was replaced by the first batch; February's delete was rolled back
+    conn = duckdb.connect(db_path)
+    rows = conn.execute(
+        "SELECT DELIVERY_DATE, load_timestamp IS NOT NULL FROM provider_raw ORDER BY 1"
+    ).fetchall()
+    conn.close()
+    assert rows == [("2024-01-01", True), ("2024-02-01", False)]
+
+def test_run_etl_with_memory_budget_streams_large_workbooks(tmp_path):
+    import pandas as pd
+    from hypermvp.utils.memory_budget import MemoryBudget, MIN_CHUNK_ROWS
+
+    path = tmp_path / "big.xlsx"
+    dates = [f"2024-01-{day:02d}" for day in range(1, 26) for _ in range(100)]
+    data = pd.DataFrame({
+        "DELIVERY_DATE": dates,
+        "PRODUCT": ["NEG_001"] * len(dates),
+        "ENERGY_PRICE_[EUR/MWh]": [10.0] * len(dates),
+        "ENERGY_PRICE_PAYMENT_DIRECTION": ["GRID_TO_PROVIDER"] * len(dates),
+        "ALLOCATED_CAPACITY_[MW]": [5.0] * len(dates),
+        "NOTE": [None] * (len(dates) - 1) + ["last row"],
+    })
+    with pd.ExcelWriter(path) as writer:
+        data.to_excel(writer, sheet_name="Bids", index=False)
+        data[["PRODUCT"]].to_excel(writer, sheet_name="Broken", index=False)
+    db_path = str(tmp_path / "test.duckdb")
+
+    # Too small for calamine: the workbook is read (and written) MIN_CHUNK_ROWS rows at a time
+    summary = etl.run_etl([str(path)], db_path=db_path, memory_budget=MemoryBudget(1))
+
+    assert summary["batches"] == -(-len(dates) // MIN_CHUNK_ROWS) == 3
+    assert summary["rows_loaded"] == len(dates)
+    assert summary["sheets_loaded"] == 1
+    assert [error["sheet"] for error in summary["errors"]] == ["Broken"]
+    conn = duckdb.connect(db_path)
+    counts = conn.execute("""
+        SELECT COUNT(*), COUNT(DISTINCT DELIVERY_DATE), COUNT(NOTE), COUNT(DISTINCT load_timestamp)
+        FROM provider_raw
+    """).fetchone()
+    conn.close()
+    assert counts == (len(dates), 25, 1, 1)
+
+def test_run_etl_with_large_budget_loads_one_batch(sample_excel_files, tmp_path):
+    summary = etl.run_etl(sample_excel_files, db_path=str(tmp_path / "test.duckdb"), memory_budget="auto")
+    assert summary["batches"] == 1
+    assert summary["rows_loaded"] == 1
+    assert len(summary["errors"]) == 1
+
+def test_run_etl_reuses_sheet_cache(sample_excel_files, tmp_path, monkeypatch):
+    from hypermvp.provider import extractor
+    from hypermvp.provider.sheet_cache import SheetCache
+
+    cache = SheetCache(str(tmp_path / "cache"))
+    db_path = str(tmp_path / "test.duckdb")
+    first = etl.run_etl(sample_excel_files, db_path=db_path, sheet_cache=cache)
+
+    def no_decode(filepath):
+        raise AssertionError("decoded again")
+
+    monkeypatch.setattr(extractor, "_decode_excel_file", no_decode)
+    second = etl.run_etl(sample_excel_files, db_path=db_path, sheet_cache=cache)
+
+    assert second["rows_loaded"] == first["rows_loaded"] == 1
+    assert second["errors"] == first["errors"]
+
+def test_extract_provider_data_in_worker_processes(tmp_path, monkeypatch):
+    import concurrent.futures
+
+    start_methods = []
+
+    class RecordingPool(concurrent.futures.ProcessPoolExecutor):
+        def __init__(self, *args, mp_context=None, **kwargs):
+            start_methods.append(mp_context.get_start_method() if mp_context else None)
+            super().__init__(*args, mp_context=mp_context, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", RecordingPool)
+    files = [
+        write_provider_file(tmp_path / "jan.xlsx", ["2024-01-01", "2024-01-02"], 10.0),
+        write_provider_file(tmp_path / "feb.xlsx", ["2024-02-01"], 20.0),
+        write_provider_file(tmp_path / "mar.xlsx", ["2024-03-01"], 30.0),
+    ]
+    result = etl.extract_provider_data(files, max_workers=2)
+
+    # Forking next to DuckDB/polars threads can deadlock the workers (--workflow all)
+    assert start_methods == ["spawn"]
+    assert result["rows"] == 4
+    assert result["errors"] == []
+    assert result["months"] == {"2024-01", "2024-02", "2024-03"}
+    assert sorted(df["source_file"][0] for df in result["frames"]) == sorted(files)
@@ -1,5 +1,6 @@
 import pytest
 import os
+import shutil
 import polars as pl
 from hypermvp.provider.extractor import read_excel_file, extract_excels
 
@@ -62,4 +63,47 @@ def test_read_excel_file_keeps_nonempty_last_column(tmp_path):
     df.to_excel(file_path, index=False)
     sheets = read_excel_file(str(file_path))
     for df in sheets.values():
-        assert "NOTE" in df.columns
\ No newline at end of file
+        assert "NOTE" in df.columns
+def zip_workbook(path, compression=None):
+    """Pack a workbook into <name>.zip next to it, as the provider platform publishes it."""
+    import zipfile
+    archive = f"{path}.zip"
+    with zipfile.ZipFile(archive, "w", compression=compression or zipfile.ZIP_DEFLATED) as zf:
+        zf.write(path, os.path.basename(path))
+    return archive
+
+def test_read_excel_file_reads_zipped_workbook(sample_excel_file):
+    archive = zip_workbook(sample_excel_file)
+    os.remove(sample_excel_file)
+
+    sheets = read_excel_file(archive)
+
+    assert set(sheets) == {"Sheet1", "Sheet2"}
+    assert sheets["Sheet1"].shape == (2, 5)
+    assert sheets["Sheet2"]["DELIVERY_DATE"].to_list() == ["2024-01-03"]
+    # Nothing was extracted next to the archive
+    assert os.listdir(os.path.dirname(archive)) == [os.path.basename(archive)]
+
+def test_read_excel_file_rejects_archive_without_workbook(tmp_path):
+    import zipfile
+    archive = tmp_path / "empty.xlsx.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("readme.txt", "no workbook here")
+
+    with pytest.raises(ValueError, match="Expected one .xlsx"):
+        read_excel_file(str(archive))
+
+def test_find_excel_files_includes_archives_once(sample_excel_file, tmp_path):
+    from hypermvp.provider.extractor import find_excel_files
+    archive = zip_workbook(sample_excel_file)
+    other = zip_workbook(shutil.copy(sample_excel_file, tmp_path / "other.xlsx"))
+    os.remove(tmp_path / "other.xlsx")
+    (tmp_path / "notes.zip").write_bytes(b"")
+    # The archive is older than the workbook extracted from it
+    os.utime(archive, (1_000_000, 1_000_000))
+
+    assert find_excel_files(str(tmp_path)) == sorted([sample_excel_file, other])
+
+    os.utime(archive, None)
+    os.utime(sample_excel_file, (1_000_000, 1_000_000))
+    assert find_excel_files(str(tmp_path)) == sorted([archive, other])
@@ -11,7 +11,7 @@ Uses a temporary DuckDB database for isolation.
 import duckdb
 import pytest
 from pathlib import Path
-from src.hypermvp.provider.provider_db_cleaner import clean_provider_table
+from src.hypermvp.provider.provider_db_cleaner import clean_provider_table, refresh_provider_data
 
 @pytest.fixture
 def duckdb_test_db(tmp_path):
@@ -29,14 +29,14 @@ def test_clean_provider_table_removes_pos_and_adjusts_price(duckdb_test_db):
     - Sorts by DELIVERY_DATE, then ENERGY_PRICE_EUR_MWh
     """
     con = duckdb.connect(duckdb_test_db)
-    # Create raw table with explicit schema
+    # Create raw table with the columns the ETL writes (RAW_TABLE_SCHEMA)
     con.execute("""
         CREATE TABLE provider_raw (
             DELIVERY_DATE VARCHAR,
             PRODUCT VARCHAR,
-            ENERGY_PRICE_EUR_MWh DOUBLE,
-            PAYMENT_DIRECTION VARCHAR,
-            ALLOCATED_CAPACITY_MW DOUBLE,
+            "ENERGY_PRICE_[EUR/MWh]" DOUBLE,
+            ENERGY_PRICE_PAYMENT_DIRECTION VARCHAR,
+            "ALLOCATED_CAPACITY_[MW]" DOUBLE,
             NOTE VARCHAR,
             source_file VARCHAR,
             load_timestamp VARCHAR
@@ -71,3 +71,39 @@ def test_clean_provider_table_removes_pos_and_adjusts_price(duckdb_test_db):
     ]
     assert result == expected
     con.close()
+
+def test_refresh_provider_data_replaces_loaded_months(duckdb_test_db):
+    """provider_data gets the cleaned rows of the loaded months; other months are kept."""
+    con = duckdb.connect(duckdb_test_db)
+    con.execute("""
+        CREATE TABLE provider_raw AS SELECT * FROM (VALUES
+            ('2024-09-01', 'NEG_001', 10.0, 'GRID_TO_PROVIDER', 3.0),
+            ('2024-09-01', 'NEG_001', 40.0, 'PROVIDER_TO_GRID', 2.0),
+            ('2024-09-01', 'POS_001', 99.0, 'GRID_TO_PROVIDER', 1.0)
+        ) t(DELIVERY_DATE, PRODUCT, "ENERGY_PRICE_[EUR/MWh]", ENERGY_PRICE_PAYMENT_DIRECTION, "ALLOCATED_CAPACITY_[MW]")
+    """)
+    con.execute("ALTER TABLE provider_raw ADD COLUMN NOTE VARCHAR")
+    con.execute("ALTER TABLE provider_raw ADD COLUMN source_file VARCHAR")
+    con.execute("ALTER TABLE provider_raw ADD COLUMN load_timestamp TIMESTAMP")
+    con.execute("""
+        CREATE TABLE provider_data AS SELECT * FROM (VALUES
+            (TIMESTAMP '2024-08-31', 'NEG_096', 7.0, 5.0),
+            (TIMESTAMP '2024-09-01', 'NEG_001', 20.0, 5.0)
+        ) t(DELIVERY_DATE, PRODUCT, ENERGY_PRICE__EUR_MWh_, OFFERED_CAPACITY__MW_)
+    """)
+    con.close()
+
+    clean_provider_table(duckdb_test_db)
+    assert refresh_provider_data(duckdb_test_db, months={"2024-09"}) == 2
+
+    con = duckdb.connect(duckdb_test_db)
+    rows = con.execute("""
+        SELECT CAST(DELIVERY_DATE AS DATE)::VARCHAR, PRODUCT, ENERGY_PRICE__EUR_MWh_, OFFERED_CAPACITY__MW_
+        FROM provider_data ORDER BY DELIVERY_DATE, ENERGY_PRICE__EUR_MWh_
+    """).fetchall()
+    con.close()
+    assert rows == [
+        ("2024-08-31", "NEG_096", 7.0, 5.0),
+        ("2024-09-01", "NEG_001", -40.0, 2.0),
+        ("2024-09-01", "NEG_001", 10.0, 3.0),
+    ]
@@ -0,0 +1,83 @@
+"""Tests for the Parquet cache of decoded workbooks."""
+
+import os
+import shutil
+
+import polars as pl
+import pytest
+
+from hypermvp.provider import extractor
+from hypermvp.provider.extractor import read_excel_file
+from hypermvp.provider.sheet_cache import SheetCache
+
+def write_workbook(path, prices):
+    import pandas as pd
+    frame = pd.DataFrame({
+        "DELIVERY_DATE": ["2024-01-01"] * len(prices),
+        "PRODUCT": ["NEG_001"] * len(prices),
+        "ENERGY_PRICE_[EUR/MWh]": prices,
+        "NOTE": ["checked"] + [None] * (len(prices) - 1),
+    })
+    with pd.ExcelWriter(path) as writer:
+        frame.to_excel(writer, sheet_name="Bids", index=False)
+        frame.head(1).to_excel(writer, sheet_name="Extra", index=False)
+    return str(path)
+
+@pytest.fixture
+def cache(tmp_path):
+    return SheetCache(str(tmp_path / "cache"), max_bytes=10 * 1024 ** 2)
+
+def test_second_read_comes_from_cache(tmp_path, cache, monkeypatch):
+    path = write_workbook(tmp_path / "jan.xlsx", [10.0, 20.5, 30.0])
+    first = read_excel_file(path, cache=cache)
+
+    def no_decode(filepath):
+        raise AssertionError("decoded again")
+
+    monkeypatch.setattr(extractor, "_decode_excel_file", no_decode)
+    # Same content under another name is the same entry
+    copy = shutil.copy(path, tmp_path / "jan_copy.xlsx")
+    second = read_excel_file(str(copy), cache=cache)
+
+    assert list(second) == ["Bids", "Extra"]
+    for name in first:
+        assert second[name].schema == first[name].schema
+        assert second[name].equals(first[name])
+    assert len(cache.entries()) == 1
+
+def test_changed_workbook_is_decoded_again(tmp_path, cache):
+    path = write_workbook(tmp_path / "jan.xlsx", [10.0])
+    read_excel_file(path, cache=cache)
+    write_workbook(tmp_path / "jan.xlsx", [99.0])
+
+    sheets = read_excel_file(path, cache=cache)
+
+    assert sheets["Bids"]["ENERGY_PRICE_[EUR/MWh]"].to_list() == [99.0]
+    assert len(cache.entries()) == 2
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SheetCache(str(tmp_path / "cache"))
+    frame = pl.DataFrame({"value": list(range(1000))})
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, {"Sheet1": frame})
+        os.utime(cache.cache_dir / key / "manifest.json", (1000 + i, 1000 + i))
+    # Reading "a" makes it the most recently used entry
+    assert cache.get("a") is not None
+    entry_bytes = cache.entries()[0]["bytes"]
+
+    cache.max_bytes = 3 * entry_bytes
+    cache.put("d", {"Sheet1": frame})
+
+    assert [entry["key"] for entry in cache.entries()] == ["c", "a", "d"]
+
+def test_entry_larger_than_the_cache_is_not_kept(cache):
+    cache.max_bytes = 1
+    cache.put("big", {"Sheet1": pl.DataFrame({"value": [1, 2, 3]})})
+    assert cache.entries() == []
+
+def test_unreadable_entry_is_dropped(cache):
+    cache.put("key", {"Sheet1": pl.DataFrame({"value": [1]})})
+    (cache.cache_dir / "key" / "0.parquet").write_bytes(b"not parquet")
+
+    assert cache.get("key") is None
+    assert not (cache.cache_dir / "key").exists()
@@ -0,0 +1,75 @@
+"""Tests for the streaming .xlsx reader."""
+
+from datetime import date, datetime
+
+import openpyxl
+import polars as pl
+import pytest
+
+from hypermvp.provider.xlsx_stream import iter_sheet_chunks, sheet_sizes
+
+@pytest.fixture
+def workbook(tmp_path):
+    """A workbook with shared strings, dates, gaps and awkward headers (written by pandas/openpyxl)."""
+    import pandas as pd
+    path = tmp_path / "provider.xlsx"
+    data = pd.DataFrame({
+        "DELIVERY_DATE": ["2024-01-01"] * 3 + ["2024-01-02"] * 2,
+        "PRODUCT": ["NEG_001", "NEG_002", "POS_001", "NEG_001", "POS_002"],
+        "ENERGY_PRICE_[EUR/MWh]": [10.5, 12.0, -3.25, 8.0, 1e-3],
+        "ALLOCATED_CAPACITY_[MW]": [5, 10, 15, 20, 25],
+        "NOTE": [None, "a & b <c>", None, None, "x"],
+    })
+    with pd.ExcelWriter(path) as writer:
+        data.to_excel(writer, sheet_name="Data", index=False)
+        data.head(2).to_excel(writer, sheet_name="Small", index=False)
+    return str(path)
+
+def test_chunks_match_calamine(workbook):
+    chunks = list(iter_sheet_chunks(workbook, "Data", 2))
+
+    assert [df.height for df in chunks] == [2, 2, 1]
+    streamed = pl.concat(chunks, how="vertical_relaxed")
+    expected = pl.read_excel(workbook, sheet_name="Data", engine="calamine")
+    assert streamed.columns == expected.columns
+    assert streamed.to_dicts() == expected.to_dicts()
+
+def test_sheet_sizes_lists_sheets_in_order(workbook):
+    sizes = sheet_sizes(workbook)
+
+    assert list(sizes) == ["Data", "Small"]
+    assert sizes["Data"] > sizes["Small"] > 0
+
+def test_dates_blank_rows_and_headers(tmp_path):
+    path = tmp_path / "odd.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Odd"
+    ws.append(["A", None, "A", "When"])
+    ws.append([1, "x", 2.5, date(2024, 3, 1)])
+    ws.append([])
+    ws.append([None, None, None, None])
+    ws.append([3, True, None, datetime(2024, 3, 2, 6, 30)])
+    wb.save(path)
+
+    (df,) = iter_sheet_chunks(str(path), "Odd", 100)
+
+    assert df.columns == ["A", "__UNNAMED__1", "A_1", "When"]
+    assert df.rows() == [
+        (1, "x", 2.5, datetime(2024, 3, 1)),
+        (3, "true", None, datetime(2024, 3, 2, 6, 30)),
+    ]
+
+def test_unknown_sheet_raises(workbook):
+    with pytest.raises(ValueError, match="Missing"):
+        list(iter_sheet_chunks(workbook, "Missing", 10))
+
+def test_reads_sheets_inside_xlsx_zip(workbook):
+    import zipfile
+    archive = f"{workbook}.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.write(workbook, "provider.xlsx")
+
+    assert sheet_sizes(archive) == sheet_sizes(workbook)
+    streamed = pl.concat(iter_sheet_chunks(archive, "Data", 2), how="vertical_relaxed")
+    assert streamed.to_dicts() == pl.read_excel(workbook, sheet_name="Data", engine="calamine").to_dicts()
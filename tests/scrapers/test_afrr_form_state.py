@@ -0,0 +1,100 @@
+"""Tests for reusing the ASP.NET form state across aFRR month downloads.
+
+The fake server replays the recorded page and CSV fixtures and, like ASP.NET,
+rejects a POST whose __VIEWSTATE it no longer accepts.
+"""
+
+from datetime import date
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+import responses
+
+from hypermvp.scrapers.afrr_scraper import AFRRScraper
+from hypermvp.scrapers.download_engine import AsyncDownloader
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAGE_TEMPLATE = (FIXTURES / "netztransparenz_afrr_page.html").read_text(encoding="utf-8")
+CSV_BODY = (FIXTURES / "netztransparenz_afrr_2024-01.csv").read_bytes()
+
+class FakeNetztransparenz:
+    """Serves the form page and answers form POSTs while the viewstate is valid."""
+
+    def __init__(self):
+        self.generation = 1
+        self.posts = []
+
+    @property
+    def viewstate(self):
+        return f"/wEPDwUKMTY3NzE5MjIwMw9kFgJmD2QWAgIBD2QWAgIFD2QWAmYPZBYC-{self.generation}"
+
+    def page(self, request):
+        body = PAGE_TEMPLATE.replace("{viewstate}", self.viewstate).replace(
+            "{eventvalidation}", f"/wEdAAbm2t7x-{self.generation}"
+        )
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+
+    def submit(self, request):
+        form = parse_qs(request.body)
+        self.posts.append(form)
+        if form["__VIEWSTATE"][0] != self.viewstate:
+            return 500, {"Content-Type": "text/html"}, "Validation of viewstate MAC failed."
+        headers = {
+            "Content-Type": "text/csv; charset=utf-8",
+            "Content-Disposition": 'attachment; filename="Aktivierte_Regelleistung.csv"',
+        }
+        return 200, headers, CSV_BODY
+
+@pytest.fixture
+def fake_site():
+    site = FakeNetztransparenz()
+    with responses.RequestsMock() as mock:
+        mock.add_callback(responses.GET, AFRRScraper.BASE_URL, callback=site.page)
+        mock.add_callback(responses.POST, AFRRScraper.BASE_URL, callback=site.submit)
+        yield site
+
+MONTHS = [date(2024, month, 1) for month in (1, 2, 3, 4)]
+
+def test_one_page_load_for_many_months(fake_site, tmp_path):
+    scraper = AFRRScraper(output_dir=tmp_path, delay=0.01)
+
+    results = scraper.fetch_months(MONTHS)
+
+    assert [content for _, content in results] == [CSV_BODY] * 4
+    assert scraper.form_page_loads == 1
+    assert len(fake_site.posts) == 4
+    posted = fake_site.posts[-1]
+    assert posted["__EVENTVALIDATION"] == ["/wEdAAbm2t7x-1"]
+    assert posted["__VIEWSTATEGENERATOR"] == ["CA0B0334"]
+    assert posted["dnn$ctr2413$View$rdpGridDownloadStartDate$dateInput"] == ["01.04.2024"]
+    assert posted["dnn$ctr2413$View$rdpGridDownloadEndDate$dateInput"] == ["30.04.2024"]
+
+def test_expired_state_is_refreshed_once(fake_site, tmp_path):
+    scraper = AFRRScraper(output_dir=tmp_path, delay=0.01)
+    scraper.fetch_month(MONTHS[0])
+
+    fake_site.generation += 1  # server-side session expired
+    _, content = scraper.fetch_month(MONTHS[1])
+    scraper.fetch_month(MONTHS[2])
+
+    assert content == CSV_BODY
+    assert scraper.form_page_loads == 2
+    # Rejected POST, retried POST, then the next month reuses the new state
+    assert [form["__VIEWSTATE"][0][-1] for form in fake_site.posts] == ["1", "1", "2", "2"]
+
+def test_concurrent_months_share_one_page_load(fake_site, tmp_path):
+    with AsyncDownloader(max_concurrency=4, max_per_host=4, rate=1000, burst=100) as downloader:
+        scraper = AFRRScraper(output_dir=tmp_path, downloader=downloader)
+        results = scraper.fetch_months(MONTHS)
+
+    assert len(results) == 4
+    assert scraper.form_page_loads == 1
+
+def test_download_date_saves_csv(fake_site, tmp_path):
+    scraper = AFRRScraper(output_dir=tmp_path, delay=0.01)
+
+    [path] = scraper.download_date(MONTHS[0])
+
+    assert path == tmp_path / "Aktivierte_Regelleistung.csv"
+    assert path.read_bytes() == CSV_BODY
@@ -0,0 +1,76 @@
+"""Tests for the scrape-to-DuckDB aFRR pipeline."""
+
+from datetime import date
+from urllib.parse import parse_qs
+
+import duckdb
+import responses
+
+from hypermvp.scrapers.afrr_pipeline import scrape_afrr_to_duckdb
+from hypermvp.scrapers.afrr_scraper import AFRRScraper
+from hypermvp.scrapers.download_engine import AsyncDownloader
+
+FORM_HTML = """
+<html><body><form id="Form">
+    <input type="hidden" name="__VIEWSTATE" value="abc123" />
+    <input type="hidden" name="__EVENTVALIDATION" value="xyz789" />
+</form></body></html>
+"""
+
+def month_csv(request):
+    """Answer the form POST with a two-row CSV for the requested month."""
+    form = parse_qs(request.body)
+    start = form["dnn$ctr2413$View$rdpGridDownloadStartDate$dateInput"][0]  # DD.MM.YYYY
+    if start.endswith(".02.2024"):
+        return 200, {"Content-Type": "text/html"}, "<html>maintenance</html>"
+    body = (
+        "Datum;von;bis;50Hertz (Negativ);50Hertz (Positiv)\n"
+        f"{start};00:00;00:15;4,364;1,0\n"
+        f"{start};00:15;00:30;10,052;2,0\n"
+    )
+    return 200, {"Content-Type": "text/csv"}, body.encode("utf-8-sig")
+
+@responses.activate
+def test_pipeline_loads_months_in_one_write(tmp_path):
+    responses.add(responses.GET, AFRRScraper.BASE_URL, body=FORM_HTML)
+    responses.add_callback(responses.POST, AFRRScraper.BASE_URL, callback=month_csv)
+    db_path = str(tmp_path / "energy.duckdb")
+
+    with AsyncDownloader(max_concurrency=3, max_per_host=3, rate=1000, burst=100) as downloader:
+        scraper = AFRRScraper(output_dir=tmp_path / "afrr", downloader=downloader)
+        dates = [date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 1), date(2024, 3, 1)]
+        summary = scrape_afrr_to_duckdb(scraper, dates, db_path=db_path)
+
+    # January and March load; February's error page is skipped
+    assert summary["months_fetched"] == 2
+    assert summary["rows"] == 4
+    assert not (tmp_path / "afrr").exists() or not any((tmp_path / "afrr").glob("*.csv"))
+
+    conn = duckdb.connect(db_path)
+    rows = conn.execute(
+        'SELECT "Datum", "50Hertz (Negativ)", month, year FROM afrr_data ORDER BY year, month, "von"'
+    ).fetchall()
+    conn.close()
+    assert rows == [
+        ("01.01.2024", "4,364", 1, 2024),
+        ("01.01.2024", "10,052", 1, 2024),
+        ("01.03.2024", "4,364", 3, 2024),
+        ("01.03.2024", "10,052", 3, 2024),
+    ]
+
+@responses.activate
+def test_pipeline_replaces_existing_months(tmp_path):
+    responses.add(responses.GET, AFRRScraper.BASE_URL, body=FORM_HTML)
+    responses.add_callback(responses.POST, AFRRScraper.BASE_URL, callback=month_csv)
+    db_path = str(tmp_path / "energy.duckdb")
+    scraper = AFRRScraper(output_dir=tmp_path / "afrr", delay=0.01)
+
+    scrape_afrr_to_duckdb(scraper, [date(2024, 1, 1)], db_path=db_path)
+    scrape_afrr_to_duckdb(scraper, [date(2024, 1, 1), date(2024, 3, 1)], db_path=db_path)
+
+    conn = duckdb.connect(db_path)
+    counts = conn.execute(
+        "SELECT month, COUNT(*) FROM afrr_data GROUP BY month ORDER BY month"
+    ).fetchall()
+    conn.close()
+    assert counts == [(1, 2), (3, 2)]
@@ -0,0 +1,103 @@
+"""Tests for the scraper download cache and conditional provider downloads."""
+
+import io
+import zipfile
+
+import responses
+
+from hypermvp.scrapers.download_cache import DownloadCache, file_sha256
+from hypermvp.scrapers.provider_scraper import ProviderScraper
+from hypermvp.scrapers.scraper_config import PROVIDER_CONFIG
+
+FILE_NAME = "RESULT_LIST_ANONYM_ENERGY_MARKET_aFRR_DE_2024-09-01_2024-09-30.xlsx.zip"
+API_URL = f"{PROVIDER_CONFIG['api_url']}/download/tenders/files/{FILE_NAME}"
+
+def zipped(content: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr(FILE_NAME.replace(".zip", ""), content)
+    return buffer.getvalue()
+
+def test_record_detects_changes(tmp_path):
+    cache = DownloadCache(cache_dir=tmp_path / "cache")
+    data_file = tmp_path / "data.csv"
+
+    data_file.write_text("a;b\n1;2\n")
+    assert cache.record("afrr:2024-09", data_file) is True
+    assert cache.record("afrr:2024-09", data_file) is False
+
+    data_file.write_text("a;b\n1;3\n")
+    assert cache.record("afrr:2024-09", data_file) is True
+    assert cache.get("afrr:2024-09")["sha256"] == file_sha256(data_file)
+
+    # The index survives a restart
+    assert DownloadCache(cache_dir=tmp_path / "cache").get("afrr:2024-09") is not None
+
+def test_conditional_headers_and_ttl(tmp_path):
+    cache = DownloadCache(cache_dir=tmp_path / "cache", ttl=3600)
+    data_file = tmp_path / "data.xlsx"
+    data_file.write_bytes(b"xlsx")
+
+    assert cache.conditional_headers("url") == {}
+    cache.record("url", data_file, etag='"v1"', last_modified="Mon, 30 Sep 2024 00:00:00 GMT")
+    assert cache.conditional_headers("url") == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 30 Sep 2024 00:00:00 GMT",
+    }
+    assert cache.is_fresh("url")
+    assert not DownloadCache(cache_dir=tmp_path / "cache", ttl=0).is_fresh("url")
+
+    # A deleted file means there is nothing to revalidate
+    data_file.unlink()
+    assert cache.get("url") is None
+    assert cache.conditional_headers("url") == {}
+
+def test_pending_changes_per_consumer(tmp_path):
+    cache = DownloadCache(cache_dir=tmp_path / "cache")
+    first, second = tmp_path / "first.xlsx", tmp_path / "second.xlsx"
+    first.write_bytes(b"1")
+    second.write_bytes(b"2")
+
+    cache.record("first", first)
+    assert cache.pending_changes("etl") == [first]
+    cache.mark_consumed("etl")
+    assert cache.pending_changes("etl") == []
+
+    cache.record("first", first)  # same content, not a change
+    cache.record("second", second)
+    assert cache.pending_changes("etl") == [second]
+    assert cache.pending_changes("other_consumer") == [first, second]
+
+@responses.activate
+def test_provider_download_revalidates_with_304(tmp_path):
+    responses.add(
+        responses.GET, API_URL, body=zipped(b"month data"), status=200,
+        headers={"ETag": '"v1"', "Last-Modified": "Mon, 30 Sep 2024 00:00:00 GMT"}
+    )
+    responses.add(responses.GET, API_URL, status=304)
+
+    cache = DownloadCache(cache_dir=tmp_path / "cache", ttl=0)
+    scraper = ProviderScraper(output_dir=str(tmp_path / "provider"), cache=cache)
+
+    first = scraper.download_monthly_data(2024, 9)
+    assert first.read_bytes() == b"month data"
+    assert "If-None-Match" not in responses.calls[0].request.headers
+
+    second = scraper.download_monthly_data(2024, 9)
+    assert second == first
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert responses.calls[1].request.headers["If-Modified-Since"] == "Mon, 30 Sep 2024 00:00:00 GMT"
+    assert cache.changed_since(0) == [first]
+
+@responses.activate
+def test_provider_download_skipped_within_ttl(tmp_path):
+    responses.add(responses.GET, API_URL, body=zipped(b"month data"), status=200, headers={"ETag": '"v1"'})
+
+    cache = DownloadCache(cache_dir=tmp_path / "cache", ttl=3600)
+    scraper = ProviderScraper(output_dir=str(tmp_path / "provider"), cache=cache)
+
+    first = scraper.download_monthly_data(2024, 9)
+    second = scraper.download_monthly_data(2024, 9)
+
+    assert second == first
+    assert len(responses.calls) == 1
@@ -0,0 +1,139 @@
+"""Tests for the async download engine, run offline against a local stub HTTP server."""
+
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hypermvp.scrapers.base_scraper import BaseScraper
+from hypermvp.scrapers.download_engine import AsyncDownloader, TokenBucket
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves /file/<n>, tracks concurrency and client connections."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.client_ports.add(self.client_address[1])
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.request_headers.append(dict(self.headers))
+            hits = server.hits[self.path]
+        try:
+            time.sleep(server.response_delay)
+            if self.path.startswith("/flaky") and hits < 3:
+                status, body = 503, b"busy"
+            elif self.path.startswith("/missing"):
+                status, body = 404, b"not found"
+            else:
+                status, body = 200, f"payload for {self.path}".encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.client_ports = set()
+    server.hits = {}
+    server.request_headers = []
+    server.response_delay = 0.05
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_fetch_all_respects_per_host_limit(stub_server):
+    urls = [f"{stub_server.base_url}/file/{i}" for i in range(12)]
+    with AsyncDownloader(max_concurrency=8, max_per_host=3, rate=1000, burst=100) as downloader:
+        responses = downloader.fetch_all(urls)
+
+    assert [r.text for r in responses] == [f"payload for /file/{i}" for i in range(12)]
+    assert 1 < stub_server.max_in_flight <= 3
+
+def test_connections_are_reused(stub_server):
+    urls = [f"{stub_server.base_url}/file/{i}" for i in range(20)]
+    with AsyncDownloader(max_concurrency=2, max_per_host=2, rate=1000, burst=100) as downloader:
+        downloader.fetch_all(urls)
+
+    # 20 requests over a pool of 2 keep-alive connections
+    assert len(stub_server.client_ports) <= 2
+
+def test_rate_limit_spaces_requests(stub_server):
+    stub_server.response_delay = 0
+    urls = [f"{stub_server.base_url}/file/{i}" for i in range(5)]
+    with AsyncDownloader(max_concurrency=5, max_per_host=5, rate=20, burst=1) as downloader:
+        start = time.monotonic()
+        downloader.fetch_all(urls)
+        elapsed = time.monotonic() - start
+
+    # First token is free, the other four arrive at 20/s
+    assert elapsed >= 0.19
+
+def test_retries_transient_errors_only(stub_server):
+    with AsyncDownloader(max_retries=3, backoff=0.01, rate=1000, burst=100) as downloader:
+        flaky, missing = downloader.fetch_all([
+            f"{stub_server.base_url}/flaky",
+            f"{stub_server.base_url}/missing",
+        ])
+
+    assert flaky.status_code == 200
+    assert stub_server.hits["/flaky"] == 3
+    assert isinstance(missing, Exception)
+    assert stub_server.hits["/missing"] == 1
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+class StubScraper(BaseScraper):
+    """Minimal scraper that downloads one stub URL per date."""
+
+    def download_date(self, target_date):
+        if target_date.day == 3:
+            raise ValueError("no data")
+        return self.get_with_retry(f"{self.BASE_URL}/file/{target_date.day}", max_retries=1).text
+
+def test_scraper_downloads_dates_concurrently(stub_server, tmp_path):
+    with AsyncDownloader(max_concurrency=4, max_per_host=4, rate=1000, burst=100) as downloader:
+        scraper = StubScraper(output_dir=tmp_path, downloader=downloader)
+        scraper.BASE_URL = stub_server.base_url
+        results = scraper.download_date_range(date(2024, 1, 1), date(2024, 1, 6))
+
+    # Failed date is logged and skipped, the rest come back in order
+    assert results == [f"payload for /file/{day}" for day in (1, 2, 4, 5, 6)]
+    assert stub_server.max_in_flight > 1
+
+def test_scraper_requests_leave_shared_session_headers_alone(stub_server, tmp_path):
+    from hypermvp.scrapers.scraper_config import USER_AGENTS
+
+    with AsyncDownloader(max_concurrency=4, max_per_host=4, rate=1000, burst=100) as downloader:
+        scraper = StubScraper(output_dir=tmp_path, downloader=downloader)
+        session_headers = dict(downloader.session.headers)
+        scraper.get_with_retry(f"{stub_server.base_url}/file/1", headers={"X-Test": "yes"})
+
+        # The user agent rotates per request; the session the worker threads share is unchanged
+        assert dict(downloader.session.headers) == session_headers
+    [sent] = stub_server.request_headers
+    assert sent["User-Agent"] in USER_AGENTS
+    assert sent["X-Test"] == "yes"
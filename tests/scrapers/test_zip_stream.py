@@ -0,0 +1,176 @@
+"""Tests for streaming ZIP extraction and resumable provider downloads."""
+
+import io
+import zipfile
+
+import pytest
+import responses
+
+from hypermvp.scrapers.provider_scraper import ProviderScraper
+from hypermvp.scrapers.scraper_config import PROVIDER_CONFIG
+from hypermvp.scrapers.zip_stream import StreamingZipExtractor
+
+FILE_NAME = "RESULT_LIST_ANONYM_ENERGY_MARKET_aFRR_DE_2024-09-01_2024-09-30.xlsx.zip"
+API_URL = f"{PROVIDER_CONFIG['api_url']}/download/tenders/files/{FILE_NAME}"
+WORKBOOK = bytes(range(256)) * 2000  # ~500 KB, compresses well but not to nothing
+
+def zipped(content: bytes, compression=zipfile.ZIP_DEFLATED, stream=False) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as zf:
+        name = FILE_NAME.replace(".zip", "")
+        if stream:
+            # Writing through open() produces a data descriptor after the member
+            with zf.open(name, "w") as member:
+                member.write(content)
+        else:
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+def feed_in_chunks(extractor, data, size=1000):
+    for start in range(0, len(data), size):
+        extractor.feed(data[start:start + size])
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED])
+def test_extracts_while_feeding(tmp_path, compression):
+    extractor = StreamingZipExtractor(tmp_path)
+    feed_in_chunks(extractor, zipped(WORKBOOK, compression))
+
+    assert extractor.done
+    path = extractor.close()
+    assert path == tmp_path / FILE_NAME.replace(".zip", "")
+    assert path.read_bytes() == WORKBOOK
+    assert not list(tmp_path.glob("*.part"))
+
+def test_extracts_member_with_data_descriptor(tmp_path):
+    extractor = StreamingZipExtractor(tmp_path)
+    feed_in_chunks(extractor, zipped(WORKBOOK, stream=True), size=7)
+
+    assert extractor.close().read_bytes() == WORKBOOK
+
+def test_corrupt_stream_is_rejected(tmp_path):
+    data = bytearray(zipped(WORKBOOK, zipfile.ZIP_STORED))
+    data[100] ^= 0xFF
+    extractor = StreamingZipExtractor(tmp_path)
+    feed_in_chunks(extractor, bytes(data))
+
+    with pytest.raises(ValueError, match="CRC mismatch"):
+        extractor.close()
+    assert list(tmp_path.iterdir()) == []
+
+def corrupt_deflate(archive: bytes) -> bytes:
+    """Make the first deflate block of the member invalid (reserved block type)."""
+    data = bytearray(archive)
+    name_length, extra_length = int.from_bytes(data[26:28], "little"), int.from_bytes(data[28:30], "little")
+    data[30 + name_length + extra_length] = 0xFF
+    return bytes(data)
+
+def test_corrupt_deflate_data_is_rejected(tmp_path):
+    extractor = StreamingZipExtractor(tmp_path)
+
+    with pytest.raises(ValueError, match="Corrupt deflate data"):
+        feed_in_chunks(extractor, corrupt_deflate(zipped(WORKBOOK)))
+    extractor.abort()
+    assert list(tmp_path.iterdir()) == []
+
+def test_truncated_stream_is_rejected(tmp_path):
+    data = zipped(WORKBOOK)
+    extractor = StreamingZipExtractor(tmp_path)
+    feed_in_chunks(extractor, data[:len(data) // 2])
+
+    assert not extractor.done
+    with pytest.raises(ValueError):
+        extractor.close()
+    assert list(tmp_path.iterdir()) == []
+
+@responses.activate
+def test_provider_download_extracts_from_stream(tmp_path):
+    responses.add(responses.GET, API_URL, body=zipped(WORKBOOK), status=200)
+    scraper = ProviderScraper(output_dir=str(tmp_path))
+
+    path = scraper.download_monthly_data(2024, 9)
+
+    assert path.read_bytes() == WORKBOOK
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name]
+
+@responses.activate
+def test_provider_download_falls_back_on_corrupt_deflate_data(tmp_path):
+    archive = corrupt_deflate(zipped(WORKBOOK))
+    responses.add(responses.GET, API_URL, body=archive, status=200)
+    scraper = ProviderScraper(output_dir=str(tmp_path))
+
+    # The fallback cannot extract it either, so the archive is kept as downloaded
+    path = scraper.download_monthly_data(2024, 9)
+
+    assert path == tmp_path / FILE_NAME
+    assert path.read_bytes() == archive
+    assert sorted(p.name for p in tmp_path.iterdir()) == [FILE_NAME]
+
+def ranged_server(archive, etag, honour_if_range=True):
+    """Serve archive with Range/If-Range support, like the provider platform."""
+    def respond(request):
+        headers = {"ETag": etag}
+        if_range = request.headers.get("If-Range")
+        if "Range" not in request.headers or (honour_if_range and if_range != etag):
+            return 200, headers, archive
+        start = int(request.headers["Range"].removeprefix("bytes=").rstrip("-"))
+        headers["Content-Range"] = f"bytes {start}-{len(archive) - 1}/{len(archive)}"
+        return 206, headers, archive[start:]
+    return respond
+
+def leave_partial_download(tmp_path, data, validator=None):
+    (tmp_path / f"{FILE_NAME}.part").write_bytes(data)
+    if validator is not None:
+        (tmp_path / f"{FILE_NAME}.part.validator").write_text(validator, encoding="utf-8")
+
+@responses.activate
+def test_provider_download_resumes_partial_file(tmp_path):
+    archive = zipped(WORKBOOK)
+    half = len(archive) // 2
+    leave_partial_download(tmp_path, archive[:half], validator='"v1"')
+    responses.add_callback(responses.GET, API_URL, callback=ranged_server(archive, '"v1"'))
+    scraper = ProviderScraper(output_dir=str(tmp_path))
+
+    path = scraper.download_monthly_data(2024, 9)
+
+    assert responses.calls[0].request.headers["Range"] == f"bytes={half}-"
+    assert responses.calls[0].request.headers["If-Range"] == '"v1"'
+    assert path.read_bytes() == WORKBOOK
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name]
+
+@pytest.mark.parametrize("honour_if_range", [True, False])
+@responses.activate
+def test_provider_download_restarts_when_the_file_changed(tmp_path, honour_if_range):
+    old_archive, new_archive = zipped(WORKBOOK[::-1]), zipped(WORKBOOK)
+    leave_partial_download(tmp_path, old_archive[:len(old_archive) // 2], validator='"v1"')
+    responses.add_callback(responses.GET, API_URL, callback=ranged_server(new_archive, '"v2"', honour_if_range))
+    scraper = ProviderScraper(output_dir=str(tmp_path))
+
+    path = scraper.download_monthly_data(2024, 9)
+
+    # Never old bytes followed by a range of the new file
+    assert path.read_bytes() == WORKBOOK
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name]
+
+@responses.activate
+def test_provider_download_restarts_partial_file_without_validator(tmp_path):
+    archive = zipped(WORKBOOK)
+    leave_partial_download(tmp_path, archive[:len(archive) // 2])
+    responses.add_callback(responses.GET, API_URL, callback=ranged_server(archive, '"v1"'))
+    scraper = ProviderScraper(output_dir=str(tmp_path))
+
+    path = scraper.download_monthly_data(2024, 9)
+
+    assert "Range" not in responses.calls[0].request.headers
+    assert path.read_bytes() == WORKBOOK
+
+@responses.activate
+def test_provider_download_can_keep_the_archive(tmp_path):
+    archive = zipped(WORKBOOK)
+    responses.add(responses.GET, API_URL, body=archive, status=200)
+    scraper = ProviderScraper(output_dir=str(tmp_path), keep_archives=True)
+
+    path = scraper.download_monthly_data(2024, 9)
+
+    assert path == tmp_path / FILE_NAME
+    assert path.read_bytes() == archive
+    assert sorted(p.name for p in tmp_path.iterdir()) == [FILE_NAME]
@@ -0,0 +1,86 @@
+"""Tests for the benchmark data generators and a small run of the suite."""
+
+import argparse
+import json
+
+import duckdb
+
+from benchmarks import generators
+from benchmarks import run_benchmarks
+from benchmarks.compare import compare
+from hypermvp.afrr.loader import read_afrr_csv, split_afrr_by_month
+from hypermvp.provider.extractor import read_excel_file
+
+def test_afrr_csv_matches_netztransparenz_format(tmp_path):
+    path = tmp_path / "afrr_2024-10.csv"
+
+    rows = generators.write_afrr_csv(str(path), 2024, 10)
+
+    raw = path.read_bytes()
+    assert raw.startswith(b"\xef\xbb\xbfDatum;Zeitzone;von;bis;Einheit;50Hertz (Positiv);")
+    lines = raw.decode("utf-8-sig").split("\r\n")
+    assert lines[-1] == "" and len(lines) == rows + 2
+    assert lines[1].startswith("01.10.2024;CEST;00:00;00:15;MW;")
+    # The clocks go back on 27 October: 100 quarter hours, 02:00-03:00 twice
+    fall_back = [line for line in lines if line.startswith("27.10.2024")]
+    assert len(fall_back) == 100
+    assert "27.10.2024;CEST;02:45;02:00;MW" in [line[:30] for line in fall_back]
+    assert "27.10.2024;CET;02:00;02:15;MW;" in [line[:30] for line in fall_back]
+    assert rows == 31 * 96 + 4
+    assert all(value.count(",") == 1 and len(value.split(",")[1]) == 3 for value in lines[1].split(";")[5:])
+
+    df = read_afrr_csv(str(path))
+    assert [(month, year, len(frame)) for month, year, frame in split_afrr_by_month(df)] == [(10, 2024, rows)]
+
+def test_afrr_csv_spring_forward_has_92_quarter_hours(tmp_path):
+    path = tmp_path / "afrr.csv"
+    generators.write_afrr_csv(str(path), 2024, 3)
+    lines = [line for line in path.read_text(encoding="utf-8-sig").splitlines() if line.startswith("31.03.2024")]
+    assert len(lines) == 92
+    assert lines[7].startswith("31.03.2024;CET;01:45;03:00;")
+
+def test_provider_workbook_is_read_by_extractor(tmp_path):
+    path = tmp_path / "provider.xlsx"
+
+    rows = generators.write_provider_workbook(str(path), 2024, 2, sheets=2, bids_per_product=1)
+
+    sheets = read_excel_file(str(path))
+    assert rows == 29 * 192
+    assert list(sheets) == ["Sheet1", "Sheet2"]
+    assert sum(df.height for df in sheets.values()) == rows
+    first = sheets["Sheet1"].row(0, named=True)
+    assert first["DELIVERY_DATE"] == "2024-02-01" and first["PRODUCT"] == "NEG_001"
+    assert sheets["Sheet2"]["DELIVERY_DATE"].min() == "2024-02-16"
+
+def test_provider_data_table_is_deterministic():
+    conn = duckdb.connect()
+    first = generators.create_provider_data_table(conn, generators.date(2024, 1, 1), generators.date(2024, 1, 2), 3)
+    total = conn.execute("SELECT SUM(ENERGY_PRICE__EUR_MWh_) FROM provider_data").fetchone()
+    generators.create_provider_data_table(conn, generators.date(2024, 1, 1), generators.date(2024, 1, 2), 3)
+    assert first == 2 * 192 * 3
+    assert conn.execute("SELECT SUM(ENERGY_PRICE__EUR_MWh_) FROM provider_data").fetchone() == total
+
+def test_suite_runs_every_benchmark(tmp_path):
+    data = run_benchmarks.prepare_scale(2, str(tmp_path / "data"), bids_per_product=1, sheets=1, seed=0)
+    options = argparse.Namespace(repeat=1, engine_days=1)
+
+    results = {name: run_benchmarks.time_benchmark(name, data, options) for name in run_benchmarks.BENCHMARKS}
+
+    assert data.months == [(2024, 11), (2024, 12)]
+    assert results["provider_etl"]["rows"] == (30 + 31) * 192
+    assert results["afrr_load"]["rows"] == data.afrr_rows == (30 + 31) * 96
+    assert results["afrr_load"]["stages"].keys() == {"afrr_load", "afrr_save"}
+    assert results["price_engine"]["rows"] > 0
+    assert results["dashboard_queries"]["details"]["days"] == {
+        "provider_data": 61, "afrr_data": 61, "marginal_prices": 61,
+    }
+    assert results["viewer_profile"]["rows"] == data.provider_rows + 2 * data.afrr_rows
+    json.dumps(list(results.values()))
+
+def test_compare_flags_regressions():
+    before = {("afrr_load", 1): {"seconds": 1.0}, ("price_engine", 1): {"seconds": 2.0}}
+    after = {("afrr_load", 1): {"seconds": 1.05}, ("price_engine", 1): {"seconds": 3.0}}
+
+    rows = compare(before, after, threshold=0.10)
+
+    assert [(row["benchmark"], row["regression"]) for row in rows] == [("afrr_load", False), ("price_engine", True)]
@@ -0,0 +1,66 @@
+import importlib
+import os
+import subprocess
+import sys
+
+import pytest
+
+from hypermvp import global_config
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def test_import_has_no_filesystem_side_effects():
+    """Importing global_config must not create directories or list files."""
+    code = (
+        "import os\n"
+        "calls = []\n"
+        "os.makedirs = lambda *a, **k: calls.append(('makedirs', a))\n"
+        "os.listdir = lambda *a, **k: calls.append(('listdir', a)) or []\n"
+        "import hypermvp.global_config\n"
+        "print(len(calls))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "0"
+
+def test_ensure_dirs(tmp_path, monkeypatch):
+    data_dirs = [str(tmp_path / "raw" / "provider"), str(tmp_path / "output" / "duckdb")]
+    test_dirs = [str(tmp_path / "tests_data" / "raw")]
+    monkeypatch.setattr(global_config, "DATA_DIRS", data_dirs)
+    monkeypatch.setattr(global_config, "TEST_DIRS", test_dirs)
+
+    assert global_config.ensure_dirs() == data_dirs
+    assert all(os.path.isdir(d) for d in data_dirs)
+    assert not os.path.exists(test_dirs[0])
+
+    global_config.ensure_dirs(include_test_dirs=True)
+    assert os.path.isdir(test_dirs[0])
+
+@pytest.mark.parametrize("module_name, argv", [
+    ("hypermvp.scrapers.cli", ["--start-date", "2024-09-01"]),
+    ("hypermvp.provider.provider_cli", ["--clean", "--db-path", "x.duckdb"]),
+    ("hypermvp.analysis.marginal_price_cli", ["--start", "2024-09-01"]),
+])
+def test_cli_entry_points_create_data_dirs(module_name, argv, monkeypatch):
+    """Each CLI creates the data directories once its arguments are parsed."""
+    cli = importlib.import_module(module_name)
+    calls = []
+    monkeypatch.setattr(cli, "ensure_dirs", lambda: calls.append("ensure_dirs"))
+    monkeypatch.setattr(cli, "run", lambda args: calls.append("run"))
+    monkeypatch.setattr(sys, "argv", [module_name, *argv])
+
+    cli.main()
+    assert calls == ["ensure_dirs", "run"]
+
+def test_discover_provider_files(tmp_path):
+    (tmp_path / "a.xlsx").write_bytes(b"")
+    (tmp_path / "b.csv").write_text("")
+    (tmp_path / "notes.txt").write_text("")
+
+    found = sorted(os.path.basename(p) for p in global_config.discover_provider_files(str(tmp_path)))
+    assert found == ["a.xlsx", "b.csv"]
+    assert global_config.discover_provider_files(str(tmp_path / "missing")) == []
+
+def test_provider_file_paths_resolved_lazily():
+    assert isinstance(global_config.PROVIDER_FILE_PATHS, list)
@@ -0,0 +1,212 @@
+"""Tests for the aFRR and analysis workflows in main.py."""
+
+import importlib.util
+import os
+
+import duckdb
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CSV_HEADER = "Datum;von;Zeitzone von;bis;Zeitzone bis;50Hertz (Positiv);50Hertz (Negativ)\n"
+
+@pytest.fixture
+def main_module(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("hypermvp_main", os.path.join(BASE_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    raw_dir = tmp_path / "afrr"
+    raw_dir.mkdir()
+    monkeypatch.setattr(module, "AFRR_RAW_DIR", str(raw_dir))
+    return module
+
+def write_csv(path, rows):
+    path.write_text(CSV_HEADER + "".join(f"{row}\n" for row in rows), encoding="utf-8")
+
+def afrr_rows(db_path):
+    conn = duckdb.connect(db_path)
+    rows = conn.execute(
+        'SELECT month, year, COUNT(*), MAX("50Hertz (Negativ)") FROM afrr_data GROUP BY ALL ORDER BY year, month'
+    ).fetchall()
+    conn.close()
+    return rows
+
+def test_afrr_workflow_loads_all_files_in_one_batch(main_module, tmp_path):
+    raw_dir = tmp_path / "afrr"
+    write_csv(raw_dir / "afrr_2024-08.csv", [
+        "31.08.2024;23:45;CEST;00:00;CEST;1,0;5,5",
+        "01.09.2024;00:00;CEST;00:15;CEST;1,0;4,364",
+    ])
+    write_csv(raw_dir / "afrr_2024-09.csv", [
+        "01.09.2024;00:00;CEST;00:15;CEST;1,0;7,0",  # newer file wins
+        "01.09.2024;00:15;CEST;00:30;CEST;1,0;10,052",
+    ])
+    db_path = str(tmp_path / "energy.duckdb")
+
+    summary = main_module.process_afrr_workflow(db_path=db_path)
+
+    assert summary["files"] == 2
+    assert summary["months"] == 2
+    assert afrr_rows(db_path) == [(8, 2024, 1, "5,5"), (9, 2024, 2, "7,0")]
+
+    conn = duckdb.connect(db_path)
+    versions = conn.execute("SELECT COUNT(*), MAX(rows_inserted) FROM version_history").fetchone()
+    conn.close()
+    assert versions == (1, 3)
+
+def test_afrr_workflow_month_filter(main_module, tmp_path):
+    raw_dir = tmp_path / "afrr"
+    write_csv(raw_dir / "afrr.csv", [
+        "31.08.2024;23:45;CEST;00:00;CEST;1,0;5,5",
+        "01.09.2024;00:00;CEST;00:15;CEST;1,0;4,364",
+    ])
+    db_path = str(tmp_path / "energy.duckdb")
+
+    summary = main_module.process_afrr_workflow(month=9, year=2024, db_path=db_path)
+
+    assert summary["rows"] == 1
+    assert afrr_rows(db_path) == [(9, 2024, 1, "4,364")]
+    assert main_module.process_afrr_workflow(month=1, db_path=db_path)["rows"] == 0
+
+def test_analysis_workflow_saves_prices(main_module, tmp_path):
+    db_path = str(tmp_path / "energy.duckdb")
+    conn = duckdb.connect(db_path)
+    conn.execute("""
+        CREATE TABLE afrr_data AS SELECT * FROM (VALUES
+            ('01.09.2024', '00:00', '00:15', '5,0'),
+            ('01.09.2024', '00:15', '00:30', '0,0')
+        ) t("Datum", von, bis, "50Hertz (Negativ)")
+    """)
+    conn.execute("""
+        CREATE TABLE provider_data AS SELECT * FROM (VALUES
+            (TIMESTAMP '2024-09-01', 'NEG_001', 10.0, 3.0),
+            (TIMESTAMP '2024-09-01', 'NEG_001', 20.0, 3.0),
+            (TIMESTAMP '2024-09-01', 'NEG_002', 15.0, 3.0)
+        ) t(DELIVERY_DATE, PRODUCT, ENERGY_PRICE__EUR_MWh_, OFFERED_CAPACITY__MW_)
+    """)
+    conn.close()
+
+    summary = main_module.process_analysis_workflow("2024-09-01", "2024-09-01", db_path=db_path)
+
+    assert summary["rows"] == 2
+    conn = duckdb.connect(db_path)
+    prices = conn.execute(
+        "SELECT product_code, marginal_price FROM marginal_prices ORDER BY product_code"
+    ).fetchall()
+    conn.close()
+    assert prices == [("NEG_001", 20.0), ("NEG_002", None)]
+
+def write_provider_workbook(path, price):
+    import pandas as pd
+
+    pd.DataFrame({
+        "DELIVERY_DATE": ["2024-09-01"],
+        "PRODUCT": ["NEG_001"],
+        "ENERGY_PRICE_[EUR/MWh]": [price],
+        "ENERGY_PRICE_PAYMENT_DIRECTION": ["GRID_TO_PROVIDER"],
+        "ALLOCATED_CAPACITY_[MW]": [3.0],
+        "NOTE": [""],
+    }).to_excel(path, index=False)
+
+def test_analysis_after_provider_workflow_uses_loaded_bids(main_module, tmp_path, monkeypatch):
+    provider_dir = tmp_path / "provider"
+    provider_dir.mkdir()
+    monkeypatch.setattr(main_module, "PROVIDER_RAW_DIR", str(provider_dir))
+    monkeypatch.setattr("hypermvp.scrapers.download_cache.DOWNLOAD_CACHE_DIR", str(tmp_path / "cache"))
+    write_provider_workbook(provider_dir / "provider_2024-09.xlsx", 10.0)
+    db_path = str(tmp_path / "energy.duckdb")
+    conn = duckdb.connect(db_path)
+    conn.execute("""
+        CREATE TABLE afrr_data AS SELECT * FROM (VALUES
+            ('01.09.2024', '00:00', '00:15', '2,0')
+        ) t("Datum", von, bis, "50Hertz (Negativ)")
+    """)
+    conn.close()
+
+    main_module.process_provider_workflow(db_path=db_path)
+    summary = main_module.process_analysis_workflow("2024-09-01", "2024-09-01", db_path=db_path)
+
+    assert summary["rows"] == 1
+    conn = duckdb.connect(db_path)
+    prices = conn.execute("SELECT product_code, marginal_price FROM marginal_prices").fetchall()
+    conn.close()
+    assert prices == [("NEG_001", 10.0)]
+
+@pytest.mark.parametrize("memory_budget", [None, "auto"])
+def test_all_workflow_runs_as_dag(main_module, tmp_path, monkeypatch, memory_budget):
+    import argparse
+
+    provider_dir = tmp_path / "provider"
+    provider_dir.mkdir()
+    monkeypatch.setattr(main_module, "PROVIDER_RAW_DIR", str(provider_dir))
+    monkeypatch.setattr("hypermvp.scrapers.download_cache.DOWNLOAD_CACHE_DIR", str(tmp_path / "cache"))
+    finished = []
+    finish = main_module.finish_provider_load
+    monkeypatch.setattr(
+        main_module, "finish_provider_load", lambda *args: (finished.append(args[0]), finish(*args))
+    )
+    write_provider_workbook(provider_dir / "provider_2024-09.xlsx", 10.0)
+    write_csv(tmp_path / "afrr" / "afrr.csv", [
+        "31.08.2024;23:45;CEST;00:00;CEST;1,0;2,0",
+        "01.09.2024;00:00;CEST;00:15;CEST;1,0;2,0",
+    ])
+    db_path = str(tmp_path / "energy.duckdb")
+    conn = duckdb.connect(db_path)
+    # Bids from an earlier load: August is not reloaded, September's stale bid is replaced
+    conn.execute("""
+        CREATE TABLE provider_data AS SELECT * FROM (VALUES
+            (TIMESTAMP '2024-08-31', 'NEG_096', 7.0, 5.0),
+            (TIMESTAMP '2024-09-01', 'NEG_001', 20.0, 5.0)
+        ) t(DELIVERY_DATE, PRODUCT, ENERGY_PRICE__EUR_MWh_, OFFERED_CAPACITY__MW_)
+    """)
+    conn.close()
+    args = argparse.Namespace(
+        month=None, year=None, file=None, changed_only=False,
+        start_date="2024-08-01", end_date="2024-09-30", memory_budget=memory_budget,
+    )
+
+    runner = main_module.run_all_workflow(args, db_path, max_workers=2)
+
+    assert runner.result("plan_analysis") == ["2024-08", "2024-09"]
+    assert finished == [db_path]
+    # August only waits for the aFRR write; September also waits for the provider write
+    assert runner.tasks["analysis_calc:2024-08"].deps == ["afrr_write"]
+    assert sorted(runner.tasks["analysis_calc:2024-09"].deps) == ["afrr_write", "provider_write"]
+    timings = runner.timings
+    assert timings["analysis_calc:2024-09"]["start"] >= timings["provider_write"]["end"]
+    assert timings["analysis_calc:2024-09"]["start"] >= timings["afrr_write"]["end"]
+
+    conn = duckdb.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM provider_raw").fetchone()[0] == 1
+    prices = conn.execute(
+        "SELECT CAST(date AS VARCHAR), product_code, marginal_price FROM marginal_prices ORDER BY date"
+    ).fetchall()
+    conn.close()
+    # September is priced with the 10.0 bid from the workbook loaded in this run
+    assert prices == [("2024-08-31", "NEG_096", 7.0), ("2024-09-01", "NEG_001", 10.0)]
+
+def test_all_workflow_provider_month_without_afrr_data(main_module, tmp_path, monkeypatch):
+    import argparse
+
+    provider_dir = tmp_path / "provider"
+    provider_dir.mkdir()
+    monkeypatch.setattr(main_module, "PROVIDER_RAW_DIR", str(provider_dir))
+    monkeypatch.setattr("hypermvp.scrapers.download_cache.DOWNLOAD_CACHE_DIR", str(tmp_path / "cache"))
+    write_provider_workbook(provider_dir / "provider_2024-09.xlsx", 10.0)
+    # Fresh database and no aFRR CSVs: afrr_data is never created
+    db_path = str(tmp_path / "energy.duckdb")
+    args = argparse.Namespace(
+        month=None, year=None, file=None, changed_only=False,
+        start_date="2024-09-01", end_date="2024-09-30", memory_budget=None,
+    )
+
+    runner = main_module.run_all_workflow(args, db_path, max_workers=2)
+
+    assert runner.result("plan_analysis") == ["2024-09"]
+    assert sorted(runner.tasks["analysis_calc:2024-09"].deps) == ["afrr_write", "provider_write"]
+    # The loaded bids reach provider_data; there is just no aFRR activation to price
+    conn = duckdb.connect(db_path)
+    assert conn.execute("SELECT PRODUCT, ENERGY_PRICE__EUR_MWh_ FROM provider_data").fetchall() == [("NEG_001", 10.0)]
+    conn.close()
+    assert runner.result("analysis_calc:2024-09").empty
+    assert runner.result("analysis_save:2024-09") == 0
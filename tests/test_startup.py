@@ -0,0 +1,70 @@
+"""
+Startup-time regression tests for the command-line entry points.
+
+Wall-clock limits are flaky on shared CI machines, so these tests check the
+thing that actually dominates startup time: which heavy libraries get imported.
+`--help` must not load any of them, and the viewer's `tables` command must not
+load the dataframe stack.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import duckdb
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(BASE_DIR, "src")
+
+HEAVY_MODULES = [
+    "pandas", "polars", "duckdb", "pyarrow", "tqdm", "rich",
+    "matplotlib", "seaborn", "plotly", "openpyxl", "fastexcel",
+]
+
+# Runs an entry point in-process, then reports which heavy modules were imported
+PROBE = """
+import json, runpy, sys
+target, argv = sys.argv[1], sys.argv[2:]
+sys.argv = [target] + argv
+try:
+    if target.endswith(".py"):
+        runpy.run_path(target, run_name="__main__")
+    else:
+        runpy.run_module(target, run_name="__main__")
+except SystemExit:
+    pass
+heavy = %r
+print(json.dumps(sorted(m for m in heavy if m in sys.modules)))
+""" % HEAVY_MODULES
+
+def loaded_heavy_modules(target, *argv):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, BASE_DIR]))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, target, *argv],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("target", [
+    "main.py",
+    "hypermvp.provider.cli",
+    "hypermvp.tools.duckdb_viewer.cli",
+    "hypermvp.analysis.marginal_price_cli",
+])
+def test_help_loads_no_heavy_modules(target):
+    assert loaded_heavy_modules(target, "--help") == []
+
+def test_viewer_tables_skips_dataframe_stack(tmp_path):
+    db_path = tmp_path / "startup.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute("CREATE TABLE t AS SELECT 1 AS x")
+    conn.close()
+
+    loaded = loaded_heavy_modules(
+        "hypermvp.tools.duckdb_viewer.cli", "--db-path", str(db_path), "--format", "json", "tables"
+    )
+    assert "duckdb" in loaded
+    assert not {"pandas", "polars", "pyarrow"} & set(loaded)
@@ -10,6 +10,8 @@ from hypermvp.tools.duckdb_viewer.analysis import (
     get_basic_table_profile,
     profile_column,
     find_data_quality_issues,
+    find_duplicates,
+    get_table_metadata,
 )
 from hypermvp.tools.duckdb_viewer.connection import get_connection
 
@@ -19,6 +21,12 @@ def test_db(tmp_path_factory):
     conn = duckdb.connect(str(db_path))
     conn.execute("CREATE TABLE test_table (id INTEGER, name VARCHAR, value DOUBLE)")
     conn.execute("INSERT INTO test_table VALUES (1, 'A', 10.0), (2, 'B', 20.0), (3, NULL, 30.0)")
+    conn.execute("CREATE TABLE dup_table (id INTEGER, name VARCHAR, value DOUBLE)")
+    conn.execute("""
+        INSERT INTO dup_table VALUES
+            (1, 'A', 10.0), (1, 'A', 10.0), (1, 'A', 10.0),
+            (2, 'B', 20.0), (2, 'B', 25.0), (3, NULL, 30.0)
+    """)
     conn.close()
     return str(db_path)
 
@@ -34,3 +42,45 @@ def test_profile_column(test_db):
 def test_find_data_quality_issues(test_db):
     issues = find_data_quality_issues("test_table", conn=get_connection(test_db))
     assert isinstance(issues, dict)
+
+def test_get_basic_table_profile_counts_duplicates(test_db):
+    profile = get_basic_table_profile("dup_table", conn=get_connection(test_db))
+    assert profile["row_count"] == 6
+    assert profile["distinct_rows"] == 4
+    assert profile["duplicate_rows"] == 2
+
+def test_find_duplicates_full_rows(test_db):
+    result = find_duplicates("dup_table", conn=get_connection(test_db))
+    assert result["duplicate_rows"] == 2
+    assert result["duplicate_groups"] == 1
+    assert result["top_groups"][0]["occurrences"] == 3
+
+def test_find_duplicates_by_key(test_db):
+    result = find_duplicates("dup_table", key_columns=["id"], conn=get_connection(test_db))
+    assert result["distinct_keys"] == 3
+    assert result["duplicate_groups"] == 2
+    assert [g["id"] for g in result["top_groups"]] == [1, 2]
+
+def test_find_duplicates_approximate(test_db):
+    result = find_duplicates("dup_table", approximate=True, limit=0, conn=get_connection(test_db))
+    assert result["approximate"] is True
+    assert "top_groups" not in result
+    assert result["row_count"] == 6
+
+def test_find_duplicates_unknown_key(test_db):
+    with pytest.raises(ValueError):
+        find_duplicates("dup_table", key_columns=["missing"], conn=get_connection(test_db))
+
+def test_get_table_metadata_estimated(test_db):
+    tables = get_table_metadata(conn=get_connection(test_db))
+    by_name = {t["name"]: t for t in tables}
+    assert set(by_name) == {"test_table", "dup_table"}
+    assert by_name["test_table"]["columns"] == 3
+    assert by_name["test_table"]["exact"] is False
+
+def test_get_table_metadata_exact(test_db):
+    tables = get_table_metadata(conn=get_connection(test_db), exact=True, max_workers=2)
+    by_name = {t["name"]: t for t in tables}
+    assert by_name["test_table"]["rows"] == 3
+    assert by_name["dup_table"]["rows"] == 6
+    assert all(t["exact"] for t in tables)
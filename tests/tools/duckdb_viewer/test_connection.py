@@ -14,6 +14,7 @@ from hypermvp.tools.duckdb_viewer.connection import (
     query_to_polars,
     get_table_schema,
     get_sample_data,
+    stream_query,
 )
 
 @pytest.fixture(scope="module")
@@ -50,3 +51,7 @@ def test_get_table_schema(test_db):
 def test_get_sample_data(test_db):
     df = get_sample_data("test_table", limit=2, conn=get_connection(test_db))
     assert len(df) == 2
+
+def test_stream_query(test_db):
+    reader = stream_query("SELECT * FROM test_table", get_connection(test_db), batch_size=2)
+    assert sum(batch.num_rows for batch in reader) == 3
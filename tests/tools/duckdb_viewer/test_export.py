@@ -0,0 +1,59 @@
+"""
+Unit tests for the DuckDB viewer export module.
+
+These tests check that query results are streamed to Parquet, CSV and JSON Lines
+files, and that paging re-chunks record batches correctly.
+"""
+
+import json
+import pytest
+import duckdb
+import polars as pl
+
+from hypermvp.tools.duckdb_viewer.connection import get_connection, stream_query
+from hypermvp.tools.duckdb_viewer.export import export_query, iter_pages
+
+@pytest.fixture(scope="module")
+def test_db(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("data") / "test.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute("CREATE TABLE big_table AS SELECT range AS id, 'row_' || range AS name FROM range(250)")
+    conn.close()
+    return str(db_path)
+
+def test_export_query_parquet(test_db, tmp_path):
+    output_path = tmp_path / "out.parquet"
+    rows = export_query("SELECT * FROM big_table", get_connection(test_db), "parquet", str(output_path), batch_size=64)
+    assert rows == 250
+    assert pl.read_parquet(output_path).height == 250
+
+def test_export_query_csv(test_db, tmp_path):
+    output_path = tmp_path / "out.csv"
+    rows = export_query("SELECT * FROM big_table", get_connection(test_db), "csv", str(output_path), batch_size=64)
+    df = pl.read_csv(output_path)
+    assert rows == 250
+    assert df.columns == ["id", "name"]
+    assert df.height == 250
+
+def test_export_query_jsonl(test_db, tmp_path):
+    output_path = tmp_path / "out.jsonl"
+    rows = export_query("SELECT * FROM big_table WHERE id < 5", get_connection(test_db), "jsonl", str(output_path))
+    lines = output_path.read_text().splitlines()
+    assert rows == 5
+    assert json.loads(lines[0]) == {"id": 0, "name": "row_0"}
+
+def test_export_query_rejects_unknown_format(test_db):
+    with pytest.raises(ValueError):
+        export_query("SELECT * FROM big_table", get_connection(test_db), "xlsx")
+
+def test_iter_pages(test_db):
+    reader = stream_query("SELECT * FROM big_table ORDER BY id", get_connection(test_db), batch_size=64)
+    pages = list(iter_pages(reader, page_size=100))
+    assert [batch.num_rows for _, batch, _ in pages] == [100, 100, 50]
+    assert [has_more for _, _, has_more in pages] == [True, True, False]
+    assert pages[1][1].column("id")[0].as_py() == 100
+
+def test_iter_pages_rejects_empty_pages(test_db):
+    reader = stream_query("SELECT * FROM big_table", get_connection(test_db), batch_size=64)
+    with pytest.raises(ValueError, match="page_size"):
+        next(iter_pages(reader, page_size=0))
@@ -9,6 +9,8 @@ from hypermvp.tools.duckdb_viewer.query_templates import (
     table_preview_query,
     table_summary_query,
     column_stats_query,
+    duplicate_groups_query,
+    table_metadata_query,
 )
 from hypermvp.tools.duckdb_viewer.connection import query_to_polars, get_connection
 import pytest
@@ -43,3 +45,19 @@ def test_column_stats_query(test_db):
     query = column_stats_query("test_table", "id")
     df = query_to_polars(query, get_connection(test_db))
     assert "unique_values" in df.columns
+
+def test_table_summary_query_approximate(test_db):
+    query = table_summary_query("test_table", approximate=True)
+    df = query_to_polars(query, get_connection(test_db))
+    assert df["distinct_rows"][0] == 3
+
+def test_duplicate_groups_query(test_db):
+    query = duplicate_groups_query("test_table", key_columns=["id"])
+    df = query_to_polars(query, get_connection(test_db))
+    assert "occurrences" in df.columns
+    assert len(df) == 0
+
+def test_table_metadata_query(test_db):
+    df = query_to_polars(table_metadata_query(), get_connection(test_db))
+    assert df["table_name"].to_list() == ["test_table"]
+    assert df["column_count"][0] == 3
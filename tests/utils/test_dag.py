@@ -0,0 +1,72 @@
+"""Tests for the dependency-aware task runner."""
+
+import threading
+import time
+
+import pytest
+
+from hypermvp.utils.dag import DagRunner
+
+def test_independent_tasks_overlap_and_dependents_wait():
+    runner = DagRunner(max_workers=4)
+    runner.add("slow_a", lambda: time.sleep(0.2) or "a")
+    runner.add("slow_b", lambda: time.sleep(0.2) or "b")
+    runner.add("join", lambda: runner.result("slow_a") + runner.result("slow_b"), deps=["slow_a", "slow_b"])
+
+    started = time.time()
+    results = runner.run()
+
+    assert results["join"] == "ab"
+    assert time.time() - started < 0.35  # not 0.4: the two sleeps ran together
+    assert runner.timings["join"]["start"] >= max(
+        runner.timings["slow_a"]["end"], runner.timings["slow_b"]["end"]
+    )
+
+def test_writer_tasks_run_one_at_a_time():
+    runner = DagRunner(max_workers=4)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def write():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    for i in range(4):
+        runner.add(f"write_{i}", write, writer=True)
+    runner.run()
+
+    assert peak[0] == 1
+
+def test_tasks_can_add_tasks_while_running():
+    runner = DagRunner()
+
+    def plan():
+        for month in ("2024-08", "2024-09"):
+            runner.add(f"analyse:{month}", lambda m=month: m.upper(), deps=["plan"])
+        return 2
+
+    runner.add("plan", plan)
+    results = runner.run()
+
+    assert results["analyse:2024-09"] == "2024-09"
+    assert len(results) == 3
+
+def test_failure_stops_dependents_and_is_raised():
+    runner = DagRunner()
+    calls = []
+    runner.add("broken", lambda: 1 / 0)
+    runner.add("after", lambda: calls.append("after"), deps=["broken"])
+
+    with pytest.raises(ZeroDivisionError):
+        runner.run()
+    assert calls == []
+
+def test_missing_dependency_is_reported():
+    runner = DagRunner()
+    runner.add("orphan", lambda: None, deps=["nowhere"])
+    with pytest.raises(ValueError, match="orphan"):
+        runner.run()
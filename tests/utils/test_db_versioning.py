@@ -4,7 +4,9 @@ import duckdb
 import json 
 from tempfile import TemporaryDirectory
 import pandas as pd
-from hypermvp.utils.db_versioning import create_duckdb_snapshot, add_version_metadata, cleanup_old_snapshots
+from hypermvp.utils.db_versioning import create_duckdb_snapshot, add_version_metadata, cleanup_old_snapshots, versions_since
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 import shutil
 import gzip
 
@@ -136,6 +138,73 @@ class TestDbVersioning(unittest.TestCase):
         # Clean up
         temp_dir.cleanup()
 
+class TestVersionHistory(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test.duckdb")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_structured_metadata(self):
+        conn = duckdb.connect(self.db_path)
+        first = add_version_metadata(conn, ["a.csv"], "afrr_update_9_2024")
+        second = add_version_metadata(
+            conn, ["b.csv"], "afrr_update_10_2024",
+            tables=["afrr_data"],
+            date_range=(date(2024, 10, 1), date(2024, 10, 31)),
+            rows_inserted=2976, rows_deleted=96, duration_seconds=0.5,
+        )
+        add_version_metadata(conn, ["c.csv"], "ANALYSIS", tables=["marginal_prices"])
+
+        self.assertEqual((first, second), (1, 2))
+        changes = versions_since(conn, first, table="afrr_data")
+        conn.close()
+
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]["version_id"], 2)
+        self.assertEqual(changes[0]["tables_touched"], ["afrr_data"])
+        self.assertEqual(changes[0]["date_from"], date(2024, 10, 1))
+        self.assertEqual(changes[0]["rows_inserted"], 2976)
+        self.assertEqual(changes[0]["rows_deleted"], 96)
+
+    def test_upgrades_legacy_table(self):
+        conn = duckdb.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE version_history (
+                version_id INTEGER PRIMARY KEY,
+                timestamp TIMESTAMP,
+                operation_type VARCHAR,
+                source_files VARCHAR,
+                username VARCHAR
+            )
+        """)
+        conn.execute("INSERT INTO version_history VALUES (7, now(), 'old', '[]', 'me')")
+
+        version_id = add_version_metadata(conn, [], "new", rows_inserted=1)
+        rows = conn.execute("SELECT version_id, rows_inserted FROM version_history ORDER BY 1").fetchall()
+        conn.close()
+
+        self.assertEqual(version_id, 8)
+        self.assertEqual(rows, [(7, None), (8, 1)])
+
+    def test_concurrent_writers_get_unique_ids(self):
+        conn = duckdb.connect(self.db_path)
+        add_version_metadata(conn, [], "setup")
+
+        def write_versions():
+            cursor = conn.cursor()
+            ids = [add_version_metadata(cursor, [], "parallel_load") for _ in range(10)]
+            cursor.close()
+            return ids
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            ids = [i for batch in pool.map(lambda _: write_versions(), range(4)) for i in batch]
+        conn.close()
+
+        self.assertEqual(len(ids), 40)
+        self.assertEqual(len(set(ids)), 40)
+
 def _test_add_version_metadata(conn, source_files, operation):
     max_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM version_history").fetchone()[0]
     files_str = json.dumps(source_files)
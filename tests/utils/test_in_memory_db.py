@@ -0,0 +1,61 @@
+import duckdb
+import pandas as pd
+import pytest
+
+from hypermvp.afrr.save_to_duckdb import save_afrr_to_duckdb
+from hypermvp.utils.in_memory_db import in_memory_database, is_in_memory
+
+def test_is_in_memory():
+    assert is_in_memory(":memory:")
+    assert is_in_memory(":memory:hypermvp")
+    assert not is_in_memory("/tmp/energy_data.duckdb")
+
+def test_connections_share_named_database():
+    with in_memory_database(":memory:test_share") as db_path:
+        conn = duckdb.connect(db_path)
+        conn.execute("CREATE TABLE t AS SELECT 42 AS x")
+        conn.close()
+
+        other = duckdb.connect(db_path)
+        assert other.execute("SELECT x FROM t").fetchone()[0] == 42
+        other.close()
+
+def test_bare_memory_path_rejected():
+    with pytest.raises(ValueError):
+        with in_memory_database(":memory:"):
+            pass
+
+def test_seed_and_persist(tmp_path):
+    source = tmp_path / "source.duckdb"
+    conn = duckdb.connect(str(source))
+    conn.execute("CREATE TABLE provider_clean AS SELECT 1 AS id")
+    conn.close()
+
+    target = tmp_path / "out" / "result.duckdb"
+    data = pd.DataFrame({
+        "Datum": ["01.09.2024", "01.09.2024"],
+        "von": ["00:00", "00:15"],
+        "bis": ["00:15", "00:30"],
+        "50Hertz (Negativ)": [4.364, 10.052],
+    })
+
+    with in_memory_database(":memory:test_persist", seed_from=str(source), persist_to=str(target)) as db_path:
+        assert save_afrr_to_duckdb(data, 9, 2024, db_path=db_path) == 2
+
+    # The source file is untouched, the target has both seeded and new tables
+    conn = duckdb.connect(str(source), read_only=True)
+    assert [r[0] for r in conn.execute("SHOW TABLES").fetchall()] == ["provider_clean"]
+    conn.close()
+
+    conn = duckdb.connect(str(target), read_only=True)
+    assert conn.execute("SELECT COUNT(*) FROM afrr_data").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM provider_clean").fetchone()[0] == 1
+    conn.close()
+
+def test_persist_refuses_to_overwrite(tmp_path):
+    target = tmp_path / "existing.duckdb"
+    duckdb.connect(str(target)).close()
+
+    with pytest.raises(FileExistsError):
+        with in_memory_database(":memory:test_overwrite", persist_to=str(target)):
+            pass
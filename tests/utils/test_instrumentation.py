@@ -0,0 +1,96 @@
+"""Tests for stage instrumentation and JSON run reports."""
+
+import json
+import threading
+
+import duckdb
+import pandas as pd
+import pytest
+
+from hypermvp.afrr.save_to_duckdb import save_afrr_months_to_duckdb
+from hypermvp.utils.instrumentation import current_report, instrument, instrumented, run_report
+
+def test_context_manager_records_rows_and_resources(tmp_path):
+    with run_report("unit", output_dir=str(tmp_path), metadata={"mode": "test"}) as report:
+        with instrument("build", rows_in=3) as stage:
+            data = [bytearray(1024) for _ in range(1000)]
+            stage.rows_out = len(data)
+
+    [path] = tmp_path.glob("unit_*.json")
+    written = json.loads(path.read_text(encoding="utf-8"))
+    assert written["run"] == "unit"
+    assert written["metadata"] == {"mode": "test"}
+    [stage] = written["stages"]
+    assert stage["stage"] == "build"
+    assert (stage["rows_in"], stage["rows_out"]) == (3, 1000)
+    assert stage["wall_seconds"] >= 0 and stage["cpu_seconds"] >= 0
+    assert stage["peak_rss_mb"] >= max(stage["rss_start_mb"], stage["rss_end_mb"]) > 0
+    assert written["peak_rss_mb"] >= stage["peak_rss_mb"]
+    assert current_report() is None and report.stages
+
+def test_decorator_collects_stages_from_threads_and_failures():
+    @instrumented(rows_in=lambda items: len(items), rows_out=len)
+    def double(items):
+        return items * 2
+
+    @instrumented("explode")
+    def explode():
+        raise RuntimeError("boom")
+
+    with run_report("threads", output_dir=None) as report:
+        workers = [threading.Thread(target=double, args=([1, 2],)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        with pytest.raises(RuntimeError):
+            explode()
+
+    doubles = [s for s in report.stages if s.stage == "double"]
+    assert [(s.rows_in, s.rows_out) for s in doubles] == [(2, 4)] * 3
+    assert report.stages[-1].error == "RuntimeError: boom"
+
+def test_overlapping_stages_report_their_own_cpu_time():
+    import time
+
+    entered, done = threading.Event(), threading.Event()
+
+    def waiting_stage():
+        with instrument("wait"):
+            entered.set()
+            done.wait()
+
+    with run_report("overlap", output_dir=None) as report:
+        waiter = threading.Thread(target=waiting_stage)
+        waiter.start()
+        entered.wait()
+        with instrument("spin"):
+            start = time.thread_time()
+            while time.thread_time() - start < 0.2:
+                pass
+        done.set()
+        waiter.join()
+
+    stages = {s.stage: s for s in report.stages}
+    assert stages["spin"].cpu_seconds >= 0.2
+    # The waiting stage used almost no CPU itself, but the process did meanwhile
+    assert stages["wait"].cpu_seconds < 0.1
+    assert stages["wait"].process_cpu_seconds >= 0.2
+
+def test_afrr_save_reports_rows(tmp_path):
+    frame = pd.DataFrame({
+        "Datum": ["01.09.2024", "01.09.2024"],
+        "von": ["00:00", "00:15"],
+        "bis": ["00:15", "00:30"],
+        "50Hertz (Negativ)": ["1,0", "2,0"],
+    })
+    db_path = str(tmp_path / "energy.duckdb")
+
+    with run_report("afrr", output_dir=None) as report:
+        save_afrr_months_to_duckdb([(9, 2024, frame)], db_path=db_path)
+
+    [stage] = [s for s in report.stages if s.stage == "afrr_save"]
+    assert (stage.rows_in, stage.rows_out) == (2, 2)
+    conn = duckdb.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM afrr_data").fetchone()[0] == 2
+    conn.close()
@@ -0,0 +1,55 @@
+"""Tests for hypermvp.utils.memory_budget."""
+
+import argparse
+
+import pytest
+
+from hypermvp.utils import memory_budget
+from hypermvp.utils.memory_budget import MemoryBudget, parse_memory_size
+
+@pytest.mark.parametrize("text, expected", [
+    ("512MB", 512 * 1024 ** 2),
+    ("8GB", 8 * 1024 ** 3),
+    ("1.5g", int(1.5 * 1024 ** 3)),
+    ("2GiB", 2 * 1024 ** 3),
+    ("1048576", 1024 ** 2),
+    ("auto", "auto"),
+])
+def test_parse_memory_size(text, expected):
+    assert parse_memory_size(text) == expected
+
+@pytest.mark.parametrize("text", ["lots", "0MB", "-1GB", "4 PB"])
+def test_parse_memory_size_rejects_invalid(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_memory_size(text)
+
+class FakeMemory:
+    def __init__(self, available):
+        self.available = available
+
+def test_resolve_caps_budget_at_available_memory(monkeypatch):
+    monkeypatch.setattr(memory_budget.psutil, "virtual_memory", lambda: FakeMemory(4 * 1024 ** 3))
+
+    assert MemoryBudget.resolve(None) is None
+    assert MemoryBudget.resolve("1GB").limit_bytes == 1024 ** 3
+    assert MemoryBudget.resolve("16GB").limit_bytes == 4 * 1024 ** 3
+    assert MemoryBudget.resolve("auto").limit_bytes == 2 * 1024 ** 3
+
+def test_should_flush_on_batch_size_or_low_memory(monkeypatch):
+    available = FakeMemory(4 * 1024 ** 3)
+    monkeypatch.setattr(memory_budget.psutil, "virtual_memory", lambda: available)
+    budget = MemoryBudget(1024 ** 3)
+
+    assert not budget.should_flush(budget.batch_bytes - 1)
+    assert budget.should_flush(budget.batch_bytes)
+    available.available = memory_budget.MIN_AVAILABLE_BYTES - 1
+    assert budget.should_flush(0)
+
+def test_should_stream_and_chunk_rows():
+    budget = MemoryBudget(100 * 1024 ** 2)
+
+    assert not budget.should_stream(10 * 1024 ** 2)
+    assert budget.should_stream(100 * 1024 ** 2)
+    assert budget.chunk_rows(100_000) == 35 * 1024
+    assert budget.chunk_rows(10_000) == 10_000
+    assert MemoryBudget(1).chunk_rows(100_000) == memory_budget.MIN_CHUNK_ROWS
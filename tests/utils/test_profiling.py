@@ -0,0 +1,67 @@
+"""Tests for the shared --profile support."""
+
+import argparse
+import pstats
+import threading
+import time
+
+from hypermvp.utils.instrumentation import instrument
+from hypermvp.utils.profiling import add_profile_arguments, profile_session
+
+def busy_work(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(1000))
+    return total
+
+def test_profile_arguments_default_off():
+    parser = add_profile_arguments(argparse.ArgumentParser())
+    assert parser.parse_args([]).profile is False
+    args = parser.parse_args(["--profile", "--profile-stacks"])
+    assert args.profile and args.profile_stacks
+
+def test_disabled_session_writes_nothing(tmp_path):
+    with profile_session("off", enabled=False, output_dir=str(tmp_path)) as run_dir:
+        busy_work(0.01)
+    assert run_dir is None
+    assert list(tmp_path.iterdir()) == []
+
+def test_session_writes_stats_stacks_and_summary(tmp_path, capsys):
+    def stage_in_thread():
+        with instrument("parse_workbooks"):
+            busy_work(0.2)
+
+    with profile_session("unit", stacks=True, output_dir=str(tmp_path)) as run_dir:
+        worker = threading.Thread(target=stage_in_thread, name="worker")
+        worker.start()
+        with instrument("load_csv"):
+            busy_work(0.2)
+        worker.join()
+
+    summary = capsys.readouterr().err
+    assert "=== Profile: unit" in summary
+    assert "cumtime" in summary and "unit.prof" in summary
+
+    stats = pstats.Stats(str(tmp_path / run_dir / "unit.prof"))
+    assert any(name == "busy_work" for _, _, name in stats.stats)
+
+    combined = (tmp_path / run_dir / "unit.collapsed").read_text(encoding="utf-8").splitlines()
+    roots = {line.split(";", 1)[0] for line in combined}
+    assert {"parse_workbooks", "load_csv"} <= roots
+    per_stage = (tmp_path / run_dir / "parse_workbooks.collapsed").read_text(encoding="utf-8")
+    assert "test_profiling.py:busy_work" in per_stage
+    stack, count = per_stage.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+def test_summary_hides_idle_waits(tmp_path, capsys):
+    stop = threading.Event()
+    idler = threading.Thread(target=lambda: [stop.wait(0.01) for _ in range(20)])
+    with profile_session("idle", output_dir=str(tmp_path)):
+        idler.start()
+        busy_work(0.05)
+        idler.join()
+
+    summary = capsys.readouterr().err
+    assert "(wait)" not in summary
+    assert "busy_work" in summary
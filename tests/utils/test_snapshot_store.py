@@ -0,0 +1,162 @@
+"""Tests for the deduplicated Parquet snapshot store."""
+
+import os
+
+import duckdb
+import pytest
+
+from hypermvp.utils.db_versioning import (
+    create_duckdb_snapshot,
+    diff_snapshots,
+    list_snapshots,
+    restore_snapshot,
+)
+from hypermvp.utils.snapshot_store import SnapshotStore
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "energy.duckdb"
+    conn = duckdb.connect(str(path))
+    conn.execute("""
+        CREATE TABLE afrr_data AS
+        SELECT strftime(DATE '2024-08-01' + (i // 96)::INT, '%d.%m.%Y') AS "Datum",
+               '00:00' AS von, '00:15' AS bis,
+               CAST(i % 50 AS VARCHAR) || ',5' AS "50Hertz (Negativ)",
+               month(DATE '2024-08-01' + (i // 96)::INT) AS month,
+               2024 AS year
+        FROM range(96 * 63) t(i)
+    """)
+    conn.execute("CREATE TABLE settings (key VARCHAR, value VARCHAR)")
+    conn.execute("INSERT INTO settings VALUES ('mode', 'pilot')")
+    conn.execute("CREATE TABLE empty_table (id INTEGER)")
+    conn.execute("CREATE SEQUENCE version_seq START 1")
+    conn.execute("SELECT nextval('version_seq')")
+    conn.execute("CREATE VIEW august AS SELECT * FROM afrr_data WHERE month = 8")
+    conn.close()
+    return path
+
+def table_rows(path, table):
+    conn = duckdb.connect(str(path))
+    rows = conn.execute(f"SELECT * FROM {table} ORDER BY ALL").fetchall()
+    conn.close()
+    return rows
+
+def test_second_snapshot_only_exports_changed_month(db_path):
+    store = SnapshotStore(db_path)
+    first = store.create("first")
+    assert first["exported"] == 4  # Aug, Sep, Oct (2 days) + settings
+    assert first["reused"] == 0
+
+    conn = duckdb.connect(str(db_path))
+    conn.execute("""UPDATE afrr_data SET "50Hertz (Negativ)" = '0,0' WHERE month = 9""")
+    conn.close()
+
+    second = store.create("second")
+    assert second["exported"] == 1
+    assert second["reused"] == 3
+
+    afrr = {t["name"]: t for t in second["tables"]}["afrr_data"]
+    assert [p["key"] for p in afrr["partitions"]] == ["2024-08", "2024-09", "2024-10"]
+    assert afrr["rows"] == 96 * 63
+
+def test_restore_round_trip(db_path, tmp_path):
+    original = table_rows(db_path, "afrr_data")
+    store = SnapshotStore(db_path)
+    store.create("before")
+
+    conn = duckdb.connect(str(db_path))
+    conn.execute("DELETE FROM afrr_data WHERE month = 8")
+    conn.close()
+
+    restored = store.restore("before", tmp_path / "restored.duckdb")
+
+    assert table_rows(restored, "afrr_data") == original
+    assert table_rows(restored, "settings") == [("mode", "pilot")]
+    assert table_rows(restored, "empty_table") == []
+    conn = duckdb.connect(str(restored))
+    assert conn.execute("SELECT COUNT(*) FROM august").fetchone()[0] == 96 * 31
+    assert conn.execute("SELECT nextval('version_seq')").fetchone()[0] == 2
+    conn.close()
+
+def test_prune_removes_unreferenced_objects(db_path):
+    store = SnapshotStore(db_path)
+    store.create("a")
+    conn = duckdb.connect(str(db_path))
+    conn.execute("DELETE FROM afrr_data WHERE month = 10")
+    conn.close()
+    store.create("b")
+
+    objects_before = set(store.objects_dir.glob("*/*.parquet"))
+    assert store.prune(keep=1) == 1
+    assert store.list_snapshots() == ["b"]
+
+    objects_after = set(store.objects_dir.glob("*/*.parquet"))
+    assert len(objects_before - objects_after) == 1  # only October's object is gone
+
+def test_create_duckdb_snapshot_parquet_engine(db_path):
+    name = create_duckdb_snapshot(str(db_path), keep=2, force_enable=True, engine="parquet")
+
+    assert SnapshotStore(db_path).list_snapshots() == [name]
+    with pytest.raises(ValueError):
+        create_duckdb_snapshot(str(db_path), force_enable=True, engine="zip")
+
+def test_restore_snapshot_replaces_database(db_path):
+    name = create_duckdb_snapshot(str(db_path), force_enable=True, engine="parquet")
+    original = table_rows(db_path, "afrr_data")
+
+    conn = duckdb.connect(str(db_path))
+    conn.execute("DELETE FROM afrr_data WHERE month = 9")
+    conn.execute("DROP TABLE settings")
+    conn.close()
+
+    assert list_snapshots(str(db_path)) == [name]
+    restore_snapshot(name, db_path=str(db_path))
+
+    assert table_rows(db_path, "afrr_data") == original
+    assert table_rows(db_path, "settings") == [("mode", "pilot")]
+
+def test_restore_snapshot_from_gzip(db_path):
+    gz_path = create_duckdb_snapshot(str(db_path), force_enable=True)
+    original = table_rows(db_path, "afrr_data")
+    conn = duckdb.connect(str(db_path))
+    conn.execute("DELETE FROM afrr_data")
+    conn.close()
+
+    restore_snapshot(os.path.basename(gz_path), db_path=str(db_path))
+
+    assert table_rows(db_path, "afrr_data") == original
+
+def test_restore_rejects_corrupt_snapshot(db_path):
+    store = SnapshotStore(db_path)
+    store.create("good")
+    # Tamper with one stored object: overwrite September with August's rows
+    afrr = {t["name"]: t for t in store.load_manifest("good")["tables"]}["afrr_data"]
+    august, september = afrr["partitions"][0], afrr["partitions"][1]
+    os.replace(store.root / august["files"][0], store.root / september["files"][0])
+
+    with pytest.raises(Exception):
+        store.restore("good", db_path)
+    # The live database is untouched
+    assert len(table_rows(db_path, "afrr_data")) == 96 * 63
+
+    with pytest.raises(FileNotFoundError):
+        restore_snapshot("missing", db_path=str(db_path))
+
+def test_diff_snapshots_reports_changed_dates(db_path):
+    store = SnapshotStore(db_path)
+    store.create("before")
+    conn = duckdb.connect(str(db_path))
+    conn.execute("""DELETE FROM afrr_data WHERE "Datum" = '02.10.2024' AND von = '00:00' AND "50Hertz (Negativ)" = '0,5'""")
+    conn.execute("""UPDATE afrr_data SET "50Hertz (Negativ)" = '99,9' WHERE "Datum" = '15.09.2024'""")
+    conn.execute("INSERT INTO settings VALUES ('owner', 'ops')")
+    conn.close()
+    store.create("after")
+
+    changes = diff_snapshots("before", "after", db_path=str(db_path))
+
+    assert [(c["table"], str(c["delivery_date"]), c["row_delta"], c["content_changed"]) for c in changes] == [
+        ("afrr_data", "2024-09-15", 0, True),
+        ("afrr_data", "2024-10-02", -1, False),
+        ("settings", "None", 1, False),
+    ]
+    assert diff_snapshots("after", "after", db_path=str(db_path)) == []
@@ -0,0 +1,70 @@
+"""Tests for the traced DuckDB connection and slow-query reports."""
+
+import json
+import logging
+
+import pytest
+
+from hypermvp.utils import traced_duckdb
+from hypermvp.utils.traced_duckdb import query_trace
+
+@pytest.fixture
+def conn():
+    con = traced_duckdb.connect()
+    con.execute("CREATE TABLE t AS SELECT range AS i FROM range(1000)")
+    yield con
+    con.close()
+
+def test_statements_are_logged_with_params_and_rows(conn, caplog):
+    with caplog.at_level(logging.DEBUG, logger="hypermvp.sql"):
+        rows = conn.execute("SELECT i FROM t WHERE i < ?", [5]).fetchall()
+        df = conn.execute("SELECT * FROM t").df()
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (1000,)
+        conn.execute("SELECT 1")  # never fetched: logged when the connection closes
+        conn.close()
+
+    assert len(rows) == 5 and len(df) == 1000
+    messages = [r.getMessage() for r in caplog.records if r.name == "hypermvp.sql"]
+    assert any("rows=5 params=[5] | SELECT i FROM t WHERE i < ?" in m for m in messages)
+    assert any("rows=1,000 | SELECT * FROM t" in m for m in messages)
+    assert any("rows=1 | SELECT COUNT(*) FROM t" in m for m in messages)
+    assert messages[-1].endswith("| SELECT 1")
+
+def test_connection_passes_through_other_methods(conn):
+    import pandas as pd
+
+    conn.register("frame", pd.DataFrame({"x": [1, 2, 3]}))
+    assert conn.execute("SELECT SUM(x) FROM frame").fetchone()[0] == 6
+    reader = conn.execute("SELECT * FROM t").to_arrow_reader(100)
+    assert sum(batch.num_rows for batch in reader) == 1000
+
+def test_slow_queries_are_profiled_and_reported(conn, tmp_path):
+    with query_trace("unit", output_dir=str(tmp_path), slow_seconds=0.0) as trace:
+        for _ in range(3):
+            conn.execute("SELECT COUNT(*) FROM t WHERE i % ? = 0", [7]).fetchone()
+        conn.execute("DELETE FROM t WHERE i > ?", [900]).fetchall()
+
+    [path] = tmp_path.glob("unit_*.json")
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["statements"] == 4
+    top = {s["sql"]: s for s in report["top_statements"]}
+    assert top["SELECT COUNT(*) FROM t WHERE i % ? = 0"]["calls"] == 3
+
+    select, *_, delete = report["slow_queries"]
+    # Each distinct read-only statement is profiled once; writes are never re-run
+    assert isinstance(select["profile"], dict)
+    assert [q.get("profile") is not None for q in report["slow_queries"]] == [True, False, False, False]
+    assert delete["params"] == "[900]" and "profile" not in delete
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 901
+    assert trace.slow_queries == report["slow_queries"]
+
+def test_slow_cte_writes_are_not_re_run(conn, tmp_path):
+    conn.execute("CREATE TABLE target (a INTEGER)")
+    with query_trace("unit", output_dir=str(tmp_path), slow_seconds=0.0) as trace:
+        conn.execute("WITH x AS (SELECT 1 a) INSERT INTO target SELECT * FROM x").fetchall()
+        conn.execute("WITH x AS (SELECT 2 a) SELECT * FROM x").fetchall()
+
+    write, read = trace.slow_queries
+    assert "profile" not in write
+    assert isinstance(read["profile"], dict)
+    assert conn.execute("SELECT COUNT(*) FROM target").fetchone()[0] == 1